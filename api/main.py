@@ -1,24 +1,33 @@
 from __future__ import annotations
 
-import shutil
+import asyncio
+import json
+import os
+import time
 import uuid
 from pathlib import Path
 from typing import Any
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-from git import Repo
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, JSONResponse
 from pydantic import BaseModel, HttpUrl
 
-from dpylens.cli import analyze_project
-from dpylens.rendering.graphviz import render_dot_to_png
-from dpylens.reporter.html_report import ReportPaths, build_report
+from dpylens.store.sqlite import MAX_PAGE_SIZE, STORE_FILENAME, AnalysisStore
+from dpylens.worker.queue import QUEUE_FILENAME, Job, JobQueue
 
 from api.summary_builder import build_repo_summary, build_description_markdown
 
 APP_DATA_DIR = Path(".dpylens-server").resolve()
 RUNS_DIR = APP_DATA_DIR / "runs"
+QUEUE_PATH = APP_DATA_DIR / QUEUE_FILENAME
+# Per-file results by git blob id, shared by all runs: re-analyzing a repo only parses changed files
+FILE_CACHE_DIR = APP_DATA_DIR / "cache" / "files"
+
+# How long POST /analyze waits for a worker before answering 202 with the job state
+ANALYZE_WAIT_SECONDS = float(os.environ.get("DPYLENS_ANALYZE_WAIT", "600"))
+ANALYZE_POLL_SECONDS = 0.5
 
 
 class AnalyzeRequest(BaseModel):
@@ -34,6 +43,7 @@ class AnalyzeResponse(BaseModel):
     warnings: list[str]
     files_analyzed: int
     parse_errors: int
+    budget_notes: int = 0
 
     report_url: str
 
@@ -44,6 +54,15 @@ class AnalyzeResponse(BaseModel):
     download_analysis_zip_url: str
 
 
+class JobResponse(BaseModel):
+    run_id: str
+    state: str
+    attempts: int
+    max_attempts: int
+    error: str | None = None
+    result: AnalyzeResponse | None = None
+
+
 app = FastAPI(title="dpylens api", version="0.1.0")
 
 app.add_middleware(
@@ -54,81 +73,130 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-
-def _ensure_dirs() -> None:
-    RUNS_DIR.mkdir(parents=True, exist_ok=True)
+_queue: JobQueue | None = None
 
 
-def _zip_dir(src_dir: Path, out_zip: Path) -> Path:
-    out_zip.parent.mkdir(parents=True, exist_ok=True)
-    base_name = str(out_zip).removesuffix(".zip")
-    shutil.make_archive(base_name, "zip", root_dir=str(src_dir))
-    return Path(base_name + ".zip")
+def _jobs() -> JobQueue:
+    global _queue
+    if _queue is None:
+        RUNS_DIR.mkdir(parents=True, exist_ok=True)
+        _queue = JobQueue(QUEUE_PATH)
+    return _queue
 
 
 def _run_dir(run_id: str) -> Path:
     return RUNS_DIR / run_id
 
 
-@app.get("/health")
-def health() -> dict[str, str]:
-    return {"status": "ok"}
-
-
-@app.post("/analyze", response_model=AnalyzeResponse)
-def analyze(req: AnalyzeRequest) -> AnalyzeResponse:
-    _ensure_dirs()
-
-    run_id = uuid.uuid4().hex[:12]
-    run_dir = RUNS_DIR / run_id
-    repo_dir = run_dir / "repo"
-    analysis_dir = run_dir / "analysis"
-    report_dir = run_dir / "report"
-
-    warnings: list[str] = []
-
-    try:
-        run_dir.mkdir(parents=True, exist_ok=True)
+def _open_store(run_id: str) -> AnalysisStore:
+    p = _run_dir(run_id) / "analysis" / STORE_FILENAME
+    if not p.exists():
+        raise HTTPException(status_code=404, detail="Not found")
+    return AnalysisStore(p)
 
-        # Clone repo (shallow)
-        Repo.clone_from(str(req.repo_url), str(repo_dir), depth=1)
 
-        # Analyze
-        files_analyzed, errors = analyze_project(root=repo_dir, out=analysis_dir)
+def _page(items: list[dict[str, Any]], limit: int, offset: int) -> dict[str, Any]:
+    return {
+        "items": items,
+        "limit": limit,
+        "offset": offset,
+        "next_offset": offset + len(items) if len(items) == limit else None,
+    }
 
-        # Optional render
-        if req.render:
-            rr = render_dot_to_png(analysis_dir)
-            warnings.extend(rr.warnings)
 
-        # Report
-        build_report(ReportPaths(analysis_dir=analysis_dir, report_dir=report_dir))
+def _enqueue(req: AnalyzeRequest) -> Job:
+    run_id = uuid.uuid4().hex[:12]
+    payload = {
+        "source": str(req.repo_url),
+        "out": str(_run_dir(run_id)),
+        "render": req.render,
+        "archives": True,
+        "cache": str(FILE_CACHE_DIR),
+    }
+    return _jobs().enqueue("analyze", payload, job_id=run_id)
+
+
+def _analyze_response(job: Job) -> AnalyzeResponse:
+    """
+    Response for a finished analyze job; the summary is computed once (streamed from the analysis
+    JSON) and kept next to the run.
+    """
+    assert job.result is not None
+    run_dir = _run_dir(job.id)
+    repo_url = job.payload["source"]
+    summary_path = run_dir / "summary.json"
+    if summary_path.exists():
+        summary = json.loads(summary_path.read_text(encoding="utf-8"))
+    else:
+        summary = build_repo_summary(Path(job.result["analysis_dir"]))
+        summary_path.write_text(json.dumps(summary), encoding="utf-8")
+    return AnalyzeResponse(
+        run_id=job.id,
+        repo_url=repo_url,
+        analysis_dir=job.result["analysis_dir"],
+        report_dir=job.result["report_dir"],
+        warnings=job.result["warnings"],
+        files_analyzed=job.result["files_analyzed"],
+        parse_errors=job.result["parse_errors"],
+        budget_notes=job.result.get("budget_notes", 0),
+        report_url=f"/runs/{job.id}/report/",
+        summary=summary,
+        description_markdown=build_description_markdown(repo_url, summary),
+        download_report_url=f"/runs/{job.id}/report.zip",
+        download_analysis_zip_url=f"/runs/{job.id}/analysis.zip",
+    )
+
+
+def _job_response(job: Job) -> JobResponse:
+    return JobResponse(
+        run_id=job.id,
+        state=job.state,
+        attempts=job.attempts,
+        max_attempts=job.max_attempts,
+        error=job.error,
+        result=_analyze_response(job) if job.state == "done" else None,
+    )
 
-        # Heuristic summary + description
-        summary = build_repo_summary(analysis_dir)
-        description = build_description_markdown(str(req.repo_url), summary)
 
-        # Downloads
-        _zip_dir(report_dir, run_dir / "report.zip")
-        _zip_dir(analysis_dir, run_dir / "analysis.zip")
+@app.get("/health")
+def health() -> dict[str, Any]:
+    return {"status": "ok", "jobs": _jobs().counts()}
 
-        return AnalyzeResponse(
-            run_id=run_id,
-            repo_url=str(req.repo_url),
-            analysis_dir=str(analysis_dir),
-            report_dir=str(report_dir),
-            warnings=warnings,
-            files_analyzed=files_analyzed,
-            parse_errors=len(errors),
-            report_url=f"/runs/{run_id}/report/",
-            summary=summary,
-            description_markdown=description,
-            download_report_url=f"/runs/{run_id}/report.zip",
-            download_analysis_zip_url=f"/runs/{run_id}/analysis.zip",
-        )
 
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Analyze failed: {e}") from e
+@app.post("/analyze", response_model=AnalyzeResponse)
+async def analyze_repo(req: AnalyzeRequest) -> Any:
+    """
+    Queue the analysis and wait for a worker (`dpylens worker`) to finish it. If it takes longer
+    than ANALYZE_WAIT_SECONDS, answer 202 with the job; poll GET /jobs/{run_id} from there.
+
+    The wait sleeps on the event loop between polls rather than blocking a threadpool thread, so
+    waiting requests do not starve the other (sync) routes.
+    """
+    job = await run_in_threadpool(_enqueue, req)
+    deadline = time.monotonic() + ANALYZE_WAIT_SECONDS
+    while job.state not in ("done", "failed") and time.monotonic() < deadline:
+        await asyncio.sleep(min(ANALYZE_POLL_SECONDS, max(0.0, deadline - time.monotonic())))
+        latest = await run_in_threadpool(_jobs().get, job.id)
+        assert latest is not None
+        job = latest
+    if job.state == "done":
+        return await run_in_threadpool(_analyze_response, job)
+    if job.state == "failed":
+        raise HTTPException(status_code=400, detail=f"Analyze failed: {job.error}")
+    return JSONResponse(status_code=202, content=_job_response(job).model_dump())
+
+
+@app.post("/jobs", response_model=JobResponse, status_code=202)
+def submit_job(req: AnalyzeRequest) -> JobResponse:
+    return _job_response(_enqueue(req))
+
+
+@app.get("/jobs/{run_id}", response_model=JobResponse)
+def job_status(run_id: str) -> JobResponse:
+    job = _jobs().get(run_id)
+    if job is None or job.kind != "analyze":
+        raise HTTPException(status_code=404, detail="Not found")
+    return _job_response(job)
 
 
 @app.get("/runs/{run_id}/report/")
@@ -166,4 +234,35 @@ def download_analysis(run_id: str) -> Any:
     p = _run_dir(run_id) / "analysis.zip"
     if not p.exists():
         raise HTTPException(status_code=404, detail="Not found")
-    return FileResponse(str(p), filename=f"dpylens-analysis-{run_id}.zip")
\ No newline at end of file
+    return FileResponse(str(p), filename=f"dpylens-analysis-{run_id}.zip")
+
+
+@app.get("/runs/{run_id}/functions")
+def run_functions(
+    run_id: str,
+    prefix: str = "",
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+) -> dict[str, Any]:
+    with _open_store(run_id) as store:
+        return _page(store.functions(prefix, limit=limit, offset=offset), limit, offset)
+
+
+@app.get("/runs/{run_id}/callers/{qualname}")
+def run_callers(
+    run_id: str,
+    qualname: str,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+) -> dict[str, Any]:
+    with _open_store(run_id) as store:
+        return _page(store.callers(qualname, limit=limit, offset=offset), limit, offset)
+
+
+@app.get("/runs/{run_id}/files/{file_path:path}")
+def run_file(run_id: str, file_path: str) -> dict[str, Any]:
+    with _open_store(run_id) as store:
+        details = store.file_details(file_path)
+    if details is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    return details
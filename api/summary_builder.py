@@ -1,121 +1,240 @@
 from __future__ import annotations
 
-import json
-from collections import Counter, defaultdict
+import heapq
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterable, Iterator
 
+from dpylens.analyzer.jsonstream import iter_fields
+from dpylens.analyzer.result import AnalysisResult
+from dpylens.analyzer.sketches import DistinctCounter, TopK
 
-def _read_json(p: Path) -> Any:
-    return json.loads(p.read_text(encoding="utf-8"))
+# Keys tracked per top-k table. Counts are exact below this many distinct keys (see TopK).
+DEFAULT_TRACKED_KEYS = 4096
 
+# Artifacts that repeat the run's error list
+_ERROR_ARTIFACTS = ("modules.json", "module_graph.json", "callgraph.json", "patterns.json", "dataflow.json")
 
-def build_repo_summary(analysis_dir: Path, max_items: int = 20) -> dict[str, Any]:
-    modules = _read_json(analysis_dir / "modules.json")
-    module_graph = _read_json(analysis_dir / "module_graph.json")
-    callgraph = _read_json(analysis_dir / "callgraph.json")
-    patterns = _read_json(analysis_dir / "patterns.json")
-    dataflow = _read_json(analysis_dir / "dataflow.json")
 
-    resolved = None
-    resolved_path = analysis_dir / "callgraph_resolved.json"
-    if resolved_path.exists():
-        resolved = _read_json(resolved_path)
+def _field(row: Any, key: str) -> Any:
+    """
+    Read one field from either a JSON dict (artifact on disk) or a record object (AnalysisResult).
+    """
+    if isinstance(row, dict):
+        return row.get(key)
+    return getattr(row, key, None)
 
-    imports = modules.get("imports", []) or []
-    files = [r.get("file") for r in imports if r.get("file")]
 
-    imported_modules = Counter()
-    for r in imports:
-        for it in r.get("items", []) or []:
-            m = (it.get("module") or "").strip()
+class _Summary:
+    """
+    One pass over the analysis rows; every table is bounded (TopK / DistinctCounter).
+    """
+
+    def __init__(self, tracked: int):
+        self.counts = {
+            "files": 0,
+            "module_edges": 0,
+            "functions": 0,
+            "calls": 0,
+            "resolved_calls": 0,
+            "dataflow_functions": 0,
+            "files_with_patterns": 0,
+            "warnings": 0,
+        }
+        self.imported_modules = TopK(tracked)
+        self.out_deg = TopK(tracked)
+        self.in_deg = TopK(tracked)
+        self.calls_by_caller = TopK(tracked)
+        self.callees_of: dict[str, DistinctCounter] = {}
+        self.calls_by_file = TopK(tracked)
+        self.pattern_counts = TopK(tracked)
+        self.df_inputs = TopK(tracked)
+        self.df_outputs = TopK(tracked)
+        self.metrics: dict[str, Any] | None = None  # metrics.json "aggregates"
+
+    def add_import_record(self, r: Any) -> None:
+        if _field(r, "file"):
+            self.counts["files"] += 1
+        for it in _field(r, "items") or []:
+            m = (_field(it, "module") or "").strip()
             if m:
-                imported_modules[m] += 1
-
-    edges = module_graph.get("edges", []) or []
-    out_deg = Counter()
-    in_deg = Counter()
-    for e in edges:
-        s = e.get("src")
-        t = e.get("dst")
+                self.imported_modules.add(m)
+
+    def add_module_edge(self, e: Any) -> None:
+        self.counts["module_edges"] += 1
+        s = _field(e, "src_module")
+        t = _field(e, "dst_module")
         if s:
-            out_deg[s] += 1
+            self.out_deg.add(s)
         if t:
-            in_deg[t] += 1
+            self.in_deg.add(t)
+
+    def add_function(self, _f: Any) -> None:
+        self.counts["functions"] += 1
 
-    calls = (resolved or callgraph).get("calls", []) or []
-    calls_by_caller = defaultdict(int)
-    unique_callees = defaultdict(set)
-    calls_by_file = Counter()
+    def count_call(self, _c: Any) -> None:
+        self.counts["calls"] += 1
 
-    for c in calls:
-        caller = c.get("caller") or ""
-        callee = c.get("callee_resolved") or c.get("callee_raw") or c.get("callee") or ""
-        f = c.get("file") or ""
+    def add_resolved_call(self, c: Any) -> None:
+        self.counts["resolved_calls"] += 1
+        self.add_call(c)
+
+    def add_call(self, c: Any) -> None:
+        """
+        A call used for the call-graph tables (resolved calls when available).
+        """
+        caller = _field(c, "caller") or ""
+        callee = _field(c, "callee_resolved") or _field(c, "callee_raw") or _field(c, "callee") or ""
+        f = _field(c, "file") or ""
         if f:
-            calls_by_file[f] += 1
+            self.calls_by_file.add(f)
         if caller and callee:
-            calls_by_caller[caller] += 1
-            unique_callees[caller].add(callee)
-
-    top_callers = sorted(calls_by_caller.items(), key=lambda x: x[1], reverse=True)[:max_items]
-    top_fanout = sorted(((k, len(v)) for k, v in unique_callees.items()), key=lambda x: x[1], reverse=True)[:max_items]
-    top_call_files = calls_by_file.most_common(max_items)
-
-    pattern_hits = patterns.get("patterns", []) or []
-    pattern_counts = Counter()
-    files_with_patterns = 0
-    for p in pattern_hits:
-        pats = p.get("patterns") or []
+            evicted = self.calls_by_caller.add(caller)
+            if evicted is not None:
+                self.callees_of.pop(evicted, None)
+            sketch = self.callees_of.get(caller)
+            if sketch is None:
+                sketch = self.callees_of[caller] = DistinctCounter()
+            sketch.add(callee)
+
+    def add_pattern_hit(self, p: Any) -> None:
+        pats = _field(p, "patterns") or []
         if pats:
-            files_with_patterns += 1
+            self.counts["files_with_patterns"] += 1
         for pat in pats:
-            pattern_counts[pat] += 1
-
-    df_fns = dataflow.get("functions", []) or []
-    df_inputs = Counter()
-    df_outputs = Counter()
-    for f in df_fns:
-        for i in f.get("inputs") or []:
-            df_inputs[str(i)] += 1
-        for o in f.get("outputs") or []:
-            df_outputs[str(o)] += 1
-
-    errors_total = (
-        len(modules.get("errors", []) or [])
-        + len(module_graph.get("errors", []) or [])
-        + len(callgraph.get("errors", []) or [])
-        + len(patterns.get("errors", []) or [])
-        + len(dataflow.get("errors", []) or [])
-    )
+            self.pattern_counts.add(pat)
+
+    def add_dataflow(self, f: Any) -> None:
+        self.counts["dataflow_functions"] += 1
+        for i in _field(f, "inputs") or []:
+            self.df_inputs.add(str(i))
+        for o in _field(f, "outputs") or []:
+            self.df_outputs.add(str(o))
 
+    def result(self, max_items: int) -> dict[str, Any]:
+        fanout = [(caller, sketch.estimate()) for caller, sketch in self.callees_of.items()]
+        # Stable sort keeps first-seen order among ties
+        top_fanout = sorted(fanout, key=lambda x: x[1], reverse=True)[:max_items]
+        return {
+            "counts": dict(self.counts),
+            "top_imported_modules": [{"module": m, "count": c} for m, c in self.imported_modules.top(max_items)],
+            "module_graph": {
+                "top_out_degree": [{"module": m, "out": c} for m, c in self.out_deg.top(max_items)],
+                "top_in_degree": [{"module": m, "in": c} for m, c in self.in_deg.top(max_items)],
+            },
+            "call_graph": {
+                "top_callers_by_calls": [{"caller": k, "calls": v} for k, v in self.calls_by_caller.top(max_items)],
+                "top_fanout_callers": [{"caller": k, "unique_callees": v} for k, v in top_fanout],
+                "top_call_files": [{"file": f, "calls": c} for f, c in self.calls_by_file.top(max_items)],
+            },
+            "patterns": [{"pattern": p, "count": c} for p, c in self.pattern_counts.top(max_items)],
+            "dataflow": {
+                "top_inputs": [{"input": k, "count": v} for k, v in self.df_inputs.top(15)],
+                "top_outputs": [{"output": k, "count": v} for k, v in self.df_outputs.top(15)],
+            },
+            "metrics": _metrics_summary(self.metrics, max_items) if self.metrics else {},
+        }
+
+
+def _top_groups(groups: dict[str, Any], max_items: int) -> list[dict[str, Any]]:
+    """
+    Most complex packages/modules: by p90 complexity, then max complexity, then first appearance.
+    """
+    cx = groups["complexity"]
+    order = heapq.nsmallest(max_items, range(len(groups["name"])), key=lambda i: (-cx["p90"][i], -cx["max"][i], i))
+    return [
+        {
+            "name": groups["name"][i],
+            "functions": groups["count"][i],
+            "complexity_p90": cx["p90"][i],
+            "complexity_max": cx["max"][i],
+            "statements_p90": groups["statements"]["p90"][i],
+        }
+        for i in order
+    ]
+
+
+def _metrics_summary(agg: dict[str, Any], max_items: int) -> dict[str, Any]:
     return {
-        "counts": {
-            "files": len(files),
-            "module_edges": len(edges),
-            "functions": len(callgraph.get("functions", []) or []),
-            "calls": len(callgraph.get("calls", []) or []),
-            "resolved_calls": len((resolved or {}).get("calls", []) or []) if resolved else 0,
-            "dataflow_functions": len(df_fns),
-            "files_with_patterns": files_with_patterns,
-            "warnings": errors_total,
-        },
-        "top_imported_modules": [{"module": m, "count": c} for m, c in imported_modules.most_common(max_items)],
-        "module_graph": {
-            "top_out_degree": [{"module": m, "out": c} for m, c in out_deg.most_common(max_items)],
-            "top_in_degree": [{"module": m, "in": c} for m, c in in_deg.most_common(max_items)],
-        },
-        "call_graph": {
-            "top_callers_by_calls": [{"caller": k, "calls": v} for k, v in top_callers],
-            "top_fanout_callers": [{"caller": k, "unique_callees": v} for k, v in top_fanout],
-            "top_call_files": [{"file": f, "calls": c} for f, c in top_call_files],
-        },
-        "patterns": [{"pattern": p, "count": c} for p, c in pattern_counts.most_common(max_items)],
-        "dataflow": {
-            "top_inputs": [{"input": k, "count": v} for k, v in df_inputs.most_common(15)],
-            "top_outputs": [{"output": k, "count": v} for k, v in df_outputs.most_common(15)],
+        "functions": agg["count"],
+        "repo": agg["repo"],
+        "histograms": agg["histograms"],
+        "outliers": {
+            name: {"threshold": o["threshold"], "count": o["count"], "top": o["top"][:max_items]}
+            for name, o in agg["outliers"].items()
         },
+        "top_packages": _top_groups(agg["packages"], max_items),
+        "top_modules": _top_groups(agg["modules"], max_items),
+    }
+
+
+def _stream(path: Path) -> Iterator[tuple[str, Any]]:
+    return iter_fields(path) if path.exists() else iter(())
+
+
+def _summarize_dir(analysis_dir: Path, acc: _Summary) -> None:
+    has_resolved = (analysis_dir / "callgraph_resolved.json").exists()
+    handlers = {
+        "modules.json": {"imports": acc.add_import_record},
+        "module_graph.json": {"edges": acc.add_module_edge},
+        "patterns.json": {"patterns": acc.add_pattern_hit},
+        "dataflow.json": {"functions": acc.add_dataflow},
+        "callgraph.json": {"functions": acc.add_function, "calls": acc.count_call},
+        "callgraph_resolved.json": {"calls": acc.add_resolved_call},
     }
+    if not has_resolved:
+        handlers["callgraph.json"]["calls"] = lambda row: (acc.count_call(row), acc.add_call(row))
+    for key, value in _stream(analysis_dir / "metrics.json"):
+        if key == "aggregates":
+            acc.metrics = value
+            break  # per-function rows follow; the summary only needs the aggregates
+
+    for name, by_key in handlers.items():
+        for key, item in _stream(analysis_dir / name):
+            if key == "errors" and name in _ERROR_ARTIFACTS:
+                acc.counts["warnings"] += 1
+                continue
+            handler = by_key.get(key)
+            if handler is not None:
+                handler(item)
+
+
+def _summarize_result(result: AnalysisResult, acc: _Summary) -> None:
+    feeds: list[tuple[Iterable[Any], Callable[[Any], None]]] = [
+        (result.imports, acc.add_import_record),
+        (result.module_edges, acc.add_module_edge),
+        (result.functions, acc.add_function),
+        (result.calls, acc.count_call),
+        (result.resolved_calls, acc.add_resolved_call),
+        (result.patterns, acc.add_pattern_hit),
+        (result.dataflows, acc.add_dataflow),
+    ]
+    for rows, fn in feeds:
+        for r in rows:
+            fn(r)
+    acc.metrics = result.payload("metrics.json")["aggregates"]
+    # Every on-disk artifact repeats the error list; keep the count identical.
+    acc.counts["warnings"] = len(_ERROR_ARTIFACTS) * len(result.errors)
+
+
+def build_repo_summary(
+    source: Path | AnalysisResult,
+    max_items: int = 20,
+    *,
+    tracked_keys: int = DEFAULT_TRACKED_KEYS,
+) -> dict[str, Any]:
+    """
+    Summarize an analysis, either from an analysis folder or directly from an in-memory AnalysisResult.
+
+    One streaming pass: artifacts on disk are read item by item (never loaded whole), and every
+    ranking keeps at most `tracked_keys` keys. Rankings are exact while a table has fewer distinct
+    keys than that; fan-out (unique callees) is exact up to 64 callees per caller and estimated above.
+    """
+    acc = _Summary(tracked_keys)
+    if isinstance(source, AnalysisResult):
+        _summarize_result(source, acc)
+    else:
+        _summarize_dir(Path(source), acc)
+    return acc.result(max_items)
 
 
 def build_description_markdown(repo_url: str, summary: dict[str, Any]) -> str:
@@ -184,6 +303,21 @@ def build_description_markdown(repo_url: str, summary: dict[str, Any]) -> str:
     md.append("Top outputs:")
     md.append(fmt_kv(df_out, "output", "count"))
     md.append("")
+    m = summary.get("metrics") or {}
+    if m:
+        md.append("## Code metrics (per function)")
+        md.append("| Metric | p50 | p90 | p99 | max | mean |")
+        md.append("|---|---|---|---|---|---|")
+        for name, st in m.get("repo", {}).items():
+            md.append(f"| {name} | {st['p50']} | {st['p90']} | {st['p99']} | {st['max']} | {st['mean']} |")
+        md.append("")
+        cx = (m.get("outliers") or {}).get("complexity") or {}
+        md.append(f"Complexity outliers (above {cx.get('threshold', 0)}): **{cx.get('count', 0)}**")
+        md.append("\n".join(f"- `{o['qualname']}` — **{o['value']}**" for o in cx.get("top", [])[:10]) or "_None._")
+        md.append("")
+        md.append("Most complex packages (p90 complexity):")
+        md.append(fmt_kv(m.get("top_packages", [])[:10], "name", "complexity_p90"))
+        md.append("")
     md.append("## Notes / limitations")
     md.append("- This description is generated **without an LLM**, purely from dpylens static-analysis outputs.")
     md.append("- Exact runtime behavior may differ (dynamic imports, reflection, external config).")
@@ -0,0 +1,70 @@
+"""
+Cost of `dpylens hotspots` history mining: builds a synthetic repo with `git fast-import`
+(many small commits over a few hundred Python files), then times the first churn cache update
+(whole history) against an update after a few more commits (only the new ones are read).
+
+Usage:
+  python -m benchmarks.churn_history [--commits 100000] [--files 500] [--new 10]
+"""
+from __future__ import annotations
+
+import argparse
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from dpylens.analyzer.churn import ChurnCache
+
+
+def write_synthetic_history(repo: Path, commits: int, files: int, start: int = 0) -> None:
+    """
+    Append `commits` commits to `repo`'s master branch, each rewriting two of `files` modules.
+    """
+    lines: list[bytes] = []
+    for i in range(start, start + commits):
+        lines.append(b"commit refs/heads/master\n")
+        lines.append(f"committer dev{i % 13} <dev{i % 13}@example.com> {1_600_000_000 + i * 60} +0000\n".encode())
+        message = f"change {i}\n".encode()
+        lines.append(b"data %d\n%s" % (len(message), message))
+        if i == start and start:
+            lines.append(b"from refs/heads/master^0\n")
+        for j in (i % files, (i * 7 + 3) % files):
+            body = f"def f{j}(x):\n    return x + {i}\n".encode()
+            lines.append(f"M 100644 inline pkg{j % 20}/mod{j}.py\ndata {len(body)}\n".encode() + body)
+        lines.append(b"\n")
+    subprocess.run(["git", "-C", str(repo), "fast-import", "--quiet"], input=b"".join(lines), check=True)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--commits", type=int, default=100_000)
+    ap.add_argument("--files", type=int, default=500)
+    ap.add_argument("--new", type=int, default=10)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = Path(tmp) / "repo"
+        subprocess.run(["git", "init", "-q", str(repo)], check=True)
+        write_synthetic_history(repo, args.commits, args.files)
+
+        with ChurnCache(Path(tmp) / "churn.sqlite") as cache:
+            t0 = time.perf_counter()
+            first = cache.update(repo, "master")
+            t1 = time.perf_counter()
+            cache.file_churn()
+            t2 = time.perf_counter()
+
+            write_synthetic_history(repo, args.new, args.files, start=args.commits)
+            t3 = time.perf_counter()
+            again = cache.update(repo, "master")
+            t4 = time.perf_counter()
+
+    print(f"history: {first.total_commits} commits, {args.files} files")
+    print(f"  first update:       {t1 - t0:.2f} s")
+    print(f"  file_churn():       {t2 - t1:.2f} s")
+    print(f"  update (+{again.new_commits} commits): {t4 - t3:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
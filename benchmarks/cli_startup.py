@@ -0,0 +1,74 @@
+"""
+CLI startup cost: `python -X importtime` of the CLI module plus parser construction
+(what `dpylens --help` pays before doing anything), checked against a budget.
+
+Usage:
+  python -m benchmarks.cli_startup [--runs 7] [--budget-ms 120] [--top 10]
+
+Exits non-zero when the median cumulative import time exceeds the budget, so it can run in CI.
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+# Parser construction only; imports done by subcommands are not part of startup
+_SNIPPET = "from dpylens.cli import build_parser; build_parser()"
+
+
+def importtime(snippet: str = _SNIPPET) -> dict[str, tuple[int, int]]:
+    """
+    module -> (self us, cumulative us) for one fresh interpreter running `snippet`.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", snippet],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    out: dict[str, tuple[int, int]] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        out[name.strip()] = (int(self_us), int(cumulative_us))
+    return out
+
+
+def total_ms(times: dict[str, tuple[int, int]]) -> float:
+    return sum(self_us for self_us, _ in times.values()) / 1000
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=7)
+    ap.add_argument("--budget-ms", type=float, default=120.0)
+    ap.add_argument("--top", type=int, default=10)
+    args = ap.parse_args()
+
+    samples: list[float] = []
+    wall: list[float] = []
+    times: dict[str, tuple[int, int]] = {}
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        times = importtime()
+        wall.append((time.perf_counter() - started) * 1000)
+        samples.append(total_ms(times))
+
+    median = statistics.median(samples)
+    ours = sorted((name for name in times if name.split(".")[0] == "dpylens"))
+    print(f"imports at startup: {len(times)} modules ({len(ours)} from dpylens)")
+    print(f"  import time (median of {args.runs}): {median:7.1f} ms  (budget {args.budget_ms:g} ms)")
+    print(f"  interpreter wall time (median):   {statistics.median(wall):7.1f} ms")
+    print(f"  dpylens modules: {', '.join(ours)}")
+    print("  slowest (cumulative):")
+    for name, (_self, cumulative) in sorted(times.items(), key=lambda kv: -kv[1][1])[: args.top]:
+        print(f"    {cumulative / 1000:7.1f} ms  {name}")
+    return 1 if median > args.budget_ms else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+"""
+Cost of mapping imports to distributions: `importlib.metadata.packages_distributions()`
+against dpylens' site-packages index, scanned cold and loaded from its fingerprint cache.
+
+Usage:
+  python -m benchmarks.distribution_index [--site-packages DIR] [--repeat 5]
+"""
+from __future__ import annotations
+
+import argparse
+import importlib.metadata
+import tempfile
+import time
+from pathlib import Path
+
+from dpylens.analyzer.distributions import environment_site_packages, load_site_packages, scan_site_packages
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--site-packages", default=None)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+    site = Path(args.site_packages) if args.site_packages else environment_site_packages()[0]
+
+    with tempfile.TemporaryDirectory() as cache:
+        load_site_packages(site, Path(cache))  # warm the cache
+        index = scan_site_packages(site)
+        print(f"{site}: {len(index.versions)} distributions, {len(index.prefixes)} import prefixes")
+        print(f"  importlib.metadata.packages_distributions(): {_best(importlib.metadata.packages_distributions, args.repeat) * 1000:.1f} ms")
+        print(f"  scan_site_packages():                        {_best(lambda: scan_site_packages(site), args.repeat) * 1000:.1f} ms")
+        print(f"  load_site_packages() (cache hit):            {_best(lambda: load_site_packages(site, Path(cache)), args.repeat) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Near-duplicate clustering at scale: builds synthetic token streams (a share of them copies or
+lightly edited copies of earlier ones), fingerprints them, and times find_duplicates().
+
+Usage:
+  python -m benchmarks.duplicates [--functions 100000] [--copies 0.15] [--budget-ms 5000]
+
+Exits non-zero when the median clustering time exceeds the budget, so it can run in CI.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import random
+import statistics
+import sys
+import time
+from array import array
+
+from dpylens.analyzer import duplicates
+from dpylens.analyzer.duplicates import FunctionFingerprint, find_duplicates
+
+_ALPHABET = range(150)
+
+
+def synthetic_fingerprints(n: int, copies: float, seed: int = 0) -> list[FunctionFingerprint]:
+    rng = random.Random(seed)
+    streams: list[list[int]] = []
+    for _ in range(n):
+        if streams and rng.random() < copies:
+            tokens = list(streams[rng.randrange(len(streams))])
+            if rng.random() < 0.6:
+                for _ in range(max(1, len(tokens) // 60)):
+                    tokens[rng.randrange(len(tokens))] = rng.randrange(150)
+        else:
+            tokens = rng.choices(_ALPHABET, k=rng.randrange(50, 400))
+        streams.append(tokens)
+    return [
+        FunctionFingerprint(
+            qualname=f"pkg.mod{i // 20}.f{i}",
+            file=f"/repo/pkg/mod{i // 20}.py",
+            lineno=1 + (i % 20) * 10,
+            tokens=len(tokens),
+            digest=hashlib.blake2b(array("I", tokens).tobytes(), digest_size=8).hexdigest(),
+            signature=duplicates._signature(tokens),
+        )
+        for i, tokens in enumerate(streams)
+    ]
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--functions", type=int, default=100_000)
+    ap.add_argument("--copies", type=float, default=0.15)
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--budget-ms", type=float, default=5000.0)
+    args = ap.parse_args()
+
+    started = time.perf_counter()
+    fps = synthetic_fingerprints(args.functions, args.copies)
+    signing = (time.perf_counter() - started) * 1e6 / max(1, args.functions)
+
+    timings: list[float] = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        clusters = find_duplicates(fps)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    median = statistics.median(timings)
+    backend = "numpy" if duplicates.np is not None else "pure Python (numpy not installed)"
+    near = sum(c.kind == "near" for c in clusters)
+    print(f"{args.functions} functions, {len(clusters)} clusters ({near} near); {backend}")
+    print(f"  fingerprint (incl. synthesis): {signing:7.1f} us/function")
+    print(f"  clustering (median of {args.runs}): {median:7.1f} ms  (budget {args.budget_ms:g} ms)")
+    return 1 if median > args.budget_ms else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""
+Peak memory of `dpylens export`: writes a synthetic analysis folder (one large
+callgraph_resolved.json), exports it to Parquet (partitioned by package) and GraphML, and
+reports the Python heap peak and the Arrow memory pool peak next to the artifact size.
+
+Usage:
+  python -m benchmarks.export_memory [--calls 1000000] [--packages 40] [--budget-mb 200]
+
+Exits non-zero when the Python heap peak exceeds the budget, so it can run in CI.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from dpylens.export import tables
+from dpylens.export.graphs import export_graphs
+from dpylens.export.tables import export_tables
+
+
+def write_synthetic_analysis(root: Path, calls: int, packages: int, calls_per_file: int = 400) -> Path:
+    files = max(1, calls // calls_per_file)
+    modules = [(f"pkg{i % packages}.mod{i}", f"/repo/pkg{i % packages}/mod{i}.py") for i in range(files)]
+    with (root / "module_graph.json").open("w", encoding="utf-8") as fh:
+        fh.write('{"nodes": [')
+        fh.write(",".join(json.dumps({"module": m, "file": f}) for m, f in modules))
+        fh.write('], "edges": [], "errors": []}')
+    with (root / "callgraph_resolved.json").open("w", encoding="utf-8") as fh:
+        fh.write('{"functions": [')
+        fh.write(",".join(json.dumps({"qualname": f"{m}.f{j}", "file": f, "lineno": j}) for m, f in modules for j in range(20)))
+        fh.write('], "calls": [')
+        for i in range(calls):
+            m, f = modules[i // calls_per_file]
+            callee = f"{modules[(i * 7) % files][0]}.f{i % 20}"
+            row = {"caller": f"{m}.f{i % 20}", "callee_raw": f"f{i % 20}", "callee_resolved": callee if i % 3 else None, "file": f, "lineno": i % 500}
+            fh.write(("," if i else "") + json.dumps(row))
+        fh.write('], "errors": []}')
+    return root / "callgraph_resolved.json"
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--calls", type=int, default=1_000_000)
+    ap.add_argument("--packages", type=int, default=40)
+    ap.add_argument("--budget-mb", type=float, default=200)
+    args = ap.parse_args()
+    if tables.pa is None:
+        print("pyarrow is not installed; nothing to measure")
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        analysis = Path(tmp) / "analysis"
+        analysis.mkdir()
+        artifact = write_synthetic_analysis(analysis, args.calls, args.packages)
+        print(f"callgraph_resolved.json: {artifact.stat().st_size / 2**20:.0f} MiB, {args.calls} calls")
+
+        t0 = time.perf_counter()
+        stats = export_tables(analysis, Path(tmp) / "out", partition_by="package", tables=("functions", "calls"))
+        t1 = time.perf_counter()
+        export_graphs(analysis, Path(tmp) / "out", graphs=("callgraph",))
+        t2 = time.perf_counter()
+
+        # Measured separately: tracing slows the run down several times
+        tracemalloc.start()
+        export_tables(analysis, Path(tmp) / "traced", partition_by="package", tables=("functions", "calls"))
+        export_graphs(analysis, Path(tmp) / "traced", graphs=("callgraph",))
+        _current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    peak_mb = peak / 2**20
+    print(f"  parquet: {stats.rows['calls']} rows in {len(stats.files)} files, {t1 - t0:.1f} s")
+    print(f"  graphml: {t2 - t1:.1f} s")
+    print(f"  Python heap peak: {peak_mb:.0f} MiB (budget {args.budget_mb:g} MiB)")
+    print(f"  Arrow pool peak:  {tables.pa.default_memory_pool().max_memory() / 2**20:.0f} MiB")
+    return 0 if peak_mb <= args.budget_mb else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
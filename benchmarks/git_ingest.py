@@ -0,0 +1,85 @@
+"""
+Checkout vs git-object ingestion on a synthetic repository that also holds non-Python assets:
+`git clone` + `analyze` against a blobless bare clone + `analyze_git`, cold and with a warm
+per-file cache. Reports wall time and the disk used by the clone.
+
+Usage:
+  python -m benchmarks.git_ingest [--files 400] [--assets 40] [--asset-kb 512]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from dpylens.analyzer.gitsource import clone_blobless
+from dpylens.analyzer.gittree import analyze_git
+from dpylens.analyzer.pipeline import analyze
+
+
+def _git(repo: Path, *args: str) -> None:
+    subprocess.run(
+        ["git", "-C", str(repo), "-c", "user.name=b", "-c", "user.email=b@example.com", *args],
+        check=True,
+        capture_output=True,
+    )
+
+
+def make_repo(root: Path, files: int, assets: int, asset_kb: int) -> Path:
+    repo = root / "origin"
+    (repo / "pkg").mkdir(parents=True)
+    (repo / "assets").mkdir()
+    _git(repo, "init", "-q")
+    (repo / "pkg" / "__init__.py").write_text("", encoding="utf-8")
+    for i in range(files):
+        body = "".join(f"def f{i}_{j}(x):\n    return f{i}_{j - 1}(x) + {j}\n\n" if j else f"def f{i}_0(x):\n    return x\n\n" for j in range(20))
+        (repo / "pkg" / f"m{i}.py").write_text(body, encoding="utf-8")
+    for i in range(assets):
+        (repo / "assets" / f"blob{i}.bin").write_bytes(os.urandom(asset_kb * 1024))
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-q", "-m", "init")
+    _git(repo, "config", "uploadpack.allowFilter", "true")
+    _git(repo, "config", "uploadpack.allowAnySHA1InWant", "true")
+    return repo
+
+
+def disk_mb(path: Path) -> float:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file()) / 1e6
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--files", type=int, default=400)
+    ap.add_argument("--assets", type=int, default=40)
+    ap.add_argument("--asset-kb", type=int, default=512)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        url = f"file://{make_repo(root, args.files, args.assets, args.asset_kb)}"
+
+        started = time.perf_counter()
+        subprocess.run(["git", "clone", "-q", "--depth", "1", url, str(root / "checkout")], check=True)
+        cloned = time.perf_counter()
+        analyze(root / "checkout")
+        done = time.perf_counter()
+        print(f"checkout:        clone {cloned - started:6.2f}s  analyze {done - cloned:6.2f}s  disk {disk_mb(root / 'checkout'):7.1f} MB")
+
+        for label, name in (("objects, cold:", "cold.git"), ("objects, cached:", "warm.git")):
+            started = time.perf_counter()
+            repo = clone_blobless(url, root / name)
+            cloned = time.perf_counter()
+            _result, stats = analyze_git(repo, root=root / "checkout", cache_dir=root / "cache")
+            done = time.perf_counter()
+            print(
+                f"{label:<16} clone {cloned - started:6.2f}s  analyze {done - cloned:6.2f}s  disk {disk_mb(repo):7.1f} MB"
+                f"  ({stats.cached} cached, {stats.fetched} blobs fetched)"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
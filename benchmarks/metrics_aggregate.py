@@ -0,0 +1,73 @@
+"""
+Function-metric aggregation at scale: builds synthetic FunctionMetrics records (laid out file by
+file, like the per-file pass produces them) and times MetricTable construction and aggregates().
+
+Usage:
+  python -m benchmarks.metrics_aggregate [--functions 500000] [--per-module 20] [--budget-ms 1000]
+
+Exits non-zero when the median aggregation time exceeds the budget, so it can run in CI.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import time
+
+from dpylens.analyzer import metrics
+from dpylens.analyzer.metrics import FunctionMetrics, MetricTable
+
+
+def synthetic_records(n: int, per_module: int, seed: int = 0) -> list[FunctionMetrics]:
+    rng = random.Random(seed)
+    records: list[FunctionMetrics] = []
+    for i in range(n):
+        m = i // per_module
+        module = sys.intern(f"pkg{m % 50}.sub{m % 13}.mod{m}")
+        file = sys.intern(f"/repo/pkg{m % 50}/sub{m % 13}/mod{m}.py")
+        records.append(
+            FunctionMetrics(
+                qualname=f"{module}.f{i}",
+                module=module,
+                file=file,
+                lineno=1 + (i % per_module) * 10,
+                complexity=1 + int(rng.expovariate(0.5)),
+                statements=1 + int(rng.expovariate(0.1)),
+                nesting=int(rng.expovariate(1.0)),
+                params=rng.randrange(0, 7),
+                calls=int(rng.expovariate(0.2)),
+            )
+        )
+    return records
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--functions", type=int, default=500_000)
+    ap.add_argument("--per-module", type=int, default=20)
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--budget-ms", type=float, default=1000.0)
+    args = ap.parse_args()
+
+    records = synthetic_records(args.functions, args.per_module)
+    build: list[float] = []
+    aggregate: list[float] = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        table = MetricTable(records)
+        built = time.perf_counter()
+        table.aggregates()
+        build.append((built - started) * 1000)
+        aggregate.append((time.perf_counter() - built) * 1000)
+
+    median = statistics.median(aggregate)
+    backend = "numpy" if metrics.np is not None else "pure Python (numpy not installed)"
+    print(f"{args.functions} functions in {len(table.modules)} modules, {len(table.packages)} packages; {backend}")
+    print(f"  table build (median of {args.runs}): {statistics.median(build):7.1f} ms")
+    print(f"  aggregates  (median of {args.runs}): {median:7.1f} ms  (budget {args.budget_ms:g} ms)")
+    return 1 if median > args.budget_ms else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
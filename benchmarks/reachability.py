@@ -0,0 +1,82 @@
+"""
+Dead-code detection at scale: builds a synthetic call graph (modules of functions calling
+earlier functions, part of the calls unresolved) and times find_dead_code().
+
+Usage:
+  python -m benchmarks.reachability [--functions 500000] [--calls-per-function 6] [--budget-ms 20000]
+
+Exits non-zero when the median time exceeds the budget, so it can run in CI.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from dpylens.analyzer import reachability
+from dpylens.analyzer.aliases import AliasMaps
+from dpylens.analyzer.callgraph_resolve import ResolvedCall
+from dpylens.analyzer.models import FunctionRecord
+from dpylens.analyzer.reachability import ReachabilityFacts, find_dead_code
+
+
+def synthetic_graph(
+    n: int, calls_per_function: int, per_module: int = 20, seed: int = 0
+) -> tuple[list[FunctionRecord], list[ResolvedCall], list[ReachabilityFacts], dict[str, AliasMaps]]:
+    rng = random.Random(seed)
+    functions: list[FunctionRecord] = []
+    calls: list[ResolvedCall] = []
+    facts: list[ReachabilityFacts] = []
+    aliases: dict[str, AliasMaps] = {}
+    for i in range(n):
+        m = i // per_module
+        module = f"pkg{m % 50}.mod{m}"
+        file = sys.intern(f"/repo/pkg{m % 50}/mod{m}.py")
+        qual = sys.intern(f"{module}.f{i}" if i % 1000 else f"{module}.main")
+        functions.append(FunctionRecord(qualname=qual, file=file, lineno=1 + (i % per_module) * 10))
+        if i % per_module == 0:
+            facts.append(
+                ReachabilityFacts(
+                    file=file, module=module, module_refs=[], main_refs=[], references=[],
+                    decorated=[], methods={}, exported=[],
+                )
+            )
+            aliases[file] = AliasMaps(file=file, module_aliases={}, symbol_aliases={})
+        for _ in range(calls_per_function if i else 0):
+            j = int(rng.random() * i)
+            if rng.random() < 0.8:
+                callee = functions[j].qualname
+                calls.append(ResolvedCall(caller=qual, callee_raw=callee, callee_resolved=callee, file=file, lineno=1))
+            else:
+                calls.append(ResolvedCall(caller=qual, callee_raw=f"obj.f{j}", callee_resolved=None, file=file, lineno=1))
+    # Calls point backwards, so only functions called by a `main` (every 1000th) are reached
+    return functions, calls, facts, aliases
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--functions", type=int, default=500_000)
+    ap.add_argument("--calls-per-function", type=int, default=6)
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--budget-ms", type=float, default=20000.0)
+    args = ap.parse_args()
+
+    functions, calls, facts, aliases = synthetic_graph(args.functions, args.calls_per_function)
+    timings: list[float] = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        report = find_dead_code(functions, calls, facts, aliases, root=Path("/repo"))
+        timings.append((time.perf_counter() - started) * 1000)
+
+    median = statistics.median(timings)
+    backend = "numpy" if reachability.np is not None else "pure Python (numpy not installed)"
+    print(f"{report.functions} functions, {len(calls)} calls; {report.reachable} reachable, {len(report.dead)} dead; {backend}")
+    print(f"  find_dead_code (median of {args.runs}): {median:7.1f} ms  (budget {args.budget_ms:g} ms)")
+    return 1 if median > args.budget_ms else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Peak memory of call-graph records: slotted + interned (current) vs plain dataclasses
+with a fresh copy of every string per record (how records used to be built).
+
+Usage:
+  python -m benchmarks.records_memory [--files 500] [--calls-per-file 500]
+"""
+from __future__ import annotations
+
+import argparse
+import ast
+import gc
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+
+from dpylens.analyzer.callgraph import extract_callgraph
+from dpylens.analyzer.callgraph_resolve import resolve_calls
+from dpylens.analyzer.models import CallRecord, FunctionRecord
+
+
+@dataclass(frozen=True)
+class _PlainCallRecord:
+    caller: str
+    callee: str
+    file: str
+    lineno: int
+
+
+@dataclass(frozen=True)
+class _PlainResolvedCall:
+    caller: str
+    callee_raw: str
+    callee_resolved: str | None
+    file: str
+    lineno: int
+
+
+def _copy(s: str) -> str:
+    # A distinct str object with the same value (what str(path) / f-strings produce per record)
+    return "".join(list(s))
+
+
+def _source(calls_per_file: int) -> str:
+    body = "\n".join(f"    helper_{i % 25}(x)" for i in range(calls_per_file))
+    return f"def handler(x):\n{body}\n"
+
+
+def _extract(files: int, calls_per_file: int) -> tuple[list[FunctionRecord], list[CallRecord]]:
+    tree = ast.parse(_source(calls_per_file))
+    functions: list[FunctionRecord] = []
+    calls: list[CallRecord] = []
+    for i in range(files):
+        fns, cs = extract_callgraph(tree, Path(f"/repo/pkg/sub/module_{i}.py"), module_name=f"pkg.sub.module_{i}")
+        functions.extend(fns)
+        calls.extend(cs)
+    return functions, calls
+
+
+def _measure(build) -> int:
+    gc.collect()
+    tracemalloc.start()
+    kept = build()
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return peak
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--files", type=int, default=500)
+    ap.add_argument("--calls-per-file", type=int, default=500)
+    args = ap.parse_args()
+
+    functions, calls = _extract(args.files, args.calls_per_file)
+
+    def current():
+        resolved = resolve_calls(functions=functions, calls=calls, alias_maps_by_file={}, local_module_index={})
+        return [CallRecord(c.caller, c.callee, c.file, c.lineno) for c in calls], resolved
+
+    def plain():
+        records = [_PlainCallRecord(_copy(c.caller), _copy(c.callee), _copy(c.file), c.lineno) for c in calls]
+        resolved = [_PlainResolvedCall(_copy(c.caller), _copy(c.callee), None, _copy(c.file), c.lineno) for c in calls]
+        return records, resolved
+
+    n = len(calls)
+    before = _measure(plain)
+    after = _measure(current)
+    print(f"{n} call records (+ resolved)")
+    print(f"  plain dataclasses, per-record strings: {before / 2**20:8.1f} MiB  ({before / n:6.1f} B/call)")
+    print(f"  slotted records, interned strings:     {after / 2**20:8.1f} MiB  ({after / n:6.1f} B/call)")
+    print(f"  reduction: {100 * (1 - after / before):.0f}%")
+
+
+if __name__ == "__main__":
+    main()
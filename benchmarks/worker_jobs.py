@@ -0,0 +1,83 @@
+"""
+Per-job overhead of the worker: small analyze jobs run by a preloaded, forking `Worker` versus
+one fresh interpreter per job (what a worker without preloading would pay).
+
+Usage:
+  python -m benchmarks.worker_jobs [--jobs 20] [--files 5]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from dpylens.worker.jobs import JOB_HANDLERS, PRELOAD
+from dpylens.worker.queue import JobQueue
+from dpylens.worker.runner import Worker, preload
+
+
+def make_source(root: Path, files: int) -> Path:
+    pkg = root / "src" / "pkg"
+    pkg.mkdir(parents=True)
+    (pkg / "__init__.py").write_text("", encoding="utf-8")
+    for i in range(files):
+        (pkg / f"m{i}.py").write_text(
+            f"from pkg import m{(i + 1) % files}\n\ndef f{i}(x):\n    return m{(i + 1) % files}.f{(i + 1) % files}(x - 1) if x else 0\n",
+            encoding="utf-8",
+        )
+    return root / "src"
+
+
+def cold(source: Path, out: Path, jobs: int) -> list[float]:
+    samples: list[float] = []
+    for i in range(jobs):
+        payload = json.dumps({"source": str(source), "out": str(out / f"cold{i}")})
+        started = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", f"import json; from dpylens.worker.jobs import analyze_job; analyze_job(json.loads({payload!r}))"],
+            check=True,
+        )
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def forked(source: Path, out: Path, jobs: int) -> list[float]:
+    preload(PRELOAD)
+    with JobQueue(out / "queue.sqlite") as queue:
+        for i in range(jobs):
+            queue.enqueue("analyze", {"source": str(source), "out": str(out / f"fork{i}")})
+        worker = Worker(queue, JOB_HANDLERS, worker="bench", log=lambda _m: None)
+        samples: list[float] = []
+        while True:
+            job = queue.claim(worker.worker)
+            if job is None:
+                break
+            started = time.perf_counter()
+            worker.process(job)
+            samples.append((time.perf_counter() - started) * 1000)
+        assert queue.counts()["done"] == jobs
+    return samples
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--jobs", type=int, default=20)
+    ap.add_argument("--files", type=int, default=5)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        source = make_source(root, args.files)
+        for name, run in (("fresh interpreter", cold), ("preloaded fork", forked)):
+            samples = run(source, root / "out", args.jobs)
+            print(f"{name:>18}: median {statistics.median(samples):7.1f} ms/job, total {sum(samples) / 1000:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,2 +1,34 @@
-__all__ = ["__version__"]
-__version__ = "0.1.0"
\ No newline at end of file
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from dpylens.analyzer.gittree import analyze_git
+    from dpylens.analyzer.pipeline import analyze
+    from dpylens.analyzer.result import AnalysisResult
+
+__all__ = ["AnalysisResult", "__version__", "analyze", "analyze_git"]
+__version__ = "0.1.0"
+
+# Public names -> defining module. Imported on first access, so `import dpylens` (and the CLI,
+# which imports dpylens.* submodules) does not pull in the whole analyzer.
+_LAZY = {
+    "analyze": "dpylens.analyzer.pipeline",
+    "analyze_git": "dpylens.analyzer.gittree",
+    "AnalysisResult": "dpylens.analyzer.result",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module 'dpylens' has no attribute {name!r}")
+    import importlib
+
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
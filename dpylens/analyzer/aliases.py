@@ -57,18 +57,25 @@ def _resolve_relative(module: str | None, level: int, src_module: str) -> str |
     return ".".join(base)
 
 
-def extract_alias_maps(tree: ast.AST, file_path: Path, *, root: Path) -> AliasMaps:
+def extract_alias_maps(
+    tree: ast.AST,
+    file_path: Path,
+    *,
+    root: Path,
+    module_name: str | None = None,
+) -> AliasMaps:
     """
     Extract alias maps for resolving cross-module calls.
 
     IMPORTANT:
-    - This version resolves relative imports using `root` and `file_path`.
-    - Caller must pass repo root used for module naming consistency.
+    - Relative imports are resolved against `module_name` (the file's own module).
+    - Pass the same name the rest of the analysis uses (see layout.ModuleIndex); without it the
+      root-relative name derived from `root` and `file_path` is used.
     """
     module_aliases: dict[str, str] = {}
     symbol_aliases: dict[str, str] = {}
 
-    src_module = _module_name_from_path(root, file_path)
+    src_module = module_name if module_name is not None else _module_name_from_path(root, file_path)
 
     for node in ast.walk(tree):
         if isinstance(node, ast.Import):
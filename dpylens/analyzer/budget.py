@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+
+# How much of a file is inspected for a "generated" header
+_HEADER_BYTES = 2048
+_HEADER_LINES = 10
+_GENERATED_HEADER = re.compile(rb"(?i)(@generated\b|\bauto-?generated\b|\bgenerated by\b|\bdo not edit\b)")
+
+_PROTOBUF_SUFFIXES = ("_pb2.py", "_pb2_grpc.py")
+_VENDOR_DIRS = {"vendor", "_vendor", "vendored", "third_party"}
+
+GENERATED_MODES = ("full", "imports-only", "skip")
+
+# FileError prefixes of files the budget reduced or skipped (notes, not failures)
+BUDGET_NOTE_PREFIXES = ("budget_exceeded:", "generated_file:")
+
+
+@dataclass(frozen=True)
+class FileBudget:
+    """
+    Per-file limits for the per-file pass.
+
+    max_bytes:   larger files are skipped (None = no limit)
+    max_seconds: if parsing a file alone takes longer, only its imports are kept (None = no limit)
+    generated:   what to do with generated/vendored files (protobuf, migrations, vendor/, "do not edit"
+                 headers): "full" analysis, "imports-only", or "skip"
+
+    Every file that is not fully analyzed gets a FileError note explaining why (see is_budget_note).
+    Reducing generated files and the time limit are opt-in: by default only oversized files are
+    skipped, so results do not depend on machine speed.
+    """
+    max_bytes: int | None = 2_000_000
+    max_seconds: float | None = None
+    generated: str = "full"
+
+    def __post_init__(self) -> None:
+        if self.generated not in GENERATED_MODES:
+            raise ValueError(f"generated must be one of {', '.join(GENERATED_MODES)}, got {self.generated!r}")
+
+
+DEFAULT_BUDGET = FileBudget()
+
+
+def is_budget_note(error: str) -> bool:
+    """
+    True for the FileError notes the budget leaves on files it reduced or skipped.
+    """
+    return error.startswith(BUDGET_NOTE_PREFIXES)
+
+
+def _header_says_generated(head: bytes) -> bool:
+    for line in head[:_HEADER_BYTES].splitlines()[:_HEADER_LINES]:
+        line = line.strip()
+        # Only comments: docstrings mentioning "generated by" are ordinary code
+        if line.startswith(b"#") and _GENERATED_HEADER.search(line):
+            return True
+    return False
+
+
+def generated_reason(rel_parts: tuple[str, ...], head: bytes) -> str | None:
+    """
+    Why a file looks generated or vendored, or None.
+
+    rel_parts: path parts relative to the analyzed root (so the root's own location never matters)
+    head:      the first bytes of the file
+    """
+    name = rel_parts[-1] if rel_parts else ""
+    dirs = set(rel_parts[:-1])
+
+    if name.endswith(_PROTOBUF_SUFFIXES):
+        return "protobuf"
+    if "migrations" in dirs or ("alembic" in dirs and "versions" in dirs):
+        return "migration"
+    if dirs & _VENDOR_DIRS:
+        return "vendored"
+    if _header_says_generated(head):
+        return "generated_header"
+    return None
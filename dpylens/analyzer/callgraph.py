@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import ast
+import sys
 from pathlib import Path
 
 from dpylens.analyzer.models import CallRecord, FunctionRecord
@@ -39,38 +40,71 @@ def _callee_name(call: ast.Call) -> str:
     return "<unknown>"
 
 
+_DEFINITIONS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+# Nodes that can contain definitions (definitions are statements, never inside expressions)
+_BLOCKS = (ast.stmt, ast.excepthandler, ast.match_case)
+
+
+def definition_qualnames(tree: ast.AST, module_name: str) -> dict[ast.AST, str]:
+    """
+    Qualname of every function and class definition: module, enclosing classes, name
+    (`pkg.mod.Class.method`, `pkg.mod.Outer.Inner`). Definitions nested in a function are named
+    from the module (`pkg.mod.helper`). Every extractor names functions this way, so their
+    records join on qualname.
+    """
+    out: dict[ast.AST, str] = {}
+    stack: list[tuple[ast.AST, str]] = [(tree, module_name)]
+    while stack:
+        node, prefix = stack.pop()
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, _DEFINITIONS):
+                qual = out[child] = sys.intern(f"{prefix}.{child.name}")
+                stack.append((child, qual if isinstance(child, ast.ClassDef) else module_name))
+            elif isinstance(child, _BLOCKS):
+                stack.append((child, prefix))
+    return out
+
+
 class CallGraphVisitor(ast.NodeVisitor):
-    def __init__(self, file_path: Path, module_name: str):
+    def __init__(self, file_path: Path, module_name: str, qualnames: dict[ast.AST, str] | None = None):
         self.file_path = file_path
         self.module_name = module_name
+        self._file = sys.intern(str(file_path))
+        self._qualnames = qualnames
         self.functions: list[FunctionRecord] = []
         self.calls: list[CallRecord] = []
         self._stack: list[str] = []
 
-    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
-        qual = f"{self.module_name}.{node.name}"
-        self.functions.append(FunctionRecord(qualname=qual, file=str(self.file_path), lineno=node.lineno))
-        self._stack.append(qual)
+    def visit_Module(self, node: ast.Module) -> None:
+        if self._qualnames is None:
+            self._qualnames = definition_qualnames(node, self.module_name)
         self.generic_visit(node)
-        self._stack.pop()
 
-    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> None:
-        qual = f"{self.module_name}.{node.name}"
-        self.functions.append(FunctionRecord(qualname=qual, file=str(self.file_path), lineno=node.lineno))
+    def _visit_function(self, node: ast.FunctionDef | ast.AsyncFunctionDef) -> None:
+        qual = (self._qualnames or {}).get(node) or sys.intern(f"{self.module_name}.{node.name}")
+        self.functions.append(FunctionRecord(qualname=qual, file=self._file, lineno=node.lineno))
         self._stack.append(qual)
         self.generic_visit(node)
         self._stack.pop()
 
+    visit_FunctionDef = _visit_function
+    visit_AsyncFunctionDef = _visit_function
+
     def visit_Call(self, node: ast.Call) -> None:
         if self._stack:
             caller = self._stack[-1]
-            callee = _callee_name(node)
+            callee = sys.intern(_callee_name(node))
             lineno = getattr(node, "lineno", 0) or 0
-            self.calls.append(CallRecord(caller=caller, callee=callee, file=str(self.file_path), lineno=lineno))
+            self.calls.append(CallRecord(caller=caller, callee=callee, file=self._file, lineno=lineno))
         self.generic_visit(node)
 
 
-def extract_callgraph(tree: ast.AST, file_path: Path, module_name: str) -> tuple[list[FunctionRecord], list[CallRecord]]:
-    v = CallGraphVisitor(file_path=file_path, module_name=module_name)
+def extract_callgraph(
+    tree: ast.AST,
+    file_path: Path,
+    module_name: str,
+    qualnames: dict[ast.AST, str] | None = None,
+) -> tuple[list[FunctionRecord], list[CallRecord]]:
+    v = CallGraphVisitor(file_path=file_path, module_name=module_name, qualnames=qualnames)
     v.visit(tree)
     return v.functions, v.calls
\ No newline at end of file
@@ -1,13 +1,16 @@
 from __future__ import annotations
 
+import sys
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Sequence
 
 from dpylens.analyzer.aliases import AliasMaps
+from dpylens.analyzer.classes import ClassIndex, LocalType
 from dpylens.analyzer.models import CallRecord, FunctionRecord
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ResolvedCall:
     caller: str
     callee_raw: str
@@ -64,14 +67,52 @@ def _resolve_callee(
     return None
 
 
+def _resolve_method(
+    callee_raw: str,
+    *,
+    caller: str,
+    file: str,
+    alias: AliasMaps | None,
+    classes: ClassIndex,
+    local_types: dict[tuple[str, str], str],
+) -> str | None:
+    """
+    Resolve a call through the class hierarchy:
+    - self.m() / cls.m() in a method   -> first class in the caller's class MRO defining m
+    - x.m() where x = Worker(...)      -> Worker's m, found through its MRO
+    - Worker.m() / mod.Worker.m()      -> Worker's m
+    - Worker()                         -> Worker's __init__
+    """
+    receiver, _, name = callee_raw.rpartition(".")
+    if receiver in ("self", "cls"):
+        cls = classes.owner_of(caller)
+    elif receiver and "." not in receiver and (caller, receiver) in local_types:
+        cls = local_types[(caller, receiver)]
+    else:
+        cls = classes.resolve_class(receiver, file, alias) if receiver else None
+        if cls is None:
+            # constructor call
+            cls, name = classes.resolve_class(callee_raw, file, alias), "__init__"
+    if cls is None or cls not in classes:
+        return None
+    return classes.lookup(cls, name)
+
+
 def resolve_calls(
     *,
     functions: list[FunctionRecord],
     calls: list[CallRecord],
     alias_maps_by_file: dict[str, AliasMaps],
     local_module_index: dict[str, Path],
+    classes: ClassIndex | None = None,
+    local_types: Sequence[LocalType] = (),
 ) -> list[ResolvedCall]:
+    """
+    With a class index, calls that import aliases cannot resolve are resolved through the class
+    hierarchy (see _resolve_method); method qualnames are class-qualified (`mod.Class.method`).
+    """
     local_functions = {f.qualname for f in functions}
+    types = {(t.function, t.name): t.cls for t in local_types}
 
     resolved: list[ResolvedCall] = []
     for c in calls:
@@ -79,6 +120,13 @@ def resolve_calls(
         callee_resolved = None
         if alias:
             callee_resolved = _resolve_callee(c.callee, alias=alias, local_functions=local_functions)
+            if callee_resolved is not None:
+                # share the FunctionRecord's (interned) qualname instead of a fresh f-string
+                callee_resolved = sys.intern(callee_resolved)
+        if callee_resolved is None and classes:
+            callee_resolved = _resolve_method(
+                c.callee, caller=c.caller, file=c.file, alias=alias, classes=classes, local_types=types
+            )
         resolved.append(
             ResolvedCall(
                 caller=c.caller,
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+
+from dpylens.analyzer.gitsource import is_ancestor, iter_numstat, rev_parse
+
+CHURN_FILENAME = "churn.sqlite"
+CHURN_VERSION = 1
+
+# Commits inserted per executemany batch
+_BATCH = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS commits (
+  id INTEGER PRIMARY KEY,
+  sha TEXT NOT NULL UNIQUE,
+  time INTEGER NOT NULL,
+  author INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS authors (id INTEGER PRIMARY KEY, email TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS paths (id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS churn (
+  commit_id INTEGER NOT NULL,
+  path_id INTEGER NOT NULL,
+  added INTEGER NOT NULL,
+  deleted INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_commits_time ON commits (time);
+CREATE INDEX IF NOT EXISTS ix_churn_path ON churn (path_id);
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class FileChurn:
+    """
+    Change history of one repo-relative path.
+
+    commits:     non-merge commits that touched it
+    added:       lines added, summed over those commits
+    deleted:     lines deleted
+    authors:     distinct author emails
+    last_change: committer time of the newest of those commits (Unix seconds)
+    """
+    path: str
+    commits: int
+    added: int
+    deleted: int
+    authors: int
+    last_change: int
+
+
+@dataclass(frozen=True, slots=True)
+class ChurnUpdate:
+    head: str
+    new_commits: int
+    total_commits: int
+    rebuilt: bool  # the cached tip is no longer in head's history (rewritten or other branch)
+
+
+class ChurnCache:
+    """
+    Per-commit, per-file line churn of a git repo's Python files, kept in SQLite.
+
+    `update(repo, rev)` reads only the commits between the cached tip and `rev`, so after the
+    first run the cost is proportional to the new commits, not the history. Paths and authors are
+    stored once and referenced by id.
+
+    Usage:
+      with ChurnCache(analysis / CHURN_FILENAME) as cache:
+          cache.update(repo, "HEAD")
+          churn = cache.file_churn(since=time.time() - 90 * 86400)
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path))
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        if self._meta("version") not in (None, str(CHURN_VERSION)):
+            self._reset()
+        self._conn.executescript(_SCHEMA)
+        with self._conn:
+            self._conn.execute("INSERT OR IGNORE INTO meta VALUES ('version', ?)", (str(CHURN_VERSION),))
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> ChurnCache:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def _meta(self, key: str) -> str | None:
+        try:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        except sqlite3.OperationalError:  # no meta table yet
+            return None
+        return row[0] if row else None
+
+    def _reset(self) -> None:
+        with self._conn:
+            for table in ("meta", "commits", "authors", "paths", "churn"):
+                self._conn.execute(f"DROP TABLE IF EXISTS {table}")
+        self._conn.executescript(_SCHEMA)
+
+    @property
+    def tip(self) -> str | None:
+        return self._meta("tip")
+
+    def _ids(self, table: str, column: str, values: set[str], known: dict[str, int]) -> None:
+        missing = [(v,) for v in values if v not in known]
+        if not missing:
+            return
+        self._conn.executemany(f"INSERT OR IGNORE INTO {table} ({column}) VALUES (?)", missing)
+        for i in range(0, len(missing), 500):
+            chunk = [v for (v,) in missing[i:i + 500]]
+            marks = ",".join("?" * len(chunk))
+            known.update(self._conn.execute(f"SELECT {column}, id FROM {table} WHERE {column} IN ({marks})", chunk))
+
+    def update(self, repo: Path, rev: str = "HEAD") -> ChurnUpdate:
+        """
+        Bring the cache up to `rev`. Runs in one transaction: an interrupted update leaves the
+        previous state.
+        """
+        head = rev_parse(repo, rev)
+        tip = self.tip
+        rebuilt = tip is not None and tip != head and not is_ancestor(repo, tip, head)
+        if rebuilt:
+            self._reset()
+            tip = None
+
+        new = 0
+        if tip != head:
+            paths: dict[str, int] = dict(self._conn.execute("SELECT path, id FROM paths"))
+            authors: dict[str, int] = dict(self._conn.execute("SELECT email, id FROM authors"))
+            with self._conn:
+                batch = []
+                for commit in iter_numstat(repo, head, exclude=(tip,) if tip else ()):
+                    batch.append(commit)
+                    if len(batch) >= _BATCH:
+                        new += self._insert(batch, paths, authors)
+                        batch = []
+                new += self._insert(batch, paths, authors)
+                self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('tip', ?)", (head,))
+        total = self._conn.execute("SELECT COUNT(*) FROM commits").fetchone()[0]
+        return ChurnUpdate(head=head, new_commits=new, total_commits=total, rebuilt=rebuilt)
+
+    def _insert(self, batch: list, paths: dict[str, int], authors: dict[str, int]) -> int:
+        if not batch:
+            return 0
+        self._ids("paths", "path", {p for c in batch for p, _a, _d in c.files}, paths)
+        self._ids("authors", "email", {c.author for c in batch}, authors)
+        inserted = 0
+        for c in batch:
+            cur = self._conn.execute(
+                "INSERT OR IGNORE INTO commits (sha, time, author) VALUES (?, ?, ?)", (c.sha, c.timestamp, authors[c.author])
+            )
+            if cur.rowcount:
+                commit_id = cur.lastrowid
+                self._conn.executemany(
+                    "INSERT INTO churn VALUES (?, ?, ?, ?)", ((commit_id, paths[p], a, d) for p, a, d in c.files)
+                )
+                inserted += 1
+        return inserted
+
+    def file_churn(self, since: int | None = None) -> dict[str, FileChurn]:
+        """
+        Churn per repo-relative path, over commits at or after `since` (Unix seconds) if given.
+        """
+        sql = (
+            "SELECT p.path, COUNT(*), SUM(ch.added), SUM(ch.deleted), COUNT(DISTINCT c.author), MAX(c.time) "
+            "FROM churn ch JOIN commits c ON c.id = ch.commit_id JOIN paths p ON p.id = ch.path_id "
+        )
+        params: tuple = ()
+        if since is not None:
+            sql += "WHERE c.time >= ? "
+            params = (since,)
+        sql += "GROUP BY ch.path_id"
+        return {row[0]: FileChurn(*row) for row in self._conn.execute(sql, params)}
@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import ast
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable
+
+from dpylens.analyzer.aliases import AliasMaps
+from dpylens.analyzer.callgraph import definition_qualnames
+from dpylens.analyzer.models import to_jsonable
+
+CLASSES_VERSION = 1
+
+_FUNCTIONS = (ast.FunctionDef, ast.AsyncFunctionDef)
+# Scopes whose assignments belong to someone else
+_NESTED_SCOPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)
+
+
+@dataclass(frozen=True, slots=True)
+class ClassRecord:
+    """
+    bases:   base class expressions, resolved to qualnames where the file's imports allow
+             (`app.models.Base`); anything else is kept as written (`ast.NodeVisitor`, `Exception`)
+    methods: names of the functions defined in the class body
+    """
+    qualname: str
+    module: str
+    file: str
+    lineno: int
+    bases: list[str]
+    methods: list[str]
+
+
+@dataclass(frozen=True, slots=True)
+class LocalType:
+    """
+    A local variable assigned only from one constructor call (`w = Worker()`).
+    cls is the class qualname as resolved from the file's imports.
+    """
+    function: str
+    name: str
+    cls: str
+
+
+def _dotted(node: ast.AST) -> str | None:
+    parts: list[str] = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return ".".join(reversed(parts))
+
+
+def class_candidate(raw: str, *, module: str, local_classes: set[str], alias: AliasMaps | None) -> str | None:
+    """
+    Qualname a class expression refers to, from the file's point of view:
+      Worker            (defined in this module)         -> module.Worker
+      Outer.Inner       (nested class of this module)    -> module.Outer.Inner
+      Worker            (from app.jobs import Worker)    -> app.jobs.Worker
+      jobs.Worker       (import app.jobs as jobs)        -> app.jobs.Worker
+      jobs.Worker       (from app import jobs)           -> app.jobs.Worker
+    None when the expression is not a local or imported name.
+    """
+    head, _, rest = raw.partition(".")
+    if head in local_classes:
+        return f"{module}.{raw}"
+    if alias is None:
+        return None
+    if not rest:
+        base = alias.symbol_aliases.get(raw)
+        return f"{base}.{raw}" if base else None
+    mod = alias.module_aliases.get(head)
+    if mod:
+        return f"{mod}.{rest}"
+    base = alias.symbol_aliases.get(head)
+    return f"{base}.{raw}" if base else None
+
+
+def _constructor_locals(fn: ast.FunctionDef | ast.AsyncFunctionDef) -> dict[str, str]:
+    """
+    Local names whose every assignment is `name = <Dotted>(...)` with one and the same
+    capitalized callee (classes by naming convention), mapped to that callee.
+    """
+    found: dict[str, str | None] = {}
+    params = fn.args
+    for a in [*params.posonlyargs, *params.args, *params.kwonlyargs, params.vararg, params.kwarg]:
+        if a is not None:
+            found[a.arg] = None
+    ctor_targets: set[int] = set()
+    stack: list[ast.AST] = list(fn.body)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, _NESTED_SCOPES):
+            continue
+        if (
+            isinstance(node, ast.Assign)
+            and len(node.targets) == 1
+            and isinstance(node.targets[0], ast.Name)
+            and isinstance(node.value, ast.Call)
+        ):
+            callee = _dotted(node.value.func)
+            name = node.targets[0].id
+            if callee is not None and callee.rsplit(".", 1)[-1][:1].isupper():
+                ctor_targets.add(id(node.targets[0]))
+                previous = found.get(name, callee)
+                found[name] = callee if previous == callee else None
+        elif isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Load) and id(node) not in ctor_targets:
+            found[node.id] = None
+        stack.extend(ast.iter_child_nodes(node))
+    return {k: v for k, v in found.items() if v is not None}
+
+
+def extract_classes(
+    tree: ast.AST,
+    file_path: Path,
+    module_name: str,
+    aliases: AliasMaps | None = None,
+    qualnames: dict[ast.AST, str] | None = None,
+) -> tuple[list[ClassRecord], list[LocalType]]:
+    """
+    Classes defined in the file, and locals bound to constructor calls in its functions.
+    Qualnames match extract_callgraph.
+    """
+    names = qualnames if qualnames is not None else definition_qualnames(tree, module_name)
+    file = sys.intern(str(file_path))
+    module = sys.intern(module_name)
+    prefix = f"{module_name}."
+    local_classes = {
+        q[len(prefix) :] for node, q in names.items() if isinstance(node, ast.ClassDef) and q.count(".") == module_name.count(".") + 1
+    }
+
+    def resolve(raw: str) -> str | None:
+        return class_candidate(raw, module=module_name, local_classes=local_classes, alias=aliases)
+
+    classes: list[ClassRecord] = []
+    local_types: list[LocalType] = []
+    for node, qual in names.items():
+        if isinstance(node, ast.ClassDef):
+            bases = []
+            for b in node.bases:
+                raw = _dotted(b)
+                if raw is not None:
+                    bases.append(sys.intern(resolve(raw) or raw))
+            classes.append(
+                ClassRecord(
+                    qualname=qual,
+                    module=module,
+                    file=file,
+                    lineno=node.lineno,
+                    bases=bases,
+                    methods=[n.name for n in node.body if isinstance(n, _FUNCTIONS)],
+                )
+            )
+        elif isinstance(node, _FUNCTIONS):
+            for name, callee in _constructor_locals(node).items():
+                cls = resolve(callee)
+                if cls is not None:
+                    local_types.append(LocalType(function=qual, name=name, cls=sys.intern(cls)))
+    classes.sort(key=lambda c: c.lineno)
+    return classes, local_types
+
+
+def _c3_merge(seqs: list[list[str]]) -> list[str] | None:
+    """
+    C3 merge of the bases' linearizations; None when no consistent order exists.
+    """
+    seqs = [s for s in seqs if s]
+    out: list[str] = []
+    while seqs:
+        for seq in seqs:
+            head = seq[0]
+            if not any(head in s[1:] for s in seqs):
+                break
+        else:
+            return None
+        out.append(head)
+        seqs = [s[1:] if s[0] == head else s for s in seqs]
+        seqs = [s for s in seqs if s]
+    return out
+
+
+class ClassIndex:
+    """
+    Every local class by qualname, with its bases, methods and method resolution order.
+
+    Built once per analysis. MROs are C3 linearizations (what Python computes at runtime) over
+    local classes; external bases (`Exception`, `ast.NodeVisitor`) appear in the MRO but have no
+    known methods. MROs and method lookups are memoized, so resolving many calls on the same
+    class walks its hierarchy once.
+    """
+
+    def __init__(self, classes: Iterable[ClassRecord]):
+        self.classes: dict[str, ClassRecord] = {}
+        for c in classes:
+            self.classes.setdefault(c.qualname, c)
+        self._methods = {q: frozenset(c.methods) for q, c in self.classes.items()}
+        # file -> (module, names of classes defined at its top level)
+        self._files: dict[str, tuple[str, set[str]]] = {}
+        for c in self.classes.values():
+            _module, names = self._files.setdefault(c.file, (c.module, set()))
+            if c.qualname.count(".") == c.module.count(".") + 1:
+                names.add(c.qualname.rsplit(".", 1)[-1])
+        self._mro: dict[str, tuple[str, ...]] = {}
+        self._lookup: dict[tuple[str, str], str | None] = {}
+
+    def __len__(self) -> int:
+        return len(self.classes)
+
+    def __contains__(self, qualname: object) -> bool:
+        return qualname in self.classes
+
+    def mro(self, cls: str) -> tuple[str, ...]:
+        found = self._mro.get(cls)
+        if found is not None:
+            return found
+        record = self.classes.get(cls)
+        if record is None:
+            return (cls,)
+        # Provisional entry: a (broken) inheritance cycle ends here instead of recursing forever
+        self._mro[cls] = (cls,)
+        seqs = [list(self.mro(b)) for b in record.bases] + [list(record.bases)]
+        merged = _c3_merge(seqs)
+        if merged is None:
+            # Inconsistent hierarchy (Python would raise TypeError): depth-first, left to right
+            merged = list(dict.fromkeys(c for s in seqs for c in s))
+        result = self._mro[cls] = (cls, *(c for c in merged if c != cls))
+        return result
+
+    def lookup(self, cls: str, method: str) -> str | None:
+        """
+        Qualname of the function `cls().method` runs, or None if no local class in the MRO defines it.
+        """
+        key = (cls, method)
+        if key not in self._lookup:
+            owner = next((c for c in self.mro(cls) if method in self._methods.get(c, ())), None)
+            self._lookup[key] = sys.intern(f"{owner}.{method}") if owner is not None else None
+        return self._lookup[key]
+
+    def owner_of(self, function: str) -> str | None:
+        """
+        The class a method qualname belongs to.
+        """
+        cls = function.rpartition(".")[0]
+        return cls if cls in self.classes else None
+
+    def resolve_class(self, raw: str, file: str, alias: AliasMaps | None) -> str | None:
+        """
+        The local class an expression in `file` names, if any (see class_candidate).
+        """
+        if raw in self.classes:
+            return raw
+        module, local_classes = self._files.get(file, ("", set()))
+        cls = class_candidate(raw, module=module, local_classes=local_classes, alias=alias)
+        return cls if cls in self.classes else None
+
+
+def classes_payload(index: ClassIndex | None, errors: list[Any]) -> dict[str, Any]:
+    """
+    The `classes.json` artifact: every class with its resolved bases, methods and MRO.
+    """
+    if index is None:
+        index = ClassIndex(())
+    return {
+        "version": CLASSES_VERSION,
+        "classes": [{**to_jsonable(c), "mro": list(index.mro(q))} for q, c in index.classes.items()],
+        "errors": errors,
+    }
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
 import ast
+import sys
 from dataclasses import dataclass
 from pathlib import Path
 
+from dpylens.analyzer.callgraph import definition_qualnames
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class FunctionDataFlow:
     function: str
     file: str
@@ -25,13 +28,16 @@ class DataflowVisitor(ast.NodeVisitor):
     Uses a stack to correctly handle nested function definitions.
     """
 
-    def __init__(self, file_path: Path, module_name: str):
+    def __init__(self, file_path: Path, module_name: str, qualnames: dict[ast.AST, str] | None = None):
         self.file_path = file_path
         self.module_name = module_name
+        self._qualnames = qualnames or {}
+        self._file = sys.intern(str(file_path))
         self.records: list[FunctionDataFlow] = []
         self._stack: list[dict] = []
 
-    def _start_function(self, name: str, lineno: int, args: ast.arguments) -> None:
+    def _start_function(self, node: ast.FunctionDef | ast.AsyncFunctionDef) -> None:
+        name, lineno, args = node.name, getattr(node, "lineno", 0) or 0, node.args
         params: list[str] = []
         for a in list(args.posonlyargs) + list(args.args) + list(args.kwonlyargs):
             if getattr(a, "arg", None):
@@ -43,7 +49,7 @@ class DataflowVisitor(ast.NodeVisitor):
 
         self._stack.append(
             {
-                "function": f"{self.module_name}.{name}",
+                "function": self._qualnames.get(node) or sys.intern(f"{self.module_name}.{name}"),
                 "lineno": lineno,
                 "inputs": set(params),
                 "transforms": [],
@@ -58,7 +64,7 @@ class DataflowVisitor(ast.NodeVisitor):
         self.records.append(
             FunctionDataFlow(
                 function=cur["function"],
-                file=str(self.file_path),
+                file=self._file,
                 lineno=int(cur["lineno"] or 0),
                 inputs=sorted(cur["inputs"]),
                 transforms=list(cur["transforms"]),
@@ -70,12 +76,12 @@ class DataflowVisitor(ast.NodeVisitor):
         return self._stack[-1] if self._stack else None
 
     def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
-        self._start_function(node.name, getattr(node, "lineno", 0) or 0, node.args)
+        self._start_function(node)
         self.generic_visit(node)
         self._finish_function()
 
     def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> None:
-        self._start_function(node.name, getattr(node, "lineno", 0) or 0, node.args)
+        self._start_function(node)
         self.generic_visit(node)
         self._finish_function()
 
@@ -109,8 +115,15 @@ class DataflowVisitor(ast.NodeVisitor):
         self.generic_visit(node)
 
 
-def extract_dataflow(tree: ast.AST, file_path: Path, module_name: str) -> list[FunctionDataFlow]:
-    v = DataflowVisitor(file_path=file_path, module_name=module_name)
+def extract_dataflow(
+    tree: ast.AST,
+    file_path: Path,
+    module_name: str,
+    qualnames: dict[ast.AST, str] | None = None,
+) -> list[FunctionDataFlow]:
+    if qualnames is None:
+        qualnames = definition_qualnames(tree, module_name)
+    v = DataflowVisitor(file_path=file_path, module_name=module_name, qualnames=qualnames)
     try:
         v.visit(tree)
     except Exception:
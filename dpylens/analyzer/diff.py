@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import json
+from collections import Counter
+from dataclasses import asdict
+from pathlib import Path, PurePosixPath
+from typing import Any, Iterable
+
+from dpylens.analyzer.callgraph_resolve import resolve_calls
+from dpylens.analyzer.classes import ClassIndex, ClassRecord
+from dpylens.analyzer.gitsource import GitBlobReader, changed_python_files, grep_files, ls_tree, rev_parse
+from dpylens.analyzer.imports import ImportItem, ImportRecord
+from dpylens.analyzer.layout import DEFAULT_IGNORE_DIRS, ModuleIndex
+from dpylens.analyzer.models import FileError, FunctionRecord, to_jsonable
+from dpylens.analyzer.modulegraph import edges_for_import_record, expand_local_importables
+from dpylens.analyzer.parser import parse_source_to_ast
+from dpylens.analyzer.pipeline import FileAnalysis, FileTask, analyze_file
+from dpylens.analyzer.routes_litestar import extract_litestar_facts, link_litestar_routes
+
+DELTA_FILENAME = "delta.json"
+
+# Superset of the constructs extract_litestar_facts looks at; used to pick files for route re-linking.
+_ROUTE_HINT_PATTERN = r"Router|Litestar|Controller|@([A-Za-z_][A-Za-z0-9_]*\.)*(get|post|put|patch|delete|head|options)\("
+
+
+def _read_json(p: Path) -> Any:
+    return json.loads(p.read_text(encoding="utf-8"))
+
+
+def _is_ignored(rel: str) -> bool:
+    return any(part in DEFAULT_IGNORE_DIRS for part in PurePosixPath(rel).parts)
+
+
+def _rel(file: str, base_root: Path) -> str | None:
+    try:
+        return Path(file).relative_to(base_root).as_posix()
+    except ValueError:
+        return None
+
+
+def _counter_delta(base: Iterable[tuple], head: Iterable[tuple]) -> tuple[Counter, Counter]:
+    b, h = Counter(base), Counter(head)
+    return h - b, b - h
+
+
+def _import_record_from_json(rec: dict[str, Any]) -> ImportRecord:
+    return ImportRecord(
+        file=rec["file"],
+        imports=list(rec.get("imports") or []),
+        items=[ImportItem(**it) for it in rec.get("items") or []],
+    )
+
+
+def analyze_diff(
+    repo: Path,
+    base: str,
+    head: str,
+    base_analysis: Path,
+    *,
+    base_root: Path | None = None,
+) -> dict[str, Any]:
+    """
+    Analyze only the Python files that changed between `base` and `head` and diff them against
+    the base run's artifacts.
+
+    File contents are read from git objects, so neither revision has to be checked out.
+    `base_analysis` must be the analysis folder produced for `base`; `base_root` is the repo
+    path that run was made from (defaults to `repo`), used to map its absolute file paths.
+
+    Unchanged files are re-analyzed only when the change can alter their results: calls that
+    resolved to a removed function, or unresolved calls whose name matches an added function.
+    """
+    repo = repo.resolve()
+    base_root = (base_root or repo).resolve()
+    base_sha = rev_parse(repo, base)
+    head_sha = rev_parse(repo, head)
+
+    changed = [c for c in changed_python_files(repo, base_sha, head_sha) if not _is_ignored(c.path)]
+    changed_paths = {c.path for c in changed}
+    errors: list[FileError] = []
+
+    # --- base artifacts ---
+    base_cg = _read_json(base_analysis / "callgraph_resolved.json")
+    base_modules = _read_json(base_analysis / "modules.json")
+    base_mg = _read_json(base_analysis / "module_graph.json")
+    routes_path = base_analysis / "routes.json"
+    base_routes = _read_json(routes_path) if routes_path.exists() else None
+    classes_path = base_analysis / "classes.json"
+    base_classes = (_read_json(classes_path).get("classes") or []) if classes_path.exists() else []
+
+    base_functions = [FunctionRecord(**f) for f in base_cg.get("functions") or []]
+    base_calls = base_cg.get("calls") or []
+
+    # Layout of the head tree, not of whatever the working tree has checked out
+    module_index = ModuleIndex.for_paths(repo, (e.path for e in ls_tree(repo, head_sha)))
+    analyzed: dict[str, FileAnalysis] = {}
+
+    def analyze_at_head(paths: Iterable[str], reader: GitBlobReader) -> None:
+        for rel in sorted(paths):
+            if rel in analyzed:
+                continue
+            data = reader.read(head_sha, rel)
+            if data is None:
+                continue
+            path = repo / rel
+            task = FileTask(path=path, module=module_index.module_for(path), source=data)
+            fa, err = analyze_file(task, root=repo)
+            if err:
+                errors.append(err)
+            if fa is not None:
+                analyzed[rel] = fa
+
+    with GitBlobReader(repo) as reader:
+        analyze_at_head((c.path for c in changed if c.status != "D"), reader)
+
+        # --- functions ---
+        base_fn_keys = [(f.qualname, _rel(f.file, base_root)) for f in base_functions]
+        head_changed_fns = [f for fa in analyzed.values() for f in fa.functions]
+        fn_added, fn_removed = _counter_delta(
+            (k for k in base_fn_keys if k[1] in changed_paths),
+            ((f.qualname, _rel(f.file, repo)) for f in head_changed_fns),
+        )
+
+        head_functions = [
+            f for f, k in zip(base_functions, base_fn_keys) if k[1] not in changed_paths
+        ] + head_changed_fns
+        head_qualnames = {f.qualname for f in head_functions}
+        removed_qualnames = {f.qualname for f in base_functions} - head_qualnames
+        added_names = {q.rsplit(".", 1)[-1] for q in head_qualnames - {f.qualname for f in base_functions}}
+
+        # Unchanged files whose call resolution may differ at head
+        affected: set[str] = set()
+        for c in base_calls:
+            rel = _rel(c.get("file") or "", base_root)
+            if rel is None or rel in changed_paths:
+                continue
+            resolved = c.get("callee_resolved")
+            if resolved in removed_qualnames:
+                affected.add(rel)
+            elif not resolved and (c.get("callee_raw") or "").rsplit(".", 1)[-1] in added_names:
+                affected.add(rel)
+        analyze_at_head(affected, reader)
+
+        # --- routes (re-linked from every file that can contribute route facts) ---
+        head_routes = None
+        if base_routes is not None:
+            facts = []
+            for rel in sorted(set(grep_files(repo, head_sha, _ROUTE_HINT_PATTERN)) | (changed_paths & set(analyzed))):
+                if _is_ignored(rel):
+                    continue
+                fa = analyzed.get(rel)
+                if fa is not None:
+                    if fa.routes is not None:
+                        facts.append(fa.routes)
+                    continue
+                data = reader.read(head_sha, rel)
+                tree, _err = parse_source_to_ast(data, repo / rel) if data is not None else (None, None)
+                if tree is not None:
+                    facts.append(extract_litestar_facts(tree, rel))
+            head_routes = link_litestar_routes(facts)
+
+    # --- calls ---
+    reanalyzed = set(analyzed) | changed_paths
+    # Class hierarchy at head: base classes of files that were not re-analyzed, plus re-analyzed ones
+    head_classes = [
+        ClassRecord(**{**{k: v for k, v in c.items() if k != "mro"}, "file": str(repo / rel)})
+        for c in base_classes
+        if (rel := _rel(c.get("file") or "", base_root)) is not None and rel not in reanalyzed
+    ] + [c for fa in analyzed.values() for c in fa.classes]
+    resolved_head = resolve_calls(
+        functions=head_functions,
+        calls=[c for fa in analyzed.values() for c in fa.calls],
+        alias_maps_by_file={fa.file: fa.aliases for fa in analyzed.values()},
+        local_module_index={},
+        classes=ClassIndex(head_classes),
+        local_types=[t for fa in analyzed.values() for t in fa.local_types],
+    )
+
+    def call_key(caller: str, resolved: str | None, raw: str, rel: str | None) -> tuple:
+        return (caller, resolved or raw, rel)
+
+    calls_added, calls_removed = _counter_delta(
+        (
+            call_key(c["caller"], c.get("callee_resolved"), c.get("callee_raw") or "", rel)
+            for c in base_calls
+            if (rel := _rel(c.get("file") or "", base_root)) in reanalyzed
+        ),
+        (call_key(c.caller, c.callee_resolved, c.callee_raw, _rel(c.file, repo)) for c in resolved_head),
+    )
+
+    # --- module edges (recomputed for every file from stored import records; no parsing needed) ---
+    base_nodes = {n["module"]: _rel(n["file"], base_root) for n in base_mg.get("nodes") or []}
+    deleted = {c.path for c in changed if c.status == "D"}
+    head_modules = {m for m, rel in base_nodes.items() if rel not in deleted}
+    head_modules |= {module_index.module_for(repo / c.path) for c in changed if c.status != "D"}
+    importables = expand_local_importables(head_modules)
+
+    records_by_rel: dict[str, ImportRecord] = {}
+    for rec in base_modules.get("imports") or []:
+        rel = _rel(rec.get("file") or "", base_root)
+        if rel is not None and rel not in changed_paths:
+            records_by_rel[rel] = _import_record_from_json(rec)
+    for rel, fa in analyzed.items():
+        records_by_rel[rel] = fa.imports
+
+    head_edges = []
+    for rel, rec in records_by_rel.items():
+        head_edges.extend(
+            edges_for_import_record(rec, src_module=module_index.module_for(repo / rel), local_importables=importables)
+        )
+    edges_added, edges_removed = _counter_delta(
+        ((e["src_module"], e["dst_module"], e["kind"], e["raw_import"]) for e in base_mg.get("edges") or []),
+        ((e.src_module, e.dst_module, e.kind, e.raw_import) for e in head_edges),
+    )
+
+    # --- routes ---
+    routes_added: Counter = Counter()
+    routes_removed: Counter = Counter()
+    if base_routes is not None and head_routes is not None:
+        routes_added, routes_removed = _counter_delta(
+            (tuple(sorted(r.items())) for r in base_routes.get("routes") or []),
+            (tuple(sorted(asdict(r).items())) for r in head_routes.routes),
+        )
+
+    def fn_rows(c: Counter) -> list[dict[str, Any]]:
+        return [{"qualname": q, "file": f} for (q, f) in sorted(c.elements())]
+
+    def call_rows(c: Counter) -> list[dict[str, Any]]:
+        return [
+            {"caller": caller, "callee": callee, "file": f, "count": n}
+            for (caller, callee, f), n in sorted(c.items())
+        ]
+
+    def edge_rows(c: Counter) -> list[dict[str, Any]]:
+        return [
+            {"src_module": s, "dst_module": d, "kind": k, "raw_import": raw}
+            for (s, d, k, raw) in sorted(c.elements())
+        ]
+
+    def route_rows(c: Counter) -> list[dict[str, Any]]:
+        rows = [dict(r) for r in c.elements()]
+        return sorted(rows, key=lambda r: (r["path"], r["http_method"], r["handler"], r["file"]))
+
+    return {
+        "base": base_sha,
+        "head": head_sha,
+        "changed_files": to_jsonable(changed),
+        "reanalyzed_files": sorted(set(analyzed) - changed_paths),
+        "functions": {"added": fn_rows(fn_added), "removed": fn_rows(fn_removed)},
+        "calls": {"added": call_rows(calls_added), "removed": call_rows(calls_removed)},
+        "module_edges": {"added": edge_rows(edges_added), "removed": edge_rows(edges_removed)},
+        "routes": {"added": route_rows(routes_added), "removed": route_rows(routes_removed)},
+        "errors": to_jsonable(errors),
+    }
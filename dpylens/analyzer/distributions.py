@@ -0,0 +1,416 @@
+from __future__ import annotations
+
+import ast
+import csv
+import hashlib
+import json
+import os
+import re
+import sys
+import sysconfig
+import tempfile
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Sequence
+
+try:
+    import tomllib
+except ModuleNotFoundError:  # Python < 3.11
+    import tomli as tomllib  # type: ignore[no-redef]
+
+from dpylens.analyzer.jsonstream import iter_fields
+from dpylens.analyzer.metrics import package_of
+
+DEPENDENCIES_FILENAME = "dependencies.json"
+DEPENDENCIES_VERSION = 1
+# Bump when the cached site-packages index format or its derivation changes
+INDEX_VERSION = 1
+
+# How an import name was classified
+KINDS = ("distribution", "stdlib", "ambiguous", "unmapped", "relative")
+
+# Import names that differ from their distribution's name; only used to match lock file entries
+# (an installed environment or an explicit mapping is authoritative)
+KNOWN_IMPORTS = {
+    "attr": "attrs",
+    "bs4": "beautifulsoup4",
+    "cv2": "opencv-python",
+    "Crypto": "pycryptodome",
+    "dateutil": "python-dateutil",
+    "docx": "python-docx",
+    "dotenv": "python-dotenv",
+    "fitz": "pymupdf",
+    "git": "gitpython",
+    "google.protobuf": "protobuf",
+    "jose": "python-jose",
+    "jwt": "pyjwt",
+    "magic": "python-magic",
+    "multipart": "python-multipart",
+    "OpenSSL": "pyopenssl",
+    "PIL": "pillow",
+    "pkg_resources": "setuptools",
+    "serial": "pyserial",
+    "skimage": "scikit-image",
+    "sklearn": "scikit-learn",
+    "websocket": "websocket-client",
+    "yaml": "pyyaml",
+    "zmq": "pyzmq",
+    "_pytest": "pytest",
+}
+
+_NORMALIZE = re.compile(r"[-_.]+")
+_REQUIREMENT = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)\s*(?:\[[^\]]*\])?\s*(?:===?\s*([^\s;,#]+))?")
+_METADATA_SUFFIXES = (".dist-info", ".egg-info")
+_MODULE_SUFFIXES = (".py", ".so", ".pyd")
+
+
+class DistributionError(ValueError):
+    pass
+
+
+def normalize(name: str) -> str:
+    """
+    PEP 503 normalized distribution name (`PyYAML` -> `pyyaml`, `zope.interface` -> `zope-interface`).
+    """
+    return _NORMALIZE.sub("-", name).lower()
+
+
+def default_cache_dir() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "dpylens" / "distributions"
+
+
+def environment_site_packages() -> list[Path]:
+    """
+    site-packages folders of the running interpreter.
+    """
+    paths = sysconfig.get_paths()
+    return [Path(p) for p in dict.fromkeys((paths["purelib"], paths["platlib"])) if Path(p).is_dir()]
+
+
+@dataclass(frozen=True, slots=True)
+class SiteIndex:
+    """
+    Distributions installed in one site-packages folder.
+
+    prefixes: importable dotted prefix -> distributions providing it. Recorded down to the first
+              regular package (one with `__init__.py`), so namespace packages stay apart:
+              `google`, `google.cloud`, `google.cloud.storage` for google-cloud-storage.
+    """
+    path: str
+    fingerprint: str
+    versions: dict[str, str]  # distribution -> version
+    prefixes: dict[str, list[str]]
+
+
+def site_fingerprint(path: Path) -> str:
+    """
+    Key of a site-packages folder: its path and the name and mtime of every metadata folder.
+    Listing the folder is cheap; reading each distribution's RECORD is not.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{INDEX_VERSION}\0{path.resolve()}\0".encode("utf-8", "surrogateescape"))
+    entries = sorted((e.name, e.stat().st_mtime_ns) for e in os.scandir(path) if e.name.endswith(_METADATA_SUFFIXES))
+    for name, mtime in entries:
+        h.update(f"{name}\0{mtime}\0".encode("utf-8", "surrogateescape"))
+    return h.hexdigest()
+
+
+def _record_prefixes(files: Iterable[str]) -> set[str]:
+    modules: list[tuple[str, ...]] = []
+    regular: set[tuple[str, ...]] = set()
+    for f in files:
+        if not f.endswith(_MODULE_SUFFIXES) or f.startswith("..") or "__pycache__" in f:
+            continue
+        parts = tuple(f.split("/"))
+        if parts[0].endswith(_METADATA_SUFFIXES):
+            continue
+        if parts[-1] == "__init__.py":
+            regular.add(parts[:-1])
+        # `six.py`, `_cffi_backend.cpython-311-x86_64-linux-gnu.so` -> a top-level module
+        modules.append(parts[:-1] if len(parts) > 1 else (parts[0].split(".")[0],))
+    prefixes: set[str] = set()
+    for dirs in modules:
+        for depth in range(1, len(dirs) + 1):
+            prefixes.add(".".join(dirs[:depth]))
+            if dirs[:depth] in regular:
+                break
+    return prefixes
+
+
+def _dist_name(meta: Path) -> tuple[str, str]:
+    # `PyYAML-6.0.1.dist-info`, `foo-1.0-py3.11.egg-info`
+    stem = meta.name.rsplit(".", 1)[0]
+    name, _, rest = stem.partition("-")
+    return name, rest.split("-")[0]
+
+
+def scan_site_packages(path: Path) -> SiteIndex:
+    versions: dict[str, str] = {}
+    prefixes: dict[str, list[str]] = {}
+    for entry in sorted(os.scandir(path), key=lambda e: e.name):
+        if not entry.name.endswith(_METADATA_SUFFIXES) or not entry.is_dir():
+            continue
+        meta = Path(entry.path)
+        name, version = _dist_name(meta)
+        versions[name] = version
+        provided: set[str] = set()
+        try:
+            with (meta / "RECORD").open(encoding="utf-8", newline="") as fh:
+                provided = _record_prefixes(row[0] for row in csv.reader(fh) if row)
+        except OSError:
+            pass
+        try:
+            # Editable installs and eggs: RECORD lists no modules, top_level.txt names them
+            provided.update(line.strip() for line in (meta / "top_level.txt").read_text(encoding="utf-8").splitlines() if line.strip())
+        except OSError:
+            pass
+        for prefix in provided:
+            prefixes.setdefault(prefix, []).append(name)
+    return SiteIndex(path=str(path), fingerprint=site_fingerprint(path), versions=versions, prefixes=prefixes)
+
+
+def load_site_packages(path: Path, cache_dir: Path | None) -> tuple[SiteIndex, bool]:
+    """
+    Index of a site-packages folder, from `<cache_dir>/<fp[:2]>/<fp>.json` when its fingerprint
+    is unchanged. Returns (index, cache hit).
+    """
+    if not path.is_dir():
+        raise DistributionError(f"{path}: not a directory")
+    if cache_dir is None:
+        return scan_site_packages(path), False
+    fp = site_fingerprint(path)
+    cached = cache_dir / fp[:2] / f"{fp}.json"
+    try:
+        data = json.loads(cached.read_text(encoding="utf-8"))
+        return SiteIndex(path=str(path), fingerprint=fp, versions=data["versions"], prefixes=data["prefixes"]), True
+    except (OSError, ValueError, KeyError):
+        pass
+    index = scan_site_packages(path)
+    cached.parent.mkdir(parents=True, exist_ok=True)
+    # Write-then-rename: concurrent runs may store the same environment
+    fd, tmp = tempfile.mkstemp(dir=cached.parent, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        json.dump({"versions": index.versions, "prefixes": index.prefixes}, fh, separators=(",", ":"))
+    os.replace(tmp, cached)
+    return index, False
+
+
+def load_lock(path: Path) -> dict[str, str | None]:
+    """
+    Distribution -> version from a lock file: `poetry.lock`, `uv.lock`, `pdm.lock` (TOML
+    `[[package]]` tables), `Pipfile.lock` (JSON), or a requirements file (`name==version` lines).
+    """
+    try:
+        text = path.read_text(encoding="utf-8")
+    except OSError as e:
+        raise DistributionError(f"{path}: {e}") from e
+    if path.name == "Pipfile.lock":
+        try:
+            data = json.loads(text)
+        except ValueError as e:
+            raise DistributionError(f"{path}: {e}") from e
+        return {
+            name: (spec.get("version") or "").lstrip("=") or None
+            for section in ("default", "develop")
+            for name, spec in (data.get(section) or {}).items()
+        }
+    if path.suffix in (".lock", ".toml"):
+        try:
+            data = tomllib.loads(text)
+        except tomllib.TOMLDecodeError as e:
+            raise DistributionError(f"{path}: {e}") from e
+        return {p["name"]: p.get("version") for p in data.get("package") or [] if isinstance(p, dict) and "name" in p}
+    locked: dict[str, str | None] = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith(("#", "-")):
+            continue
+        m = _REQUIREMENT.match(line)
+        if m:
+            locked[m.group(1)] = m.group(2)
+    return locked
+
+
+def load_mapping(path: Path) -> dict[str, str]:
+    """
+    Import name -> distribution from a JSON object or a TOML file (top level or an `[imports]`
+    table): `{"yaml": "PyYAML", "google.cloud.storage": "google-cloud-storage"}`.
+    """
+    try:
+        text = path.read_text(encoding="utf-8")
+        data = json.loads(text) if path.suffix == ".json" else tomllib.loads(text)
+    except (OSError, ValueError) as e:  # TOMLDecodeError is a ValueError
+        raise DistributionError(f"{path}: {e}") from e
+    if isinstance(data, dict) and isinstance(data.get("imports"), dict):
+        data = data["imports"]
+    if not isinstance(data, dict) or not all(isinstance(k, str) and isinstance(v, str) for k, v in data.items()):
+        raise DistributionError(f"{path}: expected a table of import name -> distribution name")
+    return dict(data)
+
+
+@dataclass(frozen=True, slots=True)
+class Resolution:
+    kind: str  # one of KINDS
+    name: str | None = None  # distribution or stdlib top-level module
+    candidates: tuple[str, ...] = ()  # kind "ambiguous": distributions sharing the longest prefix
+
+
+@dataclass
+class DistributionIndex:
+    """
+    Maps import names to distributions, by longest dotted prefix. Sources are consulted in order:
+    the explicit mapping, the running interpreter's standard library, installed site-packages,
+    then the lock file (via name normalization and KNOWN_IMPORTS).
+    """
+    mapping: dict[str, str] = field(default_factory=dict)
+    sites: list[SiteIndex] = field(default_factory=list)
+    locked: dict[str, str | None] = field(default_factory=dict)
+    _locked_norm: dict[str, str] = field(default_factory=dict, init=False, repr=False)
+    _memo: dict[str, Resolution] = field(default_factory=dict, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._locked_norm = {normalize(name): name for name in self.locked}
+
+    @property
+    def fingerprint(self) -> str:
+        h = hashlib.blake2b(digest_size=16)
+        h.update(json.dumps([self.mapping, [s.fingerprint for s in self.sites], self.locked], sort_keys=True).encode("utf-8"))
+        return h.hexdigest()
+
+    def version(self, dist: str) -> str | None:
+        for site in self.sites:
+            if dist in site.versions:
+                return site.versions[dist]
+        return self.locked.get(dist)
+
+    def resolve(self, name: str) -> Resolution:
+        found = self._memo.get(name)
+        if found is None:
+            found = self._memo[name] = self._resolve(name)
+        return found
+
+    def _resolve(self, name: str) -> Resolution:
+        if not name or name.startswith(".") or name == "<unknown>":
+            return Resolution("relative")
+        parts = name.split(".")
+        prefixes = [".".join(parts[:i]) for i in range(len(parts), 0, -1)]  # longest first
+        for p in prefixes:
+            if p in self.mapping:
+                return Resolution("distribution", self.mapping[p])
+        if parts[0] in sys.stdlib_module_names:
+            return Resolution("stdlib", parts[0])
+        for site in self.sites:
+            for p in prefixes:
+                dists = site.prefixes.get(p)
+                if dists:
+                    unique = sorted(set(dists))
+                    if len(unique) == 1:
+                        return Resolution("distribution", unique[0])
+                    return Resolution("ambiguous", candidates=tuple(unique))
+        for p in prefixes:
+            for guess in (KNOWN_IMPORTS.get(p), p, p.replace(".", "-")):
+                if guess and normalize(guess) in self._locked_norm:
+                    return Resolution("distribution", self._locked_norm[normalize(guess)])
+        return Resolution("unmapped")
+
+    @classmethod
+    def build(
+        cls,
+        *,
+        site_packages: Sequence[Path] = (),
+        lock: Path | None = None,
+        mapping: Path | None = None,
+        cache_dir: Path | None = None,
+    ) -> tuple[DistributionIndex, list[dict[str, Any]]]:
+        """
+        Index from the given sources; returns it with one description per source (for the artifact).
+        """
+        sources: list[dict[str, Any]] = []
+        sites: list[SiteIndex] = []
+        for path in site_packages:
+            site, hit = load_site_packages(path, cache_dir)
+            sites.append(site)
+            sources.append({"kind": "site-packages", "path": str(path), "distributions": len(site.versions), "cached": hit})
+        locked = load_lock(lock) if lock is not None else {}
+        if lock is not None:
+            sources.append({"kind": "lock", "path": str(lock), "distributions": len(locked)})
+        mapped = load_mapping(mapping) if mapping is not None else {}
+        if mapping is not None:
+            sources.append({"kind": "mapping", "path": str(mapping), "imports": len(mapped)})
+        return cls(mapping=mapped, sites=sites, locked=locked), sources
+
+
+def _from_names(raw: str) -> list[str]:
+    try:
+        node = ast.parse(raw).body[0]
+    except (SyntaxError, IndexError):
+        return []
+    return [a.name for a in node.names if a.name != "*"] if isinstance(node, ast.ImportFrom) else []
+
+
+def dependency_graph(analysis_dir: Path, index: DistributionIndex) -> dict[str, Any]:
+    """
+    Package-level dependency graph from `module_graph.json`: local packages, the distributions and
+    stdlib modules they import, and edges weighted by import statements. External imports that
+    could not be mapped are listed under `unmapped`.
+
+    `from google.cloud import storage` is resolved as `google.cloud.storage` when the module
+    alone is shared by several distributions (namespace packages).
+    """
+    packages: dict[str, str] = {}  # local module (also without `.__init__`) -> package
+    statements: set[tuple[str, str, str, str]] = set()  # (src module, raw import, dst, kind)
+    used: dict[str, set[str]] = {}  # distribution -> import names
+    unmapped: Counter[tuple[str, str]] = Counter()
+    candidates: dict[str, tuple[str, ...]] = {}
+    for key, item in iter_fields(analysis_dir / "module_graph.json"):
+        if key == "nodes":
+            package = package_of(item["module"], item["file"])
+            packages[item["module"]] = packages[item["module"].removesuffix(".__init__")] = package
+            continue
+        if key != "edges" or item["src_module"] not in packages:
+            continue
+        src, dst_module, raw = item["src_module"], item["dst_module"], item["raw_import"]
+        if item["kind"] == "local":
+            statements.add((src, raw, packages.get(dst_module, dst_module), "local"))
+            continue
+        r = index.resolve(dst_module)
+        resolved = [(dst_module, r)]
+        if r.kind == "ambiguous":
+            more = [(f"{dst_module}.{n}", index.resolve(f"{dst_module}.{n}")) for n in _from_names(raw)]
+            if more and all(m.kind == "distribution" for _name, m in more):
+                resolved = more
+        for name, r in resolved:
+            if r.kind in ("distribution", "stdlib"):
+                assert r.name is not None
+                statements.add((src, raw, r.name, r.kind))
+                if r.kind == "distribution":
+                    used.setdefault(r.name, set()).add(name)
+            else:
+                unmapped[(name, r.kind)] += 1
+                if r.candidates:
+                    candidates[name] = r.candidates
+
+    edges: Counter[tuple[str, str, str]] = Counter()
+    for src, _raw, dst, kind in statements:
+        if packages[src] != dst:
+            edges[(packages[src], dst, kind)] += 1
+    local = sorted(set(packages.values()))
+    stdlib = sorted({dst for (_s, dst, kind) in edges if kind == "stdlib"})
+    return {
+        "version": DEPENDENCIES_VERSION,
+        "packages": (
+            [{"package": p, "kind": "local"} for p in local]
+            + [{"package": d, "kind": "distribution", "version": index.version(d), "imports": sorted(used[d])} for d in sorted(used)]
+            + [{"package": m, "kind": "stdlib"} for m in stdlib]
+        ),
+        "edges": [
+            {"src": src, "dst": dst, "kind": kind, "imports": n}
+            for (src, dst, kind), n in sorted(edges.items())
+        ],
+        "unmapped": [
+            {"import": name, "reason": reason, "imports": n, **({"candidates": list(candidates[name])} if name in candidates else {})}
+            for (name, reason), n in sorted(unmapped.items())
+        ],
+    }
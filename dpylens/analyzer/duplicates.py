@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+import ast
+import hashlib
+import sys
+import zlib
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Sequence
+
+from dpylens.analyzer.callgraph import definition_qualnames
+
+try:
+    import numpy as np
+except ImportError:  # optional: LSH bucketing falls back to pure Python (same clusters, slower)
+    np = None  # type: ignore[assignment]
+
+DUPLICATES_VERSION = 1
+
+# Functions with fewer normalized tokens are not fingerprinted: short getters and
+# one-line wrappers look alike everywhere and are not worth reporting.
+MIN_TOKENS = 50
+
+# Shingle length (tokens) and MinHash signature length
+SHINGLE = 5
+SIGNATURE_BINS = 64
+
+# LSH: BANDS bands of ROWS bins each. Two functions with Jaccard similarity s share a band with
+# probability 1 - (1 - s^ROWS)^BANDS (~0.98 at s=0.6, ~1.0 at s=0.8).
+BANDS = 16
+ROWS = SIGNATURE_BINS // BANDS
+
+# Estimated similarity (share of equal signature bins) needed to join a near-duplicate cluster
+DEFAULT_THRESHOLD = 0.8
+
+_BIN_MASK = SIGNATURE_BINS - 1  # SIGNATURE_BINS is a power of two
+_EMPTY = sys.maxsize  # not below any hash value
+# Odd 64-bit multipliers folding a band's ROWS values into one bucket key (numpy path; ROWS <= 4)
+_BAND_MIX = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+# Node types that only carry context (Load/Store/Del); dropped from the token stream
+_SKIP = (ast.expr_context,)
+
+
+@dataclass(frozen=True, slots=True)
+class FunctionFingerprint:
+    """
+    Normalized shape of one function body: identifiers and literal values are abstracted away.
+
+    digest:    structural hash of the normalized token stream; equal digests = same shape
+    signature: MinHash of the token shingles, SIGNATURE_BINS values
+    """
+    qualname: str
+    file: str
+    lineno: int
+    tokens: int
+    digest: str
+    signature: list[int]
+
+
+@dataclass(frozen=True)
+class DuplicateCluster:
+    """
+    kind: "exact" (all members have the same digest) or "near"
+    similarity: lowest estimated similarity of a member to the first member
+    """
+    kind: str
+    similarity: float
+    members: list[FunctionFingerprint]
+
+
+_token_ids: dict[str, int] = {}
+
+
+def _token_id(token: str) -> int:
+    # crc32 is stable across processes and runs (str hashes are salted), so signatures
+    # computed in different workers are comparable
+    tid = _token_ids.get(token)
+    if tid is None:
+        tid = _token_ids[token] = zlib.crc32(token.encode("ascii"))
+    return tid
+
+
+def _normalized_tokens(fn: ast.FunctionDef | ast.AsyncFunctionDef) -> list[int]:
+    """
+    Preorder node types of the signature and body. Names, attributes and argument names are
+    reduced to their node type and constants to their value type; nested functions and classes
+    become a single token (they are fingerprinted on their own); a docstring is skipped.
+    """
+    body = fn.body
+    if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant) and isinstance(body[0].value.value, str):
+        body = body[1:]
+    out: list[int] = []
+    stack: list[ast.AST] = list(reversed(body)) + [fn.args]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, _SKIP):
+            continue
+        if isinstance(node, ast.Constant):
+            out.append(_token_id(f"Constant:{type(node.value).__name__}"))
+            continue
+        out.append(_token_id(type(node).__name__))
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)):
+            continue
+        stack.extend(reversed(list(ast.iter_child_nodes(node))))
+    return out
+
+
+def _signature(tokens: list[int]) -> list[int]:
+    """
+    One-permutation MinHash: every shingle is hashed once and lands in one of SIGNATURE_BINS
+    bins by its low bits, each bin keeping its minimum. Empty bins borrow from the next non-empty
+    bin to the right (rotation densification), mixed with the distance so they stay distinguishable.
+    """
+    bins = [_EMPTY] * SIGNATURE_BINS
+    # Tuples of ints hash deterministically (only str/bytes hashes are salted)
+    for h in map(hash, zip(*(tokens[i:] for i in range(SHINGLE)))):
+        b = h & _BIN_MASK
+        if h < bins[b]:
+            bins[b] = h
+    if _EMPTY in bins and len(tokens) >= SHINGLE:
+        filled = list(bins)
+        for j in range(SIGNATURE_BINS):
+            k = 0
+            while bins[(j + k) % SIGNATURE_BINS] == _EMPTY:
+                k += 1
+            if k:
+                filled[j] = hash((bins[(j + k) % SIGNATURE_BINS], k))
+        bins = filled
+    return bins
+
+
+def extract_fingerprints(
+    tree: ast.AST,
+    file_path: Path,
+    module_name: str,
+    qualnames: dict[ast.AST, str] | None = None,
+    *,
+    min_tokens: int = MIN_TOKENS,
+) -> list[FunctionFingerprint]:
+    """
+    Fingerprints for every function with at least `min_tokens` normalized tokens.
+    Qualnames match extract_callgraph.
+    """
+    names = qualnames if qualnames is not None else definition_qualnames(tree, module_name)
+    file = sys.intern(str(file_path))
+    records: list[FunctionFingerprint] = []
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        tokens = _normalized_tokens(node)
+        if len(tokens) < min_tokens:
+            continue
+        digest = hashlib.blake2b(array("I", tokens).tobytes(), digest_size=8).hexdigest()
+        records.append(
+            FunctionFingerprint(
+                qualname=names[node],
+                file=file,
+                lineno=node.lineno,
+                tokens=len(tokens),
+                digest=digest,
+                signature=_signature(tokens),
+            )
+        )
+    records.sort(key=lambda r: r.lineno)
+    return records
+
+
+def similarity(a: Sequence[int], b: Sequence[int]) -> float:
+    """
+    Estimated Jaccard similarity of two signatures: the share of equal bins.
+    """
+    return sum(x == y for x, y in zip(a, b)) / SIGNATURE_BINS
+
+
+def _find(parent: list[int], i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def _candidate_pairs(sigs: list[list[int]]) -> Iterable[tuple[int, int]]:
+    """
+    (bucket leader, member) for every signature sharing a band with an earlier one.
+    """
+    n = len(sigs)
+    # keys_by_band[band][r]: the band's slice of signature r
+    keys_by_band = list(zip(*(zip(*[iter(sig)] * ROWS) for sig in sigs))) if n else []
+    for keys in keys_by_band:
+        # key -> first signature with it (later duplicates overwrite, so insert in reverse)
+        leaders = dict(zip(reversed(keys), range(n - 1, -1, -1)))
+        for r, leader in enumerate(map(leaders.__getitem__, keys)):
+            if leader != r:
+                yield leader, r
+
+
+def _similar_pairs_numpy(sigs: list[list[int]], threshold: float) -> Iterable[tuple[int, int]]:
+    """
+    Vectorized _candidate_pairs plus the similarity check: each band folds into one 64-bit key,
+    np.unique finds every bucket's first member, and all candidates are compared at once.
+    """
+    arr = np.array(sigs, dtype=np.int64).reshape(len(sigs), SIGNATURE_BINS)
+    bits = arr.view(np.uint64)
+    mix = np.array(_BAND_MIX[:ROWS], dtype=np.uint64)
+    rows = np.arange(len(sigs))
+    for band in range(BANDS):
+        keys = (bits[:, band * ROWS : (band + 1) * ROWS] * mix).sum(axis=1, dtype=np.uint64)
+        _uniq, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        leaders = first[inverse.reshape(-1)]
+        members = rows[leaders != rows]
+        leaders = leaders[members]
+        equal = (arr[leaders] == arr[members]).sum(axis=1)
+        ok = equal / SIGNATURE_BINS >= threshold
+        yield from zip(leaders[ok].tolist(), members[ok].tolist())
+
+
+def find_duplicates(
+    fingerprints: Sequence[FunctionFingerprint],
+    *,
+    threshold: float = DEFAULT_THRESHOLD,
+) -> list[DuplicateCluster]:
+    """
+    Exact clusters (same digest) and near-duplicate clusters (LSH candidates whose estimated
+    similarity reaches `threshold`), largest duplicated volume first.
+
+    No all-pairs comparison: exact duplicates collapse to one representative, representatives are
+    bucketed per LSH band, and each bucket member is only compared with the bucket's first member.
+    """
+    by_digest: dict[str, list[int]] = {}
+    for i, fp in enumerate(fingerprints):
+        by_digest.setdefault(fp.digest, []).append(i)
+    reps = [members[0] for members in by_digest.values()]
+
+    sigs = [fingerprints[i].signature for i in reps]
+    parent = list(range(len(reps)))
+    if np is not None:
+        for a, b in _similar_pairs_numpy(sigs, threshold):
+            ra, rb = _find(parent, a), _find(parent, b)
+            if ra != rb:
+                parent[rb] = ra
+    else:
+        for leader, r in _candidate_pairs(sigs):
+            a, b = _find(parent, leader), _find(parent, r)
+            if a != b and similarity(sigs[leader], sigs[r]) >= threshold:
+                parent[b] = a
+
+    groups: dict[int, list[int]] = {}
+    for r, members in enumerate(by_digest.values()):
+        groups.setdefault(_find(parent, r), []).extend(members)
+
+    clusters: list[DuplicateCluster] = []
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        ordered = sorted((fingerprints[i] for i in members), key=lambda fp: (fp.file, fp.lineno, fp.qualname))
+        first = ordered[0]
+        exact = all(fp.digest == first.digest for fp in ordered)
+        sim = 1.0 if exact else min(similarity(first.signature, fp.signature) for fp in ordered)
+        clusters.append(DuplicateCluster(kind="exact" if exact else "near", similarity=sim, members=ordered))
+
+    # Most duplicated code first: tokens beyond the first copy
+    clusters.sort(key=lambda c: (-sum(fp.tokens for fp in c.members[1:]), c.members[0].file, c.members[0].lineno))
+    return clusters
+
+
+def duplicates_payload(fingerprints: Sequence[FunctionFingerprint], errors: list[Any]) -> dict[str, Any]:
+    """
+    The `duplicates.json` artifact.
+    """
+    clusters = find_duplicates(fingerprints)
+    return {
+        "version": DUPLICATES_VERSION,
+        "params": {
+            "min_tokens": MIN_TOKENS,
+            "shingle": SHINGLE,
+            "signature_bins": SIGNATURE_BINS,
+            "bands": BANDS,
+            "threshold": DEFAULT_THRESHOLD,
+        },
+        "stats": {
+            "functions": len(fingerprints),
+            "clusters": len(clusters),
+            "exact_clusters": sum(c.kind == "exact" for c in clusters),
+            "near_clusters": sum(c.kind == "near" for c in clusters),
+            "duplicated_functions": sum(len(c.members) for c in clusters),
+            "duplicated_tokens": sum(fp.tokens for c in clusters for fp in c.members[1:]),
+        },
+        "clusters": [
+            {
+                "id": n,
+                "kind": c.kind,
+                "similarity": round(c.similarity, 3),
+                "size": len(c.members),
+                "members": [
+                    {"qualname": fp.qualname, "file": fp.file, "lineno": fp.lineno, "tokens": fp.tokens, "digest": fp.digest}
+                    for fp in c.members
+                ],
+            }
+            for n, c in enumerate(clusters, start=1)
+        ],
+        "errors": errors,
+    }
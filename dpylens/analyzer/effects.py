@@ -0,0 +1,323 @@
+from __future__ import annotations
+
+import ast
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+from dpylens.analyzer.aliases import AliasMaps
+from dpylens.analyzer.callgraph import _callee_name, definition_qualnames
+
+# Canonical (alias-expanded) call names -> side-effect category.
+# Exact names first, then prefixes ending in ".".
+_EFFECT_CALLS: dict[str, str] = {
+    "os.remove": "file_delete",
+    "os.unlink": "file_delete",
+    "os.rmdir": "file_delete",
+    "os.removedirs": "file_delete",
+    "shutil.rmtree": "file_delete",
+    "os.mkdir": "file_write",
+    "os.makedirs": "file_write",
+    "os.rename": "file_write",
+    "os.replace": "file_write",
+    "os.symlink": "file_write",
+    "os.link": "file_write",
+    "os.chmod": "file_write",
+    "os.truncate": "file_write",
+    "shutil.copy": "file_write",
+    "shutil.copy2": "file_write",
+    "shutil.copyfile": "file_write",
+    "shutil.copytree": "file_write",
+    "shutil.move": "file_write",
+    "os.system": "subprocess",
+    "os.popen": "subprocess",
+    "os.putenv": "env_write",
+    "os.unsetenv": "env_write",
+    "os.environ.update": "env_write",
+    "os.environ.setdefault": "env_write",
+    "os.environ.pop": "env_write",
+    "os.environ.clear": "env_write",
+    "urllib.request.urlopen": "network",
+    "socket.create_connection": "network",
+}
+_EFFECT_PREFIXES: tuple[tuple[str, str], ...] = (
+    ("subprocess.", "subprocess"),
+    ("os.exec", "subprocess"),
+    ("os.spawn", "subprocess"),
+    ("asyncio.create_subprocess_", "subprocess"),
+    ("requests.", "network"),
+    ("httpx.", "network"),
+    ("aiohttp.", "network"),
+)
+# Method names that write/delete files whatever the receiver (pathlib.Path and friends)
+_EFFECT_METHODS: dict[str, str] = {
+    "write_text": "file_write",
+    "write_bytes": "file_write",
+    "mkdir": "file_write",
+    "touch": "file_write",
+    "symlink_to": "file_write",
+    "unlink": "file_delete",
+    "rmdir": "file_delete",
+}
+_ENV_GETTERS = {"os.getenv", "os.environ.get"}
+_WRITE_MODE_CHARS = set("wax+")
+
+
+@dataclass(frozen=True, slots=True)
+class CallSite:
+    """
+    One call inside a function body, for interprocedural propagation.
+
+    Dependency atoms: "p:<param>" (a parameter of the enclosing function) or "c:<index>"
+    (the result of another call site of the same function).
+    args/kwargs: atoms flowing into each positional/keyword argument
+    receiver: atoms of the receiver for method calls (x in x.strip())
+    """
+    callee: str
+    args: list[list[str]]
+    kwargs: dict[str, list[str]]
+    receiver: list[str]
+
+
+@dataclass(frozen=True, slots=True)
+class FunctionEffects:
+    """
+    Local (intraprocedural) facts for one function; summaries.py propagates them over the call graph.
+
+    env_reads:    environment variable names read directly ("*" when the name is dynamic)
+    side_effects: categories of side-effecting calls made directly
+                  (file_write, file_delete, subprocess, network, env_write)
+    returns:      atoms (see CallSite) that reach a return/yield
+    """
+    function: str
+    file: str
+    lineno: int
+    params: list[str]
+    env_reads: list[str]
+    side_effects: list[str]
+    calls: list[CallSite]
+    returns: list[str]
+
+
+def _param_names(args: ast.arguments) -> list[str]:
+    names = [a.arg for a in list(args.posonlyargs) + list(args.args)]
+    if args.vararg:
+        names.append(args.vararg.arg)
+    names.extend(a.arg for a in args.kwonlyargs)
+    if args.kwarg:
+        names.append(args.kwarg.arg)
+    return names
+
+
+def _const_str(node: ast.AST | None) -> str | None:
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    return None
+
+
+class _FunctionScan:
+    """
+    Flow-insensitive scan of one function body (nested defs/classes excluded; they are scanned
+    on their own). Variables map to the atoms they may hold; two passes let loop-carried
+    assignments settle.
+    """
+
+    def __init__(self, node: ast.FunctionDef | ast.AsyncFunctionDef, aliases: AliasMaps | None):
+        self.node = node
+        self.aliases = aliases
+        self.params = _param_names(node.args)
+        self.vars: dict[str, set[str]] = {p: {f"p:{p}"} for p in self.params}
+        self.env_reads: set[str] = set()
+        self.side_effects: set[str] = set()
+        self.calls: list[CallSite] = []
+        self._call_index: dict[int, int] = {}
+        self.returns: set[str] = set()
+
+    # --- names ---
+
+    def _canonical(self, raw: str) -> str:
+        if self.aliases is None or raw.startswith("<"):
+            return raw
+        head, _, rest = raw.partition(".")
+        mod = self.aliases.module_aliases.get(head)
+        if mod:
+            return f"{mod}.{rest}" if rest else mod
+        mod = self.aliases.symbol_aliases.get(head)
+        if mod:
+            return f"{mod}.{raw}"
+        return raw
+
+    # --- expressions ---
+
+    def deps(self, node: ast.AST | None) -> set[str]:
+        if node is None:
+            return set()
+        if isinstance(node, ast.Name):
+            return set(self.vars.get(node.id, ()))
+        if isinstance(node, ast.Call):
+            return {f"c:{self._call(node)}"}
+        if isinstance(node, ast.Subscript):
+            self._env_subscript(node)
+        if isinstance(node, (ast.Lambda, ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            return set()
+        out: set[str] = set()
+        for child in ast.iter_child_nodes(node):
+            out |= self.deps(child)
+        return out
+
+    def _env_subscript(self, node: ast.Subscript) -> None:
+        target = node.value
+        if isinstance(target, (ast.Attribute, ast.Name)) and self._canonical(_callee_name_of(target)) == "os.environ":
+            self.env_reads.add(_const_str(node.slice) or "*")
+
+    def _call(self, node: ast.Call) -> int:
+        raw = _callee_name(node)
+        self._classify(node, self._canonical(raw))
+
+        receiver: set[str] = set()
+        if isinstance(node.func, ast.Attribute):
+            receiver = self.deps(node.func.value)
+        args = [sorted(self.deps(a.value if isinstance(a, ast.Starred) else a)) for a in node.args]
+        kwargs = {kw.arg or "**": sorted(self.deps(kw.value)) for kw in node.keywords}
+        site = CallSite(callee=sys.intern(raw), args=args, kwargs=kwargs, receiver=sorted(receiver))
+
+        # Each call site keeps one index across passes; later passes only refine its atoms
+        idx = self._call_index.get(id(node))
+        if idx is None:
+            idx = len(self.calls)
+            self._call_index[id(node)] = idx
+            self.calls.append(site)
+        else:
+            self.calls[idx] = site
+        return idx
+
+    def _classify(self, node: ast.Call, name: str) -> None:
+        if name in _ENV_GETTERS:
+            self.env_reads.add(_const_str(node.args[0] if node.args else None) or "*")
+            return
+
+        effect = _EFFECT_CALLS.get(name)
+        if effect is None:
+            for prefix, category in _EFFECT_PREFIXES:
+                if name.startswith(prefix):
+                    effect = category
+                    break
+        if effect is None and name in {"open", "io.open"}:
+            mode = node.args[1] if len(node.args) > 1 else next((k.value for k in node.keywords if k.arg == "mode"), None)
+            mode_str = _const_str(mode)
+            if mode is not None and (mode_str is None or _WRITE_MODE_CHARS & set(mode_str)):
+                effect = "file_write"
+        if effect is None and isinstance(node.func, ast.Attribute) and not name.startswith("os."):
+            effect = _EFFECT_METHODS.get(node.func.attr)
+        if effect is not None:
+            self.side_effects.add(effect)
+
+    # --- statements ---
+
+    def _bind(self, target: ast.AST, atoms: set[str]) -> None:
+        if isinstance(target, ast.Name):
+            self.vars.setdefault(target.id, set()).update(atoms)
+        elif isinstance(target, (ast.Tuple, ast.List)):
+            for elt in target.elts:
+                self._bind(elt, atoms)
+        elif isinstance(target, ast.Starred):
+            self._bind(target.value, atoms)
+        elif isinstance(target, ast.Subscript):
+            if self._canonical(_callee_name_of(target.value)) == "os.environ":
+                self.side_effects.add("env_write")
+                self.deps(target.slice)
+            else:
+                self.deps(target)
+        else:
+            self.deps(target)
+
+    def _stmt(self, node: ast.AST) -> None:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)):
+            return
+
+        handled = True
+        if isinstance(node, ast.Assign):
+            atoms = self.deps(node.value)
+            for t in node.targets:
+                self._bind(t, atoms)
+        elif isinstance(node, (ast.AnnAssign, ast.AugAssign)):
+            atoms = self.deps(node.value)
+            if isinstance(node, ast.AugAssign):
+                atoms |= self.deps(node.target)
+            self._bind(node.target, atoms)
+        elif isinstance(node, (ast.For, ast.AsyncFor)):
+            self._bind(node.target, self.deps(node.iter))
+        elif isinstance(node, (ast.With, ast.AsyncWith)):
+            for item in node.items:
+                atoms = self.deps(item.context_expr)
+                if item.optional_vars is not None:
+                    self._bind(item.optional_vars, atoms)
+        elif isinstance(node, ast.Return):
+            self.returns |= self.deps(node.value)
+        elif isinstance(node, (ast.Yield, ast.YieldFrom)):
+            self.returns |= self.deps(node.value)
+        elif isinstance(node, ast.NamedExpr):
+            self._bind(node.target, self.deps(node.value))
+        elif isinstance(node, (ast.Call, ast.Subscript)):
+            self.deps(node)
+        else:
+            handled = False
+
+        for child in ast.iter_child_nodes(node):
+            # handled nodes already walked their expressions; only nested statements remain
+            if handled and not isinstance(child, ast.stmt):
+                continue
+            self._stmt(child)
+
+    def run(self) -> None:
+        for _ in range(2):
+            for stmt in self.node.body:
+                self._stmt(stmt)
+
+
+def _callee_name_of(node: ast.AST) -> str:
+    parts: list[str] = []
+    cur = node
+    while isinstance(cur, ast.Attribute):
+        parts.append(cur.attr)
+        cur = cur.value
+    if not isinstance(cur, ast.Name):
+        return "<expr>"
+    parts.append(cur.id)
+    return ".".join(reversed(parts))
+
+
+def extract_effects(
+    tree: ast.AST,
+    file_path: Path,
+    module_name: str,
+    aliases: AliasMaps | None = None,
+    qualnames: dict[ast.AST, str] | None = None,
+) -> list[FunctionEffects]:
+    """
+    Local effect facts for every function in the file. Qualnames match extract_callgraph.
+    """
+    names = qualnames if qualnames is not None else definition_qualnames(tree, module_name)
+    file = sys.intern(str(file_path))
+    records: list[FunctionEffects] = []
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        scan = _FunctionScan(node, aliases)
+        try:
+            scan.run()
+        except RecursionError:
+            continue
+        records.append(
+            FunctionEffects(
+                function=names[node],
+                file=file,
+                lineno=node.lineno,
+                params=scan.params,
+                env_reads=sorted(scan.env_reads),
+                side_effects=sorted(scan.side_effects),
+                calls=scan.calls,
+                returns=sorted(scan.returns),
+            )
+        )
+    return records
@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator
+
+_CHUNK = 1 << 16
+
+
+class GitError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class ChangedFile:
+    status: str  # "A" | "M" | "D" (renames are reported as D + A)
+    path: str  # repo-relative, forward slashes
+
+
+def _git(repo: Path, *args: str, ok_status: tuple[int, ...] = (0,)) -> str:
+    """
+    stdout of a git command; raises GitError unless it exits with one of `ok_status`.
+    """
+    try:
+        proc = subprocess.run(["git", "-C", str(repo), *args], capture_output=True)
+    except FileNotFoundError as e:
+        raise GitError("git executable not found on PATH") from e
+    if proc.returncode not in ok_status:
+        raise GitError(proc.stderr.decode("utf-8", "replace").strip() or f"git {' '.join(args)} failed")
+    return proc.stdout.decode("utf-8", "surrogateescape")
+
+
+def rev_parse(repo: Path, rev: str) -> str:
+    return _git(repo, "rev-parse", "--verify", f"{rev}^{{commit}}").strip()
+
+
+def changed_python_files(repo: Path, base: str, head: str) -> list[ChangedFile]:
+    """
+    Python files that differ between two revisions, without touching the working tree.
+    """
+    out = _git(repo, "diff", "--name-status", "--no-renames", "-z", base, head, "--", "*.py")
+    fields = [f for f in out.split("\0") if f]
+    changed: list[ChangedFile] = []
+    for status, path in zip(fields[0::2], fields[1::2]):
+        s = status[:1]
+        if s not in {"A", "M", "D"}:
+            # T (type change) and friends: treat as a modification
+            s = "M"
+        changed.append(ChangedFile(status=s, path=path))
+    return changed
+
+
+def grep_files(repo: Path, rev: str, pattern: str) -> list[str]:
+    """
+    Repo-relative Python files at `rev` whose content matches an extended regex (via `git grep`).
+    """
+    # `git grep` exits 1 when nothing matches; anything else (bad revision, bad regex) is an error
+    out = _git(repo, "grep", "-l", "-E", "-e", pattern, rev, "--", "*.py", ok_status=(0, 1))
+    prefix = f"{rev}:"
+    return [line[len(prefix):] if line.startswith(prefix) else line for line in out.splitlines() if line]
+
+
+class GitBlobReader:
+    """
+    Read many blobs through one long-lived `git cat-file --batch` process.
+
+    Usage:
+      with GitBlobReader(repo) as r:
+          data = r.read("HEAD", "pkg/mod.py")   # bytes, or None if missing
+    """
+
+    def __init__(self, repo: Path):
+        self.repo = repo
+        self._proc: subprocess.Popen[bytes] | None = None
+
+    def __enter__(self) -> GitBlobReader:
+        try:
+            self._proc = subprocess.Popen(
+                ["git", "-C", str(self.repo), "cat-file", "--batch"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except FileNotFoundError as e:
+            raise GitError("git executable not found on PATH") from e
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._proc is None:
+            return
+        assert self._proc.stdin is not None
+        self._proc.stdin.close()
+        self._proc.wait()
+        self._proc = None
+
+    def read_object(self, spec: str) -> bytes | None:
+        """
+        Read an object by spec (`<rev>:<path>` or a blob sha). Returns None if it does not exist.
+        """
+        if self._proc is None:
+            raise GitError("GitBlobReader is not open")
+        stdin, stdout = self._proc.stdin, self._proc.stdout
+        assert stdin is not None and stdout is not None
+
+        stdin.write(spec.encode("utf-8", "surrogateescape") + b"\n")
+        stdin.flush()
+
+        header = stdout.readline()
+        if not header:
+            raise GitError("git cat-file exited unexpectedly")
+        parts = header.split()
+        if len(parts) != 3:
+            # "<spec> missing" / "<spec> ambiguous"
+            return None
+
+        size = int(parts[2])
+        data = stdout.read(size)
+        stdout.read(1)  # trailing LF
+        if parts[1] != b"blob":
+            return None
+        return data
+
+    def read(self, rev: str, path: str) -> bytes | None:
+        return self.read_object(f"{rev}:{path}")
+
+
+@dataclass(frozen=True, slots=True)
+class TreeEntry:
+    path: str  # relative to the folder git ran in, forward slashes
+    sha: str  # blob id: identifies the content, so it doubles as a cache key
+
+
+# Regular files; symlinks (120000) and submodules (160000) have no Python source to read
+_FILE_MODES = {"100644", "100755"}
+
+
+def ls_tree(repo: Path, rev: str) -> list[TreeEntry]:
+    """
+    Files of `rev` under `repo` (a folder of a work tree, or a bare repository), from tree
+    objects only: no checkout, and no blob is read or fetched.
+    """
+    out = _git(repo, "ls-tree", "-r", "-z", rev)
+    entries: list[TreeEntry] = []
+    for record in out.split("\0"):
+        if not record:
+            continue
+        meta, path = record.split("\t", 1)
+        mode, kind, sha = meta.split(" ")
+        if kind == "blob" and mode in _FILE_MODES:
+            entries.append(TreeEntry(path=path, sha=sha))
+    return entries
+
+
+def clone_blobless(url: str, dest: Path, *, depth: int | None = 1) -> Path:
+    """
+    Bare clone with commits and trees but no blobs (`--filter=blob:none`); fetch the blobs that
+    are needed with `fetch_blobs`. Servers without partial-clone support send everything.
+    """
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    args = ["clone", "--bare", "--quiet", "--filter=blob:none"]
+    if depth is not None:
+        args += ["--depth", str(depth)]
+    _git(dest.parent, *args, url, str(dest))
+    return dest
+
+
+def partial_clone_remote(repo: Path) -> str | None:
+    """
+    The remote missing objects are fetched from, if `repo` is a partial clone.
+    """
+    try:
+        out = _git(repo, "config", "--get-regexp", r"^(extensions\.partialclone|remote\..*\.promisor)$")
+    except GitError:
+        return None  # none set
+    for line in out.splitlines():
+        key, _, value = line.partition(" ")
+        if key == "extensions.partialclone" and value:
+            return value
+        if key.endswith(".promisor") and value == "true":
+            return key[len("remote.") : -len(".promisor")]
+    return None
+
+
+def missing_blobs(repo: Path, rev: str) -> set[str]:
+    """
+    Blob ids in `rev`'s tree that are not in the local object store (without fetching them).
+    """
+    out = _git(repo, "rev-list", "--objects", "--no-walk", "--missing=print", rev)
+    return {line[1:] for line in out.splitlines() if line.startswith("?")}
+
+
+def fetch_blobs(repo: Path, shas: Iterable[str]) -> int:
+    """
+    Fetch blobs into a partial clone in one request, instead of one lazy fetch per object when
+    they are read. Returns the number requested (0 when `repo` is not a partial clone).
+    """
+    remote = partial_clone_remote(repo)
+    wanted = sorted(set(shas))
+    if remote is None or not wanted:
+        return 0
+    # What git runs itself to fill in a partial clone, for many objects at once
+    args = ["git", "-C", str(repo), "-c", "fetch.negotiationAlgorithm=noop", "fetch", remote]
+    args += ["--no-tags", "--no-write-fetch-head", "--recurse-submodules=no", "--filter=blob:none", "--stdin"]
+    try:
+        subprocess.run(args, input="\n".join(wanted).encode("ascii") + b"\n", check=True, capture_output=True)
+    except FileNotFoundError as e:
+        raise GitError("git executable not found on PATH") from e
+    except subprocess.CalledProcessError as e:
+        raise GitError(e.stderr.decode("utf-8", "replace").strip() or "git fetch of blobs failed") from e
+    return len(wanted)
+
+
+def is_ancestor(repo: Path, ancestor: str, rev: str) -> bool:
+    """
+    True if `ancestor` is reachable from `rev` (False also when `ancestor` no longer exists).
+    """
+    try:
+        proc = subprocess.run(["git", "-C", str(repo), "merge-base", "--is-ancestor", ancestor, rev], capture_output=True)
+    except FileNotFoundError as e:
+        raise GitError("git executable not found on PATH") from e
+    return proc.returncode == 0
+
+
+def toplevel(repo: Path) -> Path:
+    return Path(_git(repo, "rev-parse", "--show-toplevel").strip())
+
+
+@dataclass(frozen=True)
+class CommitChurn:
+    sha: str
+    timestamp: int  # committer time, Unix seconds
+    author: str  # author email
+    files: tuple[tuple[str, int, int], ...]  # (path, lines added, lines deleted); binary files count 0
+
+
+def iter_numstat(repo: Path, rev: str, exclude: tuple[str, ...] = (), pathspec: str = "*.py") -> Iterator[CommitChurn]:
+    """
+    Non-merge commits reachable from `rev` but not from any of `exclude`, newest first, with the
+    lines added and deleted per file (`git log --numstat`, renames as delete + add).
+
+    Streams git's output, so memory stays at one commit whatever the history length.
+    """
+    args = ["git", "-C", str(repo), "log", "--numstat", "--no-renames", "--no-merges", "-z", "--format=%x01%H %ct %aE", rev]
+    args += [f"^{sha}" for sha in exclude]
+    args += ["--", pathspec]
+    try:
+        proc = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except FileNotFoundError as e:
+        raise GitError("git executable not found on PATH") from e
+    assert proc.stdout is not None and proc.stderr is not None
+
+    header: list[str] | None = None
+    files: list[tuple[str, int, int]] = []
+    pending = b""
+    try:
+        # -z: header and numstat records are NUL-terminated; headers start with \x01
+        while chunk := proc.stdout.read(_CHUNK):
+            records = (pending + chunk).split(b"\0")
+            pending = records.pop()
+            for raw in records:
+                record = raw.lstrip(b"\n").decode("utf-8", "surrogateescape")
+                if record.startswith("\x01"):
+                    if header is not None:
+                        yield CommitChurn(header[0], int(header[1]), header[2], tuple(files))
+                    header = (record[1:].split(" ", 2) + [""])[:3]
+                    files = []
+                elif record:
+                    added, deleted, path = record.split("\t", 2)
+                    files.append((path, int(added) if added != "-" else 0, int(deleted) if deleted != "-" else 0))
+        if header is not None:
+            yield CommitChurn(header[0], int(header[1]), header[2], tuple(files))
+    finally:
+        proc.stdout.close()
+        err = proc.stderr.read()
+        proc.stderr.close()
+        code = proc.wait()
+    if code != 0:
+        raise GitError(err.decode("utf-8", "replace").strip() or f"git log {rev} failed")
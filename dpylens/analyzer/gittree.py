@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+import pickle
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from dpylens.analyzer.budget import DEFAULT_BUDGET, FileBudget, is_budget_note
+from dpylens.analyzer.gitsource import (
+    GitBlobReader,
+    GitError,
+    TreeEntry,
+    fetch_blobs,
+    ls_tree,
+    missing_blobs,
+    partial_clone_remote,
+    rev_parse,
+)
+from dpylens.analyzer.layout import DEFAULT_IGNORE_DIRS, ModuleIndex
+from dpylens.analyzer.models import FileError
+from dpylens.analyzer.patterns import CompiledRules
+from dpylens.analyzer.pipeline import DEFAULT_CHUNK_SIZE, FILE_ANALYSIS_VERSION, FileAnalysis, FileTask, finalize, run_file_pass
+from dpylens.analyzer.plugins import PluginConfig
+from dpylens.analyzer.reachability import parse_entry_point_config
+from dpylens.analyzer.result import AnalysisResult
+from dpylens.analyzer.summaries import SummaryMemo
+
+Outcome = tuple[FileAnalysis | None, FileError | None]
+
+
+@dataclass(frozen=True, slots=True)
+class GitIngestStats:
+    commit: str
+    files: int  # Python files analyzed
+    cached: int  # per-file results reused from the cache (their blobs were not read)
+    fetched: int  # blobs fetched into a partial clone
+
+
+class _RootPickler(pickle.Pickler):
+    """
+    Stores strings under `root` relative to it, so an entry can be loaded under another root.
+    """
+
+    def __init__(self, fh: io.BytesIO, root: str):
+        super().__init__(fh, protocol=pickle.HIGHEST_PROTOCOL)
+        self._root = root.rstrip(os.sep)
+        self._prefix = self._root + os.sep
+        self._pids: dict[str, str] = {}  # one pid object per path, so pickle memoizes repeats
+
+    def persistent_id(self, obj: Any) -> str | None:
+        if type(obj) is str and (obj.startswith(self._prefix) or (obj == self._root and obj)):
+            pid = self._pids.get(obj)
+            if pid is None:
+                pid = self._pids[obj] = obj[len(self._root) :]
+            return pid
+        return None
+
+
+class _RootUnpickler(pickle.Unpickler):
+    def __init__(self, fh: io.BytesIO, root: str):
+        super().__init__(fh)
+        self._root = root.rstrip(os.sep)
+        self._strings: dict[str, str] = {}  # one string per path, as a fresh analysis would share
+
+    def persistent_load(self, pid: Any) -> str:
+        s = self._strings.get(pid)
+        if s is None:
+            s = self._strings[pid] = self._root + pid
+        return s
+
+
+class FileCache:
+    """
+    Per-file analysis results on disk: <dir>/<key[:2]>/<key>.pickle
+
+    The key covers the file's blob id (its content), path and module, the budget, the per-file
+    format (FILE_ANALYSIS_VERSION) and the Python minor version (`ast` differs between them), so a
+    hit is known before the blob is read, or fetched into a partial clone. Paths
+    are stored relative to the analysis root: runs that name files under different roots (one
+    folder per API run) share entries. Entries are pickles; only use a cache folder you trust.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    @staticmethod
+    def key(sha: str, rel: str, module: str, budget: FileBudget) -> str:
+        h = hashlib.blake2b(digest_size=16)
+        python = ".".join(map(str, sys.version_info[:2]))
+        for part in (str(FILE_ANALYSIS_VERSION), python, sha, rel, module, repr(budget)):
+            h.update(part.encode("utf-8", "surrogateescape"))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.pickle"
+
+    def get(self, key: str, root: Path) -> Outcome | None:
+        try:
+            data = self._path(key).read_bytes()
+            return _RootUnpickler(io.BytesIO(data), str(root)).load()
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
+
+    def put(self, key: str, outcome: Outcome, root: Path) -> None:
+        buf = io.BytesIO()
+        _RootPickler(buf, str(root)).dump(outcome)
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename: several runs may store the same key
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(buf.getvalue())
+        os.replace(tmp, path)
+
+
+def plan_git_files(entries: list[TreeEntry], root: Path) -> list[tuple[Path, TreeEntry]]:
+    """
+    The Python files among `entries`, named under `root` and ordered as plan_files orders a
+    checkout (ignored folders left out).
+    """
+    files = [
+        (root / e.path, e)
+        for e in entries
+        if e.path.endswith(".py") and not any(part in DEFAULT_IGNORE_DIRS for part in e.path.split("/"))
+    ]
+    return sorted(files, key=lambda item: item[0])
+
+
+def analyze_git(
+    repo: Path | str,
+    rev: str = "HEAD",
+    *,
+    root: Path | str | None = None,
+    jobs: int = 1,
+    budget: FileBudget = DEFAULT_BUDGET,
+    summary_memo: SummaryMemo | None = None,
+    pattern_rules: CompiledRules | None = None,
+    plugins: PluginConfig | None = None,
+    entry_points: tuple[str, ...] = (),
+    cache_dir: Path | None = None,
+) -> tuple[AnalysisResult, GitIngestStats]:
+    """
+    Analyze the Python files of `rev` straight from git objects, without a checkout: the file
+    list comes from `git ls-tree`, contents from `git cat-file --batch`, and the package layout
+    and pyproject.toml are read from the tree too.
+
+    `repo` is a folder of a work tree (only files below it are analyzed, as `analyze` would) or
+    a bare repository. In a partial clone (see `clone_blobless`), the blobs needed are fetched
+    in one request. Files are named as if `rev` were checked out at `root` (default: `repo`).
+    `cache_dir` reuses per-file results by blob id (see FileCache); custom pattern rules and
+    plugins bypass it. The other options are those of `analyze`.
+    """
+    repo = Path(repo).resolve()
+    root = Path(root).resolve() if root is not None else repo
+    commit = rev_parse(repo, rev)
+    entries = ls_tree(repo, commit)
+    files = plan_git_files(entries, root)
+    module_index = ModuleIndex.for_paths(root, (e.path for e in entries))
+    if plugins is not None:
+        plugins.load()  # unknown or broken plugins fail here, not inside a worker
+
+    cache = FileCache(cache_dir) if cache_dir is not None and pattern_rules is None and plugins is None else None
+    outcomes: list[Outcome] = [(None, None)] * len(files)
+    keys: dict[int, str] = {}
+    misses: list[int] = []
+    modules = [module_index.module_for(path) for path, _entry in files]
+    for i, (_path, entry) in enumerate(files):
+        if cache is not None:
+            keys[i] = FileCache.key(entry.sha, entry.path, modules[i], budget)
+            hit = cache.get(keys[i], root)
+            if hit is not None:
+                outcomes[i] = hit
+                continue
+        misses.append(i)
+
+    pyproject = next((e for e in entries if e.path == "pyproject.toml"), None)
+    fetched = 0
+    if partial_clone_remote(repo) is not None:
+        wanted = {files[i][1].sha for i in misses} | ({pyproject.sha} if pyproject is not None else set())
+        fetched = fetch_blobs(repo, wanted & missing_blobs(repo, commit))
+
+    tasks: list[FileTask] = []
+    with GitBlobReader(repo) as reader:
+        for i in misses:
+            path, entry = files[i]
+            data = reader.read_object(entry.sha)
+            if data is None:
+                raise GitError(f"{entry.path}: blob {entry.sha} is not available")
+            tasks.append(FileTask(path=path, module=modules[i], source=data))
+        pyproject_data = reader.read_object(pyproject.sha) if pyproject is not None else None
+
+    if jobs > 1 and len(tasks) > DEFAULT_CHUNK_SIZE:
+        with ProcessPoolExecutor(max_workers=jobs) as ex:
+            fresh = run_file_pass(tasks, root, executor=ex, budget=budget, rules=pattern_rules, plugins=plugins)
+    else:
+        fresh = run_file_pass(tasks, root, budget=budget, rules=pattern_rules, plugins=plugins)
+    for i, outcome in zip(misses, fresh):
+        outcomes[i] = outcome
+        # Budget notes are not cached: the parse-time limit depends on the machine and its load
+        if cache is not None and not (outcome[1] is not None and is_budget_note(outcome[1].error)):
+            cache.put(keys[i], outcome, root)
+
+    entry_config = parse_entry_point_config(
+        pyproject_data.decode("utf-8") if pyproject_data is not None else None, root / "pyproject.toml", entry_points
+    )
+    result = finalize(
+        root,
+        [path for path, _entry in files],
+        outcomes,
+        summary_memo=summary_memo,
+        plugins=plugins,
+        entry_points=entry_points,
+        module_index=module_index,
+        entry_config=entry_config,
+    )
+    return result, GitIngestStats(commit=commit, files=len(files), cached=len(files) - len(misses), fetched=fetched)
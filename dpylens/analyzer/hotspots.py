@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import heapq
+from array import array
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import Any
+
+try:
+    import numpy as np
+except ImportError:  # optional: PageRank falls back to pure Python (same result, slower)
+    np = None  # type: ignore[assignment]
+
+from dpylens.analyzer.churn import ChurnUpdate, FileChurn
+from dpylens.analyzer.jsonstream import iter_fields
+
+HOTSPOTS_FILENAME = "hotspots.json"
+HOTSPOTS_VERSION = 1
+
+# Rows per ranking
+DEFAULT_TOP = 50
+
+DAMPING = 0.85
+_MAX_ITERATIONS = 100
+_TOLERANCE = 1e-10
+
+
+@dataclass(frozen=True, slots=True)
+class FunctionHotspot:
+    """
+    One function with the churn of its file, its size and its place in the call graph.
+
+    score:      commits * complexity * centrality
+    centrality: PageRank over resolved calls (caller -> callee), scaled so the mean is 1
+    fan_in:     distinct resolved callers
+    """
+    qualname: str
+    file: str
+    lineno: int
+    score: float
+    commits: int
+    churn: int  # lines added + deleted in the file
+    authors: int
+    complexity: int
+    statements: int
+    fan_in: int
+    centrality: float
+
+
+def pagerank(n: int, src: array, dst: array, damping: float = DAMPING) -> list[float]:
+    """
+    PageRank of `n` nodes over edges src[i] -> dst[i] (no duplicates), scaled to mean 1. Rank of
+    nodes without out-edges is spread over all nodes.
+    """
+    if n == 0:
+        return []
+    if np is not None:
+        return _pagerank_numpy(n, src, dst, damping)
+    out_degree = [0] * n
+    for s in src:
+        out_degree[s] += 1
+    dangling = [i for i in range(n) if not out_degree[i]]
+    edges = list(zip(src, dst))
+    rank = [1.0 / n] * n
+    for _ in range(_MAX_ITERATIONS):
+        share = [damping * r / d if d else 0.0 for r, d in zip(rank, out_degree)]
+        base = (1.0 - damping + damping * sum(rank[i] for i in dangling)) / n
+        new = [base] * n
+        for s, t in edges:
+            new[t] += share[s]
+        delta = sum(abs(a - b) for a, b in zip(new, rank))
+        rank = new
+        if delta < _TOLERANCE:
+            break
+    return [r * n for r in rank]
+
+
+def _pagerank_numpy(n: int, src: array, dst: array, damping: float) -> list[float]:
+    s = np.frombuffer(src, dtype=np.int64) if len(src) else np.zeros(0, dtype=np.int64)
+    t = np.frombuffer(dst, dtype=np.int64) if len(dst) else np.zeros(0, dtype=np.int64)
+    out_degree = np.bincount(s, minlength=n).astype(np.float64)
+    dangling = out_degree == 0
+    weight = np.divide(damping, out_degree, out=np.zeros(n), where=~dangling)
+    rank = np.full(n, 1.0 / n)
+    for _ in range(_MAX_ITERATIONS):
+        base = (1.0 - damping + damping * rank[dangling].sum()) / n
+        new = base + np.bincount(t, weights=(rank * weight)[s], minlength=n)
+        delta = np.abs(new - rank).sum()
+        rank = new
+        if delta < _TOLERANCE:
+            break
+    return (rank * n).tolist()
+
+
+def _churn_key(file: str, root: Path, prefix: PurePosixPath) -> str | None:
+    try:
+        return (prefix / Path(file).relative_to(root).as_posix()).as_posix()
+    except ValueError:
+        return None
+
+
+def compute_hotspots(
+    analysis_dir: Path,
+    churn: dict[str, FileChurn],
+    *,
+    root: Path,
+    prefix: PurePosixPath = PurePosixPath("."),
+    top: int = DEFAULT_TOP,
+) -> dict[str, Any]:
+    """
+    Join file churn with per-function size (`metrics.json`) and call-graph centrality
+    (`callgraph_resolved.json`) into three rankings: `riskiest` functions (score), `most_changed`
+    files (commits) and `most_depended_on` functions (centrality).
+
+    `churn` is keyed by path relative to the git top level; `root` is the folder the analysis was
+    made from and `prefix` its path below the top level, which together map the artifacts'
+    absolute paths to churn keys.
+    """
+    ids: dict[str, int] = {}
+    rows: list[tuple[str, str, int, int, int]] = []  # qualname, file, lineno, complexity, statements
+    metrics = analysis_dir / "metrics.json"
+    for key, item in iter_fields(metrics):
+        if key == "functions":
+            ids.setdefault(item["qualname"], len(ids))
+            rows.append((item["qualname"], item["file"], item["lineno"], item["complexity"], item["statements"]))
+
+    edges: set[tuple[int, int]] = set()
+    for key, call in iter_fields(analysis_dir / "callgraph_resolved.json"):
+        if key == "calls" and call.get("callee_resolved"):
+            s, t = ids.get(call["caller"]), ids.get(call["callee_resolved"])
+            if s is not None and t is not None and s != t:
+                edges.add((s, t))
+    src, dst = array("q"), array("q")
+    fan_in = [0] * len(ids)
+    for s, t in edges:
+        src.append(s)
+        dst.append(t)
+        fan_in[t] += 1
+    del edges
+    centrality = pagerank(len(ids), src, dst)
+
+    keys: dict[str, str | None] = {}
+    files: dict[str, list[int]] = {}  # churn key -> [functions, complexity]
+    hotspots: list[FunctionHotspot] = []
+    for qualname, file, lineno, complexity, statements in rows:
+        if file not in keys:
+            keys[file] = _churn_key(file, root, prefix)
+        fc = churn.get(keys[file] or "")
+        if keys[file] is not None and fc is not None:
+            totals = files.setdefault(keys[file], [0, 0])
+            totals[0] += 1
+            totals[1] += complexity
+        i = ids[qualname]
+        commits = fc.commits if fc else 0
+        hotspots.append(
+            FunctionHotspot(
+                qualname=qualname,
+                file=file,
+                lineno=lineno,
+                score=round(commits * complexity * centrality[i], 2),
+                commits=commits,
+                churn=fc.added + fc.deleted if fc else 0,
+                authors=fc.authors if fc else 0,
+                complexity=complexity,
+                statements=statements,
+                fan_in=fan_in[i],
+                centrality=round(centrality[i], 4),
+            )
+        )
+
+    def row(h: FunctionHotspot) -> dict[str, Any]:
+        return {name: getattr(h, name) for name in FunctionHotspot.__slots__}
+
+    riskiest = heapq.nsmallest(top, (h for h in hotspots if h.score > 0), key=lambda h: (-h.score, h.qualname))
+    depended = heapq.nsmallest(top, hotspots, key=lambda h: (-h.centrality, h.qualname))
+    changed = heapq.nsmallest(top, files.items(), key=lambda kv: (-churn[kv[0]].commits, kv[0]))
+    return {
+        "riskiest": [row(h) for h in riskiest],
+        "most_changed": [
+            {
+                "path": path,
+                "commits": churn[path].commits,
+                "added": churn[path].added,
+                "deleted": churn[path].deleted,
+                "authors": churn[path].authors,
+                "last_change": churn[path].last_change,
+                "functions": n,
+                "complexity": complexity,
+            }
+            for path, (n, complexity) in changed
+        ],
+        "most_depended_on": [row(h) for h in depended],
+    }
+
+
+def hotspots_payload(update: ChurnUpdate, rankings: dict[str, Any], since: int | None) -> dict[str, Any]:
+    """
+    The `hotspots.json` artifact.
+    """
+    return {
+        "version": HOTSPOTS_VERSION,
+        "head": update.head,
+        "commits": update.total_commits,
+        "since": since,
+        "score": "commits * complexity * centrality",
+        **rankings,
+    }
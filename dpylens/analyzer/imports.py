@@ -1,11 +1,12 @@
 from __future__ import annotations
 
 import ast
+import sys
 from dataclasses import dataclass
 from pathlib import Path
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ImportItem:
     """
     A structured representation of an import statement.
@@ -51,7 +52,7 @@ def extract_imports(tree: ast.AST, file_path: Path) -> ImportRecord:
                 items.append(
                     ImportItem(
                         kind="import",
-                        module=alias.name,
+                        module=sys.intern(alias.name),
                         level=0,
                         names=[],
                         raw=f"import {alias.name}",
@@ -72,7 +73,7 @@ def extract_imports(tree: ast.AST, file_path: Path) -> ImportRecord:
             items.append(
                 ImportItem(
                     kind="from",
-                    module=mod,
+                    module=sys.intern(mod) if mod else mod,
                     level=level,
                     names=names,
                     raw=raw,
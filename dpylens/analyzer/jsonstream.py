@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Iterator
+
+_WS = " \t\n\r"
+_CHUNK = 1 << 16
+
+
+class _Buffered:
+    """
+    A text file read in chunks, with just enough look-ahead to decode one JSON value at a time.
+    """
+
+    def __init__(self, fh, chunk: int):
+        self.fh = fh
+        self.chunk = chunk
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        data = self.fh.read(self.chunk)
+        if not data:
+            self.eof = True
+            return False
+        # Drop what was consumed so memory stays at about one chunk plus the current value
+        self.buf = self.buf[self.pos :] + data
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WS:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise ValueError("unexpected end of JSON")
+
+    def expect(self, ch: str) -> None:
+        if self.peek() != ch:
+            raise ValueError(f"expected {ch!r} at offset {self.pos}, got {self.buf[self.pos]!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_fields(path: Path, *, chunk: int = _CHUNK) -> Iterator[tuple[str, Any]]:
+    """
+    Stream a JSON object artifact: yields (key, item) for every item of a top-level array
+    and (key, value) for other top-level values, holding one item in memory at a time.
+    """
+    with path.open("r", encoding="utf-8") as fh:
+        r = _Buffered(fh, chunk)
+        r.expect("{")
+        if r.peek() == "}":
+            return
+        while True:
+            key = r.value()
+            r.expect(":")
+            if r.peek() == "[":
+                r.pos += 1
+                if r.peek() != "]":
+                    while True:
+                        yield key, r.value()
+                        if r.peek() != ",":
+                            break
+                        r.pos += 1
+                r.expect("]")
+            else:
+                yield key, r.value()
+            if r.peek() != ",":
+                break
+            r.pos += 1
+        r.expect("}")
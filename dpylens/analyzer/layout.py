@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import os
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Iterable
 
 
 DEFAULT_IGNORE_DIRS = {
@@ -88,21 +90,116 @@ def detect_package_layout(repo_root: Path) -> PackageLayout:
     return PackageLayout(repo_root=repo_root, package_roots=uniq)
 
 
-def module_name_for_file_with_layout(layout: PackageLayout, file_path: Path) -> str:
-    file_path = file_path.resolve()
-
-    chosen_root: Path | None = None
-    for r in layout.package_roots:
-        try:
-            file_path.relative_to(r)
-            chosen_root = r
-            break
-        except ValueError:
+def detect_package_layout_from_paths(repo_root: Path, rel_paths: Iterable[str]) -> PackageLayout:
+    """
+    detect_package_layout for a file listing instead of a folder on disk (e.g. a git tree):
+    `rel_paths` are `repo_root`-relative, with forward slashes.
+    """
+    repo_root = repo_root.resolve()
+    top_src = False
+    package_srcs: set[str] = set()
+    for rel in rel_paths:
+        if not rel.endswith(".py"):
             continue
+        parts = rel.split("/")
+        # A src folder counts when one of its subfolders holds a .py file directly
+        if len(parts) == 3 and parts[0] == "src" and parts[1] not in DEFAULT_IGNORE_DIRS:
+            top_src = True
+        elif (
+            len(parts) == 5
+            and parts[0] == "packages"
+            and parts[2] == "src"
+            and parts[1] not in DEFAULT_IGNORE_DIRS
+            and parts[3] not in DEFAULT_IGNORE_DIRS
+        ):
+            package_srcs.add(parts[1])
+
+    roots: list[Path] = []
+    if top_src:
+        roots.append(repo_root / "src")
+    roots.extend(repo_root / "packages" / pkg / "src" for pkg in sorted(package_srcs))
+    roots.append(repo_root)
+    return PackageLayout(repo_root=repo_root, package_roots=roots)
 
-    if chosen_root is None:
-        chosen_root = layout.repo_root
 
-    rel = file_path.relative_to(chosen_root)
-    rel_no_suffix = rel.with_suffix("")
-    return ".".join(rel_no_suffix.parts)
\ No newline at end of file
+def module_name_for_file_with_layout(layout: PackageLayout, file_path: Path) -> str:
+    """
+    One-off lookup. When naming many files, build a ModuleIndex once and reuse it.
+    """
+    return ModuleIndex(layout).module_for(file_path)
+
+
+class ModuleIndex:
+    """
+    Path -> module name lookup, built once from a PackageLayout.
+
+    Package roots are stored in a directory trie keyed by path parts below the repo root.
+    A lookup walks the file's parent directories (no filesystem calls) and names the module
+    relative to the deepest package root on the way, falling back to the repo root:
+
+      /repo/src/mypkg/util.py                -> mypkg.util
+      /repo/packages/pkgA/src/pkgA/util.py   -> pkgA.util
+      /repo/scripts/deploy.py                -> scripts.deploy
+    """
+
+    _ROOT = "\0root"
+
+    def __init__(self, layout: PackageLayout):
+        self.layout = layout
+        self._root_parts = layout.repo_root.parts
+        self._trie: dict[str, dict] = {}
+        for r in layout.package_roots:
+            try:
+                rel = r.relative_to(layout.repo_root).parts
+            except ValueError:
+                continue
+            node = self._trie
+            for part in rel:
+                node = node.setdefault(part, {})
+            node[self._ROOT] = {}
+        # parent-dir parts -> module prefix parts; most files share a handful of directories
+        self._dir_cache: dict[tuple[str, ...], tuple[str, ...]] = {}
+
+    @classmethod
+    def for_root(cls, repo_root: Path) -> ModuleIndex:
+        return cls(detect_package_layout(repo_root))
+
+    @classmethod
+    def for_paths(cls, repo_root: Path, rel_paths: Iterable[str]) -> ModuleIndex:
+        return cls(detect_package_layout_from_paths(repo_root, rel_paths))
+
+    def _prefix(self, dir_parts: tuple[str, ...]) -> tuple[str, ...]:
+        cached = self._dir_cache.get(dir_parts)
+        if cached is not None:
+            return cached
+
+        node = self._trie
+        start = 0
+        for i, part in enumerate(dir_parts):
+            node = node.get(part)
+            if node is None:
+                break
+            if self._ROOT in node:
+                start = i + 1
+        prefix = dir_parts[start:]
+        self._dir_cache[dir_parts] = prefix
+        return prefix
+
+    def module_for(self, file_path: Path) -> str:
+        parts = file_path.parts
+        n = len(self._root_parts)
+        if parts[:n] != self._root_parts:
+            # Only pay for resolve() when the path is not already spelled under the repo root
+            parts = file_path.resolve().parts
+            if parts[:n] != self._root_parts:
+                raise ValueError(f"{file_path} is not under {self.layout.repo_root}")
+
+        rel = parts[n:]
+        stem = os.path.splitext(rel[-1])[0]
+        return ".".join(self._prefix(rel[:-1]) + (stem,))
+
+    def module_map(self, files: list[Path]) -> dict[str, Path]:
+        """
+        module -> file for every file (the local module index).
+        """
+        return {self.module_for(f): f for f in files}
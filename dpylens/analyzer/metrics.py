@@ -0,0 +1,367 @@
+from __future__ import annotations
+
+import ast
+import bisect
+import heapq
+import sys
+from array import array
+from dataclasses import dataclass
+from operator import attrgetter
+from pathlib import Path
+from typing import Any, Sequence
+
+from dpylens.analyzer.callgraph import definition_qualnames
+
+try:
+    import numpy as np
+except ImportError:  # optional: aggregation falls back to pure Python (same output, slower)
+    np = None  # type: ignore[assignment]
+
+METRICS_VERSION = 1
+
+METRIC_NAMES = ("complexity", "statements", "nesting", "params", "calls")
+
+PERCENTILES = (50, 90, 95, 99)
+
+# Histogram bins [edges[i], edges[i+1]); the last bin is open-ended
+HISTOGRAM_EDGES = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+# Functions listed per metric in the outlier tables
+MAX_OUTLIERS = 50
+
+_BLOCKS = (
+    ast.If,
+    ast.For,
+    ast.AsyncFor,
+    ast.While,
+    ast.With,
+    ast.AsyncWith,
+    ast.Try,
+    ast.Match,
+) + ((ast.TryStar,) if hasattr(ast, "TryStar") else ())
+_BRANCHES = (ast.If, ast.IfExp, ast.For, ast.AsyncFor, ast.While, ast.ExceptHandler, ast.match_case)
+_SCOPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+@dataclass(frozen=True, slots=True)
+class FunctionMetrics:
+    """
+    Size and shape of one function body (nested defs and classes are measured on their own).
+
+    complexity: cyclomatic complexity (1 + branches, boolean operators, comprehension clauses)
+    statements: statements in the body, at any depth
+    nesting:    deepest block nesting (if/for/while/with/try/match) below the function body
+    params:     parameters, including *args/**kwargs
+    calls:      call sites in the body (lambdas included)
+    """
+    qualname: str
+    module: str
+    file: str
+    lineno: int
+    complexity: int
+    statements: int
+    nesting: int
+    params: int
+    calls: int
+
+
+def _param_count(args: ast.arguments) -> int:
+    return (
+        len(args.posonlyargs)
+        + len(args.args)
+        + len(args.kwonlyargs)
+        + (args.vararg is not None)
+        + (args.kwarg is not None)
+    )
+
+
+def _measure(fn: ast.FunctionDef | ast.AsyncFunctionDef) -> tuple[int, int, int, int]:
+    complexity = 1
+    statements = 0
+    nesting = 0
+    calls = 0
+    # Explicit stack of (node, block depth): deep bodies do not hit the recursion limit
+    stack: list[tuple[ast.AST, int]] = [(s, 0) for s in reversed(fn.body)]
+    while stack:
+        node, depth = stack.pop()
+        if isinstance(node, ast.stmt):
+            statements += 1
+            if isinstance(node, _SCOPES):
+                continue
+        if isinstance(node, _BRANCHES):
+            complexity += 1
+        elif isinstance(node, ast.BoolOp):
+            complexity += len(node.values) - 1
+        elif isinstance(node, ast.comprehension):
+            complexity += 1 + len(node.ifs)
+        elif isinstance(node, ast.Call):
+            calls += 1
+
+        child_depth = depth
+        if isinstance(node, _BLOCKS):
+            child_depth = depth + 1
+            nesting = max(nesting, child_depth)
+        for child in ast.iter_child_nodes(node):
+            stack.append((child, child_depth))
+    return complexity, statements, nesting, calls
+
+
+def extract_metrics(
+    tree: ast.AST,
+    file_path: Path,
+    module_name: str,
+    qualnames: dict[ast.AST, str] | None = None,
+) -> list[FunctionMetrics]:
+    """
+    Metrics for every function in the file. Qualnames match extract_callgraph.
+    """
+    names = qualnames if qualnames is not None else definition_qualnames(tree, module_name)
+    file = sys.intern(str(file_path))
+    module = sys.intern(module_name)
+    records: list[FunctionMetrics] = []
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        complexity, statements, nesting, calls = _measure(node)
+        records.append(
+            FunctionMetrics(
+                qualname=names[node],
+                module=module,
+                file=file,
+                lineno=node.lineno,
+                complexity=complexity,
+                statements=statements,
+                nesting=nesting,
+                params=_param_count(node.args),
+                calls=calls,
+            )
+        )
+    records.sort(key=lambda r: r.lineno)
+    return records
+
+
+def package_of(module: str, file: str) -> str:
+    """
+    The package a module belongs to: itself for `__init__.py` (also when named `pkg.__init__`,
+    as in module_graph.json), else its parent.
+    """
+    if Path(file).name == "__init__.py":
+        return module.removesuffix(".__init__")
+    return module.rpartition(".")[0] or module
+
+
+class MetricTable:
+    """
+    Function metrics stored column-wise: one integer array per metric, plus per-row
+    module and package ids. With NumPy the columns are ndarrays and every aggregate is
+    computed with vector operations; without it they are `array('q')` and aggregated in
+    pure Python with identical results.
+    """
+
+    def __init__(self, records: Sequence[FunctionMetrics]):
+        self.records = records
+        n = len(records)
+        modules = list(map(attrgetter("module"), records))
+
+        # Records come file by file, so modules (and packages) are resolved once per run of rows
+        if np is not None and n:
+            mods = np.array(modules, dtype=object)
+            starts = np.flatnonzero(np.concatenate(([True], mods[1:] != mods[:-1]))).tolist()
+        else:
+            starts = [i for i in range(n) if i == 0 or modules[i] != modules[i - 1]]
+        lengths = [b - a for a, b in zip(starts, starts[1:] + [n])]
+
+        module_ids: dict[str, int] = {}
+        package_ids: dict[str, int] = {}
+        module_package: list[int] = []
+        run_modules: list[int] = []
+        for start in starts:
+            module = modules[start]
+            mid = module_ids.get(module)
+            if mid is None:
+                mid = module_ids[module] = len(module_ids)
+                module_package.append(package_ids.setdefault(package_of(module, records[start].file), len(package_ids)))
+            run_modules.append(mid)
+        self.modules = list(module_ids)
+        self.packages = list(package_ids)
+
+        if np is not None:
+            self.columns = {name: np.fromiter(map(attrgetter(name), records), dtype=np.int64, count=n) for name in METRIC_NAMES}
+            self.module_ids = np.repeat(np.array(run_modules, dtype=np.int64), lengths)
+            self.package_ids = np.array(module_package, dtype=np.int64)[self.module_ids]
+        else:
+            self.columns = {name: array("q", map(attrgetter(name), records)) for name in METRIC_NAMES}
+            self.module_ids = array("q", (g for g, k in zip(run_modules, lengths) for _ in range(k)))
+            self.package_ids = array("q", (module_package[g] for g in self.module_ids))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def aggregates(self, max_outliers: int = MAX_OUTLIERS) -> dict[str, Any]:
+        """
+        Repo-level stats, histograms and outliers, and the same stats per package and per module.
+
+        Package and module stats are column-wise too: {"name": [...], "count": [...],
+        "<metric>": {"p50": [...], ..., "max": [...], "mean": [...]}}, in order of first appearance.
+        """
+        backend = _NumpyAggregator if np is not None else _PythonAggregator
+        repo: dict[str, Any] = {}
+        outliers: dict[str, Any] = {}
+        for name in METRIC_NAMES:
+            values = self.columns[name]
+            ordered = backend.sort(values)
+            repo[name] = _stats_from_sorted(ordered, int(sum(values) if np is None else values.sum()))
+            threshold = _fence(ordered)
+            count, rows = backend.above(values, threshold, max_outliers)
+            outliers[name] = {
+                "threshold": threshold,
+                "count": count,
+                "top": [
+                    {
+                        "qualname": self.records[i].qualname,
+                        "file": self.records[i].file,
+                        "lineno": self.records[i].lineno,
+                        "value": int(values[i]),
+                    }
+                    for i in rows
+                ],
+            }
+        return {
+            "count": len(self),
+            "repo": repo,
+            "histograms": {
+                "edges": list(HISTOGRAM_EDGES),
+                **{name: backend.histogram(self.columns[name]) for name in METRIC_NAMES},
+            },
+            "outliers": outliers,
+            "packages": {"name": self.packages, **backend.grouped(self.package_ids, len(self.packages), self.columns)},
+            "modules": {"name": self.modules, **backend.grouped(self.module_ids, len(self.modules), self.columns)},
+        }
+
+
+def _rank(n: int, q: int) -> int:
+    # Lower nearest rank: values are integers, so percentiles stay integers
+    return (q * (n - 1)) // 100
+
+
+def _round2(x: float) -> float:
+    # Same arithmetic as numpy.round(x, 2), so both backends agree to the digit
+    return round(x * 100) / 100
+
+
+def _stats_from_sorted(values: Sequence[int], total: int) -> dict[str, Any]:
+    n = len(values)
+    if n == 0:
+        return {**{f"p{q}": 0 for q in PERCENTILES}, "max": 0, "mean": 0.0}
+    out: dict[str, Any] = {f"p{q}": int(values[_rank(n, q)]) for q in PERCENTILES}
+    out["max"] = int(values[-1])
+    out["mean"] = _round2(total / n)
+    return out
+
+
+def _fence(sorted_values: Sequence[int]) -> int:
+    """
+    Outlier threshold: the Tukey far-out fence Q3 + 3*IQR, but at least p99 (most functions
+    have complexity 1, so the IQR alone would flag every branch).
+    """
+    n = len(sorted_values)
+    if n == 0:
+        return 0
+    q1 = int(sorted_values[_rank(n, 25)])
+    q3 = int(sorted_values[_rank(n, 75)])
+    return max(q3 + 3 * (q3 - q1), int(sorted_values[_rank(n, 99)]))
+
+
+# Backends: `above` returns how many values exceed the threshold and the row indexes of the
+# largest of them (value descending, then row order); `grouped` returns column-wise group stats.
+
+
+class _NumpyAggregator:
+    @staticmethod
+    def sort(values: Any) -> Any:
+        return np.sort(values)
+
+    @staticmethod
+    def histogram(values: Any) -> list[int]:
+        bins = np.searchsorted(np.asarray(HISTOGRAM_EDGES), values, side="right") - 1
+        return np.bincount(bins, minlength=len(HISTOGRAM_EDGES)).tolist()
+
+    @staticmethod
+    def above(values: Any, threshold: int, limit: int) -> tuple[int, list[int]]:
+        idx = np.flatnonzero(values > threshold)
+        order = idx[np.lexsort((idx, -values[idx]))][:limit]
+        return int(idx.size), order.tolist()
+
+    @staticmethod
+    def grouped(group_ids: Any, n_groups: int, columns: dict[str, Any]) -> dict[str, Any]:
+        counts = np.bincount(group_ids, minlength=n_groups)
+        starts = np.cumsum(counts) - counts
+        offsets = np.repeat(np.arange(n_groups, dtype=np.int64), counts)
+        out: dict[str, Any] = {"count": counts.tolist()}
+        for name, values in columns.items():
+            # Sort by (group, value) as one key: each group becomes one sorted run
+            span = int(values.max()) + 1 if values.size else 1
+            ordered = np.sort(group_ids * span + values) - offsets * span
+            stats = {f"p{q}": ordered[starts + (q * (counts - 1)) // 100].tolist() for q in PERCENTILES}
+            stats["max"] = ordered[starts + counts - 1].tolist()
+            sums = np.bincount(group_ids, weights=values, minlength=n_groups)
+            stats["mean"] = (np.rint(sums / counts * 100) / 100).tolist()
+            out[name] = stats
+        return out
+
+
+class _PythonAggregator:
+    @staticmethod
+    def sort(values: Any) -> Any:
+        return sorted(values)
+
+    @staticmethod
+    def histogram(values: Any) -> list[int]:
+        counts = [0] * len(HISTOGRAM_EDGES)
+        for v in values:
+            counts[bisect.bisect_right(HISTOGRAM_EDGES, v) - 1] += 1
+        return counts
+
+    @staticmethod
+    def above(values: Any, threshold: int, limit: int) -> tuple[int, list[int]]:
+        idx = [i for i, v in enumerate(values) if v > threshold]
+        return len(idx), heapq.nsmallest(limit, idx, key=lambda i: (-values[i], i))
+
+    @staticmethod
+    def grouped(group_ids: Any, n_groups: int, columns: dict[str, Any]) -> dict[str, Any]:
+        members: list[list[int]] = [[] for _ in range(n_groups)]
+        for i, g in enumerate(group_ids):
+            members[g].append(i)
+        out: dict[str, Any] = {"count": [len(m) for m in members]}
+        for name, values in columns.items():
+            stats: dict[str, list[Any]] = {key: [] for key in [f"p{q}" for q in PERCENTILES] + ["max", "mean"]}
+            for m in members:
+                vals = sorted(values[i] for i in m)
+                for key, v in _stats_from_sorted(vals, sum(vals)).items():
+                    stats[key].append(v)
+            out[name] = stats
+        return out
+
+
+def metrics_payload(records: Sequence[FunctionMetrics], errors: list[Any]) -> dict[str, Any]:
+    """
+    The `metrics.json` artifact. Aggregates come before the per-function rows so readers that
+    only need the aggregates can stop early.
+    """
+    table = MetricTable(records)
+    return {
+        "version": METRICS_VERSION,
+        "metrics": list(METRIC_NAMES),
+        "aggregates": table.aggregates(),
+        "functions": [
+            {
+                "qualname": r.qualname,
+                "module": r.module,
+                "file": r.file,
+                "lineno": r.lineno,
+                **{name: getattr(r, name) for name in METRIC_NAMES},
+            }
+            for r in records
+        ],
+        "errors": errors,
+    }
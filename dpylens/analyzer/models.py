@@ -1,6 +1,9 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, asdict
+import sys
+import types
+import typing
+from dataclasses import dataclass, asdict, fields, is_dataclass
 from typing import Any
 
 
@@ -10,14 +13,18 @@ class FileError:
     error: str
 
 
-@dataclass(frozen=True)
+# Record types below are slotted (no per-instance __dict__) and are built from interned
+# strings, so millions of calls share one copy of each file path, caller and callee name.
+
+
+@dataclass(frozen=True, slots=True)
 class FunctionRecord:
     qualname: str
     file: str
     lineno: int
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class CallRecord:
     caller: str
     callee: str
@@ -33,4 +40,34 @@ def to_jsonable(obj: Any) -> Any:
         return [to_jsonable(x) for x in obj]
     if isinstance(obj, dict):
         return {k: to_jsonable(v) for k, v in obj.items()}
-    return obj
\ No newline at end of file
+    return obj
+
+
+def from_jsonable(tp: Any, data: Any) -> Any:
+    """
+    Inverse of to_jsonable: rebuild (nested) dataclasses from plain JSON data using type hints.
+    Supports dataclasses, list[...], dict[str, ...] and `X | None`.
+    """
+    if data is None or tp is Any:
+        return data
+
+    if tp is str:
+        return sys.intern(data)
+
+    if is_dataclass(tp):
+        hints = typing.get_type_hints(tp)
+        kwargs = {f.name: from_jsonable(hints[f.name], data[f.name]) for f in fields(tp) if f.init and f.name in data}
+        return tp(**kwargs)
+
+    origin = typing.get_origin(tp)
+    args = typing.get_args(tp)
+
+    if origin is list:
+        return [from_jsonable(args[0], x) for x in data] if args else list(data)
+    if origin is dict:
+        return {k: from_jsonable(args[1], v) for k, v in data.items()} if args else dict(data)
+    if origin in (typing.Union, types.UnionType):
+        non_none = [a for a in args if a is not type(None)]
+        return from_jsonable(non_none[0], data) if len(non_none) == 1 else data
+
+    return data
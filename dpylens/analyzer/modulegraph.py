@@ -2,9 +2,13 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from dpylens.analyzer.imports import ImportItem, ImportRecord
 
+if TYPE_CHECKING:
+    from dpylens.analyzer.layout import ModuleIndex
+
 
 @dataclass(frozen=True)
 class ModuleNode:
@@ -26,7 +30,14 @@ def module_name_for_file(root: Path, file_path: Path) -> str:
     return ".".join(no_suffix.parts)
 
 
-def build_local_module_index(root: Path, py_files: list[Path]) -> dict[str, Path]:
+def build_local_module_index(
+    root: Path,
+    py_files: list[Path],
+    *,
+    module_index: ModuleIndex | None = None,
+) -> dict[str, Path]:
+    if module_index is not None:
+        return module_index.module_map(py_files)
     idx: dict[str, Path] = {}
     for f in py_files:
         idx[module_name_for_file(root, f)] = f
@@ -41,7 +52,7 @@ def _package_name_for_init(mod: str) -> str:
     return mod[: -len(".__init__")]
 
 
-def _expand_local_importables(local_modules: set[str]) -> set[str]:
+def expand_local_importables(local_modules: set[str]) -> set[str]:
     """
     If a package has __init__.py, treat the package name as importable.
     Example:
@@ -132,12 +143,18 @@ def build_module_graph(
     root: Path,
     py_files: list[Path],
     import_records: list[ImportRecord],
+    local_index: dict[str, Path] | None = None,
 ) -> tuple[list[ModuleNode], list[ModuleEdge]]:
-    local_index = build_local_module_index(root, py_files)
+    """
+    `local_index` (module -> file) may be passed in when the caller already built it,
+    e.g. with a layout-aware ModuleIndex; otherwise modules are named root-relative.
+    """
+    if local_index is None:
+        local_index = build_local_module_index(root, py_files)
     local_modules = set(local_index.keys())
-    local_importables = _expand_local_importables(local_modules)
+    local_importables = expand_local_importables(local_modules)
 
-    file_to_module = {str(p): module_name_for_file(root, p) for p in py_files}
+    file_to_module = {str(p): m for m, p in local_index.items()}
 
     nodes: list[ModuleNode] = [
         ModuleNode(module=m, file=str(p)) for m, p in sorted(local_index.items(), key=lambda x: x[0])
@@ -148,41 +165,54 @@ def build_module_graph(
         src_mod = file_to_module.get(rec.file)
         if not src_mod:
             continue
+        edges.extend(edges_for_import_record(rec, src_module=src_mod, local_importables=local_importables))
 
-        for item in rec.items:
-            local_targets = _local_targets_for_import_item(
-                item,
-                src_module=src_mod,
-                local_importables=local_importables,
-            )
+    return nodes, edges
 
-            if local_targets:
-                for t in local_targets:
-                    edges.append(
-                        ModuleEdge(
-                            src_module=src_mod,
-                            dst_module=t,
-                            kind="local",
-                            raw_import=item.raw,
-                        )
-                    )
-            else:
-                # Keep an external edge so users can still see dependencies
-                # Choose best-available name
-                if item.kind == "import":
-                    dst = item.module or "<unknown>"
-                else:
-                    # include relative dots for readability
-                    dst = ("." * item.level) + (item.module or "")
-                    dst = dst or "<unknown>"
 
+def edges_for_import_record(
+    rec: ImportRecord,
+    *,
+    src_module: str,
+    local_importables: set[str],
+) -> list[ModuleEdge]:
+    """
+    Module edges contributed by one file, given the set of importable local modules.
+    """
+    edges: list[ModuleEdge] = []
+    for item in rec.items:
+        local_targets = _local_targets_for_import_item(
+            item,
+            src_module=src_module,
+            local_importables=local_importables,
+        )
+
+        if local_targets:
+            for t in local_targets:
                 edges.append(
                     ModuleEdge(
-                        src_module=src_mod,
-                        dst_module=dst,
-                        kind="external",
+                        src_module=src_module,
+                        dst_module=t,
+                        kind="local",
                         raw_import=item.raw,
                     )
                 )
-
-    return nodes, edges
\ No newline at end of file
+        else:
+            # Keep an external edge so users can still see dependencies
+            # Choose best-available name
+            if item.kind == "import":
+                dst = item.module or "<unknown>"
+            else:
+                # include relative dots for readability
+                dst = ("." * item.level) + (item.module or "")
+                dst = dst or "<unknown>"
+
+            edges.append(
+                ModuleEdge(
+                    src_module=src_module,
+                    dst_module=dst,
+                    kind="external",
+                    raw_import=item.raw,
+                )
+            )
+    return edges
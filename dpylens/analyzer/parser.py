@@ -19,10 +19,23 @@ def parse_file_to_ast(path: Path) -> tuple[ast.AST | None, FileError | None]:
     except Exception as e:  # noqa: BLE001
         return None, FileError(file=str(path), error=f"read_error: {e}")
 
+    return parse_source_to_ast(source, path)
+
+
+def parse_source_to_ast(source: str | bytes, path: Path) -> tuple[ast.AST | None, FileError | None]:
+    """
+    Same as parse_file_to_ast, for source that did not come from the working tree (e.g. a git blob).
+    """
+    if isinstance(source, bytes):
+        try:
+            source = source.decode("utf-8")
+        except Exception as e:  # noqa: BLE001
+            return None, FileError(file=str(path), error=f"read_error: {e}")
+
     try:
         tree = ast.parse(source, filename=str(path))
         return tree, None
     except SyntaxError as e:
         return None, FileError(file=str(path), error=f"syntax_error: {e.msg} (line {e.lineno})")
     except Exception as e:  # noqa: BLE001
-        return None, FileError(file=str(path), error=f"parse_error: {e}")
\ No newline at end of file
+        return None, FileError(file=str(path), error=f"parse_error: {e}")
@@ -1,11 +1,29 @@
 from __future__ import annotations
 
 import ast
-from dataclasses import dataclass
+import functools
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Any, Callable, Iterable
 
 from dpylens.analyzer.imports import ImportRecord
 
+try:
+    import tomllib
+except ModuleNotFoundError:  # Python 3.10
+    import tomli as tomllib  # type: ignore[no-redef]
+
+DEFAULT_RULES_PATH = Path(__file__).parent / "rules" / "patterns.toml"
+
+# Condition kinds, as bits of a per-rule mask
+_IMPORTS, _CALLS, _DECORATORS, _BASES = 1, 2, 4, 8
+_CONDITIONS = {"imports": _IMPORTS, "calls": _CALLS, "decorators": _DECORATORS, "bases": _BASES}
+_TRIE_RULES = "\0rules"
+
+
+class PatternRuleError(ValueError):
+    pass
+
 
 @dataclass(frozen=True)
 class PatternHit:
@@ -13,58 +31,209 @@ class PatternHit:
     patterns: list[str]
 
 
-def _has_import(imports: set[str], prefix: str) -> bool:
-    return any(i == prefix or i.startswith(prefix + ".") for i in imports)
+@dataclass(frozen=True)
+class PatternRule:
+    """
+    A rule matches a file when every listed condition has at least one hit (lists are OR-ed).
+    See rules/patterns.toml for the matching semantics of each condition.
+    """
+    id: str
+    imports: list[str] = field(default_factory=list)
+    calls: list[str] = field(default_factory=list)
+    decorators: list[str] = field(default_factory=list)
+    bases: list[str] = field(default_factory=list)
+
+
+def load_pattern_rules(path: Path) -> list[PatternRule]:
+    """
+    Read `[[rule]]` tables from a TOML file.
+    """
+    try:
+        data = tomllib.loads(path.read_text(encoding="utf-8"))
+    except (OSError, tomllib.TOMLDecodeError) as e:
+        raise PatternRuleError(f"{path}: {e}") from e
+
+    rules: list[PatternRule] = []
+    for i, raw in enumerate(data.get("rule") or []):
+        where = f"{path}: rule #{i + 1}"
+        unknown = set(raw) - {"id", *_CONDITIONS}
+        if unknown:
+            raise PatternRuleError(f"{where}: unknown keys {', '.join(sorted(unknown))}")
+        rule_id = raw.get("id")
+        if not isinstance(rule_id, str) or not rule_id:
+            raise PatternRuleError(f"{where}: missing id")
+        conditions = {k: raw.get(k) or [] for k in _CONDITIONS}
+        for k, v in conditions.items():
+            if not isinstance(v, list) or not all(isinstance(x, str) and x for x in v):
+                raise PatternRuleError(f"{where} ({rule_id}): {k} must be a list of names")
+        if not any(conditions.values()):
+            raise PatternRuleError(f"{where} ({rule_id}): needs at least one condition")
+        rules.append(PatternRule(id=rule_id, **conditions))
+    return rules
 
 
-def _has_call(tree: ast.AST, names: set[str]) -> bool:
+@dataclass(frozen=True)
+class CompiledRules:
+    """
+    Rules compiled for one-pass evaluation:
+
+    import_trie:      module parts -> node; a node's _TRIE_RULES entry lists rules whose prefix ends there
+    import_raw:       (raw prefix, rule) pairs for "name*" entries
+    calls/decorators/bases: name -> rules (dispatch tables, looked up by terminal and dotted name)
+    required:         per rule, the bitmask of condition kinds it needs
+    """
+    ids: list[str]
+    required: list[int]
+    import_trie: dict
+    import_raw: list[tuple[str, int]]
+    calls: dict[str, list[int]]
+    decorators: dict[str, list[int]]
+    bases: dict[str, list[int]]
+
+    @classmethod
+    def compile(cls, rules: list[PatternRule]) -> CompiledRules:
+        trie: dict = {}
+        raw: list[tuple[str, int]] = []
+        tables: dict[str, dict[str, list[int]]] = {"calls": {}, "decorators": {}, "bases": {}}
+        required: list[int] = []
+
+        for idx, rule in enumerate(rules):
+            mask = 0
+            for kind, bit in _CONDITIONS.items():
+                names = getattr(rule, kind)
+                if not names:
+                    continue
+                mask |= bit
+                for name in names:
+                    if kind != "imports":
+                        tables[kind].setdefault(name, []).append(idx)
+                    elif name.endswith("*"):
+                        raw.append((name[:-1], idx))
+                    else:
+                        node = trie
+                        for part in name.split("."):
+                            node = node.setdefault(part, {})
+                        node.setdefault(_TRIE_RULES, []).append(idx)
+            required.append(mask)
+
+        return cls(
+            ids=[r.id for r in rules],
+            required=required,
+            import_trie=trie,
+            import_raw=raw,
+            calls=tables["calls"],
+            decorators=tables["decorators"],
+            bases=tables["bases"],
+        )
+
+
+def compile_pattern_rules(paths: Iterable[Path] = (), *, include_defaults: bool = True) -> CompiledRules:
+    rules = load_pattern_rules(DEFAULT_RULES_PATH) if include_defaults else []
+    for p in paths:
+        rules.extend(load_pattern_rules(p))
+    return CompiledRules.compile(rules)
+
+
+@functools.lru_cache(maxsize=1)
+def default_pattern_rules() -> CompiledRules:
+    return compile_pattern_rules()
+
+
+def _dotted(node: ast.AST) -> str | None:
+    parts: list[str] = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return ".".join(reversed(parts))
+
+
+def _names(node: ast.AST) -> tuple[str | None, str | None]:
+    """
+    (terminal, dotted) name of a call target / decorator / base class expression.
+    """
+    if isinstance(node, ast.Call):
+        node = node.func
+    if isinstance(node, ast.Name):
+        return node.id, None
+    if isinstance(node, ast.Attribute):
+        return node.attr, _dotted(node)
+    return None, None
+
+
+def detect_patterns(
+    tree: ast.AST,
+    import_record: ImportRecord,
+    file_path: Path,
+    rules: CompiledRules | None = None,
+) -> PatternHit:
     """
-    Detect simple calls like subprocess.run(), os.system(), etc.
-    MVP: checks direct attribute names or function names.
+    Evaluate all rules against one file: imports through the prefix trie, then at most one
+    walk of the tree for rules that also need calls/decorators/base classes.
     """
-    for node in ast.walk(tree):
-        if isinstance(node, ast.Call):
-            fn = node.func
-            if isinstance(fn, ast.Name) and fn.id in names:
-                return True
-            if isinstance(fn, ast.Attribute) and fn.attr in names:
-                return True
-    return False
-
-
-def detect_patterns(tree: ast.AST, import_record: ImportRecord, file_path: Path) -> PatternHit:
-    imports = set(import_record.imports)
-    patterns: list[str] = []
-
-    # CLI frameworks
-    if _has_import(imports, "argparse") or _has_import(imports, "click") or _has_import(imports, "typer") or _has_import(imports, "fire"):
-        patterns.append("devops:cli")
-
-    # Shell / OS automation
-    if _has_import(imports, "subprocess") or _has_import(imports, "shlex") or _has_import(imports, "os"):
-        if _has_call(tree, {"system", "run", "Popen"}):
-            patterns.append("devops:shell")
-
-    # IaC
-    if _has_import(imports, "pulumi") or any(i.startswith("pulumi_") for i in imports):
-        patterns.append("iac:pulumi")
-    if _has_import(imports, "aws_cdk") or _has_import(imports, "constructs"):
-        patterns.append("iac:cdk")
-
-    # Pipelines / Orchestrators
-    if _has_import(imports, "airflow"):
-        patterns.append("pipeline:airflow")
-    if _has_import(imports, "prefect"):
-        patterns.append("pipeline:prefect")
-    if _has_import(imports, "dagster"):
-        patterns.append("pipeline:dagster")
-    if _has_import(imports, "luigi"):
-        patterns.append("pipeline:luigi")
-
-    # Models / Schemas
-    if _has_import(imports, "pydantic"):
-        patterns.append("models:pydantic")
-    if _has_import(imports, "dataclasses"):
-        patterns.append("models:dataclass")
-
-    return PatternHit(file=str(file_path), patterns=sorted(set(patterns)))
\ No newline at end of file
+    rules = rules or default_pattern_rules()
+    hits = [0] * len(rules.ids)
+
+    for mod in import_record.imports:
+        node = rules.import_trie
+        for part in mod.split("."):
+            node = node.get(part)
+            if node is None:
+                break
+            for idx in node.get(_TRIE_RULES, ()):
+                hits[idx] |= _IMPORTS
+        for prefix, idx in rules.import_raw:
+            if mod.startswith(prefix):
+                hits[idx] |= _IMPORTS
+
+    # Rules still waiting on node conditions (their import condition, if any, already holds)
+    pending = {
+        idx
+        for idx, req in enumerate(rules.required)
+        if req & ~_IMPORTS and (not req & _IMPORTS or hits[idx] & _IMPORTS)
+    }
+
+    def mark(table: dict[str, list[int]], node: ast.AST, bit: int) -> None:
+        for name in _names(node):
+            if name is None:
+                continue
+            for idx in table.get(name, ()):
+                if idx in pending:
+                    hits[idx] |= bit
+                    if hits[idx] == rules.required[idx]:
+                        pending.discard(idx)
+
+    def on_call(node: ast.Call) -> None:
+        mark(rules.calls, node, _CALLS)
+
+    def on_def(node: ast.FunctionDef | ast.AsyncFunctionDef | ast.ClassDef) -> None:
+        for d in node.decorator_list:
+            mark(rules.decorators, d, _DECORATORS)
+
+    def on_class(node: ast.ClassDef) -> None:
+        if rules.decorators:
+            on_def(node)
+        for b in node.bases:
+            mark(rules.bases, b, _BASES)
+
+    # Node-type dispatch: only node types some rule cares about get a handler
+    dispatch: dict[type, Callable[[Any], None]] = {}
+    if rules.calls:
+        dispatch[ast.Call] = on_call
+    if rules.decorators:
+        dispatch[ast.FunctionDef] = dispatch[ast.AsyncFunctionDef] = dispatch[ast.ClassDef] = on_def
+    if rules.bases:
+        dispatch[ast.ClassDef] = on_class
+
+    if pending and dispatch:
+        for node in ast.walk(tree):
+            handler = dispatch.get(type(node))
+            if handler is not None:
+                handler(node)
+                if not pending:
+                    break
+
+    matched = {rules.ids[idx] for idx, req in enumerate(rules.required) if hits[idx] == req}
+    return PatternHit(file=str(file_path), patterns=sorted(matched))
@@ -0,0 +1,390 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from dpylens.analyzer.aliases import AliasMaps, extract_alias_maps
+from dpylens.analyzer.budget import DEFAULT_BUDGET, FileBudget, generated_reason
+from dpylens.analyzer.callgraph import definition_qualnames, extract_callgraph
+from dpylens.analyzer.callgraph_resolve import resolve_calls
+from dpylens.analyzer.classes import ClassIndex, ClassRecord, LocalType, extract_classes
+from dpylens.analyzer.dataflow import FunctionDataFlow, extract_dataflow
+from dpylens.analyzer.duplicates import FunctionFingerprint, extract_fingerprints
+from dpylens.analyzer.effects import FunctionEffects, extract_effects
+from dpylens.analyzer.imports import ImportRecord, extract_imports
+from dpylens.analyzer.layout import ModuleIndex
+from dpylens.analyzer.metrics import FunctionMetrics, extract_metrics
+from dpylens.analyzer.models import CallRecord, FileError, FunctionRecord
+from dpylens.analyzer.modulegraph import build_local_module_index, build_module_graph
+from dpylens.analyzer.parser import parse_source_to_ast
+from dpylens.analyzer.patterns import CompiledRules, PatternHit, detect_patterns
+from dpylens.analyzer.plugins import FileContext, PluginConfig, finalize_plugins, run_plugins_on_file
+from dpylens.analyzer.reachability import (
+    EntryPointConfig,
+    ReachabilityFacts,
+    extract_reachability_facts,
+    find_dead_code,
+    load_entry_point_config,
+)
+from dpylens.analyzer.result import AnalysisResult
+from dpylens.analyzer.routes_litestar import LitestarFileFacts, extract_litestar_facts, link_litestar_routes
+from dpylens.analyzer.scanner import scan_python_files
+from dpylens.analyzer.summaries import SummaryMemo, summarize_effects
+
+# Files per pool task: large enough to amortize pickling, small enough to balance load.
+DEFAULT_CHUNK_SIZE = 32
+
+# Bump when FileAnalysis changes shape or the per-file pass extracts anything differently: shards
+# and the per-file cache (gittree.FileCache) store FileAnalysis records under this version
+FILE_ANALYSIS_VERSION = 7
+
+
+@dataclass(frozen=True)
+class FileTask:
+    path: Path
+    module: str
+    # Source bytes when the file does not come from the working tree (e.g. a git blob)
+    source: bytes | None = None
+
+
+@dataclass(frozen=True)
+class FileAnalysis:
+    """
+    Everything the per-file pass extracts from one parsed file.
+    """
+    file: str
+    module: str
+    imports: ImportRecord
+    aliases: AliasMaps
+    functions: list[FunctionRecord]
+    calls: list[CallRecord]
+    patterns: PatternHit
+    dataflows: list[FunctionDataFlow]
+    routes: LitestarFileFacts | None
+    effects: list[FunctionEffects]
+    metrics: list[FunctionMetrics]
+    fingerprints: list[FunctionFingerprint]
+    reachability: ReachabilityFacts | None
+    classes: list[ClassRecord]
+    local_types: list[LocalType]
+    plugins: dict[str, Any]  # plugin name -> per-file result
+
+
+def plan_files(root: Path) -> list[FileTask]:
+    """
+    Scan `root` and assign each Python file its layout-aware module name.
+    """
+    root = root.resolve()
+    index = ModuleIndex.for_root(root)
+    return [FileTask(path=f, module=index.module_for(f)) for f in scan_python_files(root)]
+
+
+def _imports_only(task: FileTask, imp_rec: ImportRecord, aliases: AliasMaps) -> FileAnalysis:
+    file = str(task.path)
+    return FileAnalysis(
+        file=file,
+        module=task.module,
+        imports=imp_rec,
+        aliases=aliases,
+        functions=[],
+        calls=[],
+        patterns=PatternHit(file=file, patterns=[]),
+        dataflows=[],
+        routes=None,
+        effects=[],
+        metrics=[],
+        fingerprints=[],
+        reachability=None,
+        classes=[],
+        local_types=[],
+        plugins={},
+    )
+
+
+def analyze_file(
+    task: FileTask,
+    *,
+    root: Path,
+    budget: FileBudget = DEFAULT_BUDGET,
+    rules: CompiledRules | None = None,
+    plugins: PluginConfig | None = None,
+) -> tuple[FileAnalysis | None, FileError | None]:
+    """
+    Per-file pass for one file.
+
+    Files over budget, or generated/vendored files (see FileBudget), are skipped or reduced to
+    imports only; they come back with a FileError note saying so, alongside any partial analysis.
+    `rules` are the compiled pattern rules (None = built-in rules); `plugins` are extractor
+    plugins that run in the same pass (not on reduced files).
+    """
+    f = task.path
+
+    # Size check before reading, so oversized files never get loaded
+    if task.source is None and budget.max_bytes is not None:
+        try:
+            size = f.stat().st_size
+        except OSError as e:
+            return None, FileError(file=str(f), error=f"read_error: {e}")
+        if size > budget.max_bytes:
+            return None, FileError(file=str(f), error=f"budget_exceeded: {size} bytes > {budget.max_bytes}; skipped")
+
+    if task.source is None:
+        try:
+            data = f.read_bytes()
+        except Exception as e:  # noqa: BLE001
+            return None, FileError(file=str(f), error=f"read_error: {e}")
+    else:
+        data = task.source
+        if budget.max_bytes is not None and len(data) > budget.max_bytes:
+            return None, FileError(file=str(f), error=f"budget_exceeded: {len(data)} bytes > {budget.max_bytes}; skipped")
+
+    note: str | None = None
+    if budget.generated != "full":
+        reason = generated_reason(f.relative_to(root).parts, data[:4096])
+        if reason is not None:
+            note = f"generated_file: {reason}; {budget.generated}"
+            if budget.generated == "skip":
+                return None, FileError(file=str(f), error=note)
+
+    started = time.perf_counter()
+    tree, err = parse_source_to_ast(data, f)
+    if err:
+        return None, err
+    assert tree is not None
+
+    imp_rec = extract_imports(tree, f)
+    aliases = extract_alias_maps(tree, f, root=root, module_name=task.module)
+
+    if note is None and budget.max_seconds is not None:
+        elapsed = time.perf_counter() - started
+        if elapsed > budget.max_seconds:
+            note = f"budget_exceeded: parse took {elapsed:.1f}s > {budget.max_seconds:g}s; imports-only"
+    if note is not None:
+        return _imports_only(task, imp_rec, aliases), FileError(file=str(f), error=note)
+
+    # One naming pass; every extractor below names functions (and classes) from it
+    qualnames = definition_qualnames(tree, task.module)
+    funcs, calls = extract_callgraph(tree, f, module_name=task.module, qualnames=qualnames)
+    classes, local_types = extract_classes(tree, f, task.module, aliases, qualnames)
+
+    # Routes and effect facts are best-effort and must not break analysis
+    try:
+        routes = extract_litestar_facts(tree, str(f.relative_to(root)))
+    except Exception:  # noqa: BLE001
+        routes = None
+    try:
+        effects = extract_effects(tree, f, task.module, aliases, qualnames)
+    except Exception:  # noqa: BLE001
+        effects = []
+
+    plugin_results: dict[str, Any] = {}
+    plugin_error: FileError | None = None
+    if plugins is not None and plugins.specs:
+        ctx = FileContext(path=f, rel=f.relative_to(root).as_posix(), module=task.module, imports=imp_rec)
+        plugin_results, plugin_errors = run_plugins_on_file(plugins, tree, ctx, data)
+        if plugin_errors:
+            plugin_error = FileError(file=str(f), error="; ".join(e.error for e in plugin_errors))
+
+    return (
+        FileAnalysis(
+            file=str(f),
+            module=task.module,
+            imports=imp_rec,
+            aliases=aliases,
+            functions=funcs,
+            calls=calls,
+            patterns=detect_patterns(tree, imp_rec, f, rules),
+            dataflows=extract_dataflow(tree, f, module_name=task.module, qualnames=qualnames),
+            routes=routes,
+            effects=effects,
+            metrics=extract_metrics(tree, f, task.module, qualnames),
+            fingerprints=extract_fingerprints(tree, f, task.module, qualnames),
+            reachability=extract_reachability_facts(tree, f, task.module, qualnames),
+            classes=classes,
+            local_types=local_types,
+            plugins=plugin_results,
+        ),
+        plugin_error,
+    )
+
+
+def analyze_files(
+    tasks: list[FileTask],
+    root: Path,
+    budget: FileBudget = DEFAULT_BUDGET,
+    rules: CompiledRules | None = None,
+    plugins: PluginConfig | None = None,
+) -> list[tuple[FileAnalysis | None, FileError | None]]:
+    """
+    Per-file pass over a chunk of files. Module-level so it can run in a worker process.
+    """
+    return [analyze_file(t, root=root, budget=budget, rules=rules, plugins=plugins) for t in tasks]
+
+
+def chunked(tasks: list[FileTask], size: int = DEFAULT_CHUNK_SIZE) -> list[list[FileTask]]:
+    return [tasks[i : i + size] for i in range(0, len(tasks), size)]
+
+
+def finalize(
+    root: Path,
+    files: list[Path],
+    outcomes: list[tuple[FileAnalysis | None, FileError | None]],
+    *,
+    summary_memo: SummaryMemo | None = None,
+    plugins: PluginConfig | None = None,
+    entry_points: tuple[str, ...] = (),
+    module_index: ModuleIndex | None = None,
+    entry_config: tuple[EntryPointConfig, list[FileError]] | None = None,
+) -> AnalysisResult:
+    """
+    Cross-file pass: module graph, call resolution, effect summaries, route linking and
+    reachability.
+
+    `outcomes` must be in the same order as `files` so results are deterministic.
+    `summary_memo` (summaries of a previous run) lets unchanged call-graph components skip
+    summary computation. `plugins` run their finalize step last and add their artifacts.
+    `entry_points` are extra qualname patterns treated as reachability roots.
+    `module_index` and `entry_config` replace what would otherwise be read from `root` on disk
+    (the package layout and pyproject.toml), for files that do not come from a working tree.
+    """
+    errors: list[FileError] = []
+    per_file: list[FileAnalysis] = []
+    for fa, err in outcomes:
+        if err:
+            errors.append(err)
+        if fa is not None:
+            per_file.append(fa)
+
+    all_functions = [fn for fa in per_file for fn in fa.functions]
+    all_calls = [c for fa in per_file for c in fa.calls]
+    import_records = [fa.imports for fa in per_file]
+
+    # One module index for every stage, so graph nodes, qualnames and aliases agree
+    local_module_index = build_local_module_index(root, files, module_index=module_index or ModuleIndex.for_root(root))
+    mod_nodes, mod_edges = build_module_graph(
+        root=root, py_files=files, import_records=import_records, local_index=local_module_index
+    )
+
+    # Built once; MROs and method lookups are memoized across every call that needs them
+    class_index = ClassIndex(c for fa in per_file for c in fa.classes)
+    resolved_calls = resolve_calls(
+        functions=all_functions,
+        calls=all_calls,
+        alias_maps_by_file={fa.file: fa.aliases for fa in per_file},
+        local_module_index=local_module_index,
+        classes=class_index,
+        local_types=[t for fa in per_file for t in fa.local_types],
+    )
+    summaries, summary_stats = summarize_effects(
+        [e for fa in per_file for e in fa.effects],
+        resolved_calls,
+        memo=summary_memo,
+    )
+
+    # Routes linking is best-effort and must not break analysis
+    routes = None
+    try:
+        routes = link_litestar_routes([fa.routes for fa in per_file if fa.routes is not None])
+        for w in routes.warnings:
+            errors.append(FileError(file="routes_litestar", error=w))
+    except Exception as e:  # noqa: BLE001
+        errors.append(FileError(file="routes_litestar", error=f"routes_analyzer_failed: {e}"))
+
+    entry_points_config, config_errors = entry_config or load_entry_point_config(root, entry_points)
+    errors.extend(config_errors)
+    dead_code = find_dead_code(
+        all_functions,
+        resolved_calls,
+        [fa.reachability for fa in per_file if fa.reachability is not None],
+        {fa.file: fa.aliases for fa in per_file},
+        root=root,
+        routes=routes,
+        config=entry_points_config,
+        classes=class_index,
+    )
+
+    result = AnalysisResult(
+        root=root,
+        files=files,
+        errors=errors,
+        imports=import_records,
+        functions=all_functions,
+        calls=all_calls,
+        resolved_calls=resolved_calls,
+        patterns=[fa.patterns for fa in per_file],
+        dataflows=[d for fa in per_file for d in fa.dataflows],
+        module_nodes=mod_nodes,
+        module_edges=mod_edges,
+        routes=routes,
+        summaries=summaries,
+        summary_stats=summary_stats,
+        function_metrics=[m for fa in per_file for m in fa.metrics],
+        fingerprints=[fp for fa in per_file for fp in fa.fingerprints],
+        dead_code=dead_code,
+        classes=class_index,
+    )
+
+    if plugins is not None and plugins.specs:
+        artifacts, plugin_errors = finalize_plugins(plugins, [(fa.file, fa.plugins) for fa in per_file], result)
+        result.plugin_artifacts.update(artifacts)
+        result.errors.extend(plugin_errors)
+    return result
+
+
+def run_file_pass(
+    tasks: list[FileTask],
+    root: Path,
+    *,
+    executor: Executor | None = None,
+    budget: FileBudget = DEFAULT_BUDGET,
+    rules: CompiledRules | None = None,
+    plugins: PluginConfig | None = None,
+) -> list[tuple[FileAnalysis | None, FileError | None]]:
+    if executor is None:
+        return analyze_files(tasks, root, budget, rules, plugins)
+
+    chunks = chunked(tasks)
+    n = len(chunks)
+    outcomes: list[tuple[FileAnalysis | None, FileError | None]] = []
+    for part in executor.map(analyze_files, chunks, [root] * n, [budget] * n, [rules] * n, [plugins] * n):
+        outcomes.extend(part)
+    return outcomes
+
+
+def analyze(
+    root: Path | str,
+    *,
+    jobs: int = 1,
+    budget: FileBudget = DEFAULT_BUDGET,
+    summary_memo: SummaryMemo | None = None,
+    pattern_rules: CompiledRules | None = None,
+    plugins: PluginConfig | None = None,
+    entry_points: tuple[str, ...] = (),
+) -> AnalysisResult:
+    """
+    Analyze a folder of Python files and return the results in memory.
+
+    Nothing is written to disk; call `AnalysisResult.write(out)` for the JSON/DOT artifacts.
+    With `jobs > 1` the per-file pass runs in a process pool. `budget` limits per-file work and
+    decides how generated/vendored files are handled. `summary_memo` reuses effect summaries
+    from a previous run (see `SummaryMemo.load`). `pattern_rules` replaces the built-in pattern
+    rules (see `compile_pattern_rules`). `plugins` enables extractor plugins (see plugins.py).
+    `entry_points` adds qualname patterns (fnmatch) to the reachability roots.
+    """
+    root = Path(root).resolve()
+    tasks = plan_files(root)
+    if plugins is not None:
+        plugins.load()  # unknown or broken plugins fail here, not inside a worker
+
+    if jobs > 1 and len(tasks) > DEFAULT_CHUNK_SIZE:
+        with ProcessPoolExecutor(max_workers=jobs) as ex:
+            outcomes = run_file_pass(tasks, root, executor=ex, budget=budget, rules=pattern_rules, plugins=plugins)
+    else:
+        outcomes = run_file_pass(tasks, root, budget=budget, rules=pattern_rules, plugins=plugins)
+
+    return finalize(
+        root, [t.path for t in tasks], outcomes, summary_memo=summary_memo, plugins=plugins, entry_points=entry_points
+    )
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import ast
+import functools
+import hashlib
+import importlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass
+from importlib.metadata import entry_points
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, ClassVar, Mapping
+
+from dpylens.analyzer.imports import ImportRecord
+from dpylens.analyzer.models import FileError
+
+if TYPE_CHECKING:
+    from dpylens.analyzer.result import AnalysisResult
+
+ENTRY_POINT_GROUP = "dpylens.extractors"
+
+
+class PluginError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class FileContext:
+    """
+    What a plugin knows about the file being traversed.
+    """
+    path: Path
+    rel: str  # repo-relative, forward slashes
+    module: str
+    imports: ImportRecord
+
+
+class ExtractorPlugin:
+    """
+    Base class for extractor plugins.
+
+    Per file, the pipeline calls `begin_file`, then every handler from `handlers()` for matching
+    nodes during one traversal shared by all enabled plugins, then `end_file`, whose
+    JSON-serializable return value is the plugin's per-file result (cached by content).
+    After all files, `finalize` turns the per-file results into artifacts.
+
+    Register with an entry point in the `dpylens.extractors` group:
+
+        [project.entry-points."dpylens.extractors"]
+        todos = "mypkg.todos:TodoPlugin"
+
+    Bump `version` whenever per-file results change, so cached results are not reused.
+    """
+    name: ClassVar[str]
+    version: ClassVar[str] = "1"
+    artifacts: ClassVar[tuple[str, ...]] = ()
+
+    def handlers(self) -> Mapping[type[ast.AST], Callable[[Any, ast.AST], None]]:
+        """
+        Node type -> handler(state, node).
+        """
+        return {}
+
+    def begin_file(self, ctx: FileContext) -> Any:
+        return {}
+
+    def end_file(self, ctx: FileContext, state: Any) -> Any:
+        return state
+
+    def finalize(self, per_file: dict[str, Any], result: AnalysisResult) -> dict[str, Any]:
+        """
+        per_file: file path -> per-file result, in analysis order.
+        Returns artifact name -> JSON payload; names must be listed in `artifacts`.
+        """
+        return {}
+
+
+def available_plugins() -> list[str]:
+    """
+    Names registered under the entry point group. Nothing is imported.
+    """
+    return sorted({ep.name for ep in entry_points(group=ENTRY_POINT_GROUP)})
+
+
+def _load_one(spec: str) -> ExtractorPlugin:
+    if ":" in spec:
+        module, _, attr = spec.partition(":")
+        try:
+            obj = getattr(importlib.import_module(module), attr)
+        except (ImportError, AttributeError) as e:
+            raise PluginError(f"cannot load plugin {spec!r}: {e}") from e
+    else:
+        matches = [ep for ep in entry_points(group=ENTRY_POINT_GROUP) if ep.name == spec]
+        if not matches:
+            known = ", ".join(available_plugins()) or "none installed"
+            raise PluginError(f"unknown plugin {spec!r} (available: {known})")
+        obj = matches[0].load()
+
+    plugin = obj() if isinstance(obj, type) else obj
+    if not isinstance(plugin, ExtractorPlugin):
+        raise PluginError(f"plugin {spec!r} is not an ExtractorPlugin")
+    return plugin
+
+
+@dataclass(frozen=True)
+class PluginConfig:
+    """
+    Enabled plugins (entry point names or "module:attr") and an optional per-plugin result cache.
+
+    Only the specs travel to worker processes; each process imports the plugins on first use.
+    """
+    specs: tuple[str, ...]
+    cache_dir: Path | None = None
+
+    def load(self) -> list[ExtractorPlugin]:
+        return list(_load_plugins(self.specs))
+
+
+@functools.lru_cache(maxsize=8)
+def _load_plugins(specs: tuple[str, ...]) -> tuple[ExtractorPlugin, ...]:
+    plugins = tuple(_load_one(s) for s in specs)
+    names = [p.name for p in plugins]
+    if len(set(names)) != len(names):
+        raise PluginError(f"duplicate plugin names: {', '.join(names)}")
+    return plugins
+
+
+class PluginCache:
+    """
+    Per-plugin per-file results on disk: <dir>/<plugin>/<key[:2]>/<key>.json
+
+    The key covers the plugin version, the file's module and path and its source bytes.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    @staticmethod
+    def key(plugin: ExtractorPlugin, ctx: FileContext, source: bytes) -> str:
+        h = hashlib.blake2b(digest_size=16)
+        for part in (plugin.version, ctx.module, ctx.rel):
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")
+        h.update(source)
+        return h.hexdigest()
+
+    def _path(self, plugin: ExtractorPlugin, key: str) -> Path:
+        return self.root / plugin.name / key[:2] / f"{key}.json"
+
+    def get(self, plugin: ExtractorPlugin, key: str) -> tuple[bool, Any]:
+        try:
+            return True, json.loads(self._path(plugin, key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False, None
+
+    def put(self, plugin: ExtractorPlugin, key: str, value: Any) -> None:
+        path = self._path(plugin, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename: several worker processes may store the same key
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(value, fh, separators=(",", ":"))
+        os.replace(tmp, path)
+
+
+def run_plugins_on_file(
+    config: PluginConfig,
+    tree: ast.AST,
+    ctx: FileContext,
+    source: bytes,
+) -> tuple[dict[str, Any], list[FileError]]:
+    """
+    Per-file step for all enabled plugins: cached results are reused, the rest share one walk.
+    A failing plugin loses its result for this file and reports a FileError; others are unaffected.
+    """
+    plugins = config.load()
+    cache = PluginCache(config.cache_dir) if config.cache_dir is not None else None
+    results: dict[str, Any] = {}
+    errors: list[FileError] = []
+
+    active: list[tuple[ExtractorPlugin, Any, str | None]] = []
+    for p in plugins:
+        key = PluginCache.key(p, ctx, source) if cache is not None else None
+        if cache is not None and key is not None:
+            hit, value = cache.get(p, key)
+            if hit:
+                results[p.name] = value
+                continue
+        try:
+            active.append((p, p.begin_file(ctx), key))
+        except Exception as e:  # noqa: BLE001
+            errors.append(FileError(file=str(ctx.path), error=f"plugin_failed: {p.name}: {e}"))
+
+    dispatch: dict[type, list[tuple[int, Callable[[Any, ast.AST], None]]]] = {}
+    for i, (p, _state, _key) in enumerate(active):
+        for node_type, handler in p.handlers().items():
+            dispatch.setdefault(node_type, []).append((i, handler))
+
+    failed: set[int] = set()
+    if dispatch:
+        for node in ast.walk(tree):
+            for i, handler in dispatch.get(type(node), ()):
+                if i in failed:
+                    continue
+                try:
+                    handler(active[i][1], node)
+                except Exception as e:  # noqa: BLE001
+                    failed.add(i)
+                    errors.append(FileError(file=str(ctx.path), error=f"plugin_failed: {active[i][0].name}: {e}"))
+
+    for i, (p, state, key) in enumerate(active):
+        if i in failed:
+            continue
+        try:
+            value = p.end_file(ctx, state)
+        except Exception as e:  # noqa: BLE001
+            errors.append(FileError(file=str(ctx.path), error=f"plugin_failed: {p.name}: {e}"))
+            continue
+        results[p.name] = value
+        if cache is not None and key is not None:
+            cache.put(p, key, value)
+
+    return results, errors
+
+
+def finalize_plugins(
+    config: PluginConfig,
+    per_file: list[tuple[str, dict[str, Any]]],
+    result: AnalysisResult,
+) -> tuple[dict[str, Any], list[FileError]]:
+    """
+    Cross-file step: returns artifact name -> payload for all plugins, plus errors.
+    """
+    artifacts: dict[str, Any] = {}
+    errors: list[FileError] = []
+    for p in config.load():
+        mine = {file: results[p.name] for file, results in per_file if p.name in results}
+        try:
+            produced = p.finalize(mine, result)
+        except Exception as e:  # noqa: BLE001
+            errors.append(FileError(file=f"plugin:{p.name}", error=f"plugin_failed: {e}"))
+            continue
+        for name, payload in produced.items():
+            if name not in p.artifacts:
+                errors.append(FileError(file=f"plugin:{p.name}", error=f"plugin_failed: undeclared artifact {name}"))
+                continue
+            if name in result.artifact_names or name in artifacts:
+                errors.append(FileError(file=f"plugin:{p.name}", error=f"plugin_failed: artifact {name} already exists"))
+                continue
+            artifacts[name] = payload
+    return artifacts, errors
@@ -0,0 +1,623 @@
+from __future__ import annotations
+
+import ast
+import fnmatch
+import re
+import sys
+from array import array
+from dataclasses import dataclass, field
+from itertools import compress, repeat
+from operator import and_, attrgetter
+from pathlib import Path
+from typing import Any, Iterable
+
+try:
+    import tomllib
+except ModuleNotFoundError:  # Python < 3.11
+    import tomli as tomllib  # type: ignore[no-redef]
+
+try:
+    import numpy as np
+except ImportError:  # optional: traversal falls back to pure Python (same result, slower)
+    np = None  # type: ignore[assignment]
+
+from dpylens.analyzer.aliases import AliasMaps
+from dpylens.analyzer.callgraph import definition_qualnames
+from dpylens.analyzer.callgraph_resolve import ResolvedCall, _resolve_callee, _resolve_method
+from dpylens.analyzer.classes import ClassIndex
+from dpylens.analyzer.models import CallRecord, FileError, FunctionRecord
+from dpylens.analyzer.routes_litestar import LitestarRouteReport
+
+DEAD_CODE_VERSION = 1
+
+# Entry-point kinds, in the order they are reported
+ENTRY_KINDS = ("main", "__main__", "script", "route", "test", "configured", "exported", "implicit", "module")
+
+_CONFIDENCE_ORDER = {"high": 0, "medium": 1, "low": 2}
+_TEST_PREFIXES = ("test", "setup", "teardown")
+
+
+@dataclass(frozen=True, slots=True)
+class ReachabilityFacts:
+    """
+    Per-file facts, beyond the call graph, that decide what is reachable.
+
+    module_refs: names called or referenced by module-level code (runs on import)
+    main_refs:   names called or referenced inside `if __name__ == "__main__":`
+    references:  functions referencing a name without calling it (callbacks); callee = the name
+    decorated:   qualnames of decorated functions
+    methods:     class qualname -> qualnames of the functions defined in its body
+    exported:    names listed in `__all__`
+    """
+    file: str
+    module: str
+    module_refs: list[str]
+    main_refs: list[str]
+    references: list[CallRecord]
+    decorated: list[str]
+    methods: dict[str, list[str]]
+    exported: list[str]
+
+
+@dataclass(frozen=True)
+class EntryPointConfig:
+    """
+    Configured entry points, on top of the built-in ones.
+
+    patterns: fnmatch patterns over qualnames (`--entry-point`, `[tool.dpylens] entry_points`)
+    scripts:  `module:attr` targets of `[project.scripts]`, `[project.gui-scripts]` and
+              `[project.entry-points.*]` in the analyzed root's pyproject.toml
+    """
+    patterns: tuple[str, ...] = ()
+    scripts: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class DeadFunction:
+    """
+    confidence: "high"   - private function, unreachable even by name
+                "medium" - public function or method, unreachable even by name
+                          (may be used from outside the repo, or via dynamic dispatch)
+                "low"    - only reachable through an unresolved call or reference with its name
+    """
+    qualname: str
+    file: str
+    lineno: int
+    confidence: str
+    reason: str
+
+
+@dataclass(frozen=True)
+class DeadCodeReport:
+    entry_points: dict[str, int]  # kind -> number of root functions
+    unmatched_roots: list[str]  # configured patterns/scripts that matched no function
+    functions: int
+    reachable: int
+    dead: list[DeadFunction] = field(default_factory=list)
+
+
+def _dotted(node: ast.AST) -> str | None:
+    parts: list[str] = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return ".".join(reversed(parts))
+
+
+def _is_main_guard(test: ast.expr) -> bool:
+    if not (isinstance(test, ast.Compare) and len(test.ops) == 1 and isinstance(test.ops[0], ast.Eq)):
+        return False
+    sides = [test.left, test.comparators[0]]
+    return any(isinstance(s, ast.Name) and s.id == "__name__" for s in sides) and any(
+        isinstance(s, ast.Constant) and s.value == "__main__" for s in sides
+    )
+
+
+class _FactsVisitor(ast.NodeVisitor):
+    def __init__(self, file: str, module: str, qualnames: dict[ast.AST, str]):
+        self.file = file
+        self.module = module
+        self._qualnames = qualnames
+        self.module_refs: dict[str, None] = {}
+        self.main_refs: dict[str, None] = {}
+        self.references: list[CallRecord] = []
+        self.decorated: list[str] = []
+        self.methods: dict[str, list[str]] = {}
+        self.exported: list[str] = []
+        # (kind, qualname, names already recorded, parameter names); kind: module/main/class/function
+        self._scopes: list[tuple[str, str, set[str], set[str]]] = [("module", "", set(), set())]
+
+    def _record(self, name: str, lineno: int) -> None:
+        scope = next(s for s in reversed(self._scopes) if s[0] != "class")
+        kind, qual, seen, params = scope
+        if kind == "module":
+            self.module_refs[name] = None
+        elif kind == "main":
+            self.main_refs[name] = None
+        elif name not in seen and name.partition(".")[0] not in params:
+            seen.add(name)
+            self.references.append(CallRecord(caller=qual, callee=sys.intern(name), file=self.file, lineno=lineno))
+
+    def _in_function(self) -> bool:
+        return any(s[0] == "function" for s in self._scopes)
+
+    def _visit_all(self, nodes: Iterable[ast.AST | None]) -> None:
+        for n in nodes:
+            if n is not None:
+                self.visit(n)
+
+    def _visit_function(self, node: ast.FunctionDef | ast.AsyncFunctionDef) -> None:
+        # Decorators and defaults are evaluated in the enclosing scope
+        self._visit_all(node.decorator_list)
+        self._visit_all(node.args.defaults)
+        self._visit_all(node.args.kw_defaults)
+
+        qual = self._qualnames.get(node) or sys.intern(f"{self.module}.{node.name}")
+        if self._scopes[-1][0] == "class":
+            self.methods[self._scopes[-1][1]].append(qual)
+        if node.decorator_list:
+            self.decorated.append(qual)
+
+        a = node.args
+        params = {x.arg for x in [*a.posonlyargs, *a.args, *a.kwonlyargs, a.vararg, a.kwarg] if x is not None}
+        self._scopes.append(("function", qual, set(), params))
+        self._visit_all(node.body)
+        self._scopes.pop()
+
+    visit_FunctionDef = _visit_function
+    visit_AsyncFunctionDef = _visit_function
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        self._visit_all(node.decorator_list)
+        self._visit_all(node.bases)
+        self._visit_all(node.keywords)
+        qual = self._qualnames.get(node) or f"{self.module}.{node.name}"
+        self.methods.setdefault(qual, [])
+        self._scopes.append(("class", qual, set(), set()))
+        self._visit_all(node.body)
+        self._scopes.pop()
+
+    def visit_If(self, node: ast.If) -> None:
+        if self._scopes[-1][0] == "module" and _is_main_guard(node.test):
+            self._scopes.append(("main", "", set(), set()))
+            self._visit_all(node.body)
+            self._scopes.pop()
+            self._visit_all(node.orelse)
+            return
+        self.generic_visit(node)
+
+    def visit_Assign(self, node: ast.Assign) -> None:
+        if self._scopes[-1][0] == "module" and any(isinstance(t, ast.Name) and t.id == "__all__" for t in node.targets):
+            if isinstance(node.value, (ast.List, ast.Tuple)):
+                self.exported.extend(
+                    e.value for e in node.value.elts if isinstance(e, ast.Constant) and isinstance(e.value, str)
+                )
+        self.generic_visit(node)
+
+    def visit_Call(self, node: ast.Call) -> None:
+        name = _dotted(node.func)
+        if name is None:
+            self.visit(node.func)
+        elif not self._in_function():
+            # Calls inside functions are already in the call graph; module-level ones are not
+            self._record(name, node.lineno)
+        self._visit_all(node.args)
+        self._visit_all(node.keywords)
+
+    def visit_Attribute(self, node: ast.Attribute) -> None:
+        name = _dotted(node) if isinstance(node.ctx, ast.Load) else None
+        if name is None:
+            self.generic_visit(node)
+        else:
+            self._record(name, node.lineno)
+
+    def visit_Name(self, node: ast.Name) -> None:
+        if isinstance(node.ctx, ast.Load):
+            self._record(node.id, node.lineno)
+
+
+def extract_reachability_facts(
+    tree: ast.AST,
+    file_path: Path,
+    module_name: str,
+    qualnames: dict[ast.AST, str] | None = None,
+) -> ReachabilityFacts:
+    if qualnames is None:
+        qualnames = definition_qualnames(tree, module_name)
+    v = _FactsVisitor(sys.intern(str(file_path)), module_name, qualnames)
+    v.visit(tree)
+    return ReachabilityFacts(
+        file=v.file,
+        module=module_name,
+        module_refs=list(v.module_refs),
+        main_refs=list(v.main_refs),
+        references=v.references,
+        decorated=v.decorated,
+        methods=v.methods,
+        exported=v.exported,
+    )
+
+
+def load_entry_point_config(root: Path, patterns: Iterable[str] = ()) -> tuple[EntryPointConfig, list[FileError]]:
+    """
+    Entry points declared in `root`/pyproject.toml, plus extra qualname `patterns`.
+    A broken pyproject.toml is reported as an error and otherwise ignored.
+    """
+    path = root / "pyproject.toml"
+    if not path.is_file():
+        return EntryPointConfig(patterns=tuple(patterns)), []
+    try:
+        text = path.read_text(encoding="utf-8")
+    except OSError as e:
+        return EntryPointConfig(patterns=tuple(patterns)), [FileError(file=str(path), error=f"pyproject_error: {e}")]
+    return parse_entry_point_config(text, path, patterns)
+
+
+def parse_entry_point_config(
+    text: str | None, path: Path, patterns: Iterable[str] = ()
+) -> tuple[EntryPointConfig, list[FileError]]:
+    """
+    load_entry_point_config for pyproject.toml contents read elsewhere (e.g. from a git blob);
+    `text` is None when there is no pyproject.toml.
+    """
+    extra = tuple(patterns)
+    if text is None:
+        return EntryPointConfig(patterns=extra), []
+    try:
+        data = tomllib.loads(text)
+    except tomllib.TOMLDecodeError as e:
+        return EntryPointConfig(patterns=extra), [FileError(file=str(path), error=f"pyproject_error: {e}")]
+
+    project = data.get("project") or {}
+    tables = [project.get("scripts") or {}, project.get("gui-scripts") or {}]
+    tables.extend((project.get("entry-points") or {}).values())
+    scripts = tuple(v for t in tables if isinstance(t, dict) for v in t.values() if isinstance(v, str))
+
+    configured = ((data.get("tool") or {}).get("dpylens") or {}).get("entry_points") or []
+    configured = tuple(p for p in configured if isinstance(p, str))
+    return EntryPointConfig(patterns=configured + extra, scripts=scripts), []
+
+
+def _script_qualnames(target: str) -> list[str]:
+    """
+    "pkg.mod:obj.attr [extra]" -> candidate qualnames, most specific first.
+    """
+    target = target.split("[", 1)[0].strip()
+    module, _, attr = target.partition(":")
+    if not attr:
+        return [module]
+    return [f"{module}.{attr}", f"{module}.{attr.rsplit('.', 1)[-1]}"]
+
+
+def _is_test_file(file: str) -> bool:
+    name = Path(file).name
+    return name.startswith("test_") or name.endswith("_test.py") or name == "conftest.py"
+
+
+def _reach_python(n: int, src: array, dst: array, sources: Iterable[int]) -> bytearray:
+    # CSR by counting sort: node v's successors are targets[offsets[v]:offsets[v + 1]]
+    offsets = [0] * (n + 1)
+    for v in src:
+        offsets[v + 1] += 1
+    for v in range(n):
+        offsets[v + 1] += offsets[v]
+    fill = offsets[:-1]
+    targets = array("q", bytes(8 * len(dst)))
+    for v, w in zip(src, dst):
+        targets[fill[v]] = w
+        fill[v] += 1
+
+    seen = bytearray(n)
+    stack = []
+    for v in sources:
+        if not seen[v]:
+            seen[v] = 1
+            stack.append(v)
+    while stack:
+        v = stack.pop()
+        for w in targets[offsets[v] : offsets[v + 1]]:
+            if not seen[w]:
+                seen[w] = 1
+                stack.append(w)
+    return seen
+
+
+def _reach_numpy(n: int, src: array, dst: array, sources: Iterable[int]) -> bytearray:
+    """
+    Level-synchronous BFS: each step gathers the whole frontier's adjacency ranges at once.
+    """
+    s = np.frombuffer(src, dtype=np.int64)
+    targets = np.frombuffer(dst, dtype=np.int64)[np.argsort(s, kind="stable")]
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(s, minlength=n), out=offsets[1:])
+
+    seen = np.zeros(n, dtype=np.bool_)
+    frontier = np.unique(np.fromiter(sources, dtype=np.int64))
+    seen[frontier] = True
+    while frontier.size:
+        starts = offsets[frontier]
+        counts = offsets[frontier + 1] - starts
+        total = int(counts.sum())
+        if not total:
+            break
+        # Positions of every neighbour in `targets`: each range start, plus 0..count-1 within the range
+        ends = np.cumsum(counts)
+        pos = np.arange(total, dtype=np.int64) + np.repeat(starts - (ends - counts), counts)
+        nxt = targets[pos]
+        nxt = np.unique(nxt[~seen[nxt]])
+        seen[nxt] = True
+        frontier = nxt
+    return bytearray(seen.view(np.uint8).tobytes())
+
+
+def _reach(n: int, src: array, dst: array, sources: Iterable[int]) -> bytearray:
+    """
+    Nodes 0..n-1 reachable from `sources` over the edges src[k] -> dst[k], as a 0/1 map.
+    """
+    if np is not None:
+        return _reach_numpy(n, src, dst, sources)
+    return _reach_python(n, src, dst, sources)
+
+
+def find_dead_code(
+    functions: list[FunctionRecord],
+    resolved_calls: list[ResolvedCall],
+    facts: list[ReachabilityFacts],
+    aliases_by_file: dict[str, AliasMaps],
+    *,
+    root: Path,
+    routes: LitestarRouteReport | None = None,
+    config: EntryPointConfig = EntryPointConfig(),
+    classes: ClassIndex | None = None,
+) -> DeadCodeReport:
+    """
+    Functions not reachable from any entry point.
+
+    The call graph (resolved calls plus references to functions that are not called, e.g.
+    callbacks) is numbered with integer ids and traversed twice from the entry points: once over
+    resolved edges only, and once also following unresolved calls/references to every function
+    with the same name (one extra node per name, so this stays linear) and from every referenced
+    class to its methods, and from a method to its overrides in subclasses (`classes`).
+    Unreachable in the first pass but reachable in the second means "low" confidence.
+    """
+    # Node ids: one per function qualname (functions nested in functions may repeat a name),
+    # then one per class, then one per name
+    ids: dict[str, int] = {}
+    first: list[FunctionRecord] = []
+    for f in functions:
+        if f.qualname not in ids:
+            ids[f.qualname] = len(first)
+            first.append(f)
+    n_functions = len(first)
+    methods: dict[str, list[str]] = {}
+    for fa in facts:
+        for cls, members in fa.methods.items():
+            if cls not in ids:
+                ids[cls] = len(ids)
+                methods[cls] = members
+    leaf_ids: dict[str, int] = {}
+    for q in ids:
+        leaf_ids.setdefault(q.rsplit(".", 1)[-1], len(ids) + len(leaf_ids))
+    n = len(ids) + len(leaf_ids)
+
+    strong_src, strong_dst = array("q"), array("q")
+    weak_src, weak_dst = array("q"), array("q")
+    # Every name node leads to the functions and classes with that name, a class to its methods (weak edges)
+    for q, i in ids.items():
+        weak_src.append(leaf_ids[q.rsplit(".", 1)[-1]])
+        weak_dst.append(i)
+    for cls, members in methods.items():
+        for m in members:
+            if m in ids:
+                weak_src.append(ids[cls])
+                weak_dst.append(ids[m])
+    # Dynamic dispatch: a call to Base.m may run any override Sub.m
+    if classes is not None:
+        for cls, record in classes.classes.items():
+            for ancestor in classes.mro(cls)[1:]:
+                for name in record.methods:
+                    base, override = ids.get(f"{ancestor}.{name}"), ids.get(f"{cls}.{name}")
+                    if base is not None and override is not None:
+                        weak_src.append(base)
+                        weak_dst.append(override)
+
+    module_of_file = {fa.file: fa.module for fa in facts}
+    local = set(ids)
+
+    def resolve(raw: str, file: str, caller: str = "") -> str | None:
+        alias = aliases_by_file.get(file)
+        if alias is not None:
+            found = _resolve_callee(raw, alias=alias, local_functions=local)
+            if found is not None:
+                return found
+        module = module_of_file.get(file)
+        if module is None:
+            return None
+        if "." not in raw and f"{module}.{raw}" in local:
+            return f"{module}.{raw}"  # same-module function or class
+        if classes is None:
+            return None
+        # self.m / cls.m / Worker.m / Worker() through the class hierarchy
+        found = _resolve_method(raw, caller=caller, file=file, alias=alias, classes=classes, local_types={})
+        return found if found in local else None
+
+    def target(raw: str, file: str, caller: str = "") -> tuple[array, array, int] | None:
+        """
+        Edge lists and target node for a call or reference: the resolved function (strong)
+        or the node for its name (weak).
+        """
+        resolved = resolve(raw, file, caller)
+        if resolved is not None:
+            return strong_src, strong_dst, ids[resolved]
+        leaf = leaf_ids.get(raw.rsplit(".", 1)[-1])
+        return (weak_src, weak_dst, leaf) if leaf is not None else None
+
+    # Resolved calls in bulk (id -1 = unknown, the loops run in C); the rest are resolved once
+    # per distinct (callee, file)
+    callers = array("q", map(ids.get, map(attrgetter("caller"), resolved_calls), repeat(-1)))
+    callees = array("q", map(ids.get, map(attrgetter("callee_resolved"), resolved_calls), repeat(-1)))
+    known_caller = list(map((-1).__lt__, callers))
+    strong = list(map(and_, known_caller, map((-1).__lt__, callees)))
+    strong_src.extend(compress(callers, strong))
+    strong_dst.extend(compress(callees, strong))
+    if classes is not None:
+        # `Job()` resolves to an __init__; the instance's other methods may then be called on
+        # receivers the resolver cannot type, so the class is reached by name as well
+        for c in compress(resolved_calls, strong):
+            if c.callee_resolved.endswith(".__init__") and not c.callee_raw.endswith("__init__"):
+                cls = classes.resolve_class(c.callee_raw, c.file, aliases_by_file.get(c.file))
+                if cls in ids:
+                    weak_src.append(ids[c.caller])
+                    weak_dst.append(ids[cls])
+    memo: dict[tuple[str, str], tuple[array, array, int] | None] = {}
+    for k in compress(range(len(callers)), map(and_, known_caller, map((0).__gt__, callees))):
+        c = resolved_calls[k]
+        key = (c.callee_raw, c.file)
+        edge = memo[key] if key in memo else memo.setdefault(key, target(*key))
+        if edge is not None:
+            edge[0].append(callers[k])
+            edge[1].append(edge[2])
+    for fa in facts:
+        for r in fa.references:
+            caller = ids.get(r.caller)
+            edge = target(r.callee, r.file, r.caller) if caller is not None else None
+            if edge is not None:
+                edge[0].append(caller)
+                edge[1].append(edge[2])
+
+    # Entry points
+    roots: dict[int, str] = {}
+    weak_roots: list[int] = []
+
+    def add_root(i: int, kind: str) -> None:
+        if i not in roots:
+            roots[i] = kind
+
+    def add_ref_root(raw: str, file: str, kind: str) -> None:
+        resolved = resolve(raw, file)
+        if resolved is not None:
+            add_root(ids[resolved], kind)
+            return
+        leaf = leaf_ids.get(raw.rsplit(".", 1)[-1])
+        if leaf is not None:
+            weak_roots.append(leaf)
+
+    for q, i in ids.items():
+        if i < n_functions and q.rsplit(".", 1)[-1] == "main":
+            add_root(i, "main")
+    for fa in facts:
+        for raw in fa.main_refs:
+            add_ref_root(raw, fa.file, "__main__")
+
+    unmatched: list[str] = []
+    for script in config.scripts:
+        hit = next((ids[q] for q in _script_qualnames(script) if q in ids), None)
+        if hit is None:
+            unmatched.append(script)
+        else:
+            add_root(hit, "script")
+
+    if routes is not None:
+        module_of_rel = {str(Path(fa.file).relative_to(root)): fa.module for fa in facts if Path(fa.file).is_relative_to(root)}
+        for route in routes.routes:
+            module = module_of_rel.get(route.file)
+            i = ids.get(f"{module}.{route.handler}") if module else None
+            if i is not None:
+                add_root(i, "route")
+
+    test_files = {fa.file for fa in facts if _is_test_file(fa.file)}
+    decorated = {q for fa in facts for q in fa.decorated}
+    if test_files:
+        for i, f in enumerate(first):
+            q = f.qualname
+            if f.file in test_files and (
+                q.rsplit(".", 1)[-1].startswith(_TEST_PREFIXES) or q in decorated or Path(f.file).name == "conftest.py"
+            ):
+                add_root(i, "test")
+
+    for pattern in config.patterns:
+        rx = re.compile(fnmatch.translate(pattern))
+        hits = [i for q, i in ids.items() if i < n_functions and rx.match(q)]
+        if not hits:
+            unmatched.append(pattern)
+        for i in hits:
+            add_root(i, "configured")
+
+    for fa in facts:
+        for name in fa.exported:
+            i = ids.get(f"{fa.module}.{name}")
+            if i is not None:
+                add_root(i, "exported")
+    # Called by the interpreter or a framework rather than by name: dunder methods, decorated functions
+    for q, i in ids.items():
+        if i >= n_functions:
+            break
+        leaf = q.rsplit(".", 1)[-1]
+        if (leaf.startswith("__") and leaf.endswith("__")) or q in decorated:
+            add_root(i, "implicit")
+    for fa in facts:
+        for raw in fa.module_refs:
+            add_ref_root(raw, fa.file, "module")
+
+    strong = _reach(n, strong_src, strong_dst, roots)
+    weak = _reach(n, strong_src + weak_src, strong_dst + weak_dst, [*roots, *weak_roots])
+
+    is_method = {m for members in methods.values() for m in members}
+    dead: list[DeadFunction] = []
+    for i in range(n_functions):
+        if strong[i]:
+            continue
+        f = first[i]
+        leaf = f.qualname.rsplit(".", 1)[-1]
+        if weak[i]:
+            confidence, reason = "low", "only reachable through an unresolved call or reference by name"
+        elif f.qualname in is_method:
+            confidence, reason = "medium", "unreachable method (calls on untyped receivers are not followed)"
+        elif not leaf.startswith("_"):
+            confidence, reason = "medium", "unreachable public function (may be used outside the repo)"
+        else:
+            confidence, reason = "high", "unreachable private function"
+        dead.append(DeadFunction(qualname=f.qualname, file=f.file, lineno=f.lineno, confidence=confidence, reason=reason))
+    dead.sort(key=attrgetter("file", "lineno"))
+    dead.sort(key=lambda d: _CONFIDENCE_ORDER[d.confidence])  # stable: by file and line within a level
+
+    counts = {kind: 0 for kind in ENTRY_KINDS}
+    for kind in roots.values():
+        counts[kind] += 1
+    return DeadCodeReport(
+        entry_points=counts,
+        unmatched_roots=unmatched,
+        functions=n_functions,
+        reachable=sum(strong[:n_functions]),
+        dead=dead,
+    )
+
+
+def dead_code_payload(report: DeadCodeReport | None, errors: list[Any]) -> dict[str, Any]:
+    """
+    The `dead_code.json` artifact.
+    """
+    if report is None:
+        report = DeadCodeReport(entry_points={k: 0 for k in ENTRY_KINDS}, unmatched_roots=[], functions=0, reachable=0)
+    by_confidence = {k: 0 for k in _CONFIDENCE_ORDER}
+    for d in report.dead:
+        by_confidence[d.confidence] += 1
+    return {
+        "version": DEAD_CODE_VERSION,
+        "entry_points": report.entry_points,
+        "unmatched_roots": report.unmatched_roots,
+        "stats": {
+            "functions": report.functions,
+            "reachable": report.reachable,
+            "unreachable": len(report.dead),
+            **by_confidence,
+        },
+        "dead": [
+            {"qualname": d.qualname, "file": d.file, "lineno": d.lineno, "confidence": d.confidence, "reason": d.reason}
+            for d in report.dead
+        ],
+        "errors": errors,
+    }
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+from dpylens.analyzer.callgraph_resolve import ResolvedCall
+from dpylens.analyzer.classes import ClassIndex, classes_payload
+from dpylens.analyzer.dataflow import FunctionDataFlow
+from dpylens.analyzer.duplicates import FunctionFingerprint, duplicates_payload
+from dpylens.analyzer.imports import ImportRecord
+from dpylens.analyzer.metrics import FunctionMetrics, metrics_payload
+from dpylens.analyzer.models import CallRecord, FileError, FunctionRecord, to_jsonable
+from dpylens.analyzer.modulegraph import ModuleEdge, ModuleNode
+from dpylens.analyzer.patterns import PatternHit
+from dpylens.analyzer.reachability import DeadCodeReport, dead_code_payload
+from dpylens.analyzer.routes_litestar import LitestarRouteReport, routes_payload
+from dpylens.analyzer.summaries import SUMMARY_VERSION, FunctionSummary, SummaryStats
+from dpylens.analyzer.visualize import (
+    build_callgraph_dot,
+    build_callgraph_grouped_dot,
+    build_imports_dot,
+    write_text,
+)
+from dpylens.analyzer.visualize_dataflow import build_dataflow_dot
+from dpylens.analyzer.visualize_modulegraph import build_module_graph_dot
+
+
+@dataclass
+class AnalysisResult:
+    """
+    In-memory output of one analysis run.
+
+    The record lists are the source of truth. JSON payloads (the dicts written to
+    `modules.json`, `callgraph.json`, ...) are only built when first requested via
+    `payload()` / `json_text()` and are cached, so writing artifacts, building a
+    report and computing a summary serialize each artifact at most once.
+    """
+    root: Path
+    files: list[Path]
+    errors: list[FileError]
+    imports: list[ImportRecord]
+    functions: list[FunctionRecord]
+    calls: list[CallRecord]
+    resolved_calls: list[ResolvedCall]
+    patterns: list[PatternHit]
+    dataflows: list[FunctionDataFlow]
+    module_nodes: list[ModuleNode]
+    module_edges: list[ModuleEdge]
+    routes: LitestarRouteReport | None = None
+    summaries: list[FunctionSummary] = field(default_factory=list)
+    summary_stats: SummaryStats | None = None
+    function_metrics: list[FunctionMetrics] = field(default_factory=list)
+    fingerprints: list[FunctionFingerprint] = field(default_factory=list)
+    dead_code: DeadCodeReport | None = None
+    classes: ClassIndex | None = None
+    # Artifacts produced by extractor plugins: file name -> JSON payload
+    plugin_artifacts: dict[str, Any] = field(default_factory=dict)
+
+    _payloads: dict[str, Any] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _texts: dict[str, str] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _written: set[Path] = field(default_factory=set, init=False, repr=False, compare=False)
+
+    @property
+    def artifact_names(self) -> list[str]:
+        names = [name for name in _PAYLOAD_BUILDERS if name != "routes.json" or self.routes is not None]
+        return names + list(self.plugin_artifacts)
+
+    def payload(self, name: str) -> Any:
+        """
+        JSON-serializable view of one artifact (e.g. "callgraph.json"), built lazily.
+        """
+        if name not in self._payloads:
+            if name in self.plugin_artifacts:
+                return self.plugin_artifacts[name]
+            builder = _PAYLOAD_BUILDERS.get(name)
+            if builder is None or name not in self.artifact_names:
+                raise KeyError(name)
+            self._payloads[name] = builder(self)
+        return self._payloads[name]
+
+    def json_text(self, name: str) -> str:
+        if name not in self._texts:
+            self._texts[name] = json.dumps(self.payload(name), indent=2, sort_keys=False)
+        return self._texts[name]
+
+    def write(self, out: Path) -> None:
+        """
+        Write JSON + DOT artifacts, same layout as `dpylens analyze`.
+        """
+        out.mkdir(parents=True, exist_ok=True)
+
+        for name in self.artifact_names:
+            write_text(out / name, self.json_text(name))
+
+        write_text(out / "imports.dot", build_imports_dot(self.imports))
+        write_text(out / "module_graph.dot", build_module_graph_dot(self.module_nodes, self.module_edges))
+        write_text(out / "callgraph.dot", build_callgraph_dot(self.calls))
+        write_text(out / "callgraph_grouped.dot", build_callgraph_grouped_dot(self.calls))
+        write_text(out / "dataflow.dot", build_dataflow_dot(self.dataflows))
+        self._written.add(out.resolve())
+
+    def written_to(self, out: Path) -> bool:
+        """
+        Whether `write()` put this result's artifacts in `out` (so they can be linked, not rewritten).
+        """
+        return out.resolve() in self._written
+
+
+def _errors(r: AnalysisResult) -> list[Any]:
+    return to_jsonable(r.errors)
+
+
+_PAYLOAD_BUILDERS: dict[str, Callable[[AnalysisResult], Any]] = {
+    "modules.json": lambda r: {"imports": to_jsonable(r.imports), "errors": _errors(r)},
+    "module_graph.json": lambda r: {
+        "nodes": to_jsonable(r.module_nodes),
+        "edges": to_jsonable(r.module_edges),
+        "errors": _errors(r),
+    },
+    "callgraph.json": lambda r: {
+        "functions": to_jsonable(r.functions),
+        "calls": to_jsonable(r.calls),
+        "errors": _errors(r),
+    },
+    "callgraph_resolved.json": lambda r: {
+        "functions": to_jsonable(r.functions),
+        "calls": to_jsonable(r.resolved_calls),
+        "errors": _errors(r),
+    },
+    "patterns.json": lambda r: {"patterns": to_jsonable(r.patterns), "errors": _errors(r)},
+    "dataflow.json": lambda r: {"functions": to_jsonable(r.dataflows), "errors": _errors(r)},
+    "effects.json": lambda r: {
+        "version": SUMMARY_VERSION,
+        "functions": to_jsonable(r.summaries),
+        "stats": to_jsonable(r.summary_stats),
+        "errors": _errors(r),
+    },
+    "metrics.json": lambda r: metrics_payload(r.function_metrics, _errors(r)),
+    "duplicates.json": lambda r: duplicates_payload(r.fingerprints, _errors(r)),
+    "classes.json": lambda r: classes_payload(r.classes, _errors(r)),
+    "dead_code.json": lambda r: dead_code_payload(r.dead_code, _errors(r)),
+    "routes.json": lambda r: routes_payload(r.routes) if r.routes is not None else None,
+}
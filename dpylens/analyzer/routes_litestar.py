@@ -213,69 +213,100 @@ def _extract_top_level_http_functions(tree: ast.AST, file_rel: str) -> dict[str,
     return out
 
 
-def analyze_litestar_routes(root: Path, out_dir: Path) -> LitestarRouteReport:
-    warnings: list[str] = []
-    routes: list[LitestarRoute] = []
+@dataclass(frozen=True)
+class LitestarFileFacts:
+    """
+    Per-file Litestar facts; routes are only linked once facts from every file are known.
+    """
+    file: str
+    router_paths: dict[str, str]
+    router_handlers: dict[str, list[str]]
+    app_handlers: dict[str, list[str]]
+    http_functions: dict[str, dict[str, Any]]
+    controllers: dict[str, dict[str, Any]]
 
-    py_files = list(root.rglob("*.py"))
 
-    # Controller definitions
+def extract_litestar_facts(tree: ast.AST, file_rel: str) -> LitestarFileFacts:
     controllers: dict[str, dict[str, Any]] = {}
-    # Top-level functions with HTTP decorators
-    http_functions: dict[str, dict[str, Any]] = {}
 
-    # Router / app wiring
-    router_paths_by_var: dict[str, str] = {}
-    router_handlers_by_var: dict[str, list[str]] = {}
-    app_handlers_by_var: dict[str, list[str]] = {}
+    for node in getattr(tree, "body", []):
+        if not isinstance(node, ast.ClassDef):
+            continue
+        if not _is_controller_base(node):
+            continue
+
+        c_name = node.name
+        c_path = _extract_controller_path(node)
+        c_auth = _extract_controller_auth(node)
 
-    for fp in py_files:
+        endpoints: list[dict[str, Any]] = []
+        for item in node.body:
+            if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                for dec in item.decorator_list:
+                    method, path = _decorator_http_method(dec)
+                    if not method:
+                        continue
+                    endpoints.append({"http_method": method, "path": path or "", "handler": item.name})
+
+        controllers[c_name] = {
+            "file": file_rel,
+            "path": c_path,
+            "auth": c_auth,
+            "endpoints": endpoints,
+        }
+
+    return LitestarFileFacts(
+        file=file_rel,
+        router_paths=_extract_router_path_assignments(tree),
+        router_handlers=_extract_router_handlers_assignments(tree),
+        app_handlers=_extract_app_handlers_assignments(tree),
+        http_functions=_extract_top_level_http_functions(tree, file_rel),
+        controllers=controllers,
+    )
+
+
+def collect_litestar_routes(root: Path) -> LitestarRouteReport:
+    """
+    Extract Litestar routes under `root` without writing anything to disk.
+    """
+    warnings: list[str] = []
+    facts: list[LitestarFileFacts] = []
+
+    for fp in root.rglob("*.py"):
         try:
             src = fp.read_text(encoding="utf-8")
             tree = ast.parse(src, filename=str(fp))
         except Exception as e:
             warnings.append(f"parse_failed: {fp}: {e}")
             continue
+        facts.append(extract_litestar_facts(tree, str(fp.relative_to(root))))
 
-        file_rel = str(fp.relative_to(root))
-
-        router_paths_by_var.update(_extract_router_path_assignments(tree))
+    return link_litestar_routes(facts, warnings=warnings)
 
-        rhs = _extract_router_handlers_assignments(tree)
-        for k, v in rhs.items():
-            router_handlers_by_var[k] = v
 
-        ahs = _extract_app_handlers_assignments(tree)
-        for k, v in ahs.items():
-            app_handlers_by_var[k] = v
+def link_litestar_routes(facts: list[LitestarFileFacts], *, warnings: list[str] | None = None) -> LitestarRouteReport:
+    """
+    Wire controllers / handler functions to Router and Litestar app paths across files.
+    """
+    warnings = list(warnings or [])
+    routes: list[LitestarRoute] = []
 
-        http_functions.update(_extract_top_level_http_functions(tree, file_rel))
+    # Controller definitions
+    controllers: dict[str, dict[str, Any]] = {}
+    # Top-level functions with HTTP decorators
+    http_functions: dict[str, dict[str, Any]] = {}
 
-        for node in tree.body:
-            if not isinstance(node, ast.ClassDef):
-                continue
-            if not _is_controller_base(node):
-                continue
+    # Router / app wiring
+    router_paths_by_var: dict[str, str] = {}
+    router_handlers_by_var: dict[str, list[str]] = {}
+    app_handlers_by_var: dict[str, list[str]] = {}
 
-            c_name = node.name
-            c_path = _extract_controller_path(node)
-            c_auth = _extract_controller_auth(node)
-
-            endpoints: list[dict[str, Any]] = []
-            for item in node.body:
-                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                    for dec in item.decorator_list:
-                        method, path = _decorator_http_method(dec)
-                        if not method:
-                            continue
-                        endpoints.append({"http_method": method, "path": path or "", "handler": item.name})
-
-            controllers[c_name] = {
-                "file": file_rel,
-                "path": c_path,
-                "auth": c_auth,
-                "endpoints": endpoints,
-            }
+    for ff in facts:
+        router_paths_by_var.update(ff.router_paths)
+        router_handlers_by_var.update(ff.router_handlers)
+        app_handlers_by_var.update(ff.app_handlers)
+        http_functions.update(ff.http_functions)
+        controllers.update(ff.controllers)
 
     # Build router->path mapping
     router_to_path: dict[str, str] = dict(router_paths_by_var)
@@ -377,15 +408,17 @@ def analyze_litestar_routes(root: Path, out_dir: Path) -> LitestarRouteReport:
 
     routes.sort(key=lambda r: (r.path, r.http_method, r.handler))
 
-    report = LitestarRouteReport(framework="litestar", routes=routes, warnings=warnings)
+    return LitestarRouteReport(framework="litestar", routes=routes, warnings=warnings)
+
+
+def routes_payload(report: LitestarRouteReport) -> dict[str, Any]:
+    return {"framework": report.framework, "routes": [asdict(r) for r in report.routes], "warnings": report.warnings}
+
+
+def analyze_litestar_routes(root: Path, out_dir: Path) -> LitestarRouteReport:
+    report = collect_litestar_routes(root)
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    (out_dir / "routes.json").write_text(
-        json.dumps(
-            {"framework": report.framework, "routes": [asdict(r) for r in report.routes], "warnings": report.warnings},
-            indent=2,
-        ),
-        encoding="utf-8",
-    )
+    (out_dir / "routes.json").write_text(json.dumps(routes_payload(report), indent=2), encoding="utf-8")
 
     return report
\ No newline at end of file
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from dpylens.analyzer.budget import DEFAULT_BUDGET, FileBudget
+from dpylens.analyzer.layout import PackageLayout, detect_package_layout
+from dpylens.analyzer.models import FileError, from_jsonable, to_jsonable
+from dpylens.analyzer.patterns import CompiledRules
+from dpylens.analyzer.pipeline import (
+    DEFAULT_CHUNK_SIZE,
+    FILE_ANALYSIS_VERSION,
+    FileAnalysis,
+    FileTask,
+    finalize,
+    plan_files,
+    run_file_pass,
+)
+from dpylens.analyzer.plugins import PluginConfig
+from dpylens.analyzer.result import AnalysisResult
+from dpylens.analyzer.visualize import write_text
+
+SHARD_FORMAT = "dpylens-shard"
+# Shards hold FileAnalysis records
+SHARD_VERSION = FILE_ANALYSIS_VERSION
+SHARD_STRATEGIES = ("hash", "root")
+
+
+class ShardError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class ShardSpec:
+    """
+    index/count: this is shard `index` (0-based) out of `count`.
+    by:
+      - "hash": files are spread by a stable hash of their repo-relative path
+      - "root": files are grouped by package root (src/, packages/*/src, repo root);
+                roots are dealt round-robin, so count == number of roots gives one shard per root
+    """
+    index: int
+    count: int
+    by: str = "hash"
+
+    @classmethod
+    def parse(cls, text: str, by: str = "hash") -> ShardSpec:
+        try:
+            i, n = (int(x) for x in text.split("/", 1))
+        except ValueError as e:
+            raise ShardError(f"shard must look like K/N (e.g. 0/4), got {text!r}") from e
+        if n < 1 or not 0 <= i < n:
+            raise ShardError(f"shard index must satisfy 0 <= K < N, got {text!r}")
+        if by not in SHARD_STRATEGIES:
+            raise ShardError(f"unknown shard strategy {by!r} (expected one of {', '.join(SHARD_STRATEGIES)})")
+        return cls(index=i, count=n, by=by)
+
+    @property
+    def filename(self) -> str:
+        return f"shard-{self.index}-of-{self.count}.json"
+
+
+def _package_root_of(layout: PackageLayout, path: Path) -> Path:
+    for r in layout.package_roots:
+        if path.is_relative_to(r):
+            return r
+    return layout.repo_root
+
+
+def shard_of(task: FileTask, spec: ShardSpec, *, root: Path, root_slots: dict[Path, int], layout: PackageLayout) -> int:
+    if spec.by == "root":
+        return root_slots[_package_root_of(layout, task.path)] % spec.count
+    rel = task.path.relative_to(root).as_posix()
+    return int.from_bytes(hashlib.blake2b(rel.encode("utf-8"), digest_size=8).digest(), "big") % spec.count
+
+
+def select_shard(root: Path, tasks: list[FileTask], spec: ShardSpec) -> list[FileTask]:
+    layout = detect_package_layout(root)
+    root_slots = {r: i for i, r in enumerate(layout.package_roots)}
+    return [t for t in tasks if shard_of(t, spec, root=root, root_slots=root_slots, layout=layout) == spec.index]
+
+
+def analyze_shard(
+    root: Path,
+    spec: ShardSpec,
+    *,
+    jobs: int = 1,
+    budget: FileBudget = DEFAULT_BUDGET,
+    pattern_rules: CompiledRules | None = None,
+    plugins: PluginConfig | None = None,
+) -> dict[str, Any]:
+    """
+    Run the per-file pass for one shard and return its partial-artifact payload.
+    """
+    root = root.resolve()
+    tasks = select_shard(root, plan_files(root), spec)
+
+    if jobs > 1 and len(tasks) > DEFAULT_CHUNK_SIZE:
+        with ProcessPoolExecutor(max_workers=jobs) as ex:
+            outcomes = run_file_pass(tasks, root, executor=ex, budget=budget, rules=pattern_rules, plugins=plugins)
+    else:
+        outcomes = run_file_pass(tasks, root, budget=budget, rules=pattern_rules, plugins=plugins)
+
+    return {
+        "format": SHARD_FORMAT,
+        "version": SHARD_VERSION,
+        "root": str(root),
+        "shard": {"index": spec.index, "count": spec.count, "by": spec.by},
+        "files": [
+            {"path": str(t.path), "analysis": to_jsonable(fa), "error": to_jsonable(err)}
+            for t, (fa, err) in zip(tasks, outcomes)
+        ],
+    }
+
+
+def write_shard(
+    root: Path,
+    spec: ShardSpec,
+    out: Path,
+    *,
+    jobs: int = 1,
+    budget: FileBudget = DEFAULT_BUDGET,
+    pattern_rules: CompiledRules | None = None,
+    plugins: PluginConfig | None = None,
+) -> Path:
+    """
+    Write `<out>/shard-K-of-N.json`. Shards of one run may share the same `out` folder.
+    """
+    payload = analyze_shard(root, spec, jobs=jobs, budget=budget, pattern_rules=pattern_rules, plugins=plugins)
+    path = out / spec.filename
+    write_text(path, json.dumps(payload, separators=(",", ":")))
+    return path
+
+
+def _shard_files(inputs: list[Path]) -> list[Path]:
+    found: list[Path] = []
+    for p in inputs:
+        if p.is_dir():
+            found.extend(sorted(p.glob("shard-*-of-*.json")))
+        else:
+            found.append(p)
+    return found
+
+
+def merge_shards(
+    inputs: list[Path],
+    *,
+    plugins: PluginConfig | None = None,
+    entry_points: tuple[str, ...] = (),
+) -> AnalysisResult:
+    """
+    Combine shard files (or folders containing them) into one AnalysisResult:
+    global module graph, resolved call graph and routes, identical to an unsharded run.
+    Pass the same `plugins` the shards were analyzed with to run their finalize step, and the
+    same `entry_points` as `analyze` for identical reachability.
+    """
+    shard_paths = _shard_files(inputs)
+    if not shard_paths:
+        raise ShardError("no shard files found")
+
+    root: str | None = None
+    count: int | None = None
+    by: str | None = None
+    seen: set[int] = set()
+    entries: dict[str, tuple[FileAnalysis | None, FileError | None]] = {}
+
+    for sp in shard_paths:
+        payload = json.loads(sp.read_text(encoding="utf-8"))
+        if payload.get("format") != SHARD_FORMAT or payload.get("version") != SHARD_VERSION:
+            raise ShardError(f"{sp}: not a dpylens shard (format/version mismatch)")
+
+        meta = payload["shard"]
+        if root is None:
+            root, count, by = payload["root"], meta["count"], meta["by"]
+        elif (payload["root"], meta["count"], meta["by"]) != (root, count, by):
+            raise ShardError(f"{sp}: belongs to a different run (root/count/strategy mismatch)")
+        if meta["index"] in seen:
+            raise ShardError(f"{sp}: duplicate shard {meta['index']}/{count}")
+        seen.add(meta["index"])
+
+        for item in payload["files"]:
+            entries[item["path"]] = (
+                from_jsonable(FileAnalysis, item["analysis"]),
+                from_jsonable(FileError, item["error"]),
+            )
+
+    assert root is not None and count is not None
+    missing = sorted(set(range(count)) - seen)
+    if missing:
+        raise ShardError(f"missing shards: {', '.join(f'{i}/{count}' for i in missing)}")
+
+    # Same order as scan_python_files, so merged output matches a single-process run
+    files = sorted(Path(p) for p in entries)
+    return finalize(Path(root), files, [entries[str(f)] for f in files], plugins=plugins, entry_points=entry_points)
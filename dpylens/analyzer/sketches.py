@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import hashlib
+import heapq
+from typing import Hashable
+
+_HASH_SPACE = float(2**64)
+
+
+def hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class TopK:
+    """
+    Heavy hitters in bounded memory (Space-Saving).
+
+    Tracks at most `capacity` keys. Counts are exact while fewer distinct keys than that have been
+    seen; after that a new key replaces the smallest tracked one and inherits its count, so counts
+    may be overestimated by at most the evicted count. `top(k)` breaks ties by first appearance.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        self.capacity = max(1, capacity)
+        self.counts: dict[Hashable, int] = {}
+        self._first_seen: dict[Hashable, int] = {}
+        self._seq = 0
+        # Lazy min-heap of (count when pushed, first seen, key); stale entries are fixed on pop
+        self._heap: list[tuple[int, int, Hashable]] = []
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def add(self, key: Hashable, n: int = 1) -> Hashable | None:
+        """
+        Count `key`; returns the key evicted to make room, if any.
+        """
+        if key in self.counts:
+            self.counts[key] += n
+            return None
+
+        evicted = None
+        base = 0
+        if len(self.counts) >= self.capacity:
+            while True:
+                count, seq, victim = heapq.heappop(self._heap)
+                current = self.counts.get(victim)
+                if current is None or self._first_seen[victim] != seq:
+                    continue
+                if current != count:
+                    heapq.heappush(self._heap, (current, seq, victim))
+                    continue
+                break
+            del self.counts[victim]
+            del self._first_seen[victim]
+            evicted, base = victim, count
+
+        self._seq += 1
+        self.counts[key] = base + n
+        self._first_seen[key] = self._seq
+        heapq.heappush(self._heap, (base + n, self._seq, key))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(c, self._first_seen[k], k) for k, c in self.counts.items()]
+            heapq.heapify(self._heap)
+        return evicted
+
+    def top(self, k: int) -> list[tuple[Hashable, int]]:
+        return [
+            (key, count)
+            for key, count in heapq.nlargest(k, self.counts.items(), key=lambda kv: (kv[1], -self._first_seen[kv[0]]))
+        ]
+
+
+class DistinctCounter:
+    """
+    Distinct count in bounded memory (k minimum values).
+
+    Exact up to `k` distinct values; beyond that the estimate has a relative standard error of
+    about 1/sqrt(k - 2) (~13% for k=64).
+    """
+
+    __slots__ = ("k", "_heap", "_members")
+
+    def __init__(self, k: int = 64):
+        self.k = k
+        self._heap: list[int] = []  # max-heap (negated) of the k smallest hashes
+        self._members: set[int] = set()
+
+    def add(self, value: str) -> None:
+        h = hash64(value)
+        if h in self._members:
+            return
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, -h)
+            self._members.add(h)
+        elif h < -self._heap[0]:
+            dropped = -heapq.heapreplace(self._heap, -h)
+            self._members.discard(dropped)
+            self._members.add(h)
+
+    def estimate(self) -> int:
+        if len(self._heap) < self.k:
+            return len(self._heap)
+        kth = -self._heap[0]
+        return round((self.k - 1) * _HASH_SPACE / (kth + 1))
@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable
+
+from dpylens.analyzer.callgraph_resolve import ResolvedCall
+from dpylens.analyzer.effects import FunctionEffects
+from dpylens.analyzer.models import from_jsonable, to_jsonable
+
+# Bump when the summary semantics change, so memoized summaries from older runs are not reused
+SUMMARY_VERSION = 2
+
+
+@dataclass(frozen=True, slots=True)
+class FunctionSummary:
+    """
+    Interprocedural summary of one function (transitive over resolved local calls).
+
+    env_reads:        environment variables read by the function or anything it calls
+    side_effects:     side-effect categories of the function or anything it calls
+    params_to_return: parameters whose value may reach the return value
+    key:              memo key: hash of the function's SCC local facts + its callees' keys
+    """
+    function: str
+    file: str
+    lineno: int
+    key: str
+    env_reads: list[str]
+    side_effects: list[str]
+    params_to_return: list[str]
+
+
+@dataclass(frozen=True)
+class SummaryStats:
+    sccs: int
+    computed: int
+    reused: int
+
+
+class SummaryMemo:
+    """
+    Summaries of a previous run, by key. A strongly connected component whose key is
+    unchanged (same local facts, same callee keys) is reused without recomputation.
+    """
+
+    def __init__(self, summaries: Iterable[FunctionSummary] = ()):
+        self._by_key: dict[str, dict[str, FunctionSummary]] = {}
+        for s in summaries:
+            self._by_key.setdefault(s.key, {})[s.function] = s
+
+    @classmethod
+    def load(cls, path: Path) -> SummaryMemo:
+        """
+        Load from an `effects.json` artifact.
+        """
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        if payload.get("version") != SUMMARY_VERSION:
+            return cls()
+        return cls(from_jsonable(FunctionSummary, row) for row in payload.get("functions") or [])
+
+    def get(self, key: str, members: list[str]) -> dict[str, FunctionSummary] | None:
+        found = self._by_key.get(key)
+        if found is None or any(m not in found for m in members):
+            return None
+        return found
+
+
+def _sccs(nodes: list[str], edges: dict[str, list[str]]) -> list[list[str]]:
+    """
+    Tarjan's algorithm (iterative). SCCs come out in reverse topological order: callees first.
+    """
+    index: dict[str, int] = {}
+    low: dict[str, int] = {}
+    on_stack: set[str] = set()
+    stack: list[str] = []
+    out: list[list[str]] = []
+    counter = 0
+
+    for start in nodes:
+        if start in index:
+            continue
+        work: list[tuple[str, int]] = [(start, 0)]
+        while work:
+            v, i = work.pop()
+            if i == 0:
+                index[v] = low[v] = counter
+                counter += 1
+                stack.append(v)
+                on_stack.add(v)
+            succ = edges.get(v, [])
+            recurse = False
+            while i < len(succ):
+                w = succ[i]
+                i += 1
+                if w not in index:
+                    work.append((v, i))
+                    work.append((w, 0))
+                    recurse = True
+                    break
+                if w in on_stack:
+                    low[v] = min(low[v], index[w])
+            if recurse:
+                continue
+            if low[v] == index[v]:
+                comp: list[str] = []
+                while True:
+                    w = stack.pop()
+                    on_stack.discard(w)
+                    comp.append(w)
+                    if w == v:
+                        break
+                out.append(comp)
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[v])
+    return out
+
+
+@dataclass
+class _State:
+    env_reads: set[str]
+    side_effects: set[str]
+    params_to_return: set[str]
+
+
+def _is_constructor(raw: str, callee: str) -> bool:
+    return callee.endswith(".__init__") and not raw.endswith("__init__")
+
+
+def _is_bound_call(raw: str, callee: str, params: list[str]) -> bool:
+    """
+    True when the call fills the callee's first parameter from its receiver. `Cls.m(obj, x)`
+    passes self explicitly; `obj.m(x)`, `self.m(x)` and `Cls.cm(x)` (cls) do not.
+    """
+    if not params or params[0] not in ("self", "cls") or "." not in raw:
+        return False
+    receiver = raw.rpartition(".")[0].rpartition(".")[2]
+    return params[0] == "cls" or receiver != callee.rpartition(".")[0].rpartition(".")[2]
+
+
+def _params_reaching_return(
+    rec: FunctionEffects,
+    callee_of: dict[tuple[str, str], str],
+    params_of: dict[str, list[str]],
+    state_of: dict[str, _State],
+) -> set[str]:
+    memo: dict[int, set[str]] = {}
+
+    def atom(a: str) -> set[str]:
+        kind, _, value = a.partition(":")
+        if kind == "p":
+            return {value}
+        i = int(value)
+        if i in memo:
+            return memo[i]
+        memo[i] = set()  # guards against cycles through loop-carried variables
+
+        site = rec.calls[i]
+        callee = callee_of.get((rec.function, site.callee))
+        st = state_of.get(callee) if callee else None
+        if st is None:
+            # Unknown callee: assume any argument (and the receiver) may reach its result
+            sources = [*site.args, *site.kwargs.values(), site.receiver]
+        elif _is_constructor(site.callee, callee):
+            # Cls(x) returns the new object, which holds whatever was passed to __init__
+            sources = [*site.args, *site.kwargs.values()]
+        else:
+            params = params_of[callee]
+            if _is_bound_call(site.callee, callee, params):
+                # obj.m(x) / self.m(x) / Cls.classmethod(x): the receiver fills params[0]
+                params = params[1:]
+                sources = [site.receiver] if params_of[callee][0] in st.params_to_return else []
+            else:
+                sources = []
+            sources += [arg for j, arg in enumerate(site.args) if j < len(params) and params[j] in st.params_to_return]
+            sources += [arg for k, arg in site.kwargs.items() if k in st.params_to_return or k == "**"]
+
+        out: set[str] = set()
+        for src in sources:
+            for a2 in src:
+                out |= atom(a2)
+        memo[i] = out
+        return out
+
+    reached: set[str] = set()
+    for a in rec.returns:
+        reached |= atom(a)
+    return reached
+
+
+def _local_fingerprint(records: list[FunctionEffects]) -> list[Any]:
+    # file/lineno do not affect the summary; leaving them out keeps keys stable when code moves
+    rows = []
+    for r in records:
+        row = to_jsonable(r)
+        row.pop("file")
+        row.pop("lineno")
+        rows.append(row)
+    return rows
+
+
+def summarize_effects(
+    effects: list[FunctionEffects],
+    resolved_calls: list[ResolvedCall],
+    *,
+    memo: SummaryMemo | None = None,
+) -> tuple[list[FunctionSummary], SummaryStats]:
+    """
+    Bottom-up interprocedural summaries over the resolved call graph.
+
+    Functions are processed one strongly connected component at a time, callees first; inside
+    a component (recursion) facts are iterated to a fixed point. Each component gets a key from
+    its local facts and its callees' keys, so with a `memo` from a previous run unchanged
+    components are reused as-is.
+    """
+    records_of: dict[str, list[FunctionEffects]] = {}
+    for rec in effects:
+        records_of.setdefault(rec.function, []).append(rec)
+    params_of = {fn: recs[0].params for fn, recs in records_of.items()}
+
+    callee_of: dict[tuple[str, str], str] = {}
+    for c in resolved_calls:
+        if c.callee_resolved is not None and c.callee_resolved in records_of:
+            callee_of[(c.caller, c.callee_raw)] = c.callee_resolved
+
+    edges: dict[str, list[str]] = {}
+    for fn, recs in records_of.items():
+        targets = {callee_of.get((fn, site.callee)) for r in recs for site in r.calls}
+        targets.discard(None)
+        edges[fn] = sorted(targets)  # type: ignore[arg-type]
+
+    state_of: dict[str, _State] = {}
+    key_of: dict[str, str] = {}
+    done: dict[str, FunctionSummary] = {}
+    computed = reused = 0
+
+    components = _sccs(list(records_of), edges)
+    for comp in components:
+        members = sorted(comp)
+        member_set = set(members)
+        external = sorted({(t, key_of[t]) for m in members for t in edges[m] if t not in member_set})
+        blob = json.dumps(
+            [SUMMARY_VERSION, [[m, _local_fingerprint(records_of[m])] for m in members], external],
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+        key = hashlib.blake2b(blob.encode("utf-8"), digest_size=16).hexdigest()
+        for m in members:
+            key_of[m] = key
+
+        cached = memo.get(key, members) if memo is not None else None
+        if cached is not None:
+            for m in members:
+                s = cached[m]
+                state_of[m] = _State(set(s.env_reads), set(s.side_effects), set(s.params_to_return))
+            reused += len(members)
+        else:
+            for m in members:
+                recs = records_of[m]
+                state_of[m] = _State(
+                    {e for r in recs for e in r.env_reads},
+                    {e for r in recs for e in r.side_effects},
+                    set(),
+                )
+            changed = True
+            while changed:
+                changed = False
+                for m in members:
+                    st = state_of[m]
+                    before = (len(st.env_reads), len(st.side_effects), len(st.params_to_return))
+                    for t in edges[m]:
+                        callee_state = state_of[t]
+                        st.env_reads |= callee_state.env_reads
+                        st.side_effects |= callee_state.side_effects
+                    for r in records_of[m]:
+                        st.params_to_return |= _params_reaching_return(r, callee_of, params_of, state_of)
+                    if (len(st.env_reads), len(st.side_effects), len(st.params_to_return)) != before:
+                        changed = True
+            computed += len(members)
+
+        for m in members:
+            first = records_of[m][0]
+            st = state_of[m]
+            params = params_of[m]
+            done[m] = FunctionSummary(
+                function=m,
+                file=first.file,
+                lineno=first.lineno,
+                key=key,
+                env_reads=sorted(st.env_reads),
+                side_effects=sorted(st.side_effects),
+                params_to_return=[p for p in params if p in st.params_to_return],
+            )
+
+    summaries = [done[fn] for fn in records_of]
+    return summaries, SummaryStats(sccs=len(components), computed=computed, reused=reused)
+
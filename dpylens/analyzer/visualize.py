@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import os
 from pathlib import Path
 
 from dpylens.analyzer.imports import ImportRecord
@@ -8,7 +9,11 @@ from dpylens.analyzer.models import CallRecord
 
 def write_text(path: Path, text: str) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(text, encoding="utf-8")
+    # Write-then-rename: readers never see a partial file, and report files hardlinked
+    # to a previous version keep their content
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
 
 
 def _dot_escape(s: str) -> str:
@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import subprocess
+from collections import Counter, defaultdict
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from dpylens.analyzer.models import FileError, to_jsonable
+from dpylens.analyzer.pipeline import DEFAULT_CHUNK_SIZE, FileTask, analyze_files, chunked, finalize, plan_files
+from dpylens.analyzer.result import AnalysisResult
+from dpylens.analyzer.visualize import write_text
+
+_GIT_URL_PREFIXES = ("http://", "https://", "ssh://", "git://", "git@", "file://")
+
+
+@dataclass(frozen=True)
+class BatchEntry:
+    name: str
+    source: str  # local path or git URL
+
+
+@dataclass
+class BatchRepoOutcome:
+    name: str
+    source: str
+    analysis_dir: str
+    status: str  # "ok" | "failed"
+    files: int = 0
+    functions: int = 0
+    calls: int = 0
+    warnings: int = 0
+    error: str | None = None
+
+
+@dataclass
+class _RepoDigest:
+    """
+    The few facts the cross-repo index needs, so full results can be dropped after writing.
+    """
+    defines: set[str] = field(default_factory=set)
+    uses: Counter = field(default_factory=Counter)
+
+
+def is_git_url(source: str) -> bool:
+    return source.startswith(_GIT_URL_PREFIXES) or source.endswith(".git")
+
+
+def _default_name(source: str) -> str:
+    name = source.rstrip("/").rsplit("/", 1)[-1].rsplit(":", 1)[-1]
+    name = name.removesuffix(".git")
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", name) or "repo"
+
+
+def read_manifest(path: Path) -> list[BatchEntry]:
+    """
+    One repo per line: `<local path or git URL> [name]`. Blank lines and `#` comments are ignored.
+    Relative paths are resolved against the manifest's folder; duplicate names get a numeric suffix.
+    """
+    entries: list[BatchEntry] = []
+    used: set[str] = set()
+
+    for raw in path.read_text(encoding="utf-8").splitlines():
+        line = raw.split("#", 1)[0].strip()
+        if not line:
+            continue
+        parts = line.split()
+        source = parts[0]
+        if not is_git_url(source):
+            source = str((path.parent / source).resolve())
+
+        base = parts[1] if len(parts) > 1 else _default_name(source)
+        name, n = base, 2
+        while name in used:
+            name, n = f"{base}-{n}", n + 1
+        used.add(name)
+
+        entries.append(BatchEntry(name=name, source=source))
+    return entries
+
+
+def _checkout(entry: BatchEntry, checkouts_dir: Path) -> Path:
+    if not is_git_url(entry.source):
+        root = Path(entry.source)
+        if not root.is_dir():
+            raise FileNotFoundError(f"not a directory: {root}")
+        return root
+
+    dest = checkouts_dir / entry.name
+    if (dest / ".git").exists():
+        subprocess.run(["git", "-C", str(dest), "pull", "--ff-only", "--quiet"], check=True, capture_output=True, text=True)
+    else:
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        subprocess.run(
+            ["git", "clone", "--depth", "1", "--quiet", entry.source, str(dest)],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+    return dest
+
+
+def _digest(result: AnalysisResult) -> _RepoDigest:
+    d = _RepoDigest()
+    for n in result.module_nodes:
+        d.defines.add(n.module.split(".", 1)[0])
+    for e in result.module_edges:
+        if e.kind != "external" or e.dst_module.startswith("."):
+            continue
+        d.uses[e.dst_module.split(".", 1)[0]] += 1
+    return d
+
+
+def build_batch_index(outcomes: list[BatchRepoOutcome], digests: dict[str, _RepoDigest]) -> dict[str, Any]:
+    """
+    Cross-repo index: which repos define / use each top-level package, and which repos import
+    packages defined by another repo in the batch.
+    """
+    defined_by: dict[str, list[str]] = defaultdict(list)
+    used_by: dict[str, dict[str, int]] = defaultdict(dict)
+
+    for name in sorted(digests):
+        d = digests[name]
+        for pkg in sorted(d.defines):
+            defined_by[pkg].append(name)
+        for pkg, count in d.uses.items():
+            used_by[pkg][name] = count
+
+    packages = {
+        pkg: {
+            "defined_by": defined_by.get(pkg, []),
+            "used_by": dict(sorted(used_by.get(pkg, {}).items())),
+            "imports": sum(used_by.get(pkg, {}).values()),
+        }
+        for pkg in sorted(set(defined_by) | set(used_by))
+    }
+
+    cross: list[dict[str, Any]] = []
+    for pkg, meta in packages.items():
+        for user, count in meta["used_by"].items():
+            for owner in meta["defined_by"]:
+                if owner != user:
+                    cross.append({"repo": user, "depends_on": owner, "package": pkg, "imports": count})
+    cross.sort(key=lambda x: (x["repo"], x["depends_on"], x["package"]))
+
+    return {
+        "repos": to_jsonable(outcomes),
+        "packages": packages,
+        "cross_repo_dependencies": cross,
+    }
+
+
+def run_batch(
+    entries: list[BatchEntry],
+    out: Path,
+    *,
+    jobs: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> list[BatchRepoOutcome]:
+    """
+    Analyze many repos with one shared process pool.
+
+    Files from every repo are chunked onto the same pool, so workers stay busy across repo
+    boundaries; each repo is finalized and written to `out/<name>/analysis` as soon as its
+    last chunk completes. Writes `out/batch_index.json` at the end.
+    """
+    out.mkdir(parents=True, exist_ok=True)
+    jobs = jobs or os.cpu_count() or 1
+
+    outcomes: dict[str, BatchRepoOutcome] = {
+        e.name: BatchRepoOutcome(
+            name=e.name, source=e.source, analysis_dir=str(out / e.name / "analysis"), status="ok"
+        )
+        for e in entries
+    }
+    digests: dict[str, _RepoDigest] = {}
+
+    # Clones are I/O bound; run them concurrently before scheduling any analysis.
+    roots: dict[str, Path] = {}
+    with ThreadPoolExecutor(max_workers=min(8, max(1, len(entries)))) as clone_pool:
+        futs = {e.name: clone_pool.submit(_checkout, e, out / "_checkouts") for e in entries}
+        for name, fut in futs.items():
+            try:
+                roots[name] = fut.result().resolve()
+            except Exception as e:  # noqa: BLE001
+                outcomes[name].status = "failed"
+                outcomes[name].error = f"checkout_failed: {getattr(e, 'stderr', '') or e}".strip()
+
+    plans: dict[str, list[FileTask]] = {}
+    for name, root in roots.items():
+        try:
+            plans[name] = plan_files(root)
+        except Exception as e:  # noqa: BLE001
+            outcomes[name].status = "failed"
+            outcomes[name].error = f"scan_failed: {e}"
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending: dict[Future, tuple[str, int]] = {}
+        parts: dict[str, list[Any]] = {}
+        remaining: dict[str, int] = {}
+
+        for name, tasks in plans.items():
+            chunks = chunked(tasks, chunk_size)
+            parts[name] = [None] * len(chunks)
+            remaining[name] = len(chunks)
+            for i, chunk in enumerate(chunks):
+                pending[pool.submit(analyze_files, chunk, roots[name])] = (name, i)
+
+        def _finish(name: str) -> None:
+            outcome = outcomes[name]
+            try:
+                file_outcomes = [o for part in parts.pop(name) for o in part]
+                result = finalize(roots[name], [t.path for t in plans[name]], file_outcomes)
+                result.write(Path(outcome.analysis_dir))
+                digests[name] = _digest(result)
+                outcome.files = len(result.files)
+                outcome.functions = len(result.functions)
+                outcome.calls = len(result.calls)
+                outcome.warnings = len(result.errors)
+            except Exception as e:  # noqa: BLE001
+                outcome.status = "failed"
+                outcome.error = f"analysis_failed: {e}"
+
+        # Repos without any Python files never get a chunk back
+        for name in [n for n, r in remaining.items() if r == 0]:
+            _finish(name)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                name, i = pending.pop(fut)
+                if outcomes[name].status == "failed":
+                    continue
+                try:
+                    parts[name][i] = fut.result()
+                except Exception as e:  # noqa: BLE001
+                    # A crashed chunk should not sink the repo: record its files as errors.
+                    chunk = chunked(plans[name], chunk_size)[i]
+                    parts[name][i] = [(None, FileError(file=str(t.path), error=f"worker_failed: {e}")) for t in chunk]
+                remaining[name] -= 1
+                if remaining[name] == 0:
+                    _finish(name)
+
+    ordered = [outcomes[e.name] for e in entries]
+    write_text(out / "batch_index.json", json.dumps(build_batch_index(ordered, digests), indent=2))
+    return ordered
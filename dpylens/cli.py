@@ -2,146 +2,371 @@ from __future__ import annotations
 
 import argparse
 import json
-import threading
-import time
-import webbrowser
-from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+# Keep module-level imports light: every invocation (including --help) pays for them.
+# Subcommands import what they need inside their cmd_* function.
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+    from dpylens.analyzer.budget import FileBudget
+    from dpylens.analyzer.patterns import CompiledRules
+    from dpylens.analyzer.plugins import PluginConfig
+    from dpylens.analyzer.summaries import SummaryMemo
+
+# Mirrors of constants from heavier modules, needed to build the parser
+# (tests/test_cli_startup.py checks they stay in sync)
+STORE_FILENAME = "analysis.sqlite"  # dpylens.store.sqlite
+DELTA_FILENAME = "delta.json"  # dpylens.analyzer.diff
+SHARD_STRATEGIES = ("hash", "root")  # dpylens.analyzer.shards
+LINK_MODES = ("auto", "reflink", "hardlink", "symlink", "copy")  # dpylens.reporter.linking
+EXPORT_FORMATS = ("parquet", "arrow", "graphml", "gexf")  # dpylens.export.tables + dpylens.export.graphs
+EXPORT_PARTITIONS = ("none", "package")  # dpylens.export.tables.PARTITIONS
+QUEUE_FILENAME = "queue.sqlite"  # dpylens.worker.queue
+GENERATED_MODES = ("full", "imports-only", "skip")  # dpylens.analyzer.budget
+DEFAULT_MAX_FILE_BYTES = 2_000_000  # dpylens.analyzer.budget.FileBudget.max_bytes
+DEFAULT_MAX_FILE_SECONDS = None  # dpylens.analyzer.budget.FileBudget.max_seconds
+DEFAULT_GENERATED = "full"  # dpylens.analyzer.budget.FileBudget.generated
+
+
+def _budget_from_args(args: argparse.Namespace) -> FileBudget:
+    from dpylens.analyzer.budget import FileBudget
+
+    max_bytes = int(args.max_file_bytes)
+    max_seconds = float(args.max_file_seconds)
+    return FileBudget(
+        max_bytes=max_bytes if max_bytes > 0 else None,
+        max_seconds=max_seconds if max_seconds > 0 else None,
+        generated=args.generated,
+    )
 
-from dpylens.analyzer.aliases import extract_alias_maps
-from dpylens.analyzer.callgraph import extract_callgraph
-from dpylens.analyzer.callgraph_resolve import resolve_calls
-from dpylens.analyzer.dataflow import extract_dataflow
-from dpylens.analyzer.imports import extract_imports
-from dpylens.analyzer.layout import detect_package_layout, module_name_for_file_with_layout
-from dpylens.analyzer.models import FileError, to_jsonable
-from dpylens.analyzer.modulegraph import build_module_graph, build_local_module_index
-from dpylens.analyzer.parser import parse_file_to_ast
-from dpylens.analyzer.patterns import detect_patterns
-from dpylens.analyzer.routes_litestar import analyze_litestar_routes
-from dpylens.analyzer.scanner import scan_python_files
-from dpylens.analyzer.visualize import (
-    build_callgraph_dot,
-    build_callgraph_grouped_dot,
-    build_imports_dot,
-    write_text,
-)
-from dpylens.analyzer.visualize_dataflow import build_dataflow_dot
-from dpylens.analyzer.visualize_modulegraph import build_module_graph_dot
-from dpylens.rendering.graphviz import render_dot_to_png
-from dpylens.reporter.html_report import ReportPaths, build_report
 
+def _summary_memo_from_args(args: argparse.Namespace) -> SummaryMemo | None:
+    from dpylens.analyzer.summaries import SummaryMemo
 
-def write_json(path: Path, payload: object) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(payload, indent=2, sort_keys=False), encoding="utf-8")
+    if not args.reuse_summaries:
+        return None
+    path = Path(args.reuse_summaries)
+    if not path.exists():
+        print(f"Warning: --reuse-summaries {path} not found; computing every summary")
+        return None
+    return SummaryMemo.load(path)
 
 
-def analyze_project(root: Path, out: Path) -> tuple[int, list[FileError]]:
-    out.mkdir(parents=True, exist_ok=True)
+def _pattern_rules_from_args(args: argparse.Namespace) -> CompiledRules | None:
+    if not args.rules:
+        return None
+    from dpylens.analyzer.patterns import compile_pattern_rules
 
-    py_files = scan_python_files(root)
-    errors: list[FileError] = []
+    return compile_pattern_rules([Path(p) for p in args.rules])
 
-    layout = detect_package_layout(root)
 
-    import_records = []
-    all_functions = []
-    all_calls = []
+def _plugins_from_args(args: argparse.Namespace) -> PluginConfig | None:
+    if not args.plugin:
+        return None
+    from dpylens.analyzer.plugins import PluginConfig
 
-    pattern_hits = []
-    all_dataflows = []
+    return PluginConfig(
+        specs=tuple(args.plugin),
+        cache_dir=Path(args.plugin_cache).resolve() if args.plugin_cache else None,
+    )
 
-    alias_maps_by_file = {}
 
-    for f in py_files:
-        tree, err = parse_file_to_ast(f)
-        if err:
-            errors.append(err)
-            continue
-        assert tree is not None
+def cmd_analyze(args: argparse.Namespace) -> int:
+    root = Path(args.path).resolve()
+    out = Path(args.out).resolve()
+
+    if args.shard:
+        from dpylens.analyzer.shards import ShardError, ShardSpec, write_shard
+
+        if args.rev:
+            print("--shard reads the working tree; it cannot be combined with --rev")
+            return 1
+        if args.reuse_summaries:
+            print("--reuse-summaries does not apply to --shard: summaries are computed when the shards are merged")
+            return 1
+        try:
+            spec = ShardSpec.parse(args.shard, by=args.shard_by)
+            path = write_shard(
+                root,
+                spec,
+                out,
+                jobs=int(args.jobs),
+                budget=_budget_from_args(args),
+                pattern_rules=_pattern_rules_from_args(args),
+                plugins=_plugins_from_args(args),
+            )
+        except ShardError as e:
+            print(f"Sharded analysis failed: {e}")
+            return 1
+        print(f"Wrote shard {spec.index}/{spec.count} ({spec.by}) to: {path}")
+        print("Combine all shards with: dpylens merge <shard folders or files> --out <analysis>")
+        return 0
 
-        imp_rec = extract_imports(tree, f)
-        import_records.append(imp_rec)
+    options: dict[str, Any] = {
+        "jobs": int(args.jobs),
+        "budget": _budget_from_args(args),
+        "summary_memo": _summary_memo_from_args(args),
+        "pattern_rules": _pattern_rules_from_args(args),
+        "plugins": _plugins_from_args(args),
+        "entry_points": tuple(args.entry_point),
+    }
+    if args.rev:
+        from dpylens.analyzer.gitsource import GitError
+        from dpylens.analyzer.gittree import analyze_git
+
+        try:
+            result, stats = analyze_git(
+                root,
+                args.rev,
+                cache_dir=Path(args.file_cache).resolve() if args.file_cache else None,
+                **options,
+            )
+        except GitError as e:
+            print(f"Reading {args.rev} from git failed: {e}")
+            return 1
+        print(f"Read {args.rev} ({stats.commit[:12]}) from git objects; {stats.cached}/{stats.files} files from the cache.")
+    else:
+        from dpylens.analyzer.pipeline import analyze
+
+        result = analyze(root, **options)
+    result.write(out)
+    nfiles, errors = len(result.files), result.errors
+
+    if args.store == "sqlite":
+        from dpylens.store.sqlite import write_sqlite_store
+
+        write_sqlite_store(result, out / STORE_FILENAME)
 
-        module_name = module_name_for_file_with_layout(layout, f)
+    print(f"Analyzed {nfiles} Python files.")
+    print(f"Wrote JSON + DOT outputs to: {out}")
+    if args.store == "sqlite":
+        print(f"Wrote indexed store: {out / STORE_FILENAME}")
+    if errors:
+        print(f"Warnings: {len(errors)} issues (parse or analysis). See JSON output for details.")
+    return 0
 
-        alias_maps_by_file[str(f)] = extract_alias_maps(tree, f, root=root)
 
-        funcs, calls = extract_callgraph(tree, f, module_name=module_name)
-        all_functions.extend(funcs)
-        all_calls.extend(calls)
+def cmd_batch(args: argparse.Namespace) -> int:
+    from dpylens.batch import read_manifest, run_batch
 
-        pattern_hits.append(detect_patterns(tree, imp_rec, f))
-        all_dataflows.extend(extract_dataflow(tree, f, module_name=module_name))
+    manifest = Path(args.manifest).resolve()
+    out = Path(args.out).resolve()
 
-    mod_nodes, mod_edges = build_module_graph(root=root, py_files=py_files, import_records=import_records)
-    local_module_index = build_local_module_index(root, py_files)
+    entries = read_manifest(manifest)
+    outcomes = run_batch(entries, out, jobs=int(args.jobs) if args.jobs else None)
 
-    resolved_calls = resolve_calls(
-        functions=all_functions,
-        calls=all_calls,
-        alias_maps_by_file=alias_maps_by_file,
-        local_module_index=local_module_index,
+    failed = [o for o in outcomes if o.status != "ok"]
+    for o in outcomes:
+        if o.status == "ok":
+            print(f"  {o.name}: {o.files} files, {o.functions} functions")
+        else:
+            print(f"  {o.name}: FAILED ({o.error})")
+    print(f"Analyzed {len(outcomes) - len(failed)}/{len(outcomes)} repos.")
+    print(f"Cross-repo index: {out / 'batch_index.json'}")
+    return 1 if failed else 0
+
+
+def cmd_deps(args: argparse.Namespace) -> int:
+    from dpylens.analyzer.distributions import (
+        DEPENDENCIES_FILENAME,
+        DistributionError,
+        DistributionIndex,
+        default_cache_dir,
+        dependency_graph,
+        environment_site_packages,
     )
+    from dpylens.analyzer.visualize import write_text
 
-    # --- NEW: routes extraction (best-effort; must not break analysis) ---
+    analysis_dir = Path(args.analysis).resolve()
+    if not (analysis_dir / "module_graph.json").exists():
+        print(f"No module_graph.json in {analysis_dir} (run `dpylens analyze` first)")
+        return 1
+
+    site_packages = [Path(p).resolve() for p in args.site_packages]
+    if not site_packages and not args.lock and not args.dist_map:
+        site_packages = environment_site_packages()
+    cache_dir = None if args.no_dist_cache else Path(args.dist_cache).resolve() if args.dist_cache else default_cache_dir()
     try:
-        rr = analyze_litestar_routes(root=root, out_dir=out)
-        # store warnings in a JSON file as well (routes.json already includes warnings)
-        # also record them in "errors" list in a non-fatal way
-        for w in rr.warnings:
-            errors.append(FileError(file="routes_litestar", error=w))
-    except Exception as e:  # noqa: BLE001
-        errors.append(FileError(file="routes_litestar", error=f"routes_analyzer_failed: {e}"))
-
-    # JSON
-    write_json(out / "modules.json", {"imports": to_jsonable(import_records), "errors": to_jsonable(errors)})
-    write_json(
-        out / "module_graph.json",
-        {"nodes": to_jsonable(mod_nodes), "edges": to_jsonable(mod_edges), "errors": to_jsonable(errors)},
-    )
-    write_json(
-        out / "callgraph.json",
-        {"functions": to_jsonable(all_functions), "calls": to_jsonable(all_calls), "errors": to_jsonable(errors)},
-    )
-    write_json(
-        out / "callgraph_resolved.json",
-        {"functions": to_jsonable(all_functions), "calls": to_jsonable(resolved_calls), "errors": to_jsonable(errors)},
+        index, sources = DistributionIndex.build(
+            site_packages=site_packages,
+            lock=Path(args.lock).resolve() if args.lock else None,
+            mapping=Path(args.dist_map).resolve() if args.dist_map else None,
+            cache_dir=cache_dir,
+        )
+    except DistributionError as e:
+        print(f"Building the distribution index failed: {e}")
+        return 1
+
+    payload = dependency_graph(analysis_dir, index)
+    payload["index"] = {"fingerprint": index.fingerprint, "sources": sources}
+    write_text(analysis_dir / DEPENDENCIES_FILENAME, json.dumps(payload, indent=2))
+
+    for source in sources:
+        cached = " (cached)" if source.get("cached") else ""
+        print(f"  {source['kind']}: {source['path']}{cached}")
+    kinds = [p["kind"] for p in payload["packages"]]
+    print(
+        f"Packages: {kinds.count('local')} local, {kinds.count('distribution')} distributions, "
+        f"{kinds.count('stdlib')} stdlib; unmapped imports: {len(payload['unmapped'])}"
     )
-    write_json(out / "patterns.json", {"patterns": to_jsonable(pattern_hits), "errors": to_jsonable(errors)})
-    write_json(out / "dataflow.json", {"functions": to_jsonable(all_dataflows), "errors": to_jsonable(errors)})
-
-    # DOT
-    write_text(out / "imports.dot", build_imports_dot(import_records))
-    write_text(out / "module_graph.dot", build_module_graph_dot(mod_nodes, mod_edges))
-    write_text(out / "callgraph.dot", build_callgraph_dot(all_calls))
-    write_text(out / "callgraph_grouped.dot", build_callgraph_grouped_dot(all_calls))
-    write_text(out / "dataflow.dot", build_dataflow_dot(all_dataflows))
+    print(f"Wrote dependency graph to: {analysis_dir / DEPENDENCIES_FILENAME}")
+    return 0
 
-    return len(py_files), errors
 
+def cmd_diff(args: argparse.Namespace) -> int:
+    from dpylens.analyzer.diff import analyze_diff
+    from dpylens.analyzer.gitsource import GitError
+    from dpylens.analyzer.visualize import write_text
 
-def cmd_analyze(args: argparse.Namespace) -> int:
-    root = Path(args.path).resolve()
+    repo = Path(args.repo).resolve()
     out = Path(args.out).resolve()
 
-    nfiles, errors = analyze_project(root=root, out=out)
+    try:
+        delta = analyze_diff(
+            repo,
+            args.base,
+            args.head,
+            Path(args.base_analysis).resolve(),
+            base_root=Path(args.base_root).resolve() if args.base_root else None,
+        )
+    except GitError as e:
+        print(f"Diffing {args.base}..{args.head} failed: {e}")
+        return 1
+    write_text(out / DELTA_FILENAME, json.dumps(delta, indent=2))
+
+    print(f"Changed Python files: {len(delta['changed_files'])} (re-analyzed unchanged: {len(delta['reanalyzed_files'])})")
+    for section in ("functions", "calls", "module_edges", "routes"):
+        print(f"  {section}: +{len(delta[section]['added'])} -{len(delta[section]['removed'])}")
+    print(f"Wrote delta to: {out / DELTA_FILENAME}")
+    return 0
 
-    print(f"Analyzed {nfiles} Python files.")
+
+def cmd_merge(args: argparse.Namespace) -> int:
+    from dpylens.analyzer.shards import ShardError, merge_shards
+    from dpylens.store.sqlite import write_sqlite_store
+
+    out = Path(args.out).resolve()
+
+    try:
+        result = merge_shards(
+            [Path(p).resolve() for p in args.shards],
+            plugins=_plugins_from_args(args),
+            entry_points=tuple(args.entry_point),
+        )
+    except ShardError as e:
+        print(f"Merging shards failed: {e}")
+        return 1
+    result.write(out)
+    if args.store == "sqlite":
+        write_sqlite_store(result, out / STORE_FILENAME)
+
+    print(f"Merged {len(result.files)} Python files from shards.")
     print(f"Wrote JSON + DOT outputs to: {out}")
-    if errors:
-        print(f"Warnings: {len(errors)} issues (parse or analysis). See JSON output for details.")
+    if result.errors:
+        print(f"Warnings: {len(result.errors)} issues (parse or analysis). See JSON output for details.")
+    return 0
+
+
+def cmd_export(args: argparse.Namespace) -> int:
+    from dpylens.export.graphs import GRAPH_FORMATS, export_graphs
+    from dpylens.export.tables import ExportError, export_tables
+
+    analysis_dir = Path(args.analysis).resolve()
+    out = Path(args.out).resolve()
+    if not (analysis_dir / "callgraph.json").exists():
+        print(f"No analysis at {analysis_dir} (run `dpylens analyze` first)")
+        return 1
+
+    try:
+        for fmt in dict.fromkeys(args.format or ["parquet"]):
+            if fmt in GRAPH_FORMATS:
+                graphs = export_graphs(analysis_dir, out, fmt=fmt)
+                for name in graphs.nodes:
+                    print(f"  {name}.{fmt}: {graphs.nodes[name]} nodes, {graphs.edges[name]} edges")
+            else:
+                tables = export_tables(
+                    analysis_dir,
+                    out,
+                    fmt=fmt,
+                    partition_by=args.partition_by,
+                    batch_rows=int(args.batch_rows),
+                )
+                print(f"  {fmt}: " + ", ".join(f"{name} {rows} rows" for name, rows in tables.rows.items()))
+    except ExportError as e:
+        print(f"Export failed: {e}")
+        return 1
+    print(f"Wrote exports to: {out}")
+    return 0
+
+
+def cmd_hotspots(args: argparse.Namespace) -> int:
+    import time
+    from pathlib import PurePosixPath
+
+    from dpylens.analyzer.churn import CHURN_FILENAME, ChurnCache
+    from dpylens.analyzer.gitsource import GitError, toplevel
+    from dpylens.analyzer.hotspots import HOTSPOTS_FILENAME, compute_hotspots, hotspots_payload
+    from dpylens.analyzer.visualize import write_text
+
+    repo = Path(args.repo).resolve()
+    analysis_dir = Path(args.analysis).resolve()
+    if not (analysis_dir / "metrics.json").exists():
+        print(f"No metrics.json in {analysis_dir} (run `dpylens analyze` first)")
+        return 1
+    cache_path = Path(args.cache).resolve() if args.cache else analysis_dir / CHURN_FILENAME
+    since = int(time.time() - float(args.days) * 86400) if args.days else None
+
+    try:
+        prefix = PurePosixPath(repo.relative_to(toplevel(repo).resolve()).as_posix())
+        with ChurnCache(cache_path) as cache:
+            update = cache.update(repo, args.rev)
+            churn = cache.file_churn(since)
+    except GitError as e:
+        print(f"Reading git history failed: {e}")
+        return 1
+
+    root = Path(args.root).resolve() if args.root else repo
+    rankings = compute_hotspots(analysis_dir, churn, root=root, prefix=prefix, top=int(args.top))
+    write_text(analysis_dir / HOTSPOTS_FILENAME, json.dumps(hotspots_payload(update, rankings, since), indent=2))
+
+    note = " (history rewritten: cache rebuilt)" if update.rebuilt else ""
+    print(f"Commits: {update.total_commits} cached, {update.new_commits} new{note}")
+    for h in rankings["riskiest"][:10]:
+        print(f"  {h['score']:>10}  {h['qualname']}  ({h['commits']} commits, complexity {h['complexity']}, centrality {h['centrality']})")
+    print(f"Wrote hotspots to: {analysis_dir / HOTSPOTS_FILENAME}")
+    return 0
+
+
+def cmd_plugins(args: argparse.Namespace) -> int:
+    from dpylens.analyzer.plugins import available_plugins
+
+    names = available_plugins()
+    if not names:
+        print("No extractor plugins installed (entry point group: dpylens.extractors).")
+        return 0
+    for name in names:
+        print(name)
     return 0
 
 
 def cmd_report(args: argparse.Namespace) -> int:
+    from dpylens.reporter.html_report import ReportPaths, build_report
+
     analysis_dir = Path(args.analysis).resolve()
     report_dir = Path(args.out).resolve()
 
-    build_report(ReportPaths(analysis_dir=analysis_dir, report_dir=report_dir))
+    stats = build_report(
+        ReportPaths(analysis_dir=analysis_dir, report_dir=report_dir),
+        single_file=args.single_file,
+        link=args.link,
+    )
 
-    print(f"Wrote report to: {report_dir}")
+    print(f"Wrote report to: {report_dir} ({stats.describe()})")
+    if args.single_file:
+        print(f"Open directly: {report_dir / 'index.html'}")
+        return 0
     print("To view:")
     print(f"  cd {report_dir}")
     print("  python -m http.server")
@@ -149,23 +374,72 @@ def cmd_report(args: argparse.Namespace) -> int:
     return 0
 
 
-def _serve_report(report_dir: Path, port: int) -> ThreadingHTTPServer:
-    class Handler(SimpleHTTPRequestHandler):
-        def __init__(self, *args, **kwargs):
-            super().__init__(*args, directory=str(report_dir), **kwargs)
+def _serve_report(report_dir: Path, *, host: str, port: int, verbose: bool = False) -> ThreadingHTTPServer:
+    import threading
 
-    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    from dpylens.reporter.server import make_report_server
+
+    server = make_report_server(report_dir, host=host, port=port, verbose=verbose)
     t = threading.Thread(target=server.serve_forever, daemon=True)
     t.start()
     return server
 
 
+def _serve_until_interrupted(args: argparse.Namespace, report_dir: Path) -> None:
+    import time
+    import webbrowser
+
+    server = _serve_report(report_dir, host=args.host, port=int(args.port), verbose=args.access_log)
+    host, port = server.server_address[:2]
+    url = f"http://{host}:{port}/"
+    print(f"Serving report at: {url}")
+    print(f"Query API: {url}api/functions?prefix=  (also api/callers?name=, api/callees?name=, api/file?path=)")
+    if args.open:
+        webbrowser.open(url)
+
+    if not getattr(args, "no_wait", False):
+        try:
+            while True:
+                time.sleep(0.5)
+        except KeyboardInterrupt:
+            server.shutdown()
+
+
+def cmd_serve(args: argparse.Namespace) -> int:
+    report_dir = Path(args.report).resolve()
+    if not (report_dir / "index.html").exists():
+        print(f"No report at {report_dir} (build one with `dpylens report` or `dpylens run`)")
+        return 1
+    _serve_until_interrupted(args, report_dir)
+    return 0
+
+
 def cmd_run(args: argparse.Namespace) -> int:
+    import webbrowser
+
+    from dpylens.analyzer.pipeline import analyze
+    from dpylens.rendering.graphviz import render_dot_to_png
+    from dpylens.reporter.html_report import ReportPaths, build_report
+    from dpylens.store.sqlite import write_sqlite_store
+
     root = Path(args.path).resolve()
     analysis_out = Path(args.analysis_out).resolve()
     report_out = Path(args.report_out).resolve()
 
-    nfiles, errors = analyze_project(root=root, out=analysis_out)
+    result = analyze(
+        root,
+        jobs=int(args.jobs),
+        budget=_budget_from_args(args),
+        summary_memo=_summary_memo_from_args(args),
+        pattern_rules=_pattern_rules_from_args(args),
+        plugins=_plugins_from_args(args),
+        entry_points=tuple(args.entry_point),
+    )
+    result.write(analysis_out)
+    nfiles, errors = len(result.files), result.errors
+
+    if args.store == "sqlite":
+        write_sqlite_store(result, analysis_out / STORE_FILENAME)
 
     if args.render:
         res = render_dot_to_png(analysis_out)
@@ -176,40 +450,129 @@ def cmd_run(args: argparse.Namespace) -> int:
         else:
             print("Rendered PNGs: none")
 
-    build_report(ReportPaths(analysis_dir=analysis_out, report_dir=report_out))
+    stats = build_report(
+        ReportPaths(analysis_dir=analysis_out, report_dir=report_out),
+        result=result,
+        single_file=args.single_file,
+        link=args.link,
+    )
 
     print(f"Analyzed {nfiles} Python files.")
     print(f"Analysis: {analysis_out}")
-    print(f"Report: {report_out}")
+    print(f"Report: {report_out} ({stats.describe()})")
     if errors:
         print(f"Warnings: {len(errors)} issues (parse or analysis). See analysis JSON output for details.")
 
     if args.serve:
-        port = int(args.port)
-        server = _serve_report(report_out, port=port)
-        url = f"http://127.0.0.1:{server.server_address[1]}/"
-        print(f"Serving report at: {url}")
-        if args.open:
-            webbrowser.open(url)
-
-        if not args.no_wait:
-            try:
-                while True:
-                    time.sleep(0.5)
-            except KeyboardInterrupt:
-                server.shutdown()
+        _serve_until_interrupted(args, report_out)
         return 0
 
-    print("To view report:")
-    print(f"  cd {report_out}")
-    print("  python -m http.server")
-    print("  open http://localhost:8000")
+    if args.single_file:
+        print(f"Open directly: {report_out / 'index.html'}")
+    else:
+        print("To view report:")
+        print(f"  cd {report_out}")
+        print("  python -m http.server")
+        print("  open http://localhost:8000")
     if args.open:
         webbrowser.open((report_out / "index.html").as_uri())
 
     return 0
 
 
+def _add_serve_args(p: argparse.ArgumentParser, prefix: str = "") -> None:
+    p.add_argument("--host", default="127.0.0.1", help=f"{prefix}Interface to bind; 0.0.0.0 to share on a network (default: 127.0.0.1)")
+    p.add_argument("--port", default="8000", help=f"{prefix}Port (default: 8000)")
+    p.add_argument("--access-log", action="store_true", help=f"{prefix}Log every request to stderr")
+
+
+def _add_link_arg(p: argparse.ArgumentParser) -> None:
+    p.add_argument(
+        "--link",
+        choices=list(LINK_MODES),
+        default="auto",
+        help="How analysis files get into the report: auto = reflink, else hardlink, else copy (default: auto)",
+    )
+
+
+def _add_plugin_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument(
+        "--plugin",
+        action="append",
+        default=[],
+        help="Enable an extractor plugin (installed name or module:attr, repeatable); see `dpylens plugins`",
+    )
+    p.add_argument(
+        "--plugin-cache",
+        default=None,
+        help="Folder for per-plugin per-file results; unchanged files reuse them",
+    )
+
+
+def _add_entry_point_arg(p: argparse.ArgumentParser) -> None:
+    p.add_argument(
+        "--entry-point",
+        action="append",
+        default=[],
+        help="Extra reachability root for dead_code.json: qualname or fnmatch pattern (repeatable)",
+    )
+
+
+def _add_analysis_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument(
+        "--rules",
+        action="append",
+        default=[],
+        help="Extra pattern rules (TOML, repeatable), added to the built-in rules",
+    )
+    p.add_argument(
+        "--reuse-summaries",
+        default=None,
+        help="effects.json of a previous run; unchanged call-graph components reuse its summaries",
+    )
+
+
+def _add_budget_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument(
+        "--max-file-bytes",
+        default=str(DEFAULT_MAX_FILE_BYTES or 0),
+        help=f"Skip files larger than this; 0 = no limit (default: {DEFAULT_MAX_FILE_BYTES or 'no limit'})",
+    )
+    p.add_argument(
+        "--max-file-seconds",
+        default=str(DEFAULT_MAX_FILE_SECONDS or 0),
+        help=f"Keep only imports of files whose parse takes longer; 0 = no limit (default: {DEFAULT_MAX_FILE_SECONDS or 'no limit'})",
+    )
+    p.add_argument(
+        "--generated",
+        choices=list(GENERATED_MODES),
+        default=DEFAULT_GENERATED,
+        help=f"Generated/vendored files (protobuf, migrations, vendor/, generated headers) (default: {DEFAULT_GENERATED})",
+    )
+
+
+def cmd_worker(args: argparse.Namespace) -> int:
+    from dpylens.worker.jobs import JOB_HANDLERS, PRELOAD
+    from dpylens.worker.runner import run_worker
+
+    queue_path = Path(args.queue).resolve()
+    print(f"Worker on {queue_path} (jobs: {', '.join(JOB_HANDLERS)})")
+    stats = run_worker(
+        queue_path,
+        JOB_HANDLERS,
+        PRELOAD,
+        burst=args.burst,
+        max_jobs=int(args.max_jobs) if args.max_jobs else None,
+        lease=float(args.lease),
+        heartbeat=float(args.heartbeat),
+        poll=float(args.poll),
+        job_timeout=float(args.job_timeout) if args.job_timeout else None,
+        fork=not args.no_fork,
+    )
+    print(f"Stopped: {stats.done} done, {stats.failed} failed attempts, {stats.abandoned} abandoned")
+    return 0
+
+
 def build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(prog="dpylens", description="DevOps Python Intelligence Platform (MVP Analyzer)")
     sub = p.add_subparsers(dest="command", required=True)
@@ -217,21 +580,159 @@ def build_parser() -> argparse.ArgumentParser:
     a = sub.add_parser("analyze", help="Analyze a folder of Python files and output JSON/DOT artifacts")
     a.add_argument("path", help="Root folder to analyze (e.g. .)")
     a.add_argument("--out", default="analysis", help="Output folder for analysis artifacts (default: analysis)")
+    a.add_argument(
+        "--store",
+        choices=["none", "sqlite"],
+        default="none",
+        help=f"Also write an indexed artifact store next to the JSON outputs (sqlite: {STORE_FILENAME})",
+    )
+    a.add_argument("--jobs", default="1", help="Worker processes for the per-file pass (default: 1)")
+    a.add_argument(
+        "--rev",
+        default=None,
+        help="Analyze this git revision of the folder from git objects, without checking it out (folder may be a bare repo)",
+    )
+    a.add_argument(
+        "--file-cache",
+        default=None,
+        help="With --rev: reuse per-file results keyed by blob id from this folder (written if missing)",
+    )
+    _add_analysis_args(a)
+    _add_budget_args(a)
+    _add_plugin_args(a)
+    _add_entry_point_arg(a)
+    a.add_argument(
+        "--shard",
+        default=None,
+        help="Only run the per-file pass for shard K/N and write <out>/shard-K-of-N.json (combine with `merge`)",
+    )
+    a.add_argument(
+        "--shard-by",
+        choices=list(SHARD_STRATEGIES),
+        default="hash",
+        help="Split files by path hash or by package root (default: hash)",
+    )
     a.set_defaults(func=cmd_analyze)
 
+    m = sub.add_parser("merge", help="Merge shard outputs into full analysis artifacts")
+    m.add_argument("shards", nargs="+", help="Shard files, or folders containing shard-K-of-N.json files")
+    m.add_argument("--out", default="analysis", help="Output folder for analysis artifacts (default: analysis)")
+    m.add_argument("--store", choices=["none", "sqlite"], default="none", help="Also write an indexed artifact store")
+    _add_plugin_args(m)
+    _add_entry_point_arg(m)
+    m.set_defaults(func=cmd_merge)
+
+    b = sub.add_parser("batch", help="Analyze many repos (local paths or git URLs) with one shared worker pool")
+    b.add_argument("manifest", help="Text file with one `<path-or-git-url> [name]` per line")
+    b.add_argument("--out", default="batch", help="Output folder; each repo goes to <out>/<name>/analysis (default: batch)")
+    b.add_argument("--jobs", default=None, help="Worker processes shared by all repos (default: CPU count)")
+    b.set_defaults(func=cmd_batch)
+
+    d = sub.add_parser("diff", help="Analyze only files changed between two git revisions, relative to a base run")
+    d.add_argument("base", help="Base revision (the one --base-analysis was produced from)")
+    d.add_argument("head", help="Head revision")
+    d.add_argument("--repo", default=".", help="Git repository (default: .)")
+    d.add_argument("--base-analysis", default="analysis", help="Analysis folder of the base revision (default: analysis)")
+    d.add_argument("--base-root", default=None, help="Path the base run analyzed, if not --repo (maps its absolute paths)")
+    d.add_argument("--out", default="delta", help=f"Output folder for {DELTA_FILENAME} (default: delta)")
+    d.set_defaults(func=cmd_diff)
+
+    hs = sub.add_parser("hotspots", help="Rank functions by git churn, complexity and call-graph centrality")
+    hs.add_argument("--repo", default=".", help="Git checkout of the analyzed folder (default: .)")
+    hs.add_argument("--analysis", default="analysis", help="Folder containing analysis JSON outputs (default: analysis)")
+    hs.add_argument("--rev", default="HEAD", help="Revision whose history is mined (default: HEAD)")
+    hs.add_argument("--root", default=None, help="Path the analysis was made from, if not --repo (maps its absolute paths)")
+    hs.add_argument("--cache", default=None, help="Churn cache, reusable across runs (default: <analysis>/churn.sqlite)")
+    hs.add_argument("--days", default=None, help="Only count commits from the last N days (default: all history)")
+    hs.add_argument("--top", default="50", help="Rows per ranking (default: 50)")
+    hs.set_defaults(func=cmd_hotspots)
+
+    dp = sub.add_parser("deps", help="Map external imports to distributions and build a package-level dependency graph")
+    dp.add_argument("--analysis", default="analysis", help="Folder containing analysis JSON outputs (default: analysis)")
+    dp.add_argument(
+        "--site-packages",
+        action="append",
+        default=[],
+        help="site-packages folder to index, repeatable (default: this interpreter's, unless --lock/--dist-map)",
+    )
+    dp.add_argument("--lock", default=None, help="Lock file: poetry.lock, uv.lock, pdm.lock, Pipfile.lock or requirements.txt")
+    dp.add_argument("--dist-map", default=None, help="JSON/TOML table of import name -> distribution, takes precedence")
+    dp.add_argument("--dist-cache", default=None, help="Folder for cached site-packages indexes (default: ~/.cache/dpylens/distributions)")
+    dp.add_argument("--no-dist-cache", action="store_true", help="Always rescan site-packages")
+    dp.set_defaults(func=cmd_deps)
+
+    ex = sub.add_parser("export", help="Export analysis artifacts as Parquet/Arrow tables or GraphML/GEXF graphs")
+    ex.add_argument("--analysis", default="analysis", help="Folder containing analysis JSON outputs (default: analysis)")
+    ex.add_argument("--out", default="export", help="Output folder (default: export)")
+    ex.add_argument(
+        "--format",
+        action="append",
+        choices=list(EXPORT_FORMATS),
+        help="Output format, repeatable (default: parquet; parquet and arrow need pyarrow)",
+    )
+    ex.add_argument(
+        "--partition-by",
+        choices=list(EXPORT_PARTITIONS),
+        default="none",
+        help="Tables: one Hive-style directory per package (<table>/package=<name>/part-N.parquet) (default: none)",
+    )
+    ex.add_argument("--batch-rows", default="65536", help="Tables: rows per record batch / row group (default: 65536)")
+    ex.set_defaults(func=cmd_export)
+
+    wk = sub.add_parser("worker", help="Process queued analysis jobs (durable SQLite queue, one forked process per job)")
+    wk.add_argument(
+        "--queue",
+        default=str(Path(".dpylens-server") / QUEUE_FILENAME),
+        help=f"Queue database shared with the API and other workers (default: .dpylens-server/{QUEUE_FILENAME})",
+    )
+    wk.add_argument("--lease", default="60", help="Seconds a claimed job stays leased without a heartbeat (default: 60)")
+    wk.add_argument("--heartbeat", default="10", help="Seconds between lease renewals while a job runs (default: 10)")
+    wk.add_argument("--poll", default="1", help="Seconds between queue polls when idle (default: 1)")
+    wk.add_argument("--job-timeout", default=None, help="Kill and fail a job attempt after this many seconds")
+    wk.add_argument("--max-jobs", default=None, help="Exit after this many jobs")
+    wk.add_argument("--burst", action="store_true", help="Exit when no job is ready instead of waiting")
+    wk.add_argument("--no-fork", action="store_true", help="Run jobs in the worker process (no isolation)")
+    wk.set_defaults(func=cmd_worker)
+
+    pl = sub.add_parser("plugins", help="List installed extractor plugins")
+    pl.set_defaults(func=cmd_plugins)
+
     r = sub.add_parser("report", help="Generate a static HTML report from analysis outputs")
     r.add_argument("--analysis", default="analysis", help="Folder containing analysis JSON outputs (default: analysis)")
     r.add_argument("--out", default="report", help="Output folder for report (default: report)")
+    r.add_argument(
+        "--single-file",
+        action="store_true",
+        help="Write one self-contained index.html with compressed embedded data (opens from disk, no server)",
+    )
+    _add_link_arg(r)
     r.set_defaults(func=cmd_report)
 
     run = sub.add_parser("run", help="Run analyze (+optional PNG render) then generate report")
     run.add_argument("path", help="Root folder to analyze (e.g. .)")
     run.add_argument("--analysis-out", default="analysis", help="Output folder for analysis artifacts (default: analysis)")
     run.add_argument("--report-out", default="report", help="Output folder for report artifacts (default: report)")
+    run.add_argument(
+        "--store",
+        choices=["none", "sqlite"],
+        default="none",
+        help=f"Also write an indexed artifact store into the analysis folder (sqlite: {STORE_FILENAME})",
+    )
+    run.add_argument("--jobs", default="1", help="Worker processes for the per-file pass (default: 1)")
+    _add_analysis_args(run)
+    _add_budget_args(run)
+    _add_plugin_args(run)
+    _add_entry_point_arg(run)
     run.add_argument("--render", action="store_true", help="If Graphviz 'dot' is available, render PNGs from DOT")
+    run.add_argument(
+        "--single-file",
+        action="store_true",
+        help="Write the report as one self-contained index.html with compressed embedded data",
+    )
+    _add_link_arg(run)
     run.add_argument("--open", action="store_true", help="Open the report in your browser")
     run.add_argument("--serve", action="store_true", help="Serve report via an embedded HTTP server (recommended with --open)")
-    run.add_argument("--port", default="8000", help="Port for --serve (default: 8000)")
+    _add_serve_args(run, prefix="For --serve: ")
     run.add_argument(
         "--no-wait",
         action="store_true",
@@ -239,6 +740,12 @@ def build_parser() -> argparse.ArgumentParser:
     )
     run.set_defaults(func=cmd_run)
 
+    sv = sub.add_parser("serve", help="Serve a built report (compression, caching, range requests, query API)")
+    sv.add_argument("--report", default="report", help="Report folder (default: report)")
+    sv.add_argument("--open", action="store_true", help="Open the report in your browser")
+    _add_serve_args(sv)
+    sv.set_defaults(func=cmd_serve)
+
     return p
 
 
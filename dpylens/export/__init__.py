@@ -0,0 +1 @@
+# Columnar and graph-interchange exports (Parquet/Arrow, GraphML, GEXF)
\ No newline at end of file
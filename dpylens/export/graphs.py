@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import chain
+from pathlib import Path
+from typing import IO, Any, Iterator
+from xml.sax.saxutils import escape, quoteattr
+
+from dpylens.analyzer.jsonstream import iter_fields
+from dpylens.analyzer.metrics import package_of
+from dpylens.export.tables import ExportError, file_packages
+
+GRAPH_FORMATS = ("graphml", "gexf")
+GRAPHS = ("callgraph", "module_graph")
+
+_BUFFER = 1 << 20
+
+# (name, type) of node and edge attributes; types are GraphML/GEXF names ("string", "int", "boolean")
+_Attrs = tuple[tuple[str, str], ...]
+
+
+@dataclass
+class GraphExportStats:
+    nodes: dict[str, int] = field(default_factory=dict)  # graph -> nodes written
+    edges: dict[str, int] = field(default_factory=dict)  # graph -> edges written
+    files: list[Path] = field(default_factory=list)
+
+
+def _text(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+class _GraphMLWriter:
+    def __init__(self, fh: IO[str], name: str, node_attrs: _Attrs, edge_attrs: _Attrs):
+        self.fh = fh
+        fh.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        fh.write('<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n')
+        for prefix, domain, attrs in (("n", "node", node_attrs), ("e", "edge", edge_attrs)):
+            for i, (attr, kind) in enumerate(attrs):
+                fh.write(f'  <key id="{prefix}{i}" for="{domain}" attr.name="{attr}" attr.type="{kind}"/>\n')
+        fh.write('  <key id="weight" for="edge" attr.name="weight" attr.type="int"/>\n')
+        fh.write(f'  <graph id={quoteattr(name)} edgedefault="directed">\n')
+
+    def node(self, node_id: str, attrs: tuple) -> None:
+        data = "".join(f'<data key="n{i}">{escape(_text(v))}</data>' for i, v in enumerate(attrs) if v is not None)
+        self.fh.write(f"    <node id={quoteattr(node_id)}>{data}</node>\n")
+
+    def end_nodes(self) -> None:
+        pass
+
+    def edge(self, n: int, src: str, dst: str, weight: int, attrs: tuple) -> None:
+        data = "".join(f'<data key="e{i}">{escape(_text(v))}</data>' for i, v in enumerate(attrs) if v is not None)
+        self.fh.write(
+            f'    <edge id="e{n}" source={quoteattr(src)} target={quoteattr(dst)}>{data}<data key="weight">{weight}</data></edge>\n'
+        )
+
+    def end(self) -> None:
+        self.fh.write("  </graph>\n</graphml>\n")
+
+
+class _GEXFWriter:
+    def __init__(self, fh: IO[str], name: str, node_attrs: _Attrs, edge_attrs: _Attrs):
+        self.fh = fh
+        fh.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        fh.write('<gexf xmlns="http://gexf.net/1.3" version="1.3">\n')
+        fh.write(f"  <meta><creator>dpylens</creator><description>{escape(name)}</description></meta>\n")
+        fh.write('  <graph mode="static" defaultedgetype="directed">\n')
+        for domain, attrs in (("node", node_attrs), ("edge", edge_attrs)):
+            if attrs:
+                fh.write(f'    <attributes class="{domain}">\n')
+                for i, (attr, kind) in enumerate(attrs):
+                    kind = "integer" if kind == "int" else kind
+                    fh.write(f'      <attribute id="{i}" title="{attr}" type="{kind}"/>\n')
+                fh.write("    </attributes>\n")
+        fh.write("    <nodes>\n")
+
+    @staticmethod
+    def _values(attrs: tuple) -> str:
+        values = "".join(f'<attvalue for="{i}" value={quoteattr(_text(v))}/>' for i, v in enumerate(attrs) if v is not None)
+        return f"<attvalues>{values}</attvalues>" if values else ""
+
+    def node(self, node_id: str, attrs: tuple) -> None:
+        q = quoteattr(node_id)
+        self.fh.write(f"      <node id={q} label={q}>{self._values(attrs)}</node>\n")
+
+    def end_nodes(self) -> None:
+        self.fh.write("    </nodes>\n    <edges>\n")
+
+    def edge(self, n: int, src: str, dst: str, weight: int, attrs: tuple) -> None:
+        self.fh.write(
+            f'      <edge id="{n}" source={quoteattr(src)} target={quoteattr(dst)} weight="{weight}">{self._values(attrs)}</edge>\n'
+        )
+
+    def end(self) -> None:
+        self.fh.write("    </edges>\n  </graph>\n</gexf>\n")
+
+
+_WRITERS = {"graphml": _GraphMLWriter, "gexf": _GEXFWriter}
+
+
+def _stream(path: Path, key: str) -> Iterator[Any]:
+    for k, item in iter_fields(path):
+        if k == key:
+            yield item
+
+
+def _runs(items: Iterator[dict[str, Any]], group: str, edge: tuple[str, ...]) -> Iterator[tuple[tuple, int]]:
+    """
+    (edge key, count) for edges repeated within each run of items sharing `group`
+    (artifacts list calls file by file and module edges module by module), so parallel edges
+    collapse into one weighted edge while holding only one run in memory.
+    """
+    current: Any = None
+    counts: Counter[tuple] = Counter()
+    for item in items:
+        if item[group] != current:
+            yield from counts.items()
+            counts.clear()
+            current = item[group]
+        counts[tuple(item[k] for k in edge)] += 1
+    yield from counts.items()
+
+
+def _write_callgraph(writer: Any, analysis_dir: Path, packages: dict[str, str]) -> tuple[int, int]:
+    """
+    Functions as nodes, resolved calls as edges weighted by call sites. One pass over
+    callgraph_resolved.json: its functions come before its calls.
+    """
+    path = analysis_dir / "callgraph_resolved.json"
+    fields = iter_fields(path) if path.exists() else iter(())
+    seen: set[str] = set()  # functions nested in different functions may share a qualname
+    calls: Iterator[dict[str, Any]] = iter(())
+    for key, item in fields:
+        if key == "functions":
+            q = item["qualname"]
+            if q not in seen:
+                seen.add(q)
+                writer.node(q, (item["file"], item["lineno"], packages.get(item["file"])))
+        elif key == "calls":
+            calls = chain((item,), (c for k, c in fields if k == "calls"))
+            break
+    writer.end_nodes()
+
+    edges = 0
+    resolved = (c for c in calls if c.get("callee_resolved"))
+    for (src, dst), weight in _runs(resolved, "file", ("caller", "callee_resolved")):
+        writer.edge(edges, src, dst, weight, ())
+        edges += 1
+    return len(seen), edges
+
+
+def _write_module_graph(writer: Any, analysis_dir: Path) -> tuple[int, int]:
+    """
+    Modules as nodes (imported modules outside the repo flagged `external`), imports as edges
+    weighted by import statements. Two passes over module_graph.json: GEXF needs every node,
+    including external ones only known from the edges, before the first edge.
+    """
+    path = analysis_dir / "module_graph.json"
+    if not path.exists():
+        writer.end_nodes()
+        return 0, 0
+    local: dict[str, str] = {}
+    external: dict[str, None] = {}
+    for key, item in iter_fields(path):
+        if key == "nodes":
+            local.setdefault(item["module"], item["file"])
+        elif key == "edges":
+            for m in (item["src_module"], item["dst_module"]):
+                if m not in local:
+                    external[m] = None
+    for module, file in local.items():
+        writer.node(module, (file, package_of(module, file), False))
+    for module in external:
+        writer.node(module, (None, None, True))
+    writer.end_nodes()
+
+    edges = 0
+    for (src, dst, kind), weight in _runs(_stream(path, "edges"), "src_module", ("src_module", "dst_module", "kind")):
+        writer.edge(edges, src, dst, weight, (kind,))
+        edges += 1
+    return len(local) + len(external), edges
+
+
+# graph -> (node attributes, edge attributes)
+_SCHEMAS: dict[str, tuple[_Attrs, _Attrs]] = {
+    "callgraph": ((("file", "string"), ("lineno", "int"), ("package", "string")), ()),
+    "module_graph": ((("file", "string"), ("package", "string"), ("external", "boolean")), (("kind", "string"),)),
+}
+
+
+def export_graphs(
+    analysis_dir: Path,
+    out: Path,
+    *,
+    fmt: str = "graphml",
+    graphs: tuple[str, ...] = GRAPHS,
+) -> GraphExportStats:
+    """
+    Write the call graph and module graph as GraphML or GEXF (`<out>/callgraph.graphml`, ...).
+
+    Nodes and edges are streamed from the analysis artifacts straight to the output file; memory
+    holds the set of node ids and the edges of one file (call graph) or one module (module graph)
+    at a time, which are merged into weighted edges.
+    """
+    if fmt not in GRAPH_FORMATS:
+        raise ExportError(f"unknown graph format {fmt!r} (expected one of {', '.join(GRAPH_FORMATS)})")
+    unknown = [g for g in graphs if g not in GRAPHS]
+    if unknown:
+        raise ExportError(f"unknown graph(s) {', '.join(unknown)} (expected {', '.join(GRAPHS)})")
+
+    packages = file_packages(analysis_dir)[0] if "callgraph" in graphs else {}
+
+    out.mkdir(parents=True, exist_ok=True)
+    stats = GraphExportStats()
+    for name in graphs:
+        path = out / f"{name}.{fmt}"
+        node_attrs, edge_attrs = _SCHEMAS[name]
+        with path.open("w", encoding="utf-8", buffering=_BUFFER) as fh:
+            writer = _WRITERS[fmt](fh, name, node_attrs, edge_attrs)
+            if name == "callgraph":
+                nodes, edges = _write_callgraph(writer, analysis_dir, packages)
+            else:
+                nodes, edges = _write_module_graph(writer, analysis_dir)
+            writer.end()
+        stats.nodes[name], stats.edges[name] = nodes, edges
+        stats.files.append(path)
+    return stats
@@ -0,0 +1,347 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from dpylens.analyzer.jsonstream import iter_fields
+from dpylens.analyzer.metrics import package_of
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: only the columnar formats need it
+    pa = None  # type: ignore[assignment]
+    pq = None  # type: ignore[assignment]
+
+TABLE_FORMATS = ("parquet", "arrow")
+PARTITIONS = ("none", "package")
+
+# Rows per record batch (and Parquet row group)
+DEFAULT_BATCH_ROWS = 65536
+# Rows buffered across all partitions before the largest buffer is flushed early
+DEFAULT_MAX_BUFFERED_ROWS = 4 * DEFAULT_BATCH_ROWS
+# Partition files kept open at once; beyond that the least recently written one is closed and
+# the partition continues in a new part file
+DEFAULT_MAX_OPEN_FILES = 128
+
+# Hive's name for rows without a partition value
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+_SUFFIX = {"parquet": ".parquet", "arrow": ".arrow"}
+
+# Column kinds: "str" (dictionary-encoded string), "int", "list" (list of strings)
+_Column = tuple[str, str]
+
+
+class ExportError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class _Table:
+    artifact: str
+    key: str
+    columns: tuple[_Column, ...]
+    rows: Callable[[Any], Iterator[tuple]]  # artifact item -> rows (without the package column)
+    package_from: str  # column whose value locates the row's file or module ("file" / "src_module")
+
+
+def _call_rows(c: dict[str, Any]) -> Iterator[tuple]:
+    yield c["caller"], c.get("callee_raw", c.get("callee")), c.get("callee_resolved"), c["file"], c["lineno"]
+
+
+def _import_rows(rec: dict[str, Any]) -> Iterator[tuple]:
+    for it in rec.get("items") or []:
+        yield rec["file"], it["kind"], it.get("module"), it["level"], list(it.get("names") or []), it["raw"]
+
+
+TABLES: dict[str, _Table] = {
+    "functions": _Table(
+        "callgraph_resolved.json",
+        "functions",
+        (("qualname", "str"), ("file", "str"), ("lineno", "int")),
+        lambda f: iter(((f["qualname"], f["file"], f["lineno"]),)),
+        "file",
+    ),
+    "calls": _Table(
+        "callgraph_resolved.json",
+        "calls",
+        (("caller", "str"), ("callee_raw", "str"), ("callee_resolved", "str"), ("file", "str"), ("lineno", "int")),
+        _call_rows,
+        "file",
+    ),
+    "imports": _Table(
+        "modules.json",
+        "imports",
+        (("file", "str"), ("kind", "str"), ("module", "str"), ("level", "int"), ("names", "list"), ("raw", "str")),
+        _import_rows,
+        "file",
+    ),
+    "module_edges": _Table(
+        "module_graph.json",
+        "edges",
+        (("src_module", "str"), ("dst_module", "str"), ("kind", "str"), ("raw_import", "str")),
+        lambda e: iter(((e["src_module"], e["dst_module"], e["kind"], e["raw_import"]),)),
+        "src_module",
+    ),
+    "dataflow": _Table(
+        "dataflow.json",
+        "functions",
+        (
+            ("function", "str"),
+            ("file", "str"),
+            ("lineno", "int"),
+            ("inputs", "list"),
+            ("transforms", "list"),
+            ("outputs", "list"),
+        ),
+        lambda d: iter(((d["function"], d["file"], d["lineno"], d["inputs"], d["transforms"], d["outputs"]),)),
+        "file",
+    ),
+}
+
+
+@dataclass
+class TableExportStats:
+    rows: dict[str, int] = field(default_factory=dict)  # table -> rows written
+    files: list[Path] = field(default_factory=list)
+
+
+def _arrow_type(kind: str) -> Any:
+    if kind == "str":
+        return pa.dictionary(pa.int32(), pa.string())
+    if kind == "int":
+        return pa.int64()
+    return pa.list_(pa.string())
+
+
+class _PartFile:
+    """
+    One output file being written: column buffers, plus (Arrow IPC only) each string column's
+    dictionary.
+
+    Parquet batches are dictionary-encoded on their own and the writer builds each row group's
+    dictionary page, so nothing outlives a flush. Arrow IPC files cannot replace a dictionary, only
+    extend it, so there every batch carries the file's dictionary so far and the writer emits only
+    the new values (dictionary deltas); a new part file starts a new dictionary.
+    """
+
+    def __init__(self, path: Path, fmt: str, schema: Any, kinds: list[str]):
+        self.path = path
+        self.kinds = kinds
+        self.schema = schema
+        self.buffers: list[list[Any]] = [[] for _ in kinds]
+        self.cumulative = fmt == "arrow"
+        # Dictionaries start with "": Arrow IPC files reject a delta on an empty first dictionary
+        self.codes: list[dict[str, int] | None] = [
+            {"": 0} if k == "str" and self.cumulative else None for k in kinds
+        ]
+        self.values: list[Any] = [pa.array([""], pa.string()) if codes is not None else None for codes in self.codes]
+        self.unseen: list[list[str]] = [[] for _ in kinds]  # values coded since the last flush
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if fmt == "parquet":
+            self._writer = pq.ParquetWriter(str(path), schema)
+            self._sink = None
+        else:
+            self._sink = pa.OSFile(str(path), "wb")
+            self._writer = pa.ipc.new_file(self._sink, schema, options=pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True))
+
+    def __len__(self) -> int:
+        return len(self.buffers[0])
+
+    def append(self, row: tuple) -> None:
+        for i, (buf, codes) in enumerate(zip(self.buffers, self.codes)):
+            v = row[i]
+            if codes is not None and v is not None:
+                code = codes.get(v)
+                if code is None:
+                    code = codes[v] = len(codes)
+                    self.unseen[i].append(v)
+                v = code
+            buf.append(v)
+
+    def flush(self) -> None:
+        if not len(self):
+            return
+        arrays = []
+        for i, kind in enumerate(self.kinds):
+            buf = self.buffers[i]
+            if kind == "str" and self.cumulative:
+                if self.unseen[i]:
+                    self.values[i] = pa.concat_arrays([self.values[i], pa.array(self.unseen[i], pa.string())])
+                    self.unseen[i] = []
+                arrays.append(pa.DictionaryArray.from_arrays(pa.array(buf, pa.int32()), self.values[i]))
+            elif kind == "str":
+                arrays.append(pa.array(buf, pa.string()).dictionary_encode())
+            else:
+                arrays.append(pa.array(buf, self.schema.field(i).type))
+            self.buffers[i] = []
+        self._writer.write_batch(pa.record_batch(arrays, schema=self.schema))
+
+    def close(self) -> None:
+        self.flush()
+        self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+
+
+class _PartitionedWriter:
+    """
+    Rows of one table routed to per-partition files, with bounded buffering and open files.
+    """
+
+    def __init__(
+        self,
+        base: Path,
+        fmt: str,
+        schema: Any,
+        kinds: list[str],
+        *,
+        partitioned: bool,
+        batch_rows: int,
+        max_buffered_rows: int,
+        max_open_files: int,
+    ):
+        self.base = base
+        self.fmt = fmt
+        self.partitioned = partitioned
+        self.schema = schema
+        self.kinds = kinds
+        self.batch_rows = batch_rows
+        self.max_buffered_rows = max_buffered_rows
+        self.max_open_files = max_open_files
+        self.open: OrderedDict[str | None, _PartFile] = OrderedDict()
+        self.parts: dict[str | None, int] = {}  # partition -> part files started
+        self.buffered = 0
+        self.rows = 0
+        self.files: list[Path] = []
+
+    def _path(self, partition: str | None) -> Path:
+        n = self.parts.get(partition, 0)
+        self.parts[partition] = n + 1
+        if not self.partitioned:
+            return self.base.with_suffix(_SUFFIX[self.fmt])
+        return self.base / f"package={partition or NULL_PARTITION}" / f"part-{n}{_SUFFIX[self.fmt]}"
+
+    def _file(self, partition: str | None) -> _PartFile:
+        part = self.open.get(partition)
+        if part is None:
+            if len(self.open) >= self.max_open_files:
+                _key, oldest = self.open.popitem(last=False)
+                self.buffered -= len(oldest)
+                oldest.close()
+            part = self.open[partition] = _PartFile(self._path(partition), self.fmt, self.schema, self.kinds)
+            self.files.append(part.path)
+        else:
+            self.open.move_to_end(partition)
+        return part
+
+    def write(self, partition: str | None, row: tuple) -> None:
+        part = self._file(partition)
+        part.append(row)
+        self.rows += 1
+        self.buffered += 1
+        if len(part) >= self.batch_rows:
+            self.buffered -= len(part)
+            part.flush()
+        elif self.buffered >= self.max_buffered_rows:
+            largest = max(self.open.values(), key=len)
+            self.buffered -= len(largest)
+            largest.flush()
+
+    def close(self) -> None:
+        for part in self.open.values():
+            part.close()
+        self.open.clear()
+
+
+def file_packages(analysis_dir: Path) -> tuple[dict[str, str], dict[str, str]]:
+    """
+    file -> package and module -> package, from module_graph.json's nodes.
+    """
+    by_file: dict[str, str] = {}
+    by_module: dict[str, str] = {}
+    path = analysis_dir / "module_graph.json"
+    if path.exists():
+        for key, node in iter_fields(path):
+            if key == "edges":
+                break  # nodes come first
+            if key == "nodes":
+                package = package_of(node["module"], node["file"])
+                by_file[node["file"]] = by_module[node["module"]] = package
+    return by_file, by_module
+
+
+def export_tables(
+    analysis_dir: Path,
+    out: Path,
+    *,
+    fmt: str = "parquet",
+    partition_by: str = "none",
+    tables: tuple[str, ...] = tuple(TABLES),
+    batch_rows: int = DEFAULT_BATCH_ROWS,
+    max_buffered_rows: int = DEFAULT_MAX_BUFFERED_ROWS,
+    max_open_files: int = DEFAULT_MAX_OPEN_FILES,
+) -> TableExportStats:
+    """
+    Stream analysis artifacts into Parquet or Arrow IPC tables.
+
+    Artifacts are read item by item and written in record batches, so memory stays at about
+    `max_buffered_rows` rows whatever the artifact size (for Arrow IPC, plus the string
+    dictionaries of the open files). String columns are dictionary-encoded. Every table has a `package` column; with
+    `partition_by="package"` it becomes a Hive-style directory level instead
+    (`calls/package=app.core/part-0.parquet`).
+    """
+    if pa is None:
+        raise ExportError(f"--format {fmt} needs pyarrow (pip install 'dpylens[export]')")
+    if fmt not in TABLE_FORMATS:
+        raise ExportError(f"unknown table format {fmt!r} (expected one of {', '.join(TABLE_FORMATS)})")
+    if partition_by not in PARTITIONS:
+        raise ExportError(f"unknown partitioning {partition_by!r} (expected one of {', '.join(PARTITIONS)})")
+    unknown = [t for t in tables if t not in TABLES]
+    if unknown:
+        raise ExportError(f"unknown table(s) {', '.join(unknown)} (expected {', '.join(TABLES)})")
+
+    by_file, by_module = file_packages(analysis_dir)
+    partitioned = partition_by == "package"
+    stats = TableExportStats()
+    for name in tables:
+        spec = TABLES[name]
+        artifact = analysis_dir / spec.artifact
+        if not artifact.exists() and spec.artifact == "callgraph_resolved.json":
+            artifact = analysis_dir / "callgraph.json"
+        if not artifact.exists():
+            continue
+
+        columns = list(spec.columns) + ([] if partitioned else [("package", "str")])
+        kinds = [k for _n, k in columns]
+        schema = pa.schema([(n, _arrow_type(k)) for n, k in columns])
+        locate = by_file if spec.package_from == "file" else by_module
+        at = [n for n, _k in spec.columns].index(spec.package_from)
+        writer = _PartitionedWriter(
+            out / name,
+            fmt,
+            schema,
+            kinds,
+            partitioned=partitioned,
+            batch_rows=batch_rows,
+            max_buffered_rows=max_buffered_rows,
+            max_open_files=max_open_files,
+        )
+        try:
+            for key, item in iter_fields(artifact):
+                if key != spec.key:
+                    continue
+                for row in spec.rows(item):
+                    package = locate.get(row[at])
+                    if partitioned:
+                        writer.write(package, row)
+                    else:
+                        writer.write(None, (*row, package))
+        finally:
+            writer.close()
+        stats.rows[name] = writer.rows
+        stats.files.extend(writer.files)
+    return stats
@@ -1,8 +1,16 @@
 from __future__ import annotations
 
+import base64
+import gzip
+import json
 from dataclasses import dataclass
 from pathlib import Path
-import shutil
+from typing import TYPE_CHECKING, Any, Mapping
+
+from dpylens.reporter.linking import LinkStats, ReportAssembler
+
+if TYPE_CHECKING:
+    from dpylens.analyzer.result import AnalysisResult
 
 
 @dataclass(frozen=True)
@@ -19,6 +27,8 @@ DEFAULT_JSON_FILES = [
     "patterns.json",
     "dataflow.json",
     "routes.json",
+    "metrics.json",
+    "duplicates.json",
 ]
 
 DEFAULT_IMAGE_FILES = [
@@ -30,26 +40,137 @@ DEFAULT_IMAGE_FILES = [
 ]
 
 
-def _safe_copy(src: Path, dst: Path) -> None:
-    if src.exists():
-        dst.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(src, dst)
+def overview_counts(data: Mapping[str, dict[str, Any]]) -> dict[str, int]:
+    """
+    Headline counts for the report's overview panel, from parsed data files (name -> payload,
+    missing files as {}). The only implementation: reports carry them as data/overview.json and
+    `dpylens serve` answers `/api/overview` with them; the page does not count.
+    """
+    modules = data.get("modules.json") or {}
+    module_graph = data.get("module_graph.json") or {}
+    resolved = data.get("callgraph_resolved.json") or {}
+    patterns = data.get("patterns.json") or {}
+    dataflow = data.get("dataflow.json") or {}
+    routes = data.get("routes.json") or {}
+    errors = sum(len(d.get("errors") or []) for d in (modules, module_graph, resolved, patterns, dataflow))
+    return {
+        "files": len(modules.get("imports") or []),
+        "functions": len(resolved.get("functions") or []),
+        "calls": len(resolved.get("calls") or []),
+        "module_edges": len(module_graph.get("edges") or []),
+        "pattern_hits": sum(len(hit.get("patterns") or []) for hit in patterns.get("patterns") or []),
+        "routes": len(routes.get("routes") or []),
+        "dataflow_functions": len(dataflow.get("functions") or []),
+        "warnings": errors + len(routes.get("warnings") or []),
+    }
 
 
-def build_report(paths: ReportPaths) -> None:
+# Data files overview_counts reads
+OVERVIEW_SOURCES = (
+    "modules.json",
+    "module_graph.json",
+    "callgraph_resolved.json",
+    "patterns.json",
+    "dataflow.json",
+    "routes.json",
+)
+
+
+def _overview_json(payloads: Mapping[str, dict[str, Any]]) -> bytes:
+    return json.dumps(overview_counts(payloads), sort_keys=True).encode("utf-8")
+
+
+# Marker in _INDEX_HTML where single-file mode embeds data blobs
+_EMBED_MARKER = "<!--dpylens:embedded-->"
+
+
+def _embedded_blob(name: str, data: bytes, *, compress: bool) -> str:
+    # gzip with mtime=0 keeps the output byte-identical across builds
+    payload = gzip.compress(data, compresslevel=9, mtime=0) if compress else data
+    encoding = "gzip" if compress else "identity"
+    b64 = base64.b64encode(payload).decode("ascii")
+    return f'<script type="application/octet-stream" data-file="{name}" data-encoding="{encoding}">{b64}</script>'
+
+
+def _single_file_html(paths: ReportPaths, result: AnalysisResult | None) -> str:
+    blobs: list[str] = []
+    payloads: dict[str, dict[str, Any]] = {}
+    for name in DEFAULT_JSON_FILES:
+        if result is not None and name in result.artifact_names:
+            data = result.json_text(name).encode("utf-8")
+            payloads[name] = result.payload(name)
+        elif (paths.analysis_dir / name).exists():
+            data = (paths.analysis_dir / name).read_bytes()
+            payloads[name] = json.loads(data)
+        else:
+            continue
+        blobs.append(_embedded_blob(f"data/{name}", data, compress=True))
+    # The overview is on screen at load; its counts are embedded so that showing it decodes no blob
+    blobs.append(_embedded_blob("data/overview.json", _overview_json(payloads), compress=False))
+
+    for name in DEFAULT_IMAGE_FILES:
+        src = paths.analysis_dir / name
+        if src.exists():
+            # PNG is already compressed
+            blobs.append(_embedded_blob(f"img/{name}", src.read_bytes(), compress=False))
+
+    return _INDEX_HTML.replace(_EMBED_MARKER, "\n".join(blobs))
+
+
+def build_report(
+    paths: ReportPaths,
+    result: AnalysisResult | None = None,
+    *,
+    single_file: bool = False,
+    link: str = "auto",
+) -> LinkStats:
+    """
+    Build the static report.
+
+    Files from `paths.analysis_dir` are placed with `link` (see LINK_MODES: reflink or hardlink
+    where the filesystem allows, else copy), and files unchanged since the previous build are
+    left alone. When `result` is given and was not written to `paths.analysis_dir`, data files
+    are written from its cached JSON views instead.
+
+    With `single_file`, only `index.html` is written: data files are embedded as
+    gzip + base64 blobs (images as base64) and decoded in the browser on first use,
+    so the report opens straight from disk.
+    """
     report_dir = paths.report_dir
     analysis_dir = paths.analysis_dir
+    assembler = ReportAssembler(report_dir, link)
+
+    if single_file:
+        assembler.add_bytes(_single_file_html(paths, result).encode("utf-8"), "index.html")
+        return assembler.finish()
 
     (report_dir / "data").mkdir(parents=True, exist_ok=True)
     (report_dir / "img").mkdir(parents=True, exist_ok=True)
 
-    for name in DEFAULT_JSON_FILES:
-        _safe_copy(analysis_dir / name, report_dir / "data" / name)
+    linkable = result is None or result.written_to(analysis_dir)
+    names = list(DEFAULT_JSON_FILES)
+    if result is not None:
+        # Extractor plugin artifacts; the page ignores them, they are there for tooling and custom views
+        names += list(result.plugin_artifacts)
+    for name in names:
+        if not linkable and result is not None and name in result.artifact_names:
+            assembler.add_bytes(result.json_text(name).encode("utf-8"), f"data/{name}")
+        else:
+            assembler.add_file(analysis_dir / name, f"data/{name}")
+
+    payloads: dict[str, dict[str, Any]] = {}
+    for name in OVERVIEW_SOURCES:
+        if result is not None and name in result.artifact_names:
+            payloads[name] = result.payload(name)
+        elif (analysis_dir / name).exists():
+            payloads[name] = json.loads((analysis_dir / name).read_bytes())
+    assembler.add_bytes(_overview_json(payloads), "data/overview.json")
 
     for name in DEFAULT_IMAGE_FILES:
-        _safe_copy(analysis_dir / name, report_dir / "img" / name)
+        assembler.add_file(analysis_dir / name, f"img/{name}")
 
-    (report_dir / "index.html").write_text(_INDEX_HTML, encoding="utf-8")
+    assembler.add_bytes(_INDEX_HTML.replace(_EMBED_MARKER, "").encode("utf-8"), "index.html")
+    return assembler.finish()
 
 
 _INDEX_HTML = r"""<!doctype html>
@@ -224,6 +345,49 @@ _INDEX_HTML = r"""<!doctype html>
     .pill.ok { background: var(--ok-bg); color: var(--ok); border-color: rgba(34,197,94,0.25); }
     .pill.warn { background: var(--warn-bg); color: var(--warn); border-color: rgba(245,158,11,0.28); }
 
+    .metrics-grid {
+      display: grid;
+      grid-template-columns: repeat(2, minmax(0, 1fr));
+      gap: 16px;
+    }
+    @media (max-width: 1100px) {
+      .metrics-grid { grid-template-columns: 1fr; }
+    }
+    .metrics-grid select {
+      background: var(--panel-solid);
+      color: var(--text);
+      border: 1px solid var(--border-2);
+      border-radius: 8px;
+      padding: 2px 6px;
+      font-size: 12px;
+    }
+    .hist {
+      display: flex;
+      align-items: flex-end;
+      gap: 4px;
+      height: 90px;
+      margin-top: 8px;
+    }
+    .hist .bar {
+      flex: 1;
+      min-height: 1px;
+      background: linear-gradient(180deg, var(--cyan), var(--blue));
+      border-radius: 3px 3px 0 0;
+      opacity: 0.75;
+    }
+    .hist-labels { display: flex; gap: 4px; font-size: 10px; color: var(--muted-2); }
+    .hist-labels span { flex: 1; text-align: center; }
+    .dup-cluster {
+      border: 1px solid var(--border);
+      border-radius: 12px;
+      padding: 8px 10px;
+      margin-top: 8px;
+      background: rgba(255,255,255,0.02);
+    }
+    .dup-cluster .head { display: flex; gap: 8px; align-items: center; font-size: 12px; }
+    tr.pick { cursor: pointer; }
+    tr.pick:hover td { color: var(--cyan); }
+
     .graph-grid {
       display: grid;
       grid-template-columns: repeat(2, minmax(0, 1fr));
@@ -530,6 +694,16 @@ _INDEX_HTML = r"""<!doctype html>
       </div>
     </div>
 
+    <div class="card" style="margin-bottom:16px;">
+      <h2>Function metrics</h2>
+      <div id="metrics" class="muted">Loading metrics…</div>
+    </div>
+
+    <div class="card" style="margin-bottom:16px;">
+      <h2>Duplicate code</h2>
+      <div id="duplicates" class="muted">Loading duplicates…</div>
+    </div>
+
     <div class="explorer">
       <div class="sidebar">
         <div class="sidebar-header">
@@ -571,13 +745,51 @@ _INDEX_HTML = r"""<!doctype html>
     </div>
   </div>
 
+<!--dpylens:embedded-->
 <script>
-async function loadJson(name) {
+// Single-file reports embed data/ and img/ files as base64 blobs (JSON gzipped);
+// a blob is decoded the first time its file is requested.
+function embeddedBlob(path) {
+  return document.querySelector(`script[data-file="${path}"]`);
+}
+
+function blobBytes(node) {
+  const bin = atob(node.textContent.trim());
+  const bytes = new Uint8Array(bin.length);
+  for (let i = 0; i < bin.length; i++) bytes[i] = bin.charCodeAt(i);
+  return bytes;
+}
+
+const jsonCache = new Map();
+function loadJson(name) {
+  if (!jsonCache.has(name)) jsonCache.set(name, fetchJson(name));
+  return jsonCache.get(name);
+}
+
+async function fetchJson(name) {
+  const node = embeddedBlob(`data/${name}`);
+  if (node) {
+    const blob = new Blob([blobBytes(node)]);
+    if (node.dataset.encoding !== "gzip") return JSON.parse(await blob.text());
+    if (typeof DecompressionStream === "undefined") throw new Error("This browser cannot decompress embedded data");
+    return await new Response(blob.stream().pipeThrough(new DecompressionStream("gzip"))).json();
+  }
+  if (embeddedBlob("data/modules.json")) throw new Error(`Not embedded: ${name}`);
   const res = await fetch(`data/${name}`);
   if (!res.ok) throw new Error(`Failed to load ${name}: ${res.status}`);
   return await res.json();
 }
 
+const imageUrls = new Map();
+function imageSrc(file) {
+  const path = `img/${file}`;
+  if (!imageUrls.has(path)) {
+    const node = embeddedBlob(path);
+    imageUrls.set(path, node ? URL.createObjectURL(new Blob([blobBytes(node)], {type: "image/png"})) : path);
+  }
+  return imageUrls.get(path);
+}
+
 function el(tag, attrs={}, children=[]) {
   const e = document.createElement(tag);
   Object.entries(attrs).forEach(([k,v]) => {
@@ -689,41 +901,40 @@ document.addEventListener("mousemove", (e) => {
 document.addEventListener("mouseup", () => { state.dragging = false; });
 
 // --- Overview/Graphs ---
-function renderOverview({modules, moduleGraph, callgraph, patterns, dataflow, routes}) {
-  const errs =
-    (modules.errors || []).length +
-    (moduleGraph.errors || []).length +
-    (callgraph.errors || []).length +
-    (patterns.errors || []).length +
-    (dataflow.errors || []).length +
-    (routes?.warnings || []).length;
-
-  const pill = errs
-    ? el("span", {class: "pill warn"}, [`Warnings: ${errs}`])
+function renderOverview(counts) {
+  const pill = counts.warnings
+    ? el("span", {class: "pill warn"}, [`Warnings: ${counts.warnings}`])
     : el("span", {class: "pill ok"}, ["OK"]);
 
-  const moduleEdges = (moduleGraph.edges || []).length;
-  const fnCount = (callgraph.functions || []).length;
-  const callCount = (callgraph.calls || []).length;
-  const filesCount = (modules.imports || []).length;
-  const patCount = (patterns.patterns || []).reduce((acc, p) => acc + ((p.patterns || []).length), 0);
-  const dfCount = (dataflow.functions || []).length;
-  const routeCount = (routes?.routes || []).length;
+  const stat = (label, value) =>
+    el("div", {class:"stat"}, [el("div", {class:"k"}, [label]), el("div", {class:"v"}, [String(value)])]);
 
   return el("div", {}, [
     pill,
     el("div", {class: "stats-grid", style: "margin-top:12px;"}, [
-      el("div", {class:"stat"}, [el("div", {class:"k"}, ["Files"]), el("div", {class:"v"}, [String(filesCount)])]),
-      el("div", {class:"stat"}, [el("div", {class:"k"}, ["Functions"]), el("div", {class:"v"}, [String(fnCount)])]),
-      el("div", {class:"stat"}, [el("div", {class:"k"}, ["Calls"]), el("div", {class:"v"}, [String(callCount)])]),
-      el("div", {class:"stat"}, [el("div", {class:"k"}, ["Module edges"]), el("div", {class:"v"}, [String(moduleEdges)])]),
-      el("div", {class:"stat"}, [el("div", {class:"k"}, ["Pattern hits"]), el("div", {class:"v"}, [String(patCount)])]),
-      el("div", {class:"stat"}, [el("div", {class:"k"}, ["Routes"]), el("div", {class:"v"}, [String(routeCount)])]),
-      el("div", {class:"stat"}, [el("div", {class:"k"}, ["Dataflow fns"]), el("div", {class:"v"}, [String(dfCount)])]),
+      stat("Files", counts.files),
+      stat("Functions", counts.functions),
+      stat("Calls", counts.calls),
+      stat("Module edges", counts.module_edges),
+      stat("Pattern hits", counts.pattern_hits),
+      stat("Routes", counts.routes),
+      stat("Dataflow fns", counts.dataflow_functions),
     ])
   ]);
 }
 
+// Run `fn` once `node` scrolls into view (images are only decoded when needed)
+function whenVisible(node, fn) {
+  if (typeof IntersectionObserver === "undefined") return fn();
+  const obs = new IntersectionObserver((entries) => {
+    if (entries.some(e => e.isIntersecting)) {
+      obs.disconnect();
+      fn();
+    }
+  });
+  obs.observe(node);
+}
+
 function renderGraphs() {
   const imgs = [
     {file: "module_graph.png", title: "Module Graph"},
@@ -735,7 +946,7 @@ function renderGraphs() {
 
   const wrap = el("div", {class:"graph-grid"});
   imgs.forEach(i => {
-    const src = `img/${i.file}`;
+    const src = imageSrc(i.file);
     const img = new Image();
     img.src = src;
 
@@ -753,8 +964,133 @@ function renderGraphs() {
   return wrap;
 }
 
+// --- Function metrics ---
+const METRIC_LABELS = {
+  complexity: "Cyclomatic complexity",
+  statements: "Statements",
+  nesting: "Nesting depth",
+  params: "Parameters",
+  calls: "Call sites",
+};
+
+function table(headers, rows) {
+  const t = el("table");
+  t.appendChild(el("thead", {}, [el("tr", {}, headers.map(h => el("th", {}, [h])))]));
+  const tb = el("tbody");
+  rows.forEach(r => tb.appendChild(r));
+  t.appendChild(tb);
+  return t;
+}
+
+function renderHistogram(edges, counts) {
+  const peak = Math.max(1, ...counts);
+  const bars = el("div", {class:"hist"});
+  const labels = el("div", {class:"hist-labels"});
+  counts.forEach((c, i) => {
+    const hi = edges[i + 1];
+    const range = hi === undefined ? `${edges[i]}+` : (hi - edges[i] === 1 ? `${edges[i]}` : `${edges[i]}-${hi - 1}`);
+    const bar = el("div", {class:"bar", title: `${range}: ${c}`});
+    bar.style.height = `${(100 * c / peak).toFixed(1)}%`;
+    bars.appendChild(bar);
+    labels.appendChild(el("span", {}, [range]));
+  });
+  return el("div", {}, [bars, labels]);
+}
+
+// Groups are column-wise: {name: [...], count: [...], complexity: {p90: [...], ...}, ...}
+function topGroups(groups, metric, n) {
+  const m = groups[metric];
+  return groups.name.map((_, i) => i)
+    .sort((a, b) => (m.p90[b] - m.p90[a]) || (m.max[b] - m.max[a]) || (a - b))
+    .slice(0, n);
+}
+
+function renderMetrics(metrics, onPick) {
+  if (!metrics) return el("div", {class:"muted"}, ["metrics.json missing (re-run dpylens analyze)."]);
+  const agg = metrics.aggregates;
+  const names = metrics.metrics || Object.keys(METRIC_LABELS);
+  if (!agg.count) return el("div", {class:"muted"}, ["No functions."]);
+
+  const summary = table(["Metric", "p50", "p90", "p95", "p99", "Max", "Mean"], names.map(name => {
+    const st = agg.repo[name];
+    return el("tr", {}, [
+      el("td", {}, [METRIC_LABELS[name] || name]),
+      ...["p50", "p90", "p95", "p99", "max", "mean"].map(k => el("td", {}, [String(st[k])])),
+    ]);
+  }));
+
+  const select = el("select", {"aria-label": "Metric"}, names.map(name => el("option", {value: name}, [METRIC_LABELS[name] || name])));
+  const detail = el("div");
+
+  function refresh() {
+    const name = select.value;
+    const out = agg.outliers[name];
+    clear(detail);
+    detail.appendChild(renderHistogram(agg.histograms.edges, agg.histograms[name]));
+    detail.appendChild(el("div", {class:"section-title"}, [`Outliers: ${out.count} above ${out.threshold}`]));
+    detail.appendChild(out.top.length ? table(["Function", "Value", "Line"], out.top.slice(0, 15).map(o =>
+      el("tr", {class:"pick", title: o.file, onclick: () => onPick(o.qualname)}, [
+        el("td", {class:"mono"}, [o.qualname]),
+        el("td", {}, [String(o.value)]),
+        el("td", {}, [String(o.lineno)]),
+      ])
+    )) : el("div", {class:"muted"}, ["None."]));
+
+    const pk = agg.packages;
+    detail.appendChild(el("div", {class:"section-title"}, ["Packages (by p90)"]));
+    detail.appendChild(table(["Package", "Functions", "p50", "p90", "Max"], topGroups(pk, name, 12).map(i => el("tr", {}, [
+      el("td", {class:"mono"}, [pk.name[i]]),
+      el("td", {}, [String(pk.count[i])]),
+      el("td", {}, [String(pk[name].p50[i])]),
+      el("td", {}, [String(pk[name].p90[i])]),
+      el("td", {}, [String(pk[name].max[i])]),
+    ]))));
+  }
+  select.addEventListener("change", refresh);
+  refresh();
+
+  return el("div", {class:"metrics-grid"}, [
+    el("div", {}, [
+      el("div", {class:"muted", style:"font-size:12px;margin-bottom:6px;"}, [`${agg.count} functions, ${agg.packages.name.length} packages, ${agg.modules.name.length} modules`]),
+      summary,
+    ]),
+    el("div", {}, [select, detail]),
+  ]);
+}
+
+// --- Duplicates ---
+function renderDuplicates(dups, onPick) {
+  if (!dups) return el("div", {class:"muted"}, ["duplicates.json missing (re-run dpylens analyze)."]);
+  const st = dups.stats;
+  const head = el("div", {class:"muted", style:"font-size:12px;"}, [
+    `${st.clusters} clusters (${st.exact_clusters} exact, ${st.near_clusters} near) covering ` +
+    `${st.duplicated_functions} of ${st.functions} functions with ≥ ${dups.params.min_tokens} tokens; ` +
+    `${st.duplicated_tokens} duplicated tokens.`
+  ]);
+  if (!dups.clusters.length) return el("div", {}, [head]);
+
+  const shown = 25;
+  const blocks = dups.clusters.slice(0, shown).map(c => el("div", {class:"dup-cluster"}, [
+    el("div", {class:"head"}, [
+      el("span", {class: "pill" + (c.kind === "exact" ? " warn" : "")}, [c.kind]),
+      el("span", {}, [`#${c.id} · ${c.size} copies · ${c.members[0].tokens} tokens` + (c.kind === "near" ? ` · similarity ≥ ${c.similarity}` : "")]),
+    ]),
+    table(["Function", "Line", "File"], c.members.map(m =>
+      el("tr", {class:"pick", onclick: () => onPick(m.qualname)}, [
+        el("td", {class:"mono"}, [m.qualname]),
+        el("td", {}, [String(m.lineno)]),
+        el("td", {class:"mono", title: m.file}, [m.file]),
+      ])
+    )),
+  ]));
+  const more = dups.clusters.length > shown
+    ? el("div", {class:"muted", style:"font-size:12px;margin-top:8px;"}, [`${dups.clusters.length - shown} more clusters in data/duplicates.json`])
+    : null;
+  return el("div", {}, [head, ...blocks, more]);
+}
+
 // --- Index build ---
-function makeIndex({modules, callgraph, callgraphResolved, patterns, dataflow, routes}) {
+function makeIndex({modules, callgraph, callgraphResolved, patterns, dataflow}) {
   const files = (modules.imports || []).map(r => r.file).sort();
 
   const importsByFile = new Map();
@@ -803,12 +1139,6 @@ function makeIndex({modules, callgraph, callgraphResolved, patterns, dataflow, r
     callersByCallee.set(callee, out2);
   });
 
-  // Routes: store list + convenience searchable strings
-  const routeItems = (routes?.routes || []).map(r => ({
-    ...r,
-    display: `${r.http_method} ${r.path}`
-  }));
-
   return {
     files,
     importsByFile,
@@ -820,16 +1150,115 @@ function makeIndex({modules, callgraph, callgraphResolved, patterns, dataflow, r
     functionMeta,
     calleesByCaller,
     callersByCallee,
-    routeItems,
   };
 }
 
-function renderList(items, filterText, onSelect, selectedValue) {
+// --- Panel data ---
+// The list and detail panels read through a source: the data/ files (static and single-file
+// reports), or the /api/ index of `dpylens serve`, which answers each panel with just its rows
+// instead of the page downloading whole artifacts.
+function filterItems(items, filterText) {
   const q = (filterText || "").toLowerCase();
-  const filtered = items.filter(x => x.toLowerCase().includes(q));
+  return items.filter(x => x.toLowerCase().includes(q));
+}
 
+// fn() runs once, on first call; later calls share its promise
+function once(fn) {
+  let p = null;
+  return () => (p ??= fn());
+}
+
+function optionalJson(name, fallback = null) {
+  return loadJson(name).catch(() => fallback);
+}
+
+function staticSource() {
+  // Built when the lists or detail panels first need it, not at page load
+  const loadIndex = once(async () => {
+    const [modules, callgraph, callgraphResolved, patterns, dataflow] = await Promise.all([
+      loadJson("modules.json"),
+      loadJson("callgraph.json"),
+      optionalJson("callgraph_resolved.json"),
+      loadJson("patterns.json"),
+      loadJson("dataflow.json"),
+    ]);
+    return makeIndex({modules, callgraph, callgraphResolved, patterns, dataflow});
+  });
+  return {
+    async list(mode, filterText) {
+      const index = await loadIndex();
+      return {items: filterItems(mode === "functions" ? index.functions : index.files, filterText), more: false};
+    },
+    async file(file) {
+      const index = await loadIndex();
+      const importsRec = index.importsByFile.get(file);
+      return {
+        file,
+        patterns: index.patternsByFile.get(file) || [],
+        imports: importsRec?.imports || [],
+        items: importsRec?.items || [],
+        calls: index.callsByFile.get(file) || [],
+        rcalls: index.resolvedCallsByFile.get(file) || [],
+        flows: index.dataflowByFile.get(file) || [],
+      };
+    },
+    async fn(qualname) {
+      const index = await loadIndex();
+      return {
+        meta: index.functionMeta.get(qualname),
+        callers: index.callersByCallee.get(qualname) || [],
+        callees: index.calleesByCaller.get(qualname) || [],
+      };
+    },
+  };
+}
+
+async function apiGet(kind, params = {}) {
+  const res = await fetch(`api/${kind}?${new URLSearchParams(params)}`);
+  if (res.status === 404) return null;
+  if (!res.ok) throw new Error(`api/${kind}: ${res.status}`);
+  return await res.json();
+}
+
+const API_LIST_LIMIT = 500;
+const API_DETAIL_LIMIT = 120;
+
+function apiSource() {
+  return {
+    // Functions are searched by qualname prefix, files by substring
+    async list(mode, filterText) {
+      const q = filterText || "";
+      if (mode === "functions") {
+        const page = await apiGet("functions", {prefix: q, limit: API_LIST_LIMIT});
+        return {items: page.items.map(r => r.qualname), more: page.next_offset !== null};
+      }
+      const page = await apiGet("files", {q, limit: API_LIST_LIMIT});
+      return {items: page.items.map(r => r.file), more: page.next_offset !== null};
+    },
+    async file(file) {
+      const rec = await apiGet("file", {path: file});
+      if (!rec) return null;
+      // No flattened import list or unresolved call list server-side
+      return {file, patterns: rec.patterns, imports: null, items: rec.imports, calls: null, rcalls: rec.calls, flows: rec.dataflow};
+    },
+    async fn(qualname) {
+      const [found, callers, callees] = await Promise.all([
+        apiGet("functions", {prefix: qualname, limit: 1}),
+        apiGet("callers", {name: qualname, limit: API_DETAIL_LIMIT}),
+        apiGet("callees", {name: qualname, limit: API_DETAIL_LIMIT}),
+      ]);
+      return {
+        meta: found.items.find(f => f.qualname === qualname),
+        callers: callers.items,
+        callees: callees.items,
+      };
+    },
+  };
+}
+
+function renderList(items, onSelect, selectedValue) {
   const list = el("div");
-  filtered.forEach(x => {
+  items.forEach(x => {
     list.appendChild(el("div", {
       class: "item" + (x === selectedValue ? " active" : ""),
       onclick: () => onSelect(x),
@@ -860,14 +1289,9 @@ function renderRouteDetails(route) {
   ]);
 }
 
-function renderFileDetails(file, index) {
-  const importsRec = index.importsByFile.get(file);
-  const fileImports = (importsRec?.imports || []);
-  const importItems = (importsRec?.items || []);
-  const pats = index.patternsByFile.get(file) || [];
-  const calls = (index.callsByFile.get(file) || []);
-  const rcalls = (index.resolvedCallsByFile.get(file) || []);
-  const flows = (index.dataflowByFile.get(file) || []);
+// rec: see the sources' file(); imports/calls are null when the source does not have them
+function renderFileDetails(rec) {
+  const {file, patterns: pats, imports: fileImports, items: importItems, calls, rcalls, flows} = rec;
 
   return el("div", {}, [
     el("div", {class:"section-title"}, ["File"]),
@@ -876,8 +1300,9 @@ function renderFileDetails(file, index) {
     el("div", {class:"section-title"}, ["Patterns"]),
     pats.length ? el("pre", {class:"mono"}, [pats.join("\n")]) : el("div", {class:"muted"}, ["None detected."]),
 
-    el("div", {class:"section-title"}, ["Imports (flattened)"]),
-    fileImports.length ? el("pre", {class:"mono"}, [fileImports.join("\n")]) : el("div", {class:"muted"}, ["None."]),
+    fileImports === null ? null : el("div", {class:"section-title"}, ["Imports (flattened)"]),
+    fileImports === null ? null
+      : fileImports.length ? el("pre", {class:"mono"}, [fileImports.join("\n")]) : el("div", {class:"muted"}, ["None."]),
 
     el("div", {class:"section-title"}, ["Imports (structured)"]),
     importItems.length ? (() => {
@@ -903,8 +1328,8 @@ function renderFileDetails(file, index) {
       return t;
     })() : el("div", {class:"muted"}, ["None."]),
 
-    el("div", {class:"section-title"}, ["Calls (sample)"]),
-    calls.length ? (() => {
+    calls === null ? null : el("div", {class:"section-title"}, ["Calls (sample)"]),
+    calls === null ? null : calls.length ? (() => {
       const t = el("table");
       t.appendChild(el("thead", {}, [el("tr", {}, [
         el("th", {}, ["Caller"]),
@@ -969,11 +1394,8 @@ function renderFileDetails(file, index) {
   ]);
 }
 
-function renderFunctionDetails(fn, index) {
-  const meta = index.functionMeta.get(fn);
-  const callers = index.callersByCallee.get(fn) || [];
-  const callees = index.calleesByCaller.get(fn) || [];
-
+// rec: see the sources' fn(); m: the function's row from metrics.json, if any
+function renderFunctionDetails(fn, {meta, callers, callees}, m) {
   return el("div", {}, [
     el("div", {class:"section-title"}, ["Function"]),
     el("pre", {class:"mono"}, [fn]),
@@ -983,6 +1405,13 @@ function renderFunctionDetails(fn, index) {
       el("pre", {class:"mono"}, [`${meta.file || ""}:${meta.lineno || ""}`]),
     ]) : el("div", {class:"muted"}, ["No metadata found."]),
 
+    m ? el("div", {}, [
+      el("div", {class:"section-title"}, ["Metrics"]),
+      el("pre", {class:"mono"}, [
+        Object.keys(METRIC_LABELS).map(k => `${METRIC_LABELS[k]}: ${m[k]}`).join("\n")
+      ]),
+    ]) : null,
+
     el("div", {class:"section-title"}, ["Calls made (sample)"]),
     callees.length ? (() => {
       const t = el("table");
@@ -1037,35 +1466,43 @@ function setActiveTab(active) {
 
 (async function main() {
   try {
-    const [modules, moduleGraph, callgraph, patterns, dataflow] = await Promise.all([
-      loadJson("modules.json"),
-      loadJson("module_graph.json"),
-      loadJson("callgraph.json"),
-      loadJson("patterns.json"),
-      loadJson("dataflow.json"),
-    ]);
-
-    let callgraphResolved = null;
-    try { callgraphResolved = await loadJson("callgraph_resolved.json"); } catch (e) {}
+    // Every data file is loaded (in single-file reports: decoded) the first time a panel needs it
+    const routeItems = once(async () => {
+      const routes = await optionalJson("routes.json", {routes: []});
+      // Routes: store list + convenience searchable strings
+      return (routes.routes || []).map(r => ({
+        ...r,
+        display: `${r.http_method} ${r.path}`
+      }));
+    });
+    const metricsByFn = once(async () => {
+      const byFn = new Map();
+      ((await optionalJson("metrics.json"))?.functions || []).forEach(m => byFn.set(m.qualname, m));
+      return byFn;
+    });
 
-    let routes = null;
-    try { routes = await loadJson("routes.json"); } catch (e) { routes = {framework:"unknown", routes:[], warnings:[]}; }
+    // Served by `dpylens serve`: use its /api/ index (a plain static server answers 404)
+    const served = !embeddedBlob("data/modules.json") && location.protocol.startsWith("http");
+    let counts = served ? await apiGet("overview").catch(() => null) : null;
+    const source = counts ? apiSource() : staticSource();
+    // Counted once at build time (html_report.overview_counts), never in the page
+    if (!counts) counts = await optionalJson("overview.json");
 
-    clear(document.getElementById("overview"));
-    document.getElementById("overview").appendChild(
-      renderOverview({modules, moduleGraph, callgraph, patterns, dataflow, routes})
-    );
+    const overviewHost = document.getElementById("overview");
+    clear(overviewHost);
+    if (counts) overviewHost.appendChild(renderOverview(counts));
+    else overviewHost.textContent = "No overview counts in this report (rebuild it with `dpylens report`).";
 
     const graphsHost = document.getElementById("graphs");
-    clear(graphsHost);
-    graphsHost.appendChild(renderGraphs());
-
-    const index = makeIndex({modules, callgraph, callgraphResolved, patterns, dataflow, routes});
+    whenVisible(graphsHost, () => {
+      clear(graphsHost);
+      graphsHost.appendChild(renderGraphs());
+    });
 
     let mode = "files";
-    let selectedFile = index.files[0] || null;
-    let selectedFn = index.functions[0] || null;
-    let selectedRouteDisplay = (index.routeItems[0]?.display) || null;
+    let selectedFile = null;
+    let selectedFn = null;
+    let selectedRouteDisplay = null;
 
     function selectedValue() {
       if (mode === "functions") return selectedFn;
@@ -1079,50 +1516,51 @@ function setActiveTab(active) {
       else selectedFile = v;
     }
 
-    function refreshList() {
+    // Panels may answer out of order (API requests); only the latest call renders
+    let listToken = 0;
+    let detailsToken = 0;
+
+    async function refreshList() {
+      const token = ++listToken;
       const q = document.getElementById("globalSearch").value || "";
-      const host = document.getElementById("masterList");
-      clear(host);
+      const {items, more} = mode === "routes"
+        ? {items: filterItems((await routeItems()).map(r => r.display), q), more: false}
+        : await source.list(mode, q);
+      if (token !== listToken) return;
 
-      if (mode === "routes") {
-        const items = index.routeItems.map(r => r.display);
-        host.appendChild(renderList(items, q, (v) => {
-          setSelected(v);
-          refreshDetails();
-          refreshList();
-        }, selectedValue()));
-        return;
+      if (selectedValue() === null && items.length) {
+        setSelected(items[0]);
+        refreshDetails();
       }
-
-      const items = mode === "functions" ? index.functions : index.files;
-
-      host.appendChild(renderList(items, q, (v) => {
+      const host = document.getElementById("masterList");
+      clear(host);
+      host.appendChild(renderList(items, (v) => {
         setSelected(v);
         refreshDetails();
         refreshList();
       }, selectedValue()));
+      if (more) host.appendChild(el("div", {class:"muted", style:"font-size:12px;margin:8px;"}, ["Refine the search to see more."]));
     }
 
-    function refreshDetails() {
-      const host = document.getElementById("details");
-      clear(host);
-
+    async function refreshDetails() {
+      const token = ++detailsToken;
+      let node;
       if (mode === "routes") {
-        if (!selectedRouteDisplay) return host.appendChild(el("div", {class:"muted"}, ["No routes."]));
-        const route = index.routeItems.find(r => r.display === selectedRouteDisplay);
-        if (!route) return host.appendChild(el("div", {class:"muted"}, ["Route not found."]));
-        host.appendChild(renderRouteDetails(route));
-        return;
-      }
-
-      if (mode === "functions") {
-        if (!selectedFn) return host.appendChild(el("div", {class:"muted"}, ["No functions."]));
-        host.appendChild(renderFunctionDetails(selectedFn, index));
-        return;
+        const route = selectedRouteDisplay && (await routeItems()).find(r => r.display === selectedRouteDisplay);
+        node = !selectedRouteDisplay ? el("div", {class:"muted"}, ["No routes."])
+          : route ? renderRouteDetails(route) : el("div", {class:"muted"}, ["Route not found."]);
+      } else if (mode === "functions") {
+        node = selectedFn
+          ? renderFunctionDetails(selectedFn, await source.fn(selectedFn), (await metricsByFn()).get(selectedFn))
+          : el("div", {class:"muted"}, ["No functions."]);
+      } else {
+        const rec = selectedFile ? await source.file(selectedFile) : null;
+        node = rec ? renderFileDetails(rec) : el("div", {class:"muted"}, [selectedFile ? "File not found." : "No files."]);
       }
-
-      if (!selectedFile) return host.appendChild(el("div", {class:"muted"}, ["No files."]));
-      host.appendChild(renderFileDetails(selectedFile, index));
+      if (token !== detailsToken) return;
+      const host = document.getElementById("details");
+      clear(host);
+      host.appendChild(node);
     }
 
     document.getElementById("globalSearch").addEventListener("input", refreshList);
@@ -1148,8 +1586,33 @@ function setActiveTab(active) {
       refreshDetails();
     });
 
-    refreshList();
-    refreshDetails();
+    function showFunction(qualname) {
+      mode = "functions";
+      selectedFn = qualname;
+      setActiveTab("functions");
+      refreshList();
+      refreshDetails();
+      document.getElementById("details").scrollIntoView({behavior: "smooth", block: "start"});
+    }
+
+    const metricsHost = document.getElementById("metrics");
+    whenVisible(metricsHost, async () => {
+      const metrics = await optionalJson("metrics.json");
+      clear(metricsHost);
+      metricsHost.classList.remove("muted");
+      metricsHost.appendChild(renderMetrics(metrics, showFunction));
+    });
+
+    const dupHost = document.getElementById("duplicates");
+    whenVisible(dupHost, async () => {
+      const duplicates = await optionalJson("duplicates.json");
+      clear(dupHost);
+      dupHost.classList.remove("muted");
+      dupHost.appendChild(renderDuplicates(duplicates, showFunction));
+    });
+
+    await refreshList();  // selects (and shows) the first file
+    if (selectedFile === null) await refreshDetails();
   } catch (e) {
     console.error(e);
     document.getElementById("overview").textContent =
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+from dataclasses import dataclass, field
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+
+# "auto" tries reflink, then hardlink, then copy. Symlinks are opt-in: they break when
+# the analysis folder moves or is deleted.
+LINK_MODES = ("auto", "reflink", "hardlink", "symlink", "copy")
+
+MANIFEST_FILENAME = ".dpylens-report.json"
+_MANIFEST_VERSION = 1
+
+# linux/fs.h: _IOW(0x94, 9, int)
+_FICLONE = 0x40049409
+
+
+def content_digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _file_digest(path: Path) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _reflink(src: Path, dst: Path) -> None:
+    if fcntl is None:
+        raise OSError("reflinks are not supported on this platform")
+    with src.open("rb") as s, dst.open("wb") as d:
+        try:
+            fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+        except OSError:
+            d.close()
+            dst.unlink()
+            raise
+
+
+def _place(src: Path, tmp: Path, mode: str) -> str:
+    """
+    Create `tmp` from `src` with the first method `mode` allows; returns the method used.
+    """
+    if mode in ("auto", "reflink"):
+        try:
+            _reflink(src, tmp)
+            return "reflink"
+        except OSError:
+            pass
+    if mode in ("auto", "reflink", "hardlink"):
+        try:
+            os.link(src, tmp)
+            return "hardlink"
+        except OSError:
+            pass
+    if mode == "symlink":
+        try:
+            os.symlink(src.resolve(), tmp)
+            return "symlink"
+        except OSError:
+            pass
+    shutil.copy2(src, tmp)
+    return "copy"
+
+
+@dataclass
+class LinkStats:
+    """
+    How report files were placed: method -> count, plus files left alone because unchanged.
+    """
+    placed: dict[str, int] = field(default_factory=dict)
+    written: int = 0
+    unchanged: int = 0
+
+    def count(self, method: str) -> None:
+        self.placed[method] = self.placed.get(method, 0) + 1
+
+    def describe(self) -> str:
+        parts = [f"{n} {method}" for method, n in sorted(self.placed.items())]
+        if self.written:
+            parts.append(f"{self.written} written")
+        parts.append(f"{self.unchanged} unchanged")
+        return ", ".join(parts)
+
+
+class ReportAssembler:
+    """
+    Places files into a report folder without copying where the filesystem allows it.
+
+    A manifest in the report folder remembers, per file, its content digest and the source's
+    stat (size, mtime, inode). On the next build a file whose source stat is unchanged is skipped
+    without reading it; otherwise the source is hashed and only re-placed if its content changed.
+    Files are replaced atomically, so a hardlinked report file is never modified in place.
+    """
+
+    def __init__(self, report_dir: Path, mode: str = "auto"):
+        if mode not in LINK_MODES:
+            raise ValueError(f"link mode must be one of {', '.join(LINK_MODES)}, got {mode!r}")
+        self.report_dir = report_dir
+        self.mode = mode
+        self.stats = LinkStats()
+        self._manifest_path = report_dir / MANIFEST_FILENAME
+        self._old = self._load_manifest()
+        self._new: dict[str, dict] = {}
+
+    def _load_manifest(self) -> dict[str, dict]:
+        try:
+            data = json.loads(self._manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != _MANIFEST_VERSION:
+            return {}
+        return data.get("files") or {}
+
+    def _unchanged(self, rel: str, digest: str) -> bool:
+        entry = self._old.get(rel)
+        return entry is not None and entry.get("digest") == digest and (self.report_dir / rel).exists()
+
+    def _replace(self, dst: Path, make) -> str:
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dst.with_name(f".{dst.name}.tmp")
+        if tmp.exists() or tmp.is_symlink():
+            tmp.unlink()
+        method = make(tmp)
+        os.replace(tmp, dst)
+        return method
+
+    def add_file(self, src: Path, rel: str) -> None:
+        """
+        Place `src` at `<report_dir>/<rel>`. Missing sources are ignored.
+        """
+        try:
+            st = src.stat()
+        except OSError:
+            return
+        signature = [st.st_size, st.st_mtime_ns, st.st_ino]
+        entry = self._old.get(rel)
+        if entry is not None and entry.get("source") == signature and (self.report_dir / rel).exists():
+            self._new[rel] = entry
+            self.stats.unchanged += 1
+            return
+
+        digest = _file_digest(src)
+        if not self._unchanged(rel, digest):
+            self.stats.count(self._replace(self.report_dir / rel, lambda tmp: _place(src, tmp, self.mode)))
+        else:
+            self.stats.unchanged += 1
+        self._new[rel] = {"digest": digest, "source": signature}
+
+    def add_bytes(self, data: bytes, rel: str) -> None:
+        """
+        Write generated content at `<report_dir>/<rel>` unless the same content is already there.
+        """
+        digest = content_digest(data)
+        if self._unchanged(rel, digest):
+            self.stats.unchanged += 1
+        else:
+            self._replace(self.report_dir / rel, lambda tmp: tmp.write_bytes(data))
+            self.stats.written += 1
+        self._new[rel] = {"digest": digest, "source": None}
+
+    def finish(self) -> LinkStats:
+        """
+        Remove files placed by the previous build but not this one, and save the manifest.
+        """
+        for rel in set(self._old) - set(self._new):
+            stale = self.report_dir / rel
+            if stale.is_file() or stale.is_symlink():
+                stale.unlink()
+        self._manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        self._manifest_path.write_text(
+            json.dumps({"version": _MANIFEST_VERSION, "files": self._new}, sort_keys=True),
+            encoding="utf-8",
+        )
+        return self.stats
@@ -0,0 +1,519 @@
+from __future__ import annotations
+
+import bisect
+import gzip
+import hashlib
+import itertools
+import json
+import mimetypes
+import os
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, unquote, urlsplit
+
+try:
+    import brotli  # optional: pip install brotli
+except ImportError:
+    brotli = None
+
+from dpylens.reporter.html_report import overview_counts
+from dpylens.store.sqlite import MAX_PAGE_SIZE
+
+_COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "image/svg+xml")
+_MIN_COMPRESS_BYTES = 1024
+# Larger files are served uncompressed unless a precompressed .gz/.br sibling exists
+_MAX_COMPRESS_BYTES = 256 * 2**20
+_COMPRESSED_CACHE_BYTES = 128 * 2**20
+_ENCODING_SUFFIX = {"br": ".br", "gzip": ".gz"}
+# data/ files behind the /api/ index; it is rebuilt when any of them changes
+_INDEXED_FILES = (
+    "callgraph_resolved.json",
+    "modules.json",
+    "patterns.json",
+    "routes.json",
+    "dataflow.json",
+    "module_graph.json",
+)
+
+
+def _content_type(path: Path) -> str:
+    if path.suffix == ".json":
+        return "application/json"
+    ctype, _ = mimetypes.guess_type(path.name)
+    ctype = ctype or "application/octet-stream"
+    return f"{ctype}; charset=utf-8" if ctype.startswith("text/") or ctype.endswith("javascript") else ctype
+
+
+def _accepted_encodings(header: str | None) -> list[str]:
+    """
+    Encodings we can produce that the client accepts, best first.
+    """
+    accepted: set[str] = set()
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(name.strip().lower())
+    out = []
+    if brotli is not None and ("br" in accepted or "*" in accepted):
+        out.append("br")
+    if "gzip" in accepted or "*" in accepted:
+        out.append("gzip")
+    return out
+
+
+def _parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """
+    A single `bytes=` range as (start, end inclusive); None if absent/unsupported (serve it all).
+    Raises ValueError if the range cannot be satisfied.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if first == "":
+            length = int(last)
+            if length <= 0:
+                raise ValueError("empty suffix range")
+            return max(0, size - length), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        raise ValueError("range not satisfiable")
+    return start, min(end, size - 1)
+
+
+@dataclass(frozen=True)
+class _FileInfo:
+    path: Path
+    size: int
+    mtime_ns: int
+    etag: str  # strong validator of the identity representation
+
+
+class _StaticFiles:
+    """
+    Per-file validators and compressed representations, cached by (inode, size, mtime).
+    """
+
+    def __init__(self, root: Path):
+        self.root = root.resolve()
+        self._lock = threading.Lock()
+        self._infos: dict[Path, tuple[tuple[int, int, int], _FileInfo]] = {}
+        self._compressed: OrderedDict[tuple[Path, int, str], bytes] = OrderedDict()
+        self._compressed_bytes = 0
+
+    def resolve(self, url_path: str) -> Path | None:
+        rel = unquote(url_path).lstrip("/") or "index.html"
+        # Normalize without following links: report files may be symlinks into the
+        # analysis folder (--link symlink), but ".." must not leave the report
+        path = Path(os.path.normpath(self.root / rel))
+        if path != self.root and self.root not in path.parents:
+            return None
+        if path.is_dir():
+            path = path / "index.html"
+        return path if path.is_file() else None
+
+    def info(self, path: Path) -> _FileInfo:
+        st = path.stat()
+        sig = (st.st_ino, st.st_size, st.st_mtime_ns)
+        with self._lock:
+            cached = self._infos.get(path)
+            if cached is not None and cached[0] == sig:
+                return cached[1]
+        h = hashlib.blake2b(digest_size=16)
+        with path.open("rb") as fh:
+            for chunk in iter(lambda: fh.read(1 << 20), b""):
+                h.update(chunk)
+        info = _FileInfo(path=path, size=st.st_size, mtime_ns=st.st_mtime_ns, etag=f'"{h.hexdigest()}"')
+        with self._lock:
+            self._infos[path] = (sig, info)
+        return info
+
+    def compressed(self, info: _FileInfo, encoding: str) -> bytes | None:
+        """
+        The file in `encoding`: a precompressed sibling (file.json.gz / .br) if it is at least as
+        new as the file, else compressed once and kept in a bounded in-memory cache.
+        None when compressing is not worth it (small files) or too big to do on the fly.
+        """
+        sibling = info.path.with_name(info.path.name + _ENCODING_SUFFIX[encoding])
+        try:
+            if sibling.stat().st_mtime_ns >= info.mtime_ns:
+                return sibling.read_bytes()
+        except OSError:
+            pass
+        if not _MIN_COMPRESS_BYTES <= info.size <= _MAX_COMPRESS_BYTES:
+            return None
+
+        key = (info.path, info.mtime_ns, encoding)
+        with self._lock:
+            body = self._compressed.get(key)
+            if body is not None:
+                self._compressed.move_to_end(key)
+                return body
+        data = info.path.read_bytes()
+        body = brotli.compress(data, quality=5) if encoding == "br" else gzip.compress(data, compresslevel=6, mtime=0)
+        with self._lock:
+            self._compressed[key] = body
+            self._compressed_bytes += len(body)
+            while self._compressed_bytes > _COMPRESSED_CACHE_BYTES and len(self._compressed) > 1:
+                _key, old = self._compressed.popitem(last=False)
+                self._compressed_bytes -= len(old)
+        return body
+
+
+class ReportIndex:
+    """
+    In-memory index over a report's data files for the /api/ query endpoints.
+    Same queries and row shapes as store.sqlite.AnalysisStore, plus `overview` (the report's
+    headline counts) and `files` (file list search) for the report page in serve mode.
+    """
+
+    def __init__(self, data_dir: Path):
+        self.data_dir = data_dir
+        self._signature: tuple | None = None
+        self._lock = threading.Lock()
+        self.qualnames: list[str] = []
+        self.functions: list[dict[str, Any]] = []
+        self.callers_of: dict[str, list[dict[str, Any]]] = {}
+        self.callees_of: dict[str, list[dict[str, Any]]] = {}
+        self.by_file: dict[str, dict[str, Any]] = {}
+        self.files: list[str] = []
+        self.overview: dict[str, int] = {}
+
+    def _current_signature(self) -> tuple:
+        sig = []
+        for name in _INDEXED_FILES:
+            try:
+                st = (self.data_dir / name).stat()
+                sig.append((name, st.st_ino, st.st_size, st.st_mtime_ns))
+            except OSError:
+                sig.append((name, None))
+        return tuple(sig)
+
+    def _read(self, name: str) -> dict[str, Any]:
+        try:
+            return json.loads((self.data_dir / name).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def refresh(self) -> bool:
+        """
+        (Re)build from the data files if they changed. False if the report has no data files.
+        """
+        sig = self._current_signature()
+        with self._lock:
+            if sig == self._signature:
+                return bool(self.by_file)
+            resolved = self._read("callgraph_resolved.json")
+            modules = self._read("modules.json")
+            patterns = self._read("patterns.json")
+            routes = self._read("routes.json")
+            dataflow = self._read("dataflow.json")
+            module_graph = self._read("module_graph.json")
+
+            by_file: dict[str, dict[str, Any]] = {}
+
+            def entry(file: str) -> dict[str, Any]:
+                return by_file.setdefault(
+                    file,
+                    {
+                        "file": file,
+                        "functions": [],
+                        "imports": [],
+                        "calls": [],
+                        "dataflow": [],
+                        "patterns": [],
+                        "routes": [],
+                        "errors": [],
+                    },
+                )
+
+            for rec in modules.get("imports") or []:
+                entry(rec["file"])["imports"] = rec.get("items") or []
+            functions = sorted(
+                ({"qualname": f["qualname"], "file": f["file"], "lineno": f["lineno"]} for f in resolved.get("functions") or []),
+                key=lambda r: (r["qualname"], r["file"], r["lineno"]),
+            )
+            for f in functions:
+                entry(f["file"])["functions"].append({"qualname": f["qualname"], "lineno": f["lineno"]})
+
+            callers_of: dict[str, list[dict[str, Any]]] = {}
+            callees_of: dict[str, list[dict[str, Any]]] = {}
+            for c in resolved.get("calls") or []:
+                callees_of.setdefault(c["caller"], []).append(
+                    {"callee_raw": c["callee_raw"], "callee_resolved": c["callee_resolved"], "file": c["file"], "lineno": c["lineno"]}
+                )
+                if c["callee_resolved"]:
+                    callers_of.setdefault(c["callee_resolved"], []).append(
+                        {"caller": c["caller"], "callee_raw": c["callee_raw"], "file": c["file"], "lineno": c["lineno"]}
+                    )
+                entry(c["file"])["calls"].append(
+                    {"caller": c["caller"], "callee_raw": c["callee_raw"], "callee_resolved": c["callee_resolved"], "lineno": c["lineno"]}
+                )
+            for rows in callers_of.values():
+                rows.sort(key=lambda r: (r["caller"], r["file"], r["lineno"]))
+            for rows in callees_of.values():
+                rows.sort(key=lambda r: r["lineno"])
+            for rec in by_file.values():
+                rec["calls"].sort(key=lambda r: r["lineno"])
+                rec["functions"].sort(key=lambda r: r["lineno"])
+
+            for hit in patterns.get("patterns") or []:
+                if hit["file"] in by_file:
+                    by_file[hit["file"]]["patterns"] = sorted(hit.get("patterns") or [])
+            for f in dataflow.get("functions") or []:
+                entry(f["file"])["dataflow"].append({k: f[k] for k in ("function", "lineno", "inputs", "transforms", "outputs")})
+            for rec in by_file.values():
+                rec["dataflow"].sort(key=lambda r: r["lineno"])
+            for e in (e for data in (modules, module_graph, resolved, patterns, dataflow) for e in data.get("errors") or []):
+                if e.get("file"):
+                    entry(e["file"])["errors"].append(e["error"])
+            self.by_file = by_file
+            # Routes carry repo-relative paths; everything else is keyed by absolute path
+            for r in routes.get("routes") or []:
+                rec = self._file_entry(r["file"])
+                if rec is not None:
+                    rec["routes"].append({k: r[k] for k in ("http_method", "path", "handler", "controller", "auth")})
+
+            self.files = sorted(by_file)
+            self.overview = overview_counts(
+                {
+                    "modules.json": modules,
+                    "module_graph.json": module_graph,
+                    "callgraph_resolved.json": resolved,
+                    "patterns.json": patterns,
+                    "dataflow.json": dataflow,
+                    "routes.json": routes,
+                }
+            )
+            self.functions = functions
+            self.qualnames = [f["qualname"] for f in functions]
+            self.callers_of = callers_of
+            self.callees_of = callees_of
+            self._signature = sig
+            return bool(by_file)
+
+    def _file_entry(self, path: str) -> dict[str, Any] | None:
+        """
+        Accepts the absolute path (as in the artifacts) or a path relative to the analyzed root.
+        """
+        rec = self.by_file.get(path)
+        if rec is None and not os.path.isabs(path):
+            suffix = "/" + path.removeprefix("./")
+            rec = next((v for k, v in self.by_file.items() if k.replace(os.sep, "/").endswith(suffix)), None)
+        return rec
+
+    def query(self, kind: str, params: dict[str, str]) -> Any:
+        """
+        kind: functions (prefix), callers / callees (name), file (path), files (q: substring of
+        the path), overview. Raises KeyError if unknown.
+        """
+        if kind == "overview":
+            return self.overview
+        limit = max(1, min(int(params.get("limit", 100)), MAX_PAGE_SIZE))
+        offset = max(0, int(params.get("offset", 0)))
+        if kind == "functions":
+            prefix = params.get("prefix", "")
+            start = bisect.bisect_left(self.qualnames, prefix) + offset
+            items = [f for f in self.functions[start : start + limit] if f["qualname"].startswith(prefix)]
+        elif kind == "callers":
+            items = self.callers_of.get(params.get("name", ""), [])[offset : offset + limit]
+        elif kind == "callees":
+            items = self.callees_of.get(params.get("name", ""), [])[offset : offset + limit]
+        elif kind == "files":
+            q = params.get("q", "")
+            matches = (f for f in self.files if q in f)
+            items = [{"file": f} for f in itertools.islice(matches, offset, offset + limit)]
+        elif kind == "file":
+            return self._file_entry(params.get("path", ""))
+        else:
+            raise KeyError(kind)
+        return {
+            "items": items,
+            "limit": limit,
+            "offset": offset,
+            "next_offset": offset + len(items) if len(items) == limit else None,
+        }
+
+
+class ReportRequestHandler(BaseHTTPRequestHandler):
+    """
+    Static report files with content negotiation (br/gzip), strong ETags + 304s and single
+    byte ranges, plus JSON queries under /api/. Set up by `make_report_server`.
+    """
+
+    server_version = "dpylens"
+    protocol_version = "HTTP/1.1"
+    files: _StaticFiles
+    index: ReportIndex
+    verbose: bool = False
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.verbose:
+            sys.stderr.write(f"{self.address_string()} - {format % args}\n")
+
+    def do_GET(self) -> None:
+        self._handle(head=False)
+
+    def do_HEAD(self) -> None:
+        self._handle(head=True)
+
+    def _handle(self, *, head: bool) -> None:
+        url = urlsplit(self.path)
+        if url.path.startswith("/api/"):
+            self._api(url.path[len("/api/") :], url.query, head=head)
+            return
+        path = self.files.resolve(url.path)
+        if path is None:
+            self._send_bytes(HTTPStatus.NOT_FOUND, b"Not found\n", "text/plain; charset=utf-8", head=head)
+            return
+        self._static(path, head=head)
+
+    def _not_modified(self, etag: str) -> bool:
+        header = self.headers.get("If-None-Match")
+        if header is None:
+            return False
+        tags = [t.strip() for t in header.split(",")]
+        return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+    def _static(self, path: Path, *, head: bool) -> None:
+        info = self.files.info(path)
+        ctype = _content_type(path)
+        compressible = ctype.startswith(_COMPRESSIBLE_TYPES)
+
+        range_header = self.headers.get("Range")
+        if range_header and self.headers.get("If-Range", info.etag) != info.etag:
+            range_header = None
+
+        # Ranges refer to the identity representation, so a range request is never compressed
+        if compressible and not range_header:
+            for encoding in _accepted_encodings(self.headers.get("Accept-Encoding")):
+                body = self.files.compressed(info, encoding)
+                if body is None:
+                    continue
+                etag = f'"{info.etag[1:-1]}-{encoding}"'
+                if self._not_modified(etag):
+                    self._send_not_modified(etag, vary=True)
+                    return
+                self.send_response(HTTPStatus.OK)
+                self._common_headers(ctype, etag, vary=True)
+                self.send_header("Content-Encoding", encoding)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if not head:
+                    self.wfile.write(body)
+                return
+
+        if self._not_modified(info.etag):
+            self._send_not_modified(info.etag, vary=compressible)
+            return
+
+        start, end = 0, info.size - 1
+        status = HTTPStatus.OK
+        if range_header:
+            try:
+                parsed = _parse_range(range_header, info.size)
+            except ValueError:
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header("Content-Range", f"bytes */{info.size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if parsed is not None:
+                start, end = parsed
+                status = HTTPStatus.PARTIAL_CONTENT
+
+        length = max(0, end - start + 1)
+        self.send_response(status)
+        self._common_headers(ctype, info.etag, vary=compressible)
+        self.send_header("Accept-Ranges", "bytes")
+        if status == HTTPStatus.PARTIAL_CONTENT:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{info.size}")
+        self.send_header("Content-Length", str(length))
+        self.end_headers()
+        if head or length == 0:
+            return
+        with path.open("rb") as fh:
+            self.wfile.flush()
+            # Zero-copy where the platform supports it
+            self.connection.sendfile(fh, start, length)
+
+    def _common_headers(self, ctype: str, etag: str, *, vary: bool) -> None:
+        self.send_header("Content-Type", ctype)
+        self.send_header("ETag", etag)
+        # Always revalidate; unchanged files cost a 304
+        self.send_header("Cache-Control", "no-cache")
+        if vary:
+            self.send_header("Vary", "Accept-Encoding")
+
+    def _send_not_modified(self, etag: str, *, vary: bool) -> None:
+        self.send_response(HTTPStatus.NOT_MODIFIED)
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        if vary:
+            self.send_header("Vary", "Accept-Encoding")
+        self.end_headers()
+
+    def _send_bytes(self, status: HTTPStatus, body: bytes, ctype: str, *, head: bool, etag: str | None = None) -> None:
+        encoding = None
+        if len(body) >= _MIN_COMPRESS_BYTES and "gzip" in _accepted_encodings(self.headers.get("Accept-Encoding")):
+            body, encoding = gzip.compress(body, compresslevel=6, mtime=0), "gzip"
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Vary", "Accept-Encoding")
+        if etag is not None:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        if encoding is not None:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+    def _api(self, kind: str, query: str, *, head: bool) -> None:
+        params = {k: v[-1] for k, v in parse_qs(query).items()}
+        status = HTTPStatus.OK
+        if not self.index.refresh():
+            status, payload = HTTPStatus.NOT_FOUND, {"detail": "report has no data files"}
+        else:
+            try:
+                payload = self.index.query(kind, params)
+            except KeyError:
+                status, payload = HTTPStatus.NOT_FOUND, {"detail": f"unknown query: {kind}"}
+            except ValueError:
+                status, payload = HTTPStatus.BAD_REQUEST, {"detail": "limit/offset must be integers"}
+            else:
+                if payload is None:
+                    status, payload = HTTPStatus.NOT_FOUND, {"detail": "Not found"}
+
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        if status == HTTPStatus.OK and self._not_modified(etag):
+            self._send_not_modified(etag, vary=True)
+            return
+        self._send_bytes(status, body, "application/json", head=head, etag=etag if status == HTTPStatus.OK else None)
+
+
+def make_report_server(report_dir: Path, *, host: str = "127.0.0.1", port: int = 8000, verbose: bool = False) -> ThreadingHTTPServer:
+    """
+    HTTP server for a built report folder (not started; call serve_forever()).
+    """
+    handler = type(
+        "BoundReportRequestHandler",
+        (ReportRequestHandler,),
+        {"files": _StaticFiles(report_dir), "index": ReportIndex(report_dir / "data"), "verbose": verbose},
+    )
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
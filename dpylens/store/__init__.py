@@ -0,0 +1 @@
+# Indexed analysis stores (SQLite, etc.)
\ No newline at end of file
@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+from pathlib import Path
+from typing import Any
+
+from dpylens.analyzer.result import AnalysisResult
+
+STORE_FILENAME = "analysis.sqlite"
+SCHEMA_VERSION = 1
+
+MAX_PAGE_SIZE = 1000
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE files (file TEXT PRIMARY KEY);
+CREATE TABLE functions (qualname TEXT NOT NULL, file TEXT NOT NULL, lineno INTEGER NOT NULL);
+CREATE TABLE calls (
+  caller TEXT NOT NULL,
+  callee_raw TEXT NOT NULL,
+  callee_resolved TEXT,
+  file TEXT NOT NULL,
+  lineno INTEGER NOT NULL
+);
+CREATE TABLE imports (
+  file TEXT NOT NULL,
+  kind TEXT NOT NULL,
+  module TEXT,
+  level INTEGER NOT NULL,
+  names TEXT NOT NULL,
+  raw TEXT NOT NULL
+);
+CREATE TABLE module_edges (src_module TEXT NOT NULL, dst_module TEXT NOT NULL, kind TEXT NOT NULL, raw_import TEXT NOT NULL);
+CREATE TABLE dataflow (
+  function TEXT NOT NULL,
+  file TEXT NOT NULL,
+  lineno INTEGER NOT NULL,
+  inputs TEXT NOT NULL,
+  transforms TEXT NOT NULL,
+  outputs TEXT NOT NULL
+);
+CREATE TABLE patterns (file TEXT NOT NULL, pattern TEXT NOT NULL);
+CREATE TABLE routes (
+  file TEXT NOT NULL,
+  controller TEXT,
+  controller_path TEXT,
+  router_path TEXT,
+  http_method TEXT NOT NULL,
+  path TEXT NOT NULL,
+  handler TEXT NOT NULL,
+  auth TEXT,
+  source TEXT NOT NULL
+);
+CREATE TABLE errors (file TEXT NOT NULL, error TEXT NOT NULL);
+"""
+
+# Indexes are created after the bulk insert (much faster than maintaining them row by row).
+_INDEXES = """
+CREATE INDEX ix_functions_qualname ON functions (qualname);
+CREATE INDEX ix_functions_file ON functions (file);
+CREATE INDEX ix_calls_callee_resolved ON calls (callee_resolved);
+CREATE INDEX ix_calls_caller ON calls (caller);
+CREATE INDEX ix_calls_file ON calls (file);
+CREATE INDEX ix_imports_file ON imports (file);
+CREATE INDEX ix_imports_module ON imports (module);
+CREATE INDEX ix_module_edges_src ON module_edges (src_module);
+CREATE INDEX ix_module_edges_dst ON module_edges (dst_module);
+CREATE INDEX ix_dataflow_function ON dataflow (function);
+CREATE INDEX ix_dataflow_file ON dataflow (file);
+CREATE INDEX ix_patterns_file ON patterns (file);
+CREATE INDEX ix_routes_file ON routes (file);
+CREATE INDEX ix_routes_handler ON routes (handler);
+"""
+
+
+def write_sqlite_store(result: AnalysisResult, path: Path) -> Path:
+    """
+    Write an indexed SQLite copy of `result` to `path`.
+
+    The database is built in a temporary file and renamed into place, so readers
+    never observe a half-written store.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    if tmp.exists():
+        tmp.unlink()
+
+    conn = sqlite3.connect(str(tmp))
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.executescript(_SCHEMA)
+
+        with conn:
+            conn.executemany(
+                "INSERT INTO meta (key, value) VALUES (?, ?)",
+                [("schema_version", str(SCHEMA_VERSION)), ("root", str(result.root))],
+            )
+            conn.executemany("INSERT INTO files VALUES (?)", ((str(f),) for f in result.files))
+            conn.executemany(
+                "INSERT INTO functions VALUES (?, ?, ?)",
+                ((f.qualname, f.file, f.lineno) for f in result.functions),
+            )
+            conn.executemany(
+                "INSERT INTO calls VALUES (?, ?, ?, ?, ?)",
+                ((c.caller, c.callee_raw, c.callee_resolved, c.file, c.lineno) for c in result.resolved_calls),
+            )
+            conn.executemany(
+                "INSERT INTO imports VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (rec.file, it.kind, it.module, it.level, json.dumps(it.names), it.raw)
+                    for rec in result.imports
+                    for it in rec.items
+                ),
+            )
+            conn.executemany(
+                "INSERT INTO module_edges VALUES (?, ?, ?, ?)",
+                ((e.src_module, e.dst_module, e.kind, e.raw_import) for e in result.module_edges),
+            )
+            conn.executemany(
+                "INSERT INTO dataflow VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (d.function, d.file, d.lineno, json.dumps(d.inputs), json.dumps(d.transforms), json.dumps(d.outputs))
+                    for d in result.dataflows
+                ),
+            )
+            conn.executemany(
+                "INSERT INTO patterns VALUES (?, ?)",
+                ((p.file, pat) for p in result.patterns for pat in p.patterns),
+            )
+            if result.routes is not None:
+                conn.executemany(
+                    "INSERT INTO routes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        (
+                            r.file,
+                            r.controller,
+                            r.controller_path,
+                            r.router_path,
+                            r.http_method,
+                            r.path,
+                            r.handler,
+                            r.auth,
+                            r.source,
+                        )
+                        for r in result.routes.routes
+                    ),
+                )
+            conn.executemany("INSERT INTO errors VALUES (?, ?)", ((e.file, e.error) for e in result.errors))
+
+        conn.executescript(_INDEXES)
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+
+    os.replace(tmp, path)
+    return path
+
+
+def _prefix_upper_bound(prefix: str) -> str:
+    # Every string starting with `prefix` sorts below prefix + U+10FFFF, so a range scan can use the index.
+    return prefix + "\U0010ffff"
+
+
+def _rows(cur: sqlite3.Cursor) -> list[dict[str, Any]]:
+    cols = [d[0] for d in cur.description]
+    return [dict(zip(cols, row)) for row in cur.fetchall()]
+
+
+def _decode_lists(rows: list[dict[str, Any]], keys: tuple[str, ...]) -> list[dict[str, Any]]:
+    for r in rows:
+        for k in keys:
+            r[k] = json.loads(r[k])
+    return rows
+
+
+class AnalysisStore:
+    """
+    Read-only, paginated queries over a store written by `write_sqlite_store`.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._conn = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False)
+        self.root = self._meta("root") or ""
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> AnalysisStore:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def _meta(self, key: str) -> str | None:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _page(limit: int, offset: int) -> tuple[int, int]:
+        return max(1, min(int(limit), MAX_PAGE_SIZE)), max(0, int(offset))
+
+    def functions(self, prefix: str = "", *, limit: int = 100, offset: int = 0) -> list[dict[str, Any]]:
+        limit, offset = self._page(limit, offset)
+        cur = self._conn.execute(
+            "SELECT qualname, file, lineno FROM functions "
+            "WHERE qualname >= ? AND qualname < ? ORDER BY qualname, file, lineno LIMIT ? OFFSET ?",
+            (prefix, _prefix_upper_bound(prefix), limit, offset),
+        )
+        return _rows(cur)
+
+    def callers(self, qualname: str, *, limit: int = 100, offset: int = 0) -> list[dict[str, Any]]:
+        limit, offset = self._page(limit, offset)
+        cur = self._conn.execute(
+            "SELECT caller, callee_raw, file, lineno FROM calls "
+            "WHERE callee_resolved = ? ORDER BY caller, file, lineno LIMIT ? OFFSET ?",
+            (qualname, limit, offset),
+        )
+        return _rows(cur)
+
+    def callees(self, qualname: str, *, limit: int = 100, offset: int = 0) -> list[dict[str, Any]]:
+        limit, offset = self._page(limit, offset)
+        cur = self._conn.execute(
+            "SELECT callee_raw, callee_resolved, file, lineno FROM calls "
+            "WHERE caller = ? ORDER BY lineno LIMIT ? OFFSET ?",
+            (qualname, limit, offset),
+        )
+        return _rows(cur)
+
+    def _file_keys(self, file: str) -> tuple[str, str]:
+        """
+        Artifacts store absolute paths for most records but repo-relative paths for routes;
+        accept either form and return (absolute, relative).
+        """
+        root = Path(self.root)
+        p = Path(file)
+        if p.is_absolute():
+            try:
+                return str(p), str(p.relative_to(root))
+            except ValueError:
+                return str(p), str(p)
+        return str(root / p), str(p)
+
+    def file_details(self, file: str) -> dict[str, Any] | None:
+        abs_path, rel_path = self._file_keys(file)
+        keys = (abs_path, rel_path)
+
+        def q(sql: str) -> list[dict[str, Any]]:
+            return _rows(self._conn.execute(sql, keys))
+
+        if not q("SELECT file FROM files WHERE file IN (?, ?)"):
+            return None
+
+        functions = q("SELECT qualname, lineno FROM functions WHERE file IN (?, ?) ORDER BY lineno")
+        imports = _decode_lists(
+            q("SELECT kind, module, level, names, raw FROM imports WHERE file IN (?, ?)"),
+            ("names",),
+        )
+        calls = q(
+            "SELECT caller, callee_raw, callee_resolved, lineno FROM calls WHERE file IN (?, ?) ORDER BY lineno"
+        )
+        dataflow = _decode_lists(
+            q("SELECT function, lineno, inputs, transforms, outputs FROM dataflow WHERE file IN (?, ?) ORDER BY lineno"),
+            ("inputs", "transforms", "outputs"),
+        )
+        patterns = [r["pattern"] for r in q("SELECT pattern FROM patterns WHERE file IN (?, ?) ORDER BY pattern")]
+        routes = q(
+            "SELECT http_method, path, handler, controller, auth FROM routes WHERE file IN (?, ?) ORDER BY path"
+        )
+        errors = [r["error"] for r in q("SELECT error FROM errors WHERE file IN (?, ?)")]
+
+        return {
+            "file": rel_path,
+            "functions": functions,
+            "imports": imports,
+            "calls": calls,
+            "dataflow": dataflow,
+            "patterns": patterns,
+            "routes": routes,
+            "errors": errors,
+        }
@@ -0,0 +1 @@
+# Background job processing (durable SQLite queue, forking workers)
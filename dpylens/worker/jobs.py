@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+from typing import Any, Callable
+
+from dpylens.batch import is_git_url
+
+# Modules a worker imports once before forking, so every job starts with them loaded
+PRELOAD = (
+    "dpylens.analyzer.pipeline",
+    "dpylens.analyzer.gittree",
+    "dpylens.analyzer.result",
+    "dpylens.analyzer.reachability",
+    "dpylens.analyzer.duplicates",
+    "dpylens.reporter.html_report",
+    "dpylens.rendering.graphviz",
+    "dpylens.store.sqlite",
+)
+
+
+def _zip_dir(src_dir: Path, out_zip: Path) -> Path:
+    base_name = str(out_zip).removesuffix(".zip")
+    return Path(shutil.make_archive(base_name, "zip", root_dir=str(src_dir)))
+
+
+def analyze_job(payload: dict[str, Any]) -> dict[str, Any]:
+    """
+    Analyze a local folder or git URL into `<out>/analysis` (JSON + SQLite store) and
+    `<out>/report`.
+
+    A git URL is not checked out: it is cloned without blobs into `<out>/repo.git`, and only the
+    Python files' blobs are fetched (those not already in the file cache). Files are named as if
+    checked out at `<out>/repo`.
+
+    payload: source (path or git URL), out, render (PNGs, default False), report (default True),
+             archives (`<out>/report.zip`, `<out>/analysis.zip`, default False),
+             cache (per-file result cache folder shared by jobs, see gittree.FileCache)
+    """
+    from dpylens.analyzer.budget import is_budget_note
+    from dpylens.analyzer.gitsource import clone_blobless
+    from dpylens.analyzer.gittree import analyze_git
+    from dpylens.analyzer.pipeline import analyze
+    from dpylens.rendering.graphviz import render_dot_to_png
+    from dpylens.reporter.html_report import ReportPaths, build_report
+    from dpylens.store.sqlite import STORE_FILENAME, write_sqlite_store
+
+    out = Path(payload["out"])
+    source = str(payload["source"])
+    analysis_dir = out / "analysis"
+    report_dir = out / "report"
+    cached = 0
+    if is_git_url(source):
+        git_dir = out / "repo.git"
+        if git_dir.exists():
+            shutil.rmtree(git_dir)  # left over from a crashed attempt
+        clone_blobless(source, git_dir)
+        cache = payload.get("cache")
+        result, stats = analyze_git(git_dir, root=out / "repo", cache_dir=Path(cache) if cache else None)
+        cached = stats.cached
+    else:
+        root = Path(source)
+        if not root.is_dir():
+            raise FileNotFoundError(f"not a directory: {root}")
+        result = analyze(root)
+    result.write(analysis_dir)
+    write_sqlite_store(result, analysis_dir / STORE_FILENAME)
+
+    warnings: list[str] = []
+    if payload.get("render"):
+        warnings.extend(render_dot_to_png(analysis_dir).warnings)
+    if payload.get("report", True):
+        build_report(ReportPaths(analysis_dir=analysis_dir, report_dir=report_dir), result=result)
+    if payload.get("archives"):
+        _zip_dir(report_dir, out / "report.zip")
+        _zip_dir(analysis_dir, out / "analysis.zip")
+
+    return {
+        "analysis_dir": str(analysis_dir),
+        "report_dir": str(report_dir),
+        "files_analyzed": len(result.files),
+        # Files the budget skipped or reduced are noted in result.errors but did not fail
+        "parse_errors": sum(not is_budget_note(e.error) for e in result.errors),
+        "budget_notes": sum(is_budget_note(e.error) for e in result.errors),
+        "cached_files": cached,
+        "warnings": warnings,
+    }
+
+
+# Job kind -> handler: payload in, JSON-serializable result out; raising fails the attempt
+JOB_HANDLERS: dict[str, Callable[[dict[str, Any]], dict[str, Any]]] = {
+    "analyze": analyze_job,
+}
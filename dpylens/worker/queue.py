@@ -0,0 +1,311 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Sequence
+
+QUEUE_FILENAME = "queue.sqlite"
+QUEUE_VERSION = 1
+
+JOB_STATES = ("queued", "running", "done", "failed")
+
+DEFAULT_LEASE_SECONDS = 60.0
+DEFAULT_MAX_ATTEMPTS = 3
+# Delay before the first retry; doubled for each further attempt
+DEFAULT_RETRY_DELAY = 5.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS jobs (
+  id TEXT PRIMARY KEY,
+  kind TEXT NOT NULL,
+  payload TEXT NOT NULL,
+  state TEXT NOT NULL,
+  attempts INTEGER NOT NULL DEFAULT 0,
+  max_attempts INTEGER NOT NULL,
+  available_at REAL NOT NULL,
+  worker TEXT,
+  lease_expires REAL,
+  result TEXT,
+  error TEXT,
+  created REAL NOT NULL,
+  updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_jobs_ready ON jobs (state, available_at);
+CREATE INDEX IF NOT EXISTS ix_jobs_lease ON jobs (state, lease_expires);
+"""
+
+_COLUMNS = "id, kind, payload, state, attempts, max_attempts, worker, lease_expires, result, error, created, updated"
+
+
+class QueueError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class Job:
+    id: str
+    kind: str
+    payload: dict[str, Any]
+    state: str  # one of JOB_STATES
+    attempts: int  # claims so far, including the current one
+    max_attempts: int
+    worker: str | None  # lease holder while running
+    lease_expires: float | None  # Unix time
+    result: dict[str, Any] | None
+    error: str | None  # last failure, kept across retries
+    created: float
+    updated: float
+
+    @classmethod
+    def _from_row(cls, row: Sequence[Any]) -> Job:
+        id_, kind, payload, state, attempts, max_attempts, worker, lease, result, error, created, updated = row
+        return cls(
+            id=id_,
+            kind=kind,
+            payload=json.loads(payload),
+            state=state,
+            attempts=attempts,
+            max_attempts=max_attempts,
+            worker=worker,
+            lease_expires=lease,
+            result=json.loads(result) if result is not None else None,
+            error=error,
+            created=created,
+            updated=updated,
+        )
+
+
+class JobQueue:
+    """
+    A durable job queue in one SQLite file, shared by any number of worker processes.
+
+    A claimed job is leased to one worker until `lease_expires`; the worker extends the lease with
+    `heartbeat` while it runs. A job whose lease runs out (the worker crashed, hung or lost its
+    host) is handed to the next `claim`, until it has been attempted `max_attempts` times. Every
+    state change is a single transaction (`BEGIN IMMEDIATE`), so two workers never claim the
+    same job. One JobQueue may be shared by threads: each thread uses its own connection.
+
+    Usage:
+      queue = JobQueue(Path(".dpylens-server") / QUEUE_FILENAME)
+      job = queue.enqueue("analyze", {"source": "https://github.com/o/r", "out": "runs/abc"})
+      ...
+      job = queue.claim("host:1234")
+      queue.complete(job.id, "host:1234", {"files": 12})
+    """
+
+    def __init__(self, path: Path, *, busy_timeout: float = 30.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # One connection per thread: transactions are BEGIN ... COMMIT on a connection, so
+        # threads sharing one (the API's request threads) would interleave their transactions
+        self._local = threading.local()
+        self._conns: list[sqlite3.Connection] = []
+        self._conns_lock = threading.Lock()
+        conn = self._conn
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.executescript(_SCHEMA)
+        conn.execute("INSERT OR IGNORE INTO meta VALUES ('version', ?)", (str(QUEUE_VERSION),))
+        version = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+        if version != str(QUEUE_VERSION):
+            raise QueueError(f"{path}: queue version {version}, expected {QUEUE_VERSION}")
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit; transactions are opened explicitly. Only this thread uses it, but
+            # `close` may run on another.
+            conn = sqlite3.connect(
+                str(self.path), timeout=self.busy_timeout, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn = conn
+            with self._conns_lock:
+                self._conns.append(conn)
+        return conn
+
+    def close(self) -> None:
+        """
+        Close every thread's connection; call once no other thread uses the queue.
+        """
+        with self._conns_lock:
+            conns, self._conns = self._conns, []
+        for conn in conns:
+            conn.close()
+        self._local = threading.local()
+
+    def __enter__(self) -> JobQueue:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def _transaction(self) -> _Transaction:
+        return _Transaction(self._conn)
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: dict[str, Any],
+        *,
+        job_id: str | None = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ) -> Job:
+        now = time.time()
+        job_id = job_id or uuid.uuid4().hex[:12]
+        try:
+            with self._transaction():
+                self._conn.execute(
+                    "INSERT INTO jobs (id, kind, payload, state, max_attempts, available_at, created, updated) "
+                    "VALUES (?, ?, ?, 'queued', ?, ?, ?, ?)",
+                    (job_id, kind, json.dumps(payload), max(1, max_attempts), now, now, now),
+                )
+        except sqlite3.IntegrityError as e:
+            raise QueueError(f"job {job_id} already exists") from e
+        job = self.get(job_id)
+        assert job is not None
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        row = self._conn.execute(f"SELECT {_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job._from_row(row) if row else None
+
+    def jobs(self, state: str | None = None, *, limit: int = 100) -> list[Job]:
+        """
+        Most recently updated jobs first.
+        """
+        where, params = ("WHERE state = ? ", (state,)) if state else ("", ())
+        cur = self._conn.execute(f"SELECT {_COLUMNS} FROM jobs {where}ORDER BY updated DESC LIMIT ?", (*params, limit))
+        return [Job._from_row(row) for row in cur]
+
+    def counts(self) -> dict[str, int]:
+        counts = dict.fromkeys(JOB_STATES, 0)
+        counts.update(self._conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state"))
+        return counts
+
+    def claim(self, worker: str, *, lease: float = DEFAULT_LEASE_SECONDS, kinds: Sequence[str] | None = None) -> Job | None:
+        """
+        Lease the oldest ready job to `worker`: a queued job whose retry delay has passed, or a
+        running job whose lease expired. Jobs whose lease expired on their last attempt are
+        marked failed instead.
+        """
+        now = time.time()
+        kind_filter, kind_params = "", ()
+        if kinds is not None:
+            kind_filter = f"AND kind IN ({','.join('?' * len(kinds))}) "
+            kind_params = tuple(kinds)
+        with self._transaction():
+            self._conn.execute(
+                "UPDATE jobs SET state = 'failed', worker = NULL, lease_expires = NULL, updated = ?, "
+                "error = 'lease expired (worker lost) on the last attempt' "
+                "WHERE state = 'running' AND lease_expires < ? AND attempts >= max_attempts",
+                (now, now),
+            )
+            row = self._conn.execute(
+                "SELECT id FROM jobs "
+                "WHERE ((state = 'queued' AND available_at <= ?) OR (state = 'running' AND lease_expires < ?)) "
+                f"{kind_filter}ORDER BY available_at, created LIMIT 1",
+                (now, now, *kind_params),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET state = 'running', worker = ?, lease_expires = ?, attempts = attempts + 1, updated = ? "
+                "WHERE id = ?",
+                (worker, now + lease, now, row[0]),
+            )
+        return self.get(row[0])
+
+    def heartbeat(self, job_id: str, worker: str, *, lease: float = DEFAULT_LEASE_SECONDS) -> bool:
+        """
+        Extend the lease. False if `worker` no longer holds it (it expired and the job was
+        claimed again, or the job was finished): the worker should abandon the job.
+        """
+        now = time.time()
+        with self._transaction():
+            cur = self._conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated = ? WHERE id = ? AND state = 'running' AND worker = ?",
+                (now + lease, now, job_id, worker),
+            )
+        return cur.rowcount == 1
+
+    def complete(self, job_id: str, worker: str, result: dict[str, Any]) -> bool:
+        """
+        Mark the job done. False (and no change) if `worker` no longer holds its lease.
+        """
+        now = time.time()
+        with self._transaction():
+            cur = self._conn.execute(
+                "UPDATE jobs SET state = 'done', result = ?, worker = NULL, lease_expires = NULL, updated = ? "
+                "WHERE id = ? AND state = 'running' AND worker = ?",
+                (json.dumps(result), now, job_id, worker),
+            )
+        return cur.rowcount == 1
+
+    def fail(
+        self,
+        job_id: str,
+        worker: str,
+        error: str,
+        *,
+        retry: bool = True,
+        retry_delay: float = DEFAULT_RETRY_DELAY,
+    ) -> str | None:
+        """
+        Record a failed attempt. The job is queued again after `retry_delay * 2**(attempts - 1)`
+        seconds while attempts remain (and `retry`), else marked failed. Returns the new state, or
+        None if `worker` no longer holds the lease.
+        """
+        now = time.time()
+        with self._transaction():
+            row = self._conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND state = 'running' AND worker = ?",
+                (job_id, worker),
+            ).fetchone()
+            if row is None:
+                return None
+            attempts, max_attempts = row
+            state = "queued" if retry and attempts < max_attempts else "failed"
+            self._conn.execute(
+                "UPDATE jobs SET state = ?, error = ?, worker = NULL, lease_expires = NULL, available_at = ?, updated = ? "
+                "WHERE id = ?",
+                (state, error, now + retry_delay * 2 ** (attempts - 1), now, job_id),
+            )
+        return state
+
+    def wait(self, job_id: str, *, timeout: float, poll: float = 0.5) -> Job:
+        """
+        Poll until the job is done or failed, or `timeout` seconds pass; returns its last state.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None:
+                raise QueueError(f"no job {job_id}")
+            if job.state in ("done", "failed") or time.monotonic() >= deadline:
+                return job
+            time.sleep(min(poll, max(0.0, deadline - time.monotonic())))
+
+
+class _Transaction:
+    """
+    `BEGIN IMMEDIATE` ... `COMMIT` (or `ROLLBACK` on error): takes the write lock up front, so
+    concurrent read-then-write sequences such as `claim` cannot interleave.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> None:
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type: object, *exc: object) -> None:
+        self.conn.execute("ROLLBACK" if exc_type is not None else "COMMIT")
+
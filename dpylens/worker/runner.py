@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import importlib
+import json
+import os
+import select
+import signal
+import socket
+import sys
+import time
+import traceback
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from dpylens.worker.queue import DEFAULT_LEASE_SECONDS, DEFAULT_RETRY_DELAY, Job, JobQueue
+
+DEFAULT_HEARTBEAT_SECONDS = 10.0
+DEFAULT_POLL_SECONDS = 1.0
+
+Handler = Callable[[dict[str, Any]], dict[str, Any]]
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def preload(modules: tuple[str, ...]) -> None:
+    for name in modules:
+        importlib.import_module(name)
+
+
+@dataclass
+class WorkerStats:
+    done: int = 0
+    failed: int = 0  # attempts that failed (the job may be retried)
+    abandoned: int = 0  # jobs whose lease was lost while running
+
+
+@dataclass
+class _Outcome:
+    ok: bool
+    result: dict[str, Any] | None = None
+    error: str | None = None
+
+
+class Worker:
+    """
+    Claims jobs from a JobQueue and runs each in a forked child process.
+
+    The parent imports the handlers' modules once (`preload`); each child starts from that warm
+    state, so jobs pay no import cost, and whatever a job leaves behind (memory, threads, open
+    files) dies with its child. While a child runs, the parent renews the lease every `heartbeat`
+    seconds; a child that crashes or exceeds `job_timeout` fails the attempt, and the queue
+    retries it. If the lease is lost (the parent was stalled longer than the lease and another
+    worker took the job), the child is killed.
+
+    On platforms without `os.fork`, or with `fork=False`, jobs run in the worker process itself.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handlers: dict[str, Handler],
+        *,
+        worker: str | None = None,
+        lease: float = DEFAULT_LEASE_SECONDS,
+        heartbeat: float = DEFAULT_HEARTBEAT_SECONDS,
+        poll: float = DEFAULT_POLL_SECONDS,
+        job_timeout: float | None = None,
+        retry_delay: float = DEFAULT_RETRY_DELAY,
+        fork: bool = True,
+        log: Callable[[str], None] = print,
+    ):
+        self.queue = queue
+        self.handlers = handlers
+        self.worker = worker or worker_id()
+        self.lease = lease
+        self.heartbeat = min(heartbeat, lease / 2)
+        self.poll = poll
+        self.job_timeout = job_timeout
+        self.retry_delay = retry_delay
+        self.fork = fork and hasattr(os, "fork")
+        self.log = log
+        self.stats = WorkerStats()
+        self._stopping = False
+
+    def stop(self, *_args: object) -> None:
+        """
+        Finish the current job, then return from `run` (also the SIGTERM/SIGINT handler).
+        """
+        self._stopping = True
+
+    def run(self, *, burst: bool = False, max_jobs: int | None = None) -> WorkerStats:
+        """
+        Process jobs until stopped. `burst`: return once no job is ready.
+        """
+        handled = 0
+        while not self._stopping and (max_jobs is None or handled < max_jobs):
+            job = self.queue.claim(self.worker, lease=self.lease, kinds=list(self.handlers))
+            if job is None:
+                if burst:
+                    break
+                time.sleep(self.poll)
+                continue
+            self.process(job)
+            handled += 1
+        return self.stats
+
+    def process(self, job: Job) -> None:
+        self.log(f"[{self.worker}] {job.kind} {job.id} (attempt {job.attempts}/{job.max_attempts})")
+        started = time.monotonic()
+        outcome = self._run_forked(job) if self.fork else self._run_inline(job)
+        if outcome is None:
+            self.stats.abandoned += 1
+            self.log(f"[{self.worker}] {job.id}: lease lost, abandoned")
+            return
+        if outcome.ok:
+            assert outcome.result is not None
+            if self.queue.complete(job.id, self.worker, outcome.result):
+                self.stats.done += 1
+                self.log(f"[{self.worker}] {job.id}: done in {time.monotonic() - started:.1f}s")
+                return
+            self.stats.abandoned += 1
+            return
+        state = self.queue.fail(job.id, self.worker, outcome.error or "failed", retry_delay=self.retry_delay)
+        self.stats.failed += 1
+        self.log(f"[{self.worker}] {job.id}: {outcome.error} -> {state}")
+
+    def _run_inline(self, job: Job) -> _Outcome:
+        try:
+            return _Outcome(True, result=self.handlers[job.kind](job.payload))
+        except Exception as e:  # noqa: BLE001
+            return _Outcome(False, error=f"{type(e).__name__}: {e}")
+
+    def _run_forked(self, job: Job) -> _Outcome | None:
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:  # child: runs the handler only (the queue connection stays with the parent)
+            os.close(read_fd)
+            code = 0
+            try:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                signal.signal(signal.SIGINT, signal.SIG_DFL)
+                try:
+                    message = {"ok": True, "result": self.handlers[job.kind](job.payload)}
+                except Exception as e:  # noqa: BLE001
+                    traceback.print_exc()
+                    message = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+                    code = 1
+                with os.fdopen(write_fd, "wb") as fh:
+                    fh.write(json.dumps(message).encode("utf-8"))
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(code)
+
+        os.close(write_fd)
+        chunks: list[bytes] = []
+        deadline = time.monotonic() + self.job_timeout if self.job_timeout else None
+        next_beat = time.monotonic() + self.heartbeat
+        error: str | None = None
+        lost = False
+        try:
+            while True:
+                now = time.monotonic()
+                wait = next_beat - now if deadline is None else min(next_beat, deadline) - now
+                ready, _w, _x = select.select([read_fd], [], [], max(0.0, wait))
+                if ready:
+                    data = os.read(read_fd, 1 << 16)
+                    if not data:
+                        break  # child closed the pipe (finished or died)
+                    chunks.append(data)
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    os.kill(pid, signal.SIGKILL)
+                    error = f"timed out after {self.job_timeout:g}s"
+                    break
+                if now >= next_beat:
+                    next_beat = now + self.heartbeat
+                    if not self.queue.heartbeat(job.id, self.worker, lease=self.lease):
+                        os.kill(pid, signal.SIGKILL)
+                        lost = True
+                        break
+        finally:
+            os.close(read_fd)
+            _pid, status = os.waitpid(pid, 0)
+
+        if lost:
+            return None
+        if error is not None:
+            return _Outcome(False, error=error)
+        try:
+            message = json.loads(b"".join(chunks))
+        except ValueError:
+            if os.WIFSIGNALED(status):
+                return _Outcome(False, error=f"job process killed by signal {os.WTERMSIG(status)}")
+            return _Outcome(False, error=f"job process exited with status {os.waitstatus_to_exitcode(status)} without a result")
+        if message["ok"]:
+            return _Outcome(True, result=message["result"])
+        return _Outcome(False, error=message["error"])
+
+
+def run_worker(
+    queue_path: Path,
+    handlers: dict[str, Handler],
+    modules: tuple[str, ...],
+    *,
+    burst: bool = False,
+    max_jobs: int | None = None,
+    **options: Any,
+) -> WorkerStats:
+    """
+    Preload `modules`, then process jobs until SIGTERM/SIGINT (or, with `burst`, until the queue
+    has nothing ready).
+    """
+    preload(modules)
+    with JobQueue(queue_path) as queue:
+        worker = Worker(queue, handlers, **options)
+        signal.signal(signal.SIGTERM, worker.stop)
+        signal.signal(signal.SIGINT, worker.stop)
+        return worker.run(burst=burst, max_jobs=max_jobs)
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+
+def _write(p: Path, text: str) -> Path:
+    p.parent.mkdir(parents=True, exist_ok=True)
+    p.write_text(text, encoding="utf-8")
+    return p
+
+
+def _git(repo: Path, *args: str, author: str = "t@example.com") -> str:
+    return subprocess.run(
+        ["git", "-C", str(repo), "-c", "user.name=t", "-c", f"user.email={author}", *args],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+
+
+@pytest.fixture
+def write() -> Callable[[Path, str], Path]:
+    """
+    write(path, text): create parent folders and write UTF-8 text.
+    """
+    return _write
+
+
+@pytest.fixture
+def make_repo(tmp_path: Path) -> Callable[..., Path]:
+    """
+    make_repo({"pkg/mod.py": "..."}, name="repo") -> tmp_path/name with those files.
+    """
+
+    def make(files: dict[str, str], name: str = "repo") -> Path:
+        root = tmp_path / name
+        root.mkdir(parents=True, exist_ok=True)
+        for rel, text in files.items():
+            _write(root / rel, text)
+        return root
+
+    return make
+
+
+@pytest.fixture
+def git() -> Callable[..., str]:
+    """
+    git(repo, *args, author=...) -> stdout; skips the test when git is not installed.
+    """
+    if shutil.which("git") is None:
+        pytest.skip("git not available")
+    return _git
+
+
+@pytest.fixture
+def commit(git: Callable[..., str]) -> Callable[..., str]:
+    """
+    commit(repo, msg, files=None, author=...) -> sha: write `files`, stage everything, commit.
+    """
+
+    def do_commit(repo: Path, msg: str, files: dict[str, str] | None = None, author: str = "t@example.com") -> str:
+        for rel, text in (files or {}).items():
+            _write(repo / rel, text)
+        git(repo, "add", "-A")
+        git(repo, "commit", "-q", "-m", msg, author=author)
+        return git(repo, "rev-parse", "HEAD")
+
+    return do_commit
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import json
+import pickle
+from pathlib import Path
+
+import pytest
+
+from api.summary_builder import build_repo_summary
+from dpylens import analyze
+from dpylens.reporter.html_report import ReportPaths, build_report
+
+
+FILES = {
+    "app/__init__.py": "",
+    "app/util.py": "import os\ndef helper(x):\n    return os.environ.get(x)\n",
+    "app/main.py": "import argparse\nfrom .util import helper\ndef main():\n    helper('HOME')\n    argparse.ArgumentParser()\n",
+    "app/broken.py": "def oops(:\n",
+}
+
+
+@pytest.fixture()
+def repo(make_repo) -> Path:
+    return make_repo(FILES)
+
+
+def test_analyze_returns_records_in_memory(repo: Path) -> None:
+    result = analyze(repo)
+
+    assert len(result.files) == 4
+    assert {f.qualname for f in result.functions} == {"app.util.helper", "app.main.main"}
+    assert any(e.error.startswith("syntax_error") for e in result.errors)
+
+    resolved = {c.callee_raw: c.callee_resolved for c in result.resolved_calls}
+    assert resolved["helper"] == "app.util.helper"
+
+
+def test_summary_from_result_matches_summary_from_disk(repo: Path, tmp_path: Path) -> None:
+    result = analyze(repo)
+    out = tmp_path / "analysis"
+    result.write(out)
+
+    assert json.loads((out / "callgraph.json").read_text(encoding="utf-8")) == result.payload("callgraph.json")
+    assert build_repo_summary(result) == build_repo_summary(out)
+
+
+def test_build_report_from_result(repo: Path, tmp_path: Path) -> None:
+    result = analyze(repo)
+    report = tmp_path / "report"
+
+    build_report(ReportPaths(analysis_dir=tmp_path / "missing", report_dir=report), result=result)
+
+    assert (report / "index.html").exists()
+    assert (report / "data" / "modules.json").read_text(encoding="utf-8") == result.json_text("modules.json")
+
+
+def test_records_are_slotted_and_share_strings(repo: Path) -> None:
+    result = analyze(repo)
+
+    calls = [c for c in result.calls if c.caller == "app.main.main"]
+    assert len(calls) == 2
+    assert not hasattr(calls[0], "__dict__")
+    assert calls[0].file is calls[1].file
+    assert calls[0].caller is next(f.qualname for f in result.functions if f.qualname == "app.main.main")
+
+    resolved = next(c for c in result.resolved_calls if c.callee_resolved == "app.util.helper")
+    assert resolved.callee_resolved is next(f.qualname for f in result.functions if f.qualname == "app.util.helper")
+
+    # records cross process boundaries in the pool
+    assert pickle.loads(pickle.dumps(result.resolved_calls)) == result.resolved_calls
+    assert pickle.loads(pickle.dumps(result.dataflows)) == result.dataflows
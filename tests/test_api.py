@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from dpylens.worker.jobs import analyze_job  # noqa: E402
+from dpylens.worker.queue import JobQueue  # noqa: E402
+from dpylens.worker.runner import Worker  # noqa: E402
+
+import api.main as api  # noqa: E402
+
+
+@pytest.fixture()
+def client(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> TestClient:
+    monkeypatch.setattr(api, "RUNS_DIR", tmp_path / "runs")
+    monkeypatch.setattr(api, "QUEUE_PATH", tmp_path / "queue.sqlite")
+    monkeypatch.setattr(api, "FILE_CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(api, "ANALYZE_WAIT_SECONDS", 30.0)
+    monkeypatch.setattr(api, "_queue", None)
+    yield TestClient(api.app)
+    if api._queue is not None:
+        api._queue.close()
+
+
+def test_analyze_endpoint_runs_through_the_worker(client: TestClient, make_repo) -> None:
+    src = make_repo({"pkg/__init__.py": "", "pkg/core.py": "def f():\n    return g()\n\ndef g():\n    return 1\n"})
+
+    def analyze_local(payload: dict[str, Any]) -> dict[str, Any]:
+        # The request must carry an http(s) URL; analyze a local folder in its place
+        return analyze_job({**payload, "source": str(src), "render": False})
+
+    queue = JobQueue(api.QUEUE_PATH)
+    worker = Worker(queue, {"analyze": analyze_local}, worker="w", poll=0.05, fork=False, log=lambda _m: None)
+    thread = threading.Thread(target=worker.run, kwargs={"max_jobs": 1})
+    thread.start()
+    try:
+        resp = client.post("/analyze", json={"repo_url": "https://example.com/org/pkg.git", "render": False})
+    finally:
+        worker.stop()
+        thread.join()
+        queue.close()
+
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["repo_url"] == "https://example.com/org/pkg.git"
+    assert body["files_analyzed"] == 2 and body["parse_errors"] == 0
+    assert body["report_url"] == f"/runs/{body['run_id']}/report/"
+    assert client.get(body["report_url"]).status_code == 200
+
+    functions = client.get(f"/runs/{body['run_id']}/functions", params={"prefix": "pkg.core"}).json()
+    assert [f["qualname"] for f in functions["items"]] == ["pkg.core.f", "pkg.core.g"]
+
+    assert client.get(f"/jobs/{body['run_id']}").json()["state"] == "done"
+    assert client.get("/health").json()["jobs"]["done"] == 1
+
+
+def test_analyze_endpoint_answers_202_when_no_worker_finishes(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(api, "ANALYZE_WAIT_SECONDS", 0.2)
+    monkeypatch.setattr(api, "ANALYZE_POLL_SECONDS", 0.05)
+    resp = client.post("/analyze", json={"repo_url": "https://example.com/org/pkg.git"})
+    assert resp.status_code == 202
+    assert resp.json()["state"] == "queued"
+    assert client.get("/health").json()["jobs"]["queued"] == 1
+
+
+def test_jobs_endpoint_queues_without_waiting(client: TestClient) -> None:
+    resp = client.post("/jobs", json={"repo_url": "https://example.com/org/pkg.git"})
+    assert resp.status_code == 202
+    job = resp.json()
+    assert (job["state"], job["attempts"], job["result"]) == ("queued", 0, None)
+
+    assert client.get(f"/jobs/{job['run_id']}").json()["state"] == "queued"
+    assert client.get("/jobs/nope").status_code == 404
+    assert client.post("/analyze", json={"repo_url": "not a url"}).status_code == 422
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from dpylens.batch import read_manifest, run_batch
+
+
+def test_read_manifest_names_and_paths(tmp_path: Path) -> None:
+    manifest = tmp_path / "repos.txt"
+    manifest.write_text(
+        "# nightly fleet\n"
+        "\n"
+        "libs/core\n"
+        "https://example.com/org/core.git  # same default name\n"
+        "services/api  api-svc\n",
+        encoding="utf-8",
+    )
+
+    entries = read_manifest(manifest)
+
+    assert [e.name for e in entries] == ["core", "core-2", "api-svc"]
+    assert entries[0].source == str((tmp_path / "libs" / "core").resolve())
+    assert entries[1].source == "https://example.com/org/core.git"
+
+
+def test_batch_writes_per_repo_artifacts_and_cross_repo_index(tmp_path: Path, write) -> None:
+    core = tmp_path / "core"
+    write(core / "corelib" / "__init__.py", "")
+    for i in range(5):
+        write(core / "corelib" / f"m{i}.py", f"import json\ndef f{i}():\n    return json.dumps({i})\n")
+
+    svc = tmp_path / "svc"
+    write(svc / "svc" / "__init__.py", "")
+    write(svc / "svc" / "main.py", "import corelib.m1\nimport requests\ndef main():\n    corelib.m1.f1()\n")
+
+    manifest = tmp_path / "repos.txt"
+    manifest.write_text("core\nsvc\nmissing\n", encoding="utf-8")
+
+    out = tmp_path / "batch"
+    outcomes = run_batch(read_manifest(manifest), out, jobs=2, chunk_size=2)
+
+    by_name = {o.name: o for o in outcomes}
+    assert by_name["core"].status == "ok" and by_name["core"].functions == 5
+    assert by_name["svc"].status == "ok"
+    assert by_name["missing"].status == "failed"
+    assert (out / "core" / "analysis" / "callgraph.json").exists()
+    assert (out / "svc" / "analysis" / "module_graph.json").exists()
+
+    index = json.loads((out / "batch_index.json").read_text(encoding="utf-8"))
+    assert index["packages"]["corelib"]["defined_by"] == ["core"]
+    assert index["packages"]["json"]["used_by"] == {"core": 5}
+    assert {"repo": "svc", "depends_on": "core", "package": "corelib", "imports": 1} in index["cross_repo_dependencies"]
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import ast
+import json
+from pathlib import Path
+
+from dpylens import analyze
+from dpylens.analyzer.callgraph import extract_callgraph
+from dpylens.analyzer.classes import ClassIndex, ClassRecord, extract_classes
+from dpylens.analyzer.dataflow import extract_dataflow
+from dpylens.analyzer.duplicates import extract_fingerprints
+from dpylens.analyzer.effects import extract_effects
+from dpylens.analyzer.metrics import extract_metrics
+
+SOURCE = '''
+class Outer:
+    def run(self):
+        def helper():
+            pass
+        return helper()
+
+    class Inner:
+        def run(self):
+            pass
+
+def run():
+    pass
+'''
+
+
+def _cls(name: str, *bases: str, methods: tuple[str, ...] = ()) -> ClassRecord:
+    return ClassRecord(qualname=name, module="m", file="m.py", lineno=1, bases=list(bases), methods=list(methods))
+
+
+def test_qualnames_agree_across_extractors() -> None:
+    tree = ast.parse(SOURCE)
+    functions, _calls = extract_callgraph(tree, Path("m.py"), "m")
+    names = [f.qualname for f in functions]
+    assert names == ["m.Outer.run", "m.helper", "m.Outer.Inner.run", "m.run"]
+
+    assert sorted(m.qualname for m in extract_metrics(tree, Path("m.py"), "m")) == sorted(names)
+    assert sorted(d.function for d in extract_dataflow(tree, Path("m.py"), "m")) == sorted(names)
+    assert sorted(e.function for e in extract_effects(tree, Path("m.py"), "m")) == sorted(names)
+    assert set(fp.qualname for fp in extract_fingerprints(tree, Path("m.py"), "m", min_tokens=1)) == set(names)
+
+    classes, _types = extract_classes(tree, Path("m.py"), "m")
+    assert [(c.qualname, c.methods) for c in classes] == [("m.Outer", ["run"]), ("m.Outer.Inner", ["run"])]
+
+
+def test_c3_mro_and_lookup() -> None:
+    # Diamond: D(B, C), B(A), C(A)
+    index = ClassIndex(
+        [
+            _cls("m.A", "object", methods=("run", "stop")),
+            _cls("m.B", "m.A"),
+            _cls("m.C", "m.A", methods=("run",)),
+            _cls("m.D", "m.B", "m.C"),
+        ]
+    )
+    assert index.mro("m.D") == ("m.D", "m.B", "m.C", "m.A", "object")
+    assert index.lookup("m.D", "run") == "m.C.run"
+    assert index.lookup("m.D", "stop") == "m.A.stop"
+    assert index.lookup("m.D", "missing") is None
+
+    # A broken hierarchy (cycle) still terminates
+    cyclic = ClassIndex([_cls("m.X", "m.Y"), _cls("m.Y", "m.X", methods=("go",))])
+    assert cyclic.lookup("m.X", "go") == "m.Y.go"
+
+
+def test_method_calls_resolve_through_hierarchy(tmp_path: Path) -> None:
+    root = tmp_path / "repo"
+    (root / "app").mkdir(parents=True)
+    (root / "app" / "__init__.py").write_text("", encoding="utf-8")
+    (root / "app" / "base.py").write_text(
+        "class Base:\n"
+        "    def __init__(self):\n        self.setup()\n"
+        "    def setup(self):\n        pass\n"
+        "    @classmethod\n    def make(cls):\n        return cls.build()\n"
+        "    @classmethod\n    def build(cls):\n        pass\n",
+        encoding="utf-8",
+    )
+    (root / "app" / "jobs.py").write_text(
+        "from app import base\n"
+        "from app.base import Base\n\n"
+        "class Job(base.Base):\n"
+        "    def run(self):\n        self.setup()\n        self.missing()\n\n"
+        "def main():\n"
+        "    job = Job()\n    job.run()\n"
+        "    other = Base()\n    other = Job()\n    other.run()\n"
+        "    Job.make()\n",
+        encoding="utf-8",
+    )
+    out = tmp_path / "analysis"
+    analyze(root).write(out)
+
+    calls = json.loads((out / "callgraph_resolved.json").read_text(encoding="utf-8"))["calls"]
+    resolved = {(c["caller"], c["callee_raw"]): c["callee_resolved"] for c in calls}
+    assert resolved[("app.jobs.Job.run", "self.setup")] == "app.base.Base.setup"
+    assert resolved[("app.jobs.Job.run", "self.missing")] is None
+    assert resolved[("app.jobs.main", "Job")] == "app.base.Base.__init__"
+    assert resolved[("app.jobs.main", "job.run")] == "app.jobs.Job.run"
+    # `other` is bound to two different classes
+    assert resolved[("app.jobs.main", "other.run")] is None
+    assert resolved[("app.jobs.main", "Job.make")] == "app.base.Base.make"
+    assert resolved[("app.base.Base.make", "cls.build")] == "app.base.Base.build"
+
+    classes = {c["qualname"]: c for c in json.loads((out / "classes.json").read_text(encoding="utf-8"))["classes"]}
+    assert classes["app.jobs.Job"]["bases"] == ["app.base.Base"]
+    assert classes["app.jobs.Job"]["mro"] == ["app.jobs.Job", "app.base.Base"]
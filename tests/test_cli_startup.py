@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks.cli_startup import importtime
+
+REPO = Path(__file__).resolve().parents[1]
+
+# Modules a bare CLI start (parser construction, --help) must not import
+HEAVY = (
+    "dpylens.analyzer.pipeline",
+    "dpylens.analyzer.result",
+    "dpylens.reporter.html_report",
+    "dpylens.rendering.graphviz",
+    "dpylens.store.sqlite",
+    "dpylens.reporter.server",
+    "dpylens.export.tables",
+    "dpylens.worker.runner",
+    "dpylens.analyzer.budget",
+    "dataclasses",
+    "pyarrow",
+    "concurrent.futures",
+    "http.server",
+    "sqlite3",
+)
+
+
+def test_cli_startup_imports_stay_light() -> None:
+    loaded = importtime()
+    assert "dpylens.cli" in loaded
+    assert [m for m in HEAVY if m in loaded] == []
+
+
+def test_help_runs_without_heavy_imports() -> None:
+    code = (
+        "import sys\n"
+        "from dpylens.cli import build_parser\n"
+        "try:\n"
+        "    build_parser().parse_args(['run', '--help'])\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        f"print(sorted(m for m in {HEAVY!r} if m in sys.modules))\n"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=REPO)
+    assert proc.stdout.strip().splitlines()[-1] == "[]"
+
+
+def test_mirrored_constants_in_sync() -> None:
+    from dpylens import cli
+    from dpylens.analyzer.budget import GENERATED_MODES, FileBudget
+    from dpylens.analyzer.diff import DELTA_FILENAME
+    from dpylens.analyzer.shards import SHARD_STRATEGIES
+    from dpylens.export.graphs import GRAPH_FORMATS
+    from dpylens.export.tables import PARTITIONS, TABLE_FORMATS
+    from dpylens.reporter.linking import LINK_MODES
+    from dpylens.store.sqlite import STORE_FILENAME
+    from dpylens.worker.queue import QUEUE_FILENAME
+
+    assert cli.STORE_FILENAME == STORE_FILENAME
+    assert cli.DELTA_FILENAME == DELTA_FILENAME
+    assert cli.SHARD_STRATEGIES == SHARD_STRATEGIES
+    assert cli.LINK_MODES == LINK_MODES
+    assert cli.EXPORT_FORMATS == TABLE_FORMATS + GRAPH_FORMATS
+    assert cli.EXPORT_PARTITIONS == PARTITIONS
+    assert cli.QUEUE_FILENAME == QUEUE_FILENAME
+    assert cli.GENERATED_MODES == GENERATED_MODES
+    defaults = FileBudget()
+    assert (cli.DEFAULT_MAX_FILE_BYTES, cli.DEFAULT_MAX_FILE_SECONDS, cli.DEFAULT_GENERATED) == (
+        defaults.max_bytes,
+        defaults.max_seconds,
+        defaults.generated,
+    )
+
+
+def test_package_exports_are_lazy() -> None:
+    code = "import sys, dpylens; print('dpylens.analyzer.pipeline' in sys.modules); print(dpylens.analyze.__module__)"
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=REPO)
+    assert proc.stdout.split() == ["False", "dpylens.analyzer.pipeline"]
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from dpylens import analyze
+from dpylens.analyzer.distributions import DistributionIndex, dependency_graph, load_lock
+
+DISTS = {
+    "PyYAML-6.0.1.dist-info": ["yaml/__init__.py", "yaml/loader.py", "_yaml/__init__.py"],
+    "google_cloud_storage-2.10.0.dist-info": ["google/cloud/storage/__init__.py", "google/cloud/storage/blob.py"],
+    "google_cloud_core-2.3.3.dist-info": ["google/cloud/client.py", "google/cloud/core/__init__.py"],
+    "six-1.16.0.dist-info": ["six.py", "../../bin/six-tool"],
+}
+
+
+def _site_packages(root: Path) -> Path:
+    for dist, files in DISTS.items():
+        (root / dist).mkdir(parents=True)
+        rows = [f"{f},sha256=x,1" for f in files] + [f"{dist}/RECORD,,"]
+        (root / dist / "RECORD").write_text("\n".join(rows) + "\n", encoding="utf-8")
+    return root
+
+
+@pytest.fixture
+def analysis(tmp_path: Path) -> Path:
+    repo = tmp_path / "repo"
+    (repo / "app" / "web").mkdir(parents=True)
+    (repo / "app" / "__init__.py").write_text("", encoding="utf-8")
+    (repo / "app" / "web" / "__init__.py").write_text("", encoding="utf-8")
+    (repo / "app" / "core.py").write_text(
+        "import os\nimport yaml\nimport six\nfrom google.cloud import storage\nimport google.cloud\nimport requests\nimport acme.sdk\n",
+        encoding="utf-8",
+    )
+    (repo / "app" / "web" / "views.py").write_text("from app import core\nimport yaml\nfrom .missing import x\n", encoding="utf-8")
+    out = tmp_path / "analysis"
+    analyze(repo).write(out)
+    return out
+
+
+def test_dependency_graph_maps_imports_to_distributions(analysis: Path, tmp_path: Path) -> None:
+    site = _site_packages(tmp_path / "site-packages")
+    (tmp_path / "requirements.txt").write_text("requests==2.31.0\nPyYAML==6.0.1  # pinned\n", encoding="utf-8")
+    (tmp_path / "map.toml").write_text('[imports]\n"acme.sdk" = "acme-sdk"\n', encoding="utf-8")
+    index, _sources = DistributionIndex.build(
+        site_packages=[site], lock=tmp_path / "requirements.txt", mapping=tmp_path / "map.toml", cache_dir=None
+    )
+
+    assert index.resolve("google.cloud.storage").name == "google_cloud_storage"
+    assert index.resolve("google.cloud").candidates == ("google_cloud_core", "google_cloud_storage")
+    assert index.resolve("six").name == "six"
+
+    graph = dependency_graph(analysis, index)
+    edges = {(e["src"], e["dst"]): (e["kind"], e["imports"]) for e in graph["edges"]}
+    assert edges[("app", "PyYAML")] == ("distribution", 1)
+    assert edges[("app.web", "PyYAML")] == ("distribution", 1)
+    assert edges[("app", "google_cloud_storage")] == ("distribution", 1)
+    assert edges[("app", "requests")] == ("distribution", 1)  # from the lock file only
+    assert edges[("app", "acme-sdk")] == ("distribution", 1)  # from the mapping
+    assert edges[("app", "os")] == ("stdlib", 1)
+    assert edges[("app.web", "app")] == ("local", 1)
+
+    packages = {p["package"]: p for p in graph["packages"]}
+    assert packages["PyYAML"]["version"] == "6.0.1"
+    assert packages["requests"]["version"] == "2.31.0"
+    assert {(u["import"], u["reason"]) for u in graph["unmapped"]} == {("google.cloud", "ambiguous"), (".missing", "relative")}
+
+
+def test_site_index_is_cached_by_fingerprint(tmp_path: Path) -> None:
+    site = _site_packages(tmp_path / "site-packages")
+    cache = tmp_path / "cache"
+    assert DistributionIndex.build(site_packages=[site], cache_dir=cache)[1][0]["cached"] is False
+    index, sources = DistributionIndex.build(site_packages=[site], cache_dir=cache)
+    assert sources[0]["cached"] is True
+    assert index.resolve("yaml.loader").name == "PyYAML"
+
+    # Installing or upgrading a distribution changes the fingerprint
+    meta = site / "six-1.16.0.dist-info"
+    os.utime(meta, ns=(meta.stat().st_atime_ns, meta.stat().st_mtime_ns + 10**9))
+    assert DistributionIndex.build(site_packages=[site], cache_dir=cache)[1][0]["cached"] is False
+
+
+def test_lock_formats(tmp_path: Path) -> None:
+    (tmp_path / "poetry.lock").write_text('[[package]]\nname = "PyYAML"\nversion = "6.0.1"\n', encoding="utf-8")
+    (tmp_path / "Pipfile.lock").write_text(json.dumps({"default": {"requests": {"version": "==2.31.0"}}}), encoding="utf-8")
+    assert load_lock(tmp_path / "poetry.lock") == {"PyYAML": "6.0.1"}
+    assert load_lock(tmp_path / "Pipfile.lock") == {"requests": "2.31.0"}
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import ast
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from dpylens import analyze
+from dpylens.analyzer import duplicates
+from dpylens.analyzer.duplicates import extract_fingerprints, find_duplicates
+
+ORIGINAL = '''
+def load(path, limit=10):
+    """Read records."""
+    rows = []
+    with open(path) as fh:
+        for n, line in enumerate(fh):
+            if n >= limit:
+                break
+            key, _, value = line.partition("=")
+            if not key.strip():
+                continue
+            rows.append((key.strip(), value.strip().lower()))
+    result = {k: v for k, v in rows if v}
+    print(len(result), "records from", path)
+    return result
+'''
+
+# Same shape, different identifiers, literals and docstring
+RENAMED = '''
+def read_config(fname, maximum=99):
+    entries = []
+    with open(fname) as stream:
+        for i, text in enumerate(stream):
+            if i >= maximum:
+                break
+            name, _, val = text.partition(":")
+            if not name.strip():
+                continue
+            entries.append((name.strip(), val.strip().lower()))
+    out = {a: b for a, b in entries if b}
+    print(len(out), "entries in", fname)
+    return out
+'''
+
+# One extra statement
+EDITED = ORIGINAL.replace("def load(", "def load_logged(").replace(
+    "    result = {", "    log.debug(len(rows))\n    result = {"
+)
+
+UNRELATED = '''
+def render(items, width):
+    lines = []
+    for item in items:
+        text = str(item)
+        while len(text) > width:
+            lines.append(text[:width])
+            text = text[width:]
+        lines.append(text.center(width, "."))
+    header = "+" + "-" * width + "+"
+    return "\\n".join([header] + ["|" + x + "|" for x in lines] + [header])
+'''
+
+
+def _fingerprints(*sources: str) -> list[duplicates.FunctionFingerprint]:
+    out = []
+    for n, src in enumerate(sources):
+        out.extend(extract_fingerprints(ast.parse(src), Path(f"m{n}.py"), f"m{n}"))
+    return out
+
+
+def test_exact_and_near_duplicates() -> None:
+    fps = _fingerprints(ORIGINAL, RENAMED, EDITED, UNRELATED)
+    assert [fp.qualname for fp in fps] == ["m0.load", "m1.read_config", "m2.load_logged", "m3.render"]
+    assert fps[0].digest == fps[1].digest != fps[2].digest
+
+    clusters = find_duplicates(fps)
+    assert len(clusters) == 1
+    (cluster,) = clusters
+    assert cluster.kind == "near"
+    assert 0.8 <= cluster.similarity < 1.0
+    assert [fp.qualname for fp in cluster.members] == ["m0.load", "m1.read_config", "m2.load_logged"]
+
+    exact = find_duplicates(_fingerprints(ORIGINAL, RENAMED, UNRELATED))
+    assert [(c.kind, c.similarity, len(c.members)) for c in exact] == [("exact", 1.0, 2)]
+
+
+def test_short_functions_are_not_fingerprinted() -> None:
+    assert _fingerprints("def f(x):\n    return x + 1\n") == []
+
+
+def _synthetic(n: int, seed: int = 0) -> list[duplicates.FunctionFingerprint]:
+    rng = random.Random(seed)
+    fps = []
+    for i in range(n):
+        if i and rng.random() < 0.2:
+            # Copy of an earlier function, possibly with a few tokens changed
+            tokens = list(fps[rng.randrange(i)][1])
+            for _ in range(rng.randrange(0, 3)):
+                tokens[rng.randrange(len(tokens))] = rng.randrange(40)
+        else:
+            tokens = [rng.randrange(40) for _ in range(rng.randrange(50, 200))]
+        fps.append((i, tokens))
+    return [
+        duplicates.FunctionFingerprint(
+            qualname=f"m.f{i}", file=f"/r/m{i // 10}.py", lineno=i, tokens=len(tokens),
+            digest=str(hash(tuple(tokens))), signature=duplicates._signature(tokens),
+        )
+        for i, tokens in fps
+    ]
+
+
+def test_numpy_and_pure_python_agree(monkeypatch: pytest.MonkeyPatch) -> None:
+    fps = _synthetic(3000, seed=5)
+    first = find_duplicates(fps)
+    assert {c.kind for c in first} == {"exact", "near"}
+    monkeypatch.setattr(duplicates, "np", None)
+    assert find_duplicates(fps) == first
+    assert find_duplicates([]) == []
+
+
+def test_duplicates_artifact(tmp_path: Path) -> None:
+    root = tmp_path / "repo"
+    (root / "app").mkdir(parents=True)
+    (root / "app" / "__init__.py").write_text("", encoding="utf-8")
+    (root / "app" / "a.py").write_text(ORIGINAL + UNRELATED, encoding="utf-8")
+    (root / "app" / "b.py").write_text(RENAMED, encoding="utf-8")
+    out = tmp_path / "analysis"
+    analyze(root).write(out)
+
+    payload = json.loads((out / "duplicates.json").read_text(encoding="utf-8"))
+    assert payload["stats"]["functions"] == 3
+    assert payload["stats"]["exact_clusters"] == 1
+    (cluster,) = payload["clusters"]
+    assert [m["qualname"] for m in cluster["members"]] == ["app.a.load", "app.b.read_config"]
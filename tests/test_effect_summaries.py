@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from dpylens import analyze
+from dpylens.analyzer.summaries import SummaryMemo
+
+
+@pytest.fixture()
+def repo(tmp_path: Path, write) -> Path:
+    root = tmp_path / "repo"
+    write(root / "app" / "__init__.py", "")
+    write(
+        root / "app" / "config.py",
+        "import os\n"
+        "def db_url():\n"
+        "    return os.environ['DATABASE_URL']\n"
+        "def normalize(value, default=None):\n"
+        "    cleaned = value.strip()\n"
+        "    return cleaned\n",
+    )
+    write(
+        root / "app" / "io.py",
+        "from pathlib import Path\n"
+        "def save(path, text):\n"
+        "    Path(path).write_text(text)\n"
+        "    return path\n",
+    )
+    write(
+        root / "app" / "main.py",
+        "from .config import db_url, normalize\n"
+        "from .io import save\n"
+        "def main(name, flag):\n"
+        "    url = db_url()\n"
+        "    out = save(normalize(name), url)\n"
+        "    return out\n",
+    )
+    write(root / "app" / "ping.py", "from .pong import pong\ndef ping(n):\n    return pong(n)\n")
+    write(root / "app" / "pong.py", "import os\nfrom .ping import ping\ndef pong(n):\n    os.system('true')\n    return ping(n)\n")
+    return root
+
+
+def test_summaries_propagate_bottom_up(repo: Path) -> None:
+    result = analyze(repo)
+    by_fn = {s.function: s for s in result.summaries}
+
+    main = by_fn["app.main.main"]
+    assert main.env_reads == ["DATABASE_URL"]
+    assert main.side_effects == ["file_write"]
+    # name -> normalize(value) -> save(path) -> return; flag never reaches the result
+    assert main.params_to_return == ["name"]
+
+    assert by_fn["app.config.normalize"].params_to_return == ["value"]
+    assert by_fn["app.io.save"].params_to_return == ["path"]
+
+    # mutual recursion is one component, solved to a fixed point
+    assert by_fn["app.ping.ping"].key == by_fn["app.pong.pong"].key
+    assert by_fn["app.ping.ping"].side_effects == ["subprocess"]
+    assert result.payload("effects.json")["stats"]["computed"] == len(result.summaries)
+
+
+def test_memo_reuses_unchanged_components(repo: Path, write) -> None:
+    first = analyze(repo)
+
+    # only io.save changes: it and its transitive callers are recomputed
+    write(
+        repo / "app" / "io.py",
+        "import subprocess\n"
+        "def save(path, text):\n"
+        "    subprocess.run(['sync'])\n"
+        "    return text\n",
+    )
+    second = analyze(repo, summary_memo=SummaryMemo(first.summaries))
+
+    stats = second.summary_stats
+    assert stats is not None
+    assert stats.computed == 2  # app.io.save, app.main.main
+    assert stats.reused == len(second.summaries) - 2
+
+    main = next(s for s in second.summaries if s.function == "app.main.main")
+    assert main.side_effects == ["subprocess"]
+    assert main.params_to_return == []
+
+
+def test_receiver_bound_calls_and_constructors(make_repo) -> None:
+    repo = make_repo(
+        {
+            "app/__init__.py": "",
+            "app/box.py": "class Box:\n"
+            "    def __init__(self, value):\n"
+            "        self.value = value\n"
+            "    def ident(self, x):\n"
+            "        return x\n"
+            "    def use(self, y):\n"
+            "        return self.ident(y)\n"
+            "    def me(self, z):\n"
+            "        return self\n"
+            "def wrap(y):\n"
+            "    return Box(y)\n"
+            "def call(b, y, z):\n"
+            "    return Box.ident(b, y)\n"
+            "def chain(y, z):\n"
+            "    b = Box(y)\n"
+            "    return b.me(z)\n",
+        }
+    )
+    by_fn = {s.function: s for s in analyze(repo).summaries}
+
+    # self.ident(y): y fills `x`, not `self`
+    assert by_fn["app.box.Box.use"].params_to_return == ["y"]
+    # Box(y) resolves to __init__ but returns the new object, built from y
+    assert by_fn["app.box.wrap"].params_to_return == ["y"]
+    # Box.ident(b, y) passes self explicitly
+    assert by_fn["app.box.call"].params_to_return == ["y"]
+    # b.me(z) returns its receiver, which was built from y
+    assert by_fn["app.box.chain"].params_to_return == ["y"]
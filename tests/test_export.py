@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import json
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import pytest
+
+from dpylens import analyze
+from dpylens.export import tables
+from dpylens.export.graphs import export_graphs
+from dpylens.export.tables import ExportError, export_tables
+
+FILES = {
+    "app/__init__.py": "",
+    "app/core.py": "import os\n\ndef load(p):\n    return read(p) + read(p)\n\ndef read(p):\n    return os.path.basename(p)\n",
+    "app/web/__init__.py": "",
+    "app/web/views.py": "from app.core import load\n\ndef index():\n    return load('x') + load('y')\n",
+}
+
+
+@pytest.fixture
+def analysis(tmp_path: Path, make_repo) -> Path:
+    out = tmp_path / "analysis"
+    analyze(make_repo(FILES)).write(out)
+    return out
+
+
+@pytest.mark.parametrize("fmt", ["graphml", "gexf"])
+def test_graph_exports(analysis: Path, tmp_path: Path, fmt: str) -> None:
+    stats = export_graphs(analysis, tmp_path / "export", fmt=fmt)
+    assert stats.nodes["callgraph"] == 3
+
+    root = ET.parse(tmp_path / "export" / f"callgraph.{fmt}").getroot()
+    ns = {"g": root.tag[1:].split("}")[0]}
+    ids = {n.get("id") for n in root.iterfind(".//g:node", ns)}
+    assert ids == {"app.core.load", "app.core.read", "app.web.views.index"}
+    # Both calls to load() collapse into one edge of weight 2
+    (edge,) = root.findall(".//g:edge", ns)
+    assert (edge.get("source"), edge.get("target")) == ("app.web.views.index", "app.core.load")
+    assert "2" in {edge.get("weight"), *(d.text for d in edge.iterfind("g:data", ns))}
+
+    modules = ET.parse(tmp_path / "export" / f"module_graph.{fmt}").getroot()
+    assert "os" in {n.get("id") for n in modules.iterfind(".//g:node", ns)}
+
+
+def test_table_exports_round_trip(analysis: Path, tmp_path: Path) -> None:
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    calls = json.loads((analysis / "callgraph_resolved.json").read_text(encoding="utf-8"))["calls"]
+    # batch_rows=1 forces one batch per row
+    export_tables(analysis, tmp_path / "flat", batch_rows=1)
+    table = pq.read_table(tmp_path / "flat" / "calls.parquet")
+    assert table.schema.field("caller").type == pa.dictionary(pa.int32(), pa.string())
+    # Each Parquet row group holds only its own values' dictionary, not every value so far
+    flat = pq.ParquetFile(tmp_path / "flat" / "calls.parquet")
+    groups = [flat.read_row_group(i).column("caller").chunk(0) for i in range(flat.num_row_groups)]
+    assert len(groups) == len(calls) and all(len(g.dictionary) == 1 for g in groups)
+    assert table.column("callee_raw").to_pylist() == [c["callee_raw"] for c in calls]
+    assert set(table.column("package").to_pylist()) == {"app", "app.web"}
+
+    # Arrow IPC dictionaries grow across batches (dictionary deltas)
+    export_tables(analysis, tmp_path / "ipc", fmt="arrow", batch_rows=1)
+    assert pa.ipc.open_file(tmp_path / "ipc" / "calls.arrow").read_all().to_pylist() == table.to_pylist()
+
+    # Two open files at most: partitions are closed and continue in new part files
+    stats = export_tables(analysis, tmp_path / "parts", partition_by="package", batch_rows=1, max_open_files=1)
+    parts = ds.dataset(tmp_path / "parts" / "calls", format="parquet", partitioning="hive").to_table()
+    assert sorted(parts.column("callee_raw").to_pylist()) == sorted(c["callee_raw"] for c in calls)
+    assert stats.rows["imports"] == 2
+    assert (tmp_path / "parts" / "functions" / "package=app.web" / "part-0.parquet").exists()
+
+
+def test_table_export_without_pyarrow(analysis: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(tables, "pa", None)
+    with pytest.raises(ExportError, match="pyarrow"):
+        export_tables(analysis, tmp_path / "out")
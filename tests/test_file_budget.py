@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from dpylens import analyze, analyze_git
+from dpylens.analyzer.budget import FileBudget, generated_reason
+
+
+@pytest.fixture()
+def repo(tmp_path: Path, write) -> Path:
+    root = tmp_path / "repo"
+    write(root / "app" / "__init__.py", "")
+    write(root / "app" / "main.py", "import os\ndef main():\n    os.getcwd()\n")
+    write(
+        root / "app" / "api_pb2.py",
+        "# Generated by the protocol buffer compiler.  DO NOT EDIT!\nimport google.protobuf\ndef build():\n    pass\n",
+    )
+    write(root / "app" / "migrations" / "0001_initial.py", "from django.db import migrations\ndef forwards():\n    pass\n")
+    write(root / "app" / "big.py", "import json\n" + "x = 1\n" * 2000)
+    return root
+
+
+def test_generated_reason() -> None:
+    assert generated_reason(("pkg", "api_pb2_grpc.py"), b"") == "protobuf"
+    assert generated_reason(("db", "alembic", "versions", "abc.py"), b"") == "migration"
+    assert generated_reason(("pkg", "_vendor", "six.py"), b"") == "vendored"
+    assert generated_reason(("pkg", "ui.py"), b"# -*- coding: utf-8 -*-\n# @generated by tool\n") == "generated_header"
+    assert generated_reason(("pkg", "ui.py"), b'"""Docs generated by sphinx."""\n') is None
+
+
+def test_generated_files_are_reduced_to_imports_with_a_note(repo: Path) -> None:
+    result = analyze(repo, budget=FileBudget(max_bytes=5000, generated="imports-only"))
+
+    notes = {Path(e.file).name: e.error for e in result.errors}
+    assert notes == {
+        "api_pb2.py": "generated_file: protobuf; imports-only",
+        "0001_initial.py": "generated_file: migration; imports-only",
+        "big.py": f"budget_exceeded: {(repo / 'app' / 'big.py').stat().st_size} bytes > 5000; skipped",
+    }
+
+    # imports are kept for the module graph, nothing else is extracted
+    edges = {(e.src_module, e.dst_module) for e in result.module_edges}
+    assert ("app.api_pb2", "google.protobuf") in edges
+    assert ("app.migrations.0001_initial", "django.db") in edges
+    assert {f.qualname for f in result.functions} == {"app.main.main"}
+
+
+def test_generated_modes(repo: Path) -> None:
+    skipped = analyze(repo, budget=FileBudget(generated="skip"))
+    assert "app.api_pb2" not in {e.src_module for e in skipped.module_edges}
+
+    full = analyze(repo, budget=FileBudget(generated="full", max_bytes=None))
+    assert full.errors == []
+    assert "app.api_pb2.build" in {f.qualname for f in full.functions}
+
+
+def test_default_budget_only_skips_oversized_files(repo: Path) -> None:
+    result = analyze(repo)
+    assert result.errors == []
+    assert "app.api_pb2.build" in {f.qualname for f in result.functions}
+
+
+def test_file_cache_skips_outcomes_with_budget_notes(repo: Path, tmp_path: Path, git, commit) -> None:
+    git(repo, "init", "-q")
+    commit(repo, "init")
+    budget = FileBudget(max_bytes=5000, generated="imports-only")
+    cache = tmp_path / "cache"
+
+    first, stats = analyze_git(repo, budget=budget, cache_dir=cache)
+    assert (stats.files, stats.cached) == (5, 0)
+    again, stats = analyze_git(repo, budget=budget, cache_dir=cache)
+    assert stats.cached == 2  # __init__.py and main.py; the three noted files are analyzed again
+    assert again.errors == first.errors
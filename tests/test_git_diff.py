@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from dpylens import analyze
+from dpylens.analyzer.diff import analyze_diff
+from dpylens.analyzer.gitsource import GitBlobReader, GitError, changed_python_files, grep_files
+
+
+@pytest.fixture()
+def repo(make_repo, git) -> Path:
+    root = make_repo(
+        {
+            "app/__init__.py": "",
+            "app/util.py": "def old_helper():\n    return 1\n",
+            "app/main.py": "from .util import new_helper\ndef main():\n    new_helper()\n",
+            "app/gone.py": "import json\n",
+        }
+    )
+    git(root, "init", "-q")
+    return root
+
+
+def test_blob_reader_reads_without_checkout(repo: Path, commit, write) -> None:
+    sha = commit(repo, "base")
+    write(repo / "app" / "util.py", "# working tree edit\n")
+
+    with GitBlobReader(repo) as r:
+        assert r.read(sha, "app/util.py") == b"def old_helper():\n    return 1\n"
+        assert r.read(sha, "app/nope.py") is None
+
+
+def test_grep_files_only_treats_no_match_as_empty(repo: Path, commit) -> None:
+    sha = commit(repo, "base")
+    assert grep_files(repo, sha, r"def old_\w+") == ["app/util.py"]
+    assert grep_files(repo, sha, "no_such_name") == []
+    with pytest.raises(GitError):
+        grep_files(repo, "0" * 40, "import")
+    with pytest.raises(GitError):
+        grep_files(repo, sha, "(unclosed")
+
+
+def test_diff_reports_deltas_against_base_artifacts(repo: Path, tmp_path: Path, commit, write) -> None:
+    base = commit(repo, "base")
+    base_analysis = tmp_path / "analysis"
+    analyze(repo).write(base_analysis)
+
+    write(repo / "app" / "util.py", "def new_helper():\n    return 2\n")
+    write(repo / "app" / "extra.py", "from . import util\n")
+    (repo / "app" / "gone.py").unlink()
+    head = commit(repo, "head")
+
+    assert {(c.status, c.path) for c in changed_python_files(repo, base, head)} == {
+        ("M", "app/util.py"),
+        ("A", "app/extra.py"),
+        ("D", "app/gone.py"),
+    }
+
+    delta = analyze_diff(repo, base, head, base_analysis)
+
+    assert delta["functions"]["added"] == [{"qualname": "app.util.new_helper", "file": "app/util.py"}]
+    assert delta["functions"]["removed"] == [{"qualname": "app.util.old_helper", "file": "app/util.py"}]
+
+    # main.py did not change, but its call now resolves to the added function
+    assert delta["reanalyzed_files"] == ["app/main.py"]
+    assert {"caller": "app.main.main", "callee": "app.util.new_helper", "file": "app/main.py", "count": 1} in delta[
+        "calls"
+    ]["added"]
+    assert {"caller": "app.main.main", "callee": "new_helper", "file": "app/main.py", "count": 1} in delta["calls"][
+        "removed"
+    ]
+
+    added_edges = {(e["src_module"], e["dst_module"]) for e in delta["module_edges"]["added"]}
+    removed_edges = {(e["src_module"], e["dst_module"]) for e in delta["module_edges"]["removed"]}
+    assert ("app.extra", "app.util") in added_edges
+    assert ("app.gone", "json") in removed_edges
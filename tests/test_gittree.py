@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from dpylens import analyze, analyze_git
+from dpylens.analyzer import gittree
+from dpylens.analyzer.budget import DEFAULT_BUDGET
+from dpylens.analyzer.gitsource import clone_blobless, missing_blobs
+from dpylens.worker.jobs import analyze_job
+
+ARTIFACTS = ("callgraph_resolved.json", "module_graph.json", "dead_code.json", "classes.json")
+
+
+@pytest.fixture()
+def repo(tmp_path: Path, git, commit, write) -> Path:
+    root = tmp_path / "repo"
+    root.mkdir()
+    git(root, "init", "-q")
+    write(root / "pyproject.toml", '[project]\nname = "app"\n[project.scripts]\napp = "app.cli:main"\n')
+    write(root / "src" / "app" / "__init__.py", "")
+    write(root / "src" / "app" / "cli.py", "from app.core import run\n\ndef main():\n    run()\n")
+    write(root / "src" / "app" / "core.py", "def run():\n    return helper()\n\ndef helper():\n    return 1\n\ndef unused():\n    pass\n")
+    write(root / "build" / "gen.py", "x = 1\n")
+    write(root / "README.md", "docs\n")
+    commit(root, "init")
+    # Uncommitted work is not part of HEAD
+    write(root / "src" / "app" / "core.py", "def run():\n    pass\n")
+    git(root, "config", "uploadpack.allowFilter", "true")
+    git(root, "config", "uploadpack.allowAnySHA1InWant", "true")
+    return root
+
+
+def test_analyze_git_matches_a_checkout(repo: Path, tmp_path: Path, git) -> None:
+    checkout = tmp_path / "checkout"
+    git(repo, "worktree", "add", "-q", "--detach", str(checkout), "HEAD")
+
+    expected = analyze(checkout)
+    result, stats = analyze_git(repo, "HEAD", root=checkout)
+    assert stats.files == 3 and stats.cached == 0
+    for name in ARTIFACTS:
+        assert result.payload(name) == expected.payload(name)
+    # Layout (src/) and the pyproject.toml script entry point came from the tree
+    assert {f.qualname for f in result.functions} >= {"app.core.run", "app.cli.main"}
+    assert "app.core.unused" in {d["qualname"] for d in result.payload("dead_code.json")["dead"]}
+    assert "app.cli.main" not in {d["qualname"] for d in result.payload("dead_code.json")["dead"]}
+
+
+def test_blobless_clone_fetches_only_python_blobs_and_cache_hits_skip_them(repo: Path, tmp_path: Path) -> None:
+    cache = tmp_path / "cache"
+    first = clone_blobless(f"file://{repo}", tmp_path / "one.git")
+    result, stats = analyze_git(first, root=tmp_path / "one", cache_dir=cache)
+    assert (stats.files, stats.cached, stats.fetched) == (3, 0, 4)  # 3 Python files + pyproject.toml
+    assert len(missing_blobs(first, "HEAD")) == 2  # README.md and build/gen.py (ignored) were never fetched
+
+    second = clone_blobless(f"file://{repo}", tmp_path / "two.git")
+    again, stats = analyze_git(second, root=tmp_path / "two", cache_dir=cache)
+    assert (stats.cached, stats.fetched) == (3, 1)
+    # Cached results are renamed under the new root
+    assert sorted(again.payload("callgraph_resolved.json")["functions"], key=str) == sorted(
+        (
+            {**f, "file": f["file"].replace(str(tmp_path / "one"), str(tmp_path / "two"))}
+            for f in result.payload("callgraph_resolved.json")["functions"]
+        ),
+        key=str,
+    )
+
+
+def test_file_cache_key_covers_format_and_python_version(monkeypatch: pytest.MonkeyPatch) -> None:
+    args = ("0" * 40, "app/core.py", "app.core", DEFAULT_BUDGET)
+    key = gittree.FileCache.key(*args)
+    assert gittree.FileCache.key(*args) == key
+
+    monkeypatch.setattr(gittree, "FILE_ANALYSIS_VERSION", gittree.FILE_ANALYSIS_VERSION + 1)
+    bumped = gittree.FileCache.key(*args)
+    monkeypatch.setattr(gittree.sys, "version_info", (3, 99, 0))
+    assert len({key, bumped, gittree.FileCache.key(*args)}) == 3
+
+
+def test_analyze_job_reads_git_urls_without_checkout(repo: Path, tmp_path: Path) -> None:
+    out = tmp_path / "run"
+    payload = {"source": f"file://{repo}", "out": str(out), "report": False, "cache": str(tmp_path / "cache")}
+    assert analyze_job(payload)["cached_files"] == 0
+    assert not (out / "repo").exists()
+    assert (out / "analysis" / "analysis.sqlite").exists()
+    assert analyze_job(payload)["cached_files"] == 3  # retried attempt: fresh clone, cached results
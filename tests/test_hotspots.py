@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from array import array
+from pathlib import Path, PurePosixPath
+
+import pytest
+
+from dpylens import analyze
+from dpylens.analyzer import hotspots
+from dpylens.analyzer.churn import ChurnCache
+from dpylens.analyzer.hotspots import compute_hotspots, pagerank
+
+@pytest.fixture()
+def repo(tmp_path: Path, git, commit) -> Path:
+    root = tmp_path / "repo"
+    root.mkdir()
+    git(root, "init", "-q")
+    commit(root, "base", {"app/__init__.py": "", "app/util.py": "def helper(x):\n    return x\n", "README": "x\n"})
+    return root
+
+
+def test_churn_cache_reads_only_new_commits(repo: Path, tmp_path: Path, git, commit) -> None:
+    cache_path = tmp_path / "churn.sqlite"
+    with ChurnCache(cache_path) as cache:
+        first = cache.update(repo)
+        assert (first.new_commits, first.total_commits) == (1, 1)
+        assert set(cache.file_churn()) == {"app/__init__.py", "app/util.py"}  # README is not Python
+
+    commit(repo, "branch", {"app/util.py": "def helper(x):\n    if x:\n        return x\n    return 0\n"}, author="u@example.com")
+    with ChurnCache(cache_path) as cache:
+        second = cache.update(repo)
+        assert (second.new_commits, second.total_commits, second.rebuilt) == (1, 2, False)
+        util = cache.file_churn()["app/util.py"]
+        assert (util.commits, util.added, util.deleted, util.authors) == (2, 5, 1, 2)
+        assert cache.update(repo).new_commits == 0
+        assert cache.file_churn(since=util.last_change + 1) == {}
+
+    # Rewritten history: the cached tip is gone from head's ancestry
+    git(repo, "reset", "-q", "--hard", "HEAD~1")
+    commit(repo, "rewrite", {"app/other.py": "def other():\n    pass\n"})
+    with ChurnCache(cache_path) as cache:
+        third = cache.update(repo)
+        assert (third.rebuilt, third.total_commits) == (True, 2)
+        assert cache.file_churn()["app/util.py"].commits == 1
+
+
+def test_hotspots_join_churn_size_and_centrality(repo: Path, tmp_path: Path, commit) -> None:
+    commit(
+        repo,
+        "use helper",
+        {
+            "app/util.py": "def helper(x):\n    if x:\n        return x\n    return 0\n",
+            "app/main.py": "from app.util import helper\n\ndef main():\n    return helper(1)\n\ndef other():\n    return helper(2)\n",
+        },
+    )
+    commit(repo, "tweak", {"app/util.py": "def helper(x):\n    if x:\n        return x\n    return 1\n"})
+    out = tmp_path / "analysis"
+    analyze(repo).write(out)
+    with ChurnCache(out / "churn.sqlite") as cache:
+        cache.update(repo)
+        churn = cache.file_churn()
+
+    rankings = compute_hotspots(out, churn, root=repo, prefix=PurePosixPath("."), top=2)
+    riskiest = rankings["riskiest"]
+    assert [r["qualname"] for r in riskiest] == ["app.util.helper", "app.main.main"]
+    assert riskiest[0]["commits"] == 3 and riskiest[0]["complexity"] == 2 and riskiest[0]["fan_in"] == 2
+    assert rankings["most_depended_on"][0]["qualname"] == "app.util.helper"
+    assert [f["path"] for f in rankings["most_changed"]] == ["app/util.py", "app/main.py"]
+
+
+def test_pagerank_python_matches_numpy(monkeypatch: pytest.MonkeyPatch) -> None:
+    pytest.importorskip("numpy")
+    # 0 -> 1 -> 2, 3 -> 2; 2 has no out-edges
+    src, dst = array("q", [0, 1, 3]), array("q", [1, 2, 2])
+    fast = pagerank(4, src, dst)
+    monkeypatch.setattr(hotspots, "np", None)
+    slow = pagerank(4, src, dst)
+    assert slow == pytest.approx(fast)
+    assert sum(slow) == pytest.approx(4)
+    assert max(range(4), key=slow.__getitem__) == 2
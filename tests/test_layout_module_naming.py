@@ -2,7 +2,8 @@ from __future__ import annotations
 
 from pathlib import Path
 
-from dpylens.analyzer.layout import detect_package_layout, module_name_for_file_with_layout
+from dpylens import analyze
+from dpylens.analyzer.layout import ModuleIndex, detect_package_layout, module_name_for_file_with_layout
 
 
 def test_src_layout_module_name(tmp_path: Path) -> None:
@@ -17,4 +18,23 @@ def test_src_layout_module_name(tmp_path: Path) -> None:
     layout = detect_package_layout(repo)
     assert (repo / "src") in layout.package_roots
 
-    assert module_name_for_file_with_layout(layout, f) == "mypkg.util"
\ No newline at end of file
+    assert module_name_for_file_with_layout(layout, f) == "mypkg.util"
+
+def test_src_layout_names_agree_across_stages(tmp_path: Path) -> None:
+    repo = tmp_path / "repo"
+    pkg = repo / "src" / "mypkg"
+    pkg.mkdir(parents=True)
+    (pkg / "__init__.py").write_text("", encoding="utf-8")
+    (pkg / "util.py").write_text("def helper():\n    return 1\n", encoding="utf-8")
+    (pkg / "cli.py").write_text("from .util import helper\ndef main():\n    helper()\n", encoding="utf-8")
+    (repo / "tools").mkdir()
+    (repo / "tools" / "run.py").write_text("import mypkg.cli\n", encoding="utf-8")
+
+    index = ModuleIndex.for_root(repo.resolve())
+    assert index.module_for(repo.resolve() / "tools" / "run.py") == "tools.run"
+
+    result = analyze(repo)
+    assert {n.module for n in result.module_nodes} == {"mypkg.__init__", "mypkg.util", "mypkg.cli", "tools.run"}
+    assert ("mypkg.cli", "mypkg.util", "local") in {(e.src_module, e.dst_module, e.kind) for e in result.module_edges}
+    assert ("tools.run", "mypkg.cli", "local") in {(e.src_module, e.dst_module, e.kind) for e in result.module_edges}
+    assert ("mypkg.cli.main", "mypkg.util.helper") in {(c.caller, c.callee_resolved) for c in result.resolved_calls}
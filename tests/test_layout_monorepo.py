@@ -2,7 +2,11 @@ from __future__ import annotations
 
 from pathlib import Path
 
-from dpylens.analyzer.layout import detect_package_layout, module_name_for_file_with_layout
+from dpylens.analyzer.layout import (
+    detect_package_layout,
+    detect_package_layout_from_paths,
+    module_name_for_file_with_layout,
+)
 
 
 def test_monorepo_packages_src_layout_module_name(tmp_path: Path) -> None:
@@ -17,4 +21,20 @@ def test_monorepo_packages_src_layout_module_name(tmp_path: Path) -> None:
     layout = detect_package_layout(repo)
 
     assert (repo / "packages" / "pkgA" / "src") in layout.package_roots
-    assert module_name_for_file_with_layout(layout, util) == "pkgA.util"
\ No newline at end of file
+    assert module_name_for_file_with_layout(layout, util) == "pkgA.util"
+
+
+def test_layout_from_paths_matches_disk(tmp_path: Path) -> None:
+    repo = tmp_path / "repo"
+    files = [
+        "src/app/__init__.py",
+        "packages/pkgA/src/pkgA/util.py",
+        "packages/pkgB/src/README.py/notes.txt",  # no .py file directly in a src subfolder
+        "packages/node_modules/src/x/y.py",
+        "scripts/deploy.py",
+    ]
+    for rel in files:
+        (repo / rel).parent.mkdir(parents=True, exist_ok=True)
+        (repo / rel).write_text("", encoding="utf-8")
+
+    assert detect_package_layout_from_paths(repo, files) == detect_package_layout(repo)
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import ast
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from api.summary_builder import build_repo_summary
+from dpylens import analyze
+from dpylens.analyzer import metrics
+from dpylens.analyzer.metrics import FunctionMetrics, MetricTable, extract_metrics
+
+SOURCE = '''
+def f(a, b=1, *args, c, **kw):
+    if a and b or c:
+        for x in range(3):
+            with open(x) as fh:
+                print(fh)
+    elif b:
+        pass
+    else:
+        try:
+            g()
+        except ValueError:
+            pass
+    y = [i for i in a if i if i > 1]
+    def inner():
+        return call1(call2())
+    return lambda: h()
+
+async def k(self):
+    match self:
+        case 1:
+            pass
+        case _:
+            pass
+'''
+
+
+def test_extract_metrics() -> None:
+    rows = {m.qualname: m for m in extract_metrics(ast.parse(SOURCE), Path("m.py"), "m")}
+    assert list(rows) == ["m.f", "m.inner", "m.k"]
+
+    f = rows["m.f"]
+    # 1 + if + 2 boolean operators + for + elif + except + comprehension with two ifs
+    assert f.complexity == 10
+    assert (f.statements, f.nesting, f.params) == (12, 3, 5)
+    assert f.calls == 5  # range, open, print, g, h; the nested function's calls are its own
+    assert (rows["m.inner"].complexity, rows["m.inner"].calls) == (1, 2)
+    assert (rows["m.k"].complexity, rows["m.k"].nesting, rows["m.k"].params) == (3, 1, 1)
+
+
+def _records(n: int, seed: int = 0) -> list[FunctionMetrics]:
+    rng = random.Random(seed)
+    out = []
+    for i in range(n):
+        module = f"pkg{i // 40 % 3}.mod{i // 7}"
+        out.append(
+            FunctionMetrics(
+                qualname=f"{module}.f{i}",
+                module=module,
+                file=f"/r/pkg{i // 40 % 3}/mod{i // 7}.py",
+                lineno=i,
+                complexity=1 + int(rng.expovariate(0.3)),
+                statements=rng.randrange(1, 200),
+                nesting=rng.randrange(0, 5),
+                params=rng.randrange(0, 6),
+                calls=rng.randrange(0, 40),
+            )
+        )
+    return out
+
+
+def test_group_stats_match_reference() -> None:
+    records = _records(500)
+    agg = MetricTable(records).aggregates()
+
+    mods = agg["modules"]
+    for g, name in enumerate(mods["name"]):
+        values = sorted(r.statements for r in records if r.module == name)
+        n = len(values)
+        assert mods["count"][g] == n
+        assert mods["statements"]["p50"][g] == values[(50 * (n - 1)) // 100]
+        assert mods["statements"]["max"][g] == values[-1]
+    assert sorted(agg["packages"]["name"]) == ["pkg0", "pkg1", "pkg2"]
+    assert sum(agg["histograms"]["complexity"]) == 500
+
+    out = agg["outliers"]["complexity"]
+    above = [r for r in records if r.complexity > out["threshold"]]
+    assert out["count"] == len(above)
+    assert [o["value"] for o in out["top"]] == sorted((r.complexity for r in above), reverse=True)[:50]
+
+
+def test_numpy_and_pure_python_agree(monkeypatch: pytest.MonkeyPatch) -> None:
+    records = _records(2000, seed=3)
+    first = MetricTable(records).aggregates()
+    monkeypatch.setattr(metrics, "np", None)
+    assert MetricTable(records).aggregates() == first
+    assert MetricTable([]).aggregates()["count"] == 0
+
+
+def test_metrics_artifact_and_summary(tmp_path: Path) -> None:
+    root = tmp_path / "repo"
+    (root / "app").mkdir(parents=True)
+    (root / "app" / "__init__.py").write_text("", encoding="utf-8")
+    (root / "app" / "core.py").write_text(
+        "def busy(x):\n    if x:\n        for i in x:\n            if i:\n                print(i)\n    return x\n"
+        "def idle():\n    pass\n",
+        encoding="utf-8",
+    )
+    out = tmp_path / "analysis"
+    result = analyze(root)
+    result.write(out)
+
+    payload = json.loads((out / "metrics.json").read_text(encoding="utf-8"))
+    assert list(payload)[:3] == ["version", "metrics", "aggregates"]
+    assert {f["qualname"]: f["complexity"] for f in payload["functions"]} == {"app.core.busy": 4, "app.core.idle": 1}
+    assert payload["aggregates"]["packages"]["name"] == ["app"]
+
+    summary = build_repo_summary(out)
+    assert summary == build_repo_summary(result)
+    assert summary["metrics"]["repo"]["complexity"]["max"] == 4
+    assert summary["metrics"]["top_modules"][0]["name"] == "app.core"
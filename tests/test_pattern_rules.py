@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import ast
+from pathlib import Path
+
+import pytest
+
+from dpylens import analyze
+from dpylens.analyzer.imports import extract_imports
+from dpylens.analyzer.patterns import PatternRuleError, compile_pattern_rules, detect_patterns
+
+
+def _patterns(src: str, rules=None) -> list[str]:
+    tree = ast.parse(src)
+    return detect_patterns(tree, extract_imports(tree, Path("m.py")), Path("m.py"), rules).patterns
+
+
+def test_builtin_rules() -> None:
+    assert _patterns("import argparse\nimport os.path\n") == ["devops:cli"]
+    assert _patterns("import os\nos.system('ls')\n") == ["devops:shell"]
+    assert _patterns("import pulumi_aws\nfrom dataclasses import dataclass\n") == ["iac:pulumi", "models:dataclass"]
+    # call without the import is not enough
+    assert _patterns("def f():\n    run()\n") == []
+
+
+def test_custom_rules_from_toml(tmp_path: Path) -> None:
+    rules_file = tmp_path / "inhouse.toml"
+    rules_file.write_text(
+        "[[rule]]\n"
+        'id = "web:fastapi-route"\n'
+        'imports = ["fastapi"]\n'
+        'decorators = ["get", "post"]\n'
+        "\n"
+        "[[rule]]\n"
+        'id = "models:orm"\n'
+        'bases = ["models.Model", "DeclarativeBase"]\n',
+        encoding="utf-8",
+    )
+    rules = compile_pattern_rules([rules_file])
+
+    src = (
+        "from fastapi import FastAPI\n"
+        "from django.db import models\n"
+        "app = FastAPI()\n"
+        "@app.get('/')\n"
+        "def index():\n"
+        "    return {}\n"
+        "class User(models.Model):\n"
+        "    pass\n"
+    )
+    assert _patterns(src, rules) == ["models:orm", "web:fastapi-route"]
+    # decorator alone does not satisfy the import condition
+    assert _patterns("@app.get('/')\ndef f():\n    pass\n", rules) == []
+
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "api.py").write_text(src, encoding="utf-8")
+    result = analyze(repo, pattern_rules=rules)
+    assert result.patterns[0].patterns == ["models:orm", "web:fastapi-route"]
+
+
+def test_invalid_rule_is_reported(tmp_path: Path) -> None:
+    bad = tmp_path / "bad.toml"
+    bad.write_text('[[rule]]\nid = "x"\nimport = ["os"]\n', encoding="utf-8")
+    with pytest.raises(PatternRuleError, match="unknown keys import"):
+        compile_pattern_rules([bad])
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import ast
+import json
+from pathlib import Path
+
+import pytest
+
+from dpylens import analyze
+from dpylens.analyzer.plugins import ExtractorPlugin, PluginConfig, PluginError
+
+CALLS: list[str] = []
+
+
+class TodoPlugin(ExtractorPlugin):
+    """Counts string constants mentioning TODO and lists global names."""
+
+    name = "todos"
+    artifacts = ("todos.json",)
+
+    def handlers(self):
+        return {ast.Constant: self.on_constant, ast.Global: self.on_global}
+
+    def begin_file(self, ctx):
+        CALLS.append(ctx.rel)
+        return {"todos": 0, "globals": []}
+
+    def on_constant(self, state, node):
+        if isinstance(node.value, str) and "TODO" in node.value:
+            state["todos"] += 1
+
+    def on_global(self, state, node):
+        state["globals"].extend(node.names)
+
+    def finalize(self, per_file, result):
+        return {"todos.json": {"files": len(result.files), "by_file": per_file}}
+
+
+class BrokenPlugin(ExtractorPlugin):
+    name = "broken"
+
+    def handlers(self):
+        return {ast.FunctionDef: self.on_def}
+
+    def on_def(self, state, node):
+        raise RuntimeError("boom")
+
+
+TODOS = f"{__name__}:TodoPlugin"
+BROKEN = f"{__name__}:BrokenPlugin"
+
+
+FILES = {
+    "app/__init__.py": "",
+    "app/a.py": "X = 0\ndef f():\n    global X\n    return 'TODO: fix'\n",
+    "app/b.py": "import os\n",
+}
+
+
+@pytest.fixture()
+def repo(make_repo) -> Path:
+    return make_repo(FILES)
+
+
+def test_plugin_artifact_and_cache(repo: Path, tmp_path: Path) -> None:
+    config = PluginConfig(specs=(TODOS,), cache_dir=tmp_path / "cache")
+
+    CALLS.clear()
+    result = analyze(repo, plugins=config)
+    assert sorted(CALLS) == ["app/__init__.py", "app/a.py", "app/b.py"]
+    assert "todos.json" in result.artifact_names
+    by_file = result.payload("todos.json")["by_file"]
+    assert by_file[str(repo.resolve() / "app" / "a.py")] == {"todos": 1, "globals": ["X"]}
+
+    out = tmp_path / "out"
+    result.write(out)
+    assert json.loads((out / "todos.json").read_text(encoding="utf-8"))["files"] == 3
+
+    # Unchanged files come from the cache; only the edited file is traversed again
+    (repo / "app" / "b.py").write_text("'TODO'\n", encoding="utf-8")
+    CALLS.clear()
+    again = analyze(repo, plugins=config)
+    assert CALLS == ["app/b.py"]
+    assert again.payload("todos.json")["by_file"][str(repo.resolve() / "app" / "b.py")]["todos"] == 1
+
+
+def test_failing_plugin_is_isolated(repo: Path) -> None:
+    result = analyze(repo, plugins=PluginConfig(specs=(TODOS, BROKEN)))
+
+    assert result.payload("todos.json")["by_file"][str(repo.resolve() / "app" / "a.py")]["todos"] == 1
+    errors = [e.error for e in result.errors]
+    assert errors == ["plugin_failed: broken: boom"]
+    # Core analysis is unaffected
+    assert {f.qualname for f in result.functions} == {"app.a.f"}
+
+
+def test_unknown_plugin(repo: Path) -> None:
+    with pytest.raises(PluginError, match="unknown plugin"):
+        analyze(repo, plugins=PluginConfig(specs=("no-such-plugin",)))
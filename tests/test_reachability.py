@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import json
+from array import array
+from pathlib import Path
+
+import pytest
+
+from dpylens import analyze
+from dpylens.analyzer import reachability
+
+FILES = {
+    "pyproject.toml": (
+        '[project.scripts]\nrun-app = "app.cli:run"\nbroken = "app.missing:main"\n\n'
+        '[tool.dpylens]\nentry_points = ["app.plugins.hook_*"]\n'
+    ),
+    "app/__init__.py": "",
+    "app/cli.py": (
+        "from app.jobs import schedule\n\n"
+        "def main():\n    schedule()\n\n"
+        "def run():\n    _setup()\n\n"
+        "def _setup():\n    pass\n\n"
+        "def _unused():\n    _also_unused()\n\n"
+        "def _also_unused():\n    pass\n\n"
+        'if __name__ == "__main__":\n    main()\n'
+    ),
+    "app/jobs.py": (
+        "def _callback(item):\n    return item\n\n"
+        "def schedule(pool=None):\n    pool.map(_callback, [])\n    w = Worker()\n    w.process()\n\n"
+        "def orphan():\n    pass\n\n"
+        "class Worker:\n"
+        "    def __init__(self):\n        self.n = 0\n"
+        "    def process(self):\n        self._step()\n"
+        "    def _step(self):\n        pass\n"
+        "    def stale(self):\n        pass\n"
+    ),
+    "app/plugins.py": "def hook_start():\n    pass\n\ndef other():\n    pass\n",
+    "app/api.py": (
+        "from litestar import Litestar, get\n\n"
+        '@get("/items")\nasync def list_items() -> list:\n    return _load()\n\n'
+        "def _load():\n    return []\n\n"
+        "app = Litestar(route_handlers=[list_items])\n"
+    ),
+    "tests/test_jobs.py": "from app.jobs import orphan\n\ndef helper():\n    pass\n\ndef test_orphan():\n    orphan()\n",
+}
+
+
+def _write(root: Path) -> None:
+    for rel, text in FILES.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+
+
+def test_dead_code_artifact(tmp_path: Path) -> None:
+    root = tmp_path / "repo"
+    _write(root)
+    out = tmp_path / "analysis"
+    analyze(root, entry_points=("app.plugins.other",)).write(out)
+
+    payload = json.loads((out / "dead_code.json").read_text(encoding="utf-8"))
+    dead = {d["qualname"]: d["confidence"] for d in payload["dead"]}
+    assert dead == {
+        "app.cli._unused": "high",
+        "app.cli._also_unused": "high",
+        "tests.test_jobs.helper": "medium",
+        # w.process() and self._step() resolve through the class index; Worker is instantiated,
+        # so its other methods are reachable by name only
+        "app.jobs.Worker.stale": "low",
+    }
+    assert [d["confidence"] for d in payload["dead"]] == ["high", "high", "medium", "low"]
+
+    kinds = payload["entry_points"]
+    assert kinds["main"] == 1 and kinds["script"] == 1 and kinds["route"] == 1
+    assert kinds["test"] == 1 and kinds["configured"] == 2 and kinds["implicit"] == 1
+    assert payload["unmatched_roots"] == ["app.missing:main"]
+    assert payload["stats"]["unreachable"] == 4
+    assert payload["stats"]["reachable"] == payload["stats"]["functions"] - 4
+
+
+def test_reach_backends_agree(monkeypatch: pytest.MonkeyPatch) -> None:
+    # 0 -> 1 -> 2, 3 -> 0, 4 isolated, 5 <-> 6
+    src, dst = array("q", [0, 1, 3, 5, 6]), array("q", [1, 2, 0, 6, 5])
+    expected = bytearray([1, 1, 1, 0, 0, 1, 1])
+    assert reachability._reach(7, src, dst, [0, 5]) == expected
+    monkeypatch.setattr(reachability, "np", None)
+    assert reachability._reach(7, src, dst, [0, 5]) == expected
+    assert reachability._reach(3, array("q"), array("q"), []) == bytearray(3)
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from dpylens import analyze
+from dpylens.reporter.html_report import ReportPaths, build_report
+
+
+def _analysis(tmp_path: Path):
+    root = tmp_path / "repo"
+    (root / "app").mkdir(parents=True)
+    (root / "app" / "__init__.py").write_text("", encoding="utf-8")
+    (root / "app" / "main.py").write_text("def main():\n    return 1\n", encoding="utf-8")
+    result = analyze(root)
+    analysis = tmp_path / "analysis"
+    result.write(analysis)
+    return result, analysis
+
+
+def test_hardlinked_report_and_unchanged_skip(tmp_path: Path) -> None:
+    result, analysis = _analysis(tmp_path)
+    paths = ReportPaths(analysis_dir=analysis, report_dir=tmp_path / "report")
+
+    first = build_report(paths, result=result, link="hardlink")
+    assert first.placed == {"hardlink": 9}  # 9 data files
+    data = paths.report_dir / "data" / "callgraph.json"
+    assert data.stat().st_ino == (analysis / "callgraph.json").stat().st_ino
+
+    second = build_report(paths, result=result, link="hardlink")
+    assert second.placed == {} and second.written == 0 and second.unchanged == 11  # + index.html, data/overview.json
+
+    # Rewriting the analysis replaces files atomically: the report keeps its old content until rebuilt
+    before = data.read_text(encoding="utf-8")
+    (analysis / "callgraph.json").unlink()
+    (analysis / "callgraph.json").write_text('{"functions": [], "calls": [], "errors": []}', encoding="utf-8")
+    assert data.read_text(encoding="utf-8") == before
+    third = build_report(paths, link="hardlink")
+    assert third.placed == {"hardlink": 1}
+    assert data.read_text(encoding="utf-8").startswith('{"functions": []')
+
+    # Files that disappear from the analysis are removed from the report
+    (analysis / "routes.json").unlink()
+    build_report(paths, link="hardlink")
+    assert not (paths.report_dir / "data" / "routes.json").exists()
+
+
+def test_copy_and_symlink_modes(tmp_path: Path) -> None:
+    _result, analysis = _analysis(tmp_path)
+
+    copied = ReportPaths(analysis_dir=analysis, report_dir=tmp_path / "copied")
+    assert build_report(copied, link="copy").placed == {"copy": 9}
+    assert (copied.report_dir / "data" / "modules.json").stat().st_ino != (analysis / "modules.json").stat().st_ino
+
+    linked = ReportPaths(analysis_dir=analysis, report_dir=tmp_path / "linked")
+    assert build_report(linked, link="symlink").placed == {"symlink": 9}
+    target = linked.report_dir / "data" / "modules.json"
+    assert target.is_symlink() and target.resolve() == (analysis / "modules.json").resolve()
+
+
+def test_result_not_written_to_analysis_dir(tmp_path: Path) -> None:
+    result, _analysis_dir = _analysis(tmp_path)
+    paths = ReportPaths(analysis_dir=tmp_path / "elsewhere", report_dir=tmp_path / "report")
+
+    stats = build_report(paths, result=result)
+    assert stats.placed == {} and stats.written == 11
+    assert (paths.report_dir / "data" / "modules.json").read_text(encoding="utf-8") == result.json_text("modules.json")
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import gzip
+import http.client
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+from dpylens import analyze
+from dpylens.reporter.html_report import ReportPaths, build_report
+from dpylens.reporter.server import make_report_server
+
+
+@pytest.fixture()
+def served(tmp_path: Path, make_repo):
+    root = make_repo(
+        {
+            "app/__init__.py": "",
+            "app/util.py": "def helper():\n    return 1\n",
+            "app/main.py": "from app.util import helper\n\ndef main():\n    return helper()\n",
+        }
+    )
+    result = analyze(root)
+    report = tmp_path / "report"
+    build_report(ReportPaths(analysis_dir=tmp_path / "analysis", report_dir=report), result=result)
+    (tmp_path / "secret.txt").write_text("nope", encoding="utf-8")
+
+    server = make_report_server(report, port=0)
+    t = threading.Thread(target=server.serve_forever, daemon=True)
+    t.start()
+    try:
+        yield server.server_address[1], root.resolve(), report
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _get(port: int, path: str, headers: dict[str, str] | None = None) -> tuple[int, dict[str, str], bytes]:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    conn.request("GET", path, headers=headers or {})
+    res = conn.getresponse()
+    body = res.read()
+    conn.close()
+    return res.status, {k.lower(): v for k, v in res.getheaders()}, body
+
+
+def test_compression_etag_and_304(served) -> None:
+    port, _root, report = served
+    raw = (report / "index.html").read_bytes()
+
+    status, headers, body = _get(port, "/", {"Accept-Encoding": "gzip"})
+    assert status == 200 and headers["content-encoding"] == "gzip"
+    assert gzip.decompress(body) == raw
+    etag = headers["etag"]
+
+    status, headers, body = _get(port, "/index.html", {"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert status == 304 and body == b""
+
+    # The identity representation has its own validator
+    status, headers, body = _get(port, "/index.html")
+    assert status == 200 and "content-encoding" not in headers and body == raw
+    assert headers["etag"] != etag and headers["accept-ranges"] == "bytes"
+
+
+def test_precompressed_sibling_is_preferred(served) -> None:
+    port, _root, report = served
+    data = report / "data" / "callgraph.json"
+    (data.parent / "callgraph.json.gz").write_bytes(gzip.compress(data.read_bytes()))
+    status, headers, body = _get(port, "/data/callgraph.json", {"Accept-Encoding": "gzip"})
+    assert status == 200 and body == (data.parent / "callgraph.json.gz").read_bytes()
+
+
+def test_range_requests(served) -> None:
+    port, _root, report = served
+    raw = (report / "data" / "callgraph.json").read_bytes()
+
+    status, headers, body = _get(port, "/data/callgraph.json", {"Range": "bytes=5-14", "Accept-Encoding": "gzip"})
+    assert status == 206 and body == raw[5:15]
+    assert headers["content-range"] == f"bytes 5-14/{len(raw)}"
+
+    status, _headers, body = _get(port, "/data/callgraph.json", {"Range": "bytes=-10"})
+    assert status == 206 and body == raw[-10:]
+
+    status, headers, _body = _get(port, "/data/callgraph.json", {"Range": f"bytes={len(raw)}-"})
+    assert status == 416 and headers["content-range"] == f"bytes */{len(raw)}"
+
+    # A stale If-Range validator gets the whole file
+    status, _headers, body = _get(port, "/data/callgraph.json", {"Range": "bytes=0-1", "If-Range": '"stale"'})
+    assert status == 200 and body == raw
+
+
+def test_paths_outside_report_are_not_served(served) -> None:
+    port, _root, _report = served
+    assert _get(port, "/../secret.txt")[0] == 404
+    assert _get(port, "/%2e%2e/secret.txt")[0] == 404
+    assert _get(port, "/missing.json")[0] == 404
+
+
+def test_query_api(served) -> None:
+    port, root, _report = served
+
+    status, _headers, body = _get(port, "/api/functions?prefix=app.&limit=1")
+    page = json.loads(body)
+    assert status == 200 and page["items"][0]["qualname"] == "app.main.main" and page["next_offset"] == 1
+
+    status, _headers, body = _get(port, "/api/callers?name=app.util.helper")
+    assert [r["caller"] for r in json.loads(body)["items"]] == ["app.main.main"]
+
+    status, _headers, body = _get(port, "/api/file?path=app/main.py")
+    details = json.loads(body)
+    assert details["file"] == str(root / "app" / "main.py")
+    assert [f["qualname"] for f in details["functions"]] == ["app.main.main"]
+    assert [r["function"] for r in details["dataflow"]] == ["app.main.main"]
+    assert json.loads(_get(port, "/api/file?path=./app/main.py")[2]) == details
+
+    status, _headers, body = _get(port, "/api/files?q=app/m")
+    assert [r["file"] for r in json.loads(body)["items"]] == [str(root / "app" / "main.py")]
+
+    status, _headers, body = _get(port, "/api/overview")
+    assert json.loads(body) == {
+        "files": 3,
+        "functions": 2,
+        "calls": 1,
+        "module_edges": 1,
+        "pattern_hits": 0,
+        "routes": 0,
+        "dataflow_functions": 2,
+        "warnings": 0,
+    }
+
+    assert _get(port, "/api/file?path=nope.py")[0] == 404
+    assert _get(port, "/api/bogus")[0] == 404
+    assert _get(port, "/api/functions?limit=x")[0] == 400
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import base64
+import gzip
+import json
+import re
+from pathlib import Path
+
+import pytest
+
+from dpylens import analyze
+from dpylens.reporter.html_report import ReportPaths, build_report
+
+_BLOB = re.compile(r'<script type="application/octet-stream" data-file="([^"]+)" data-encoding="([^"]+)">([^<]*)</script>')
+
+
+@pytest.fixture()
+def repo(make_repo) -> Path:
+    return make_repo({"app/__init__.py": "", "app/main.py": "import os\ndef main():\n    return os.getcwd()\n"})
+
+
+def test_single_file_report_embeds_compressed_data(repo: Path, tmp_path: Path) -> None:
+    result = analyze(repo)
+    analysis = tmp_path / "analysis"
+    result.write(analysis)
+    (analysis / "module_graph.png").write_bytes(b"\x89PNG fake")
+
+    report = tmp_path / "report"
+    build_report(ReportPaths(analysis_dir=analysis, report_dir=report), single_file=True)
+    assert sorted(p.name for p in report.iterdir() if not p.name.startswith(".")) == ["index.html"]
+
+    html = (report / "index.html").read_text(encoding="utf-8")
+    blobs = {path: (enc, data) for path, enc, data in _BLOB.findall(html)}
+    assert set(blobs) == {
+        "data/modules.json",
+        "data/module_graph.json",
+        "data/callgraph.json",
+        "data/callgraph_resolved.json",
+        "data/patterns.json",
+        "data/dataflow.json",
+        "data/routes.json",
+        "data/metrics.json",
+        "data/duplicates.json",
+        "data/overview.json",
+        "img/module_graph.png",
+    }
+
+    enc, data = blobs["data/callgraph.json"]
+    assert enc == "gzip"
+    decoded = json.loads(gzip.decompress(base64.b64decode(data)))
+    assert decoded == json.loads((analysis / "callgraph.json").read_text(encoding="utf-8"))
+
+    # Overview counts are embedded uncompressed, so the first screen decodes no blob
+    enc, data = blobs["data/overview.json"]
+    assert enc == "identity"
+    assert json.loads(base64.b64decode(data)) == {
+        "files": 2,
+        "functions": 1,
+        "calls": 1,
+        "module_edges": 1,
+        "pattern_hits": 0,
+        "routes": 0,
+        "dataflow_functions": 1,
+        "warnings": 0,
+    }
+    assert blobs["img/module_graph.png"] == ("identity", base64.b64encode(b"\x89PNG fake").decode("ascii"))
+
+    # Same input, same bytes; and the same data whether it comes from files or from the result
+    again = tmp_path / "again"
+    build_report(ReportPaths(analysis_dir=analysis, report_dir=again), result=result, single_file=True)
+    assert (again / "index.html").read_text(encoding="utf-8") == html
+
+
+def test_default_report_has_no_embedded_data(repo: Path, tmp_path: Path) -> None:
+    analysis = tmp_path / "analysis"
+    analyze(repo).write(analysis)
+    report = tmp_path / "report"
+    build_report(ReportPaths(analysis_dir=analysis, report_dir=report))
+
+    html = (report / "index.html").read_text(encoding="utf-8")
+    assert not _BLOB.search(html)
+    assert "dpylens:embedded" not in html
+    assert (report / "data" / "modules.json").exists()
+    # The page shows these counts; it does not compute them
+    assert json.loads((report / "data" / "overview.json").read_text(encoding="utf-8"))["functions"] == 1
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from dpylens import analyze
+from dpylens.analyzer.shards import ShardError, ShardSpec, merge_shards, write_shard
+
+
+@pytest.fixture
+def monorepo(make_repo) -> Path:
+    files = {"tools/run.py": "import alpha.m1\ndef main():\n    alpha.m1.f1()\n", "tools/bad.py": "def (:\n"}
+    for pkg in ("alpha", "beta"):
+        files[f"packages/{pkg}/src/{pkg}/__init__.py"] = ""
+        for i in range(4):
+            files[f"packages/{pkg}/src/{pkg}/m{i}.py"] = f"from .m0 import f0\ndef f{i}():\n    return f0()\n"
+    return make_repo(files)
+
+
+@pytest.mark.parametrize("by,count", [("hash", 3), ("root", 3)])
+def test_merged_shards_match_single_run(tmp_path: Path, monorepo: Path, by: str, count: int) -> None:
+    repo = monorepo
+    shard_dir = tmp_path / "shards"
+    for i in range(count):
+        write_shard(repo, ShardSpec(index=i, count=count, by=by), shard_dir)
+
+    merged = merge_shards([shard_dir])
+    single = analyze(repo)
+
+    for name in single.artifact_names:
+        assert merged.payload(name) == single.payload(name), name
+
+
+def test_merge_rejects_missing_shard(tmp_path: Path, monorepo: Path) -> None:
+    repo = monorepo
+    write_shard(repo, ShardSpec(index=0, count=2), tmp_path / "shards")
+
+    with pytest.raises(ShardError, match="missing shards: 1/2"):
+        merge_shards([tmp_path / "shards"])
+
+
+def test_shard_spec_parse() -> None:
+    assert ShardSpec.parse("2/5", by="root") == ShardSpec(index=2, count=5, by="root")
+    with pytest.raises(ShardError):
+        ShardSpec.parse("5/5")
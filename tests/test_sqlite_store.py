@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from dpylens import analyze
+from dpylens.store.sqlite import AnalysisStore, write_sqlite_store
+
+
+FILES = {
+    "app/__init__.py": "",
+    "app/util.py": "def helper():\n    return 1\ndef helper_two():\n    return helper()\n",
+    "app/main.py": "from .util import helper\ndef main():\n    helper()\n",
+}
+
+
+@pytest.fixture()
+def repo(make_repo) -> Path:
+    return make_repo(FILES)
+
+
+def test_store_prefix_query_and_pagination(repo: Path, tmp_path: Path) -> None:
+    result = analyze(repo)
+    db = write_sqlite_store(result, tmp_path / "analysis.sqlite")
+
+    with AnalysisStore(db) as store:
+        names = [r["qualname"] for r in store.functions("app.util.")]
+        assert names == ["app.util.helper", "app.util.helper_two"]
+
+        first = store.functions("app.", limit=2, offset=0)
+        rest = store.functions("app.", limit=2, offset=2)
+        assert [r["qualname"] for r in first + rest] == ["app.main.main", "app.util.helper", "app.util.helper_two"]
+
+
+def test_store_callers_and_file_details(repo: Path, tmp_path: Path) -> None:
+    result = analyze(repo)
+    db = write_sqlite_store(result, tmp_path / "analysis.sqlite")
+
+    with AnalysisStore(db) as store:
+        callers = {r["caller"] for r in store.callers("app.util.helper")}
+        assert callers == {"app.main.main"}
+
+        details = store.file_details("app/main.py")
+        assert details is not None
+        assert [f["qualname"] for f in details["functions"]] == ["app.main.main"]
+        assert details["imports"][0]["names"] == ["helper"]
+
+        assert store.file_details(str(repo / "app" / "__init__.py")) is not None
+        assert store.file_details("app/missing.py") is None
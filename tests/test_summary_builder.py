@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import json
+import random
+from pathlib import Path
+
+from api.summary_builder import build_repo_summary
+from dpylens import analyze
+from dpylens.analyzer.jsonstream import iter_fields
+from dpylens.analyzer.sketches import DistinctCounter, TopK
+
+
+def test_iter_fields_streams_top_level_arrays(tmp_path: Path) -> None:
+    payload = {
+        "framework": "litestar",
+        "routes": [{"path": "/a" * 50, "n": 12345678901234567890}, {"path": "ü", "n": -1.5e3}],
+        "empty": [],
+        "nested": {"k": [1, 2]},
+        "n": 42,
+    }
+    p = tmp_path / "a.json"
+    p.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+
+    # Tiny chunks: values and numbers straddle chunk boundaries
+    for chunk in (1, 3, 7, 1 << 16):
+        rows = list(iter_fields(p, chunk=chunk))
+        assert rows == [
+            ("framework", "litestar"),
+            ("routes", payload["routes"][0]),
+            ("routes", payload["routes"][1]),
+            ("nested", {"k": [1, 2]}),
+            ("n", 42),
+        ]
+
+
+def test_topk_exact_below_capacity_and_bounded_above() -> None:
+    exact = TopK(capacity=10)
+    for key in "abacabadab":
+        exact.add(key)
+    assert exact.top(3) == [("a", 5), ("b", 3), ("c", 1)]  # ties (c, d) keep first-seen order
+
+    rng = random.Random(1)
+    stream = ["heavy"] * 500 + ["warm"] * 200 + [f"rare{rng.randrange(5000)}" for _ in range(3000)]
+    rng.shuffle(stream)
+    bounded = TopK(capacity=50)
+    for key in stream:
+        bounded.add(key)
+    assert len(bounded) == 50
+    top = dict(bounded.top(2))
+    assert list(top) == ["heavy", "warm"]
+    assert 500 <= top["heavy"] <= 500 + len(stream) // 50
+
+
+def test_distinct_counter() -> None:
+    small = DistinctCounter(k=64)
+    for i in range(40):
+        small.add(f"x{i % 20}")
+    assert small.estimate() == 20
+
+    big = DistinctCounter(k=256)
+    for i in range(20_000):
+        big.add(f"callee{i}")
+    assert abs(big.estimate() - 20_000) < 0.2 * 20_000
+
+
+def test_module_degrees_and_bounded_tables(tmp_path: Path) -> None:
+    root = tmp_path / "repo"
+    (root / "app").mkdir(parents=True)
+    (root / "app" / "__init__.py").write_text("", encoding="utf-8")
+    (root / "app" / "core.py").write_text("def f():\n    pass\n", encoding="utf-8")
+    for name in ("a", "b", "c"):
+        (root / "app" / f"{name}.py").write_text(
+            "from app import core\nimport os\ndef g():\n    core.f()\n    os.getcwd()\n", encoding="utf-8"
+        )
+    out = tmp_path / "analysis"
+    analyze(root).write(out)
+
+    summary = build_repo_summary(out)
+    graph = summary["module_graph"]
+    assert {"module": "app.core", "in": 3} in graph["top_in_degree"]
+    assert graph["top_out_degree"][0] == {"module": "app.a", "out": 3}
+
+    # With fewer tracked keys than distinct callers, tables stay bounded
+    small = build_repo_summary(out, tracked_keys=2)
+    assert len(small["call_graph"]["top_callers_by_calls"]) == 2
+    assert len(small["call_graph"]["top_fanout_callers"]) <= 2
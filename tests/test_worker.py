@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from dpylens.worker.jobs import analyze_job
+from dpylens.worker.queue import JobQueue
+from dpylens.worker.runner import Worker
+
+
+@pytest.fixture
+def queue(tmp_path: Path):
+    with JobQueue(tmp_path / "queue.sqlite") as q:
+        yield q
+
+
+def _handlers(marker: Path) -> dict[str, Any]:
+    def echo(payload: dict[str, Any]) -> dict[str, Any]:
+        return {"pid": os.getpid(), "value": payload["value"] * 2}
+
+    def crash(payload: dict[str, Any]) -> dict[str, Any]:
+        with marker.open("a", encoding="utf-8") as fh:
+            fh.write("x")
+        os._exit(3)  # the job process dies without reporting
+
+    def boom(payload: dict[str, Any]) -> dict[str, Any]:
+        raise ValueError("bad input")
+
+    return {"echo": echo, "crash": crash, "boom": boom}
+
+
+def test_leases_expire_and_jobs_are_retried_then_failed(queue: JobQueue) -> None:
+    job = queue.enqueue("analyze", {"source": "x"}, max_attempts=2)
+    first = queue.claim("w1", lease=0.05)
+    assert first is not None and first.id == job.id and first.attempts == 1
+    assert queue.claim("w2") is None  # leased
+
+    time.sleep(0.1)  # w1 stopped heartbeating
+    second = queue.claim("w2", lease=30)
+    assert second is not None and second.worker == "w2" and second.attempts == 2
+    assert queue.heartbeat(job.id, "w1") is False
+    assert queue.complete(job.id, "w1", {}) is False
+    assert queue.heartbeat(job.id, "w2") is True
+
+    assert queue.fail(job.id, "w2", "boom", retry_delay=0) == "failed"  # no attempts left
+    assert queue.get(job.id).error == "boom"
+
+    retried = queue.enqueue("analyze", {"source": "y"}, max_attempts=3)
+    queue.claim("w1")
+    assert queue.fail(retried.id, "w1", "flaky", retry_delay=60) == "queued"
+    assert queue.claim("w1") is None  # waiting out the retry delay
+    assert queue.counts() == {"queued": 1, "running": 0, "done": 0, "failed": 1}
+
+
+def test_threads_share_one_queue(queue: JobQueue) -> None:
+    errors: list[Exception] = []
+
+    def submit(n: int) -> None:
+        try:
+            for i in range(50):
+                queue.enqueue("echo", {"value": n * 100 + i})
+                queue.counts()
+        except Exception as e:  # noqa: BLE001
+            errors.append(e)
+
+    threads = [threading.Thread(target=submit, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert queue.counts()["queued"] == 400
+
+
+def test_forked_worker_runs_retries_and_fails_jobs(queue: JobQueue, tmp_path: Path) -> None:
+    marker = tmp_path / "crashes"
+    ok = queue.enqueue("echo", {"value": 21})
+    crash = queue.enqueue("crash", {}, max_attempts=2)
+    boom = queue.enqueue("boom", {}, max_attempts=1)
+
+    worker = Worker(queue, _handlers(marker), worker="w", retry_delay=0, log=lambda _m: None)
+    stats = worker.run(burst=True)
+
+    done = queue.get(ok.id)
+    assert done.state == "done" and done.result["value"] == 42
+    assert done.result["pid"] != os.getpid()  # ran in a forked child
+
+    crashed = queue.get(crash.id)
+    assert crashed.state == "failed" and crashed.attempts == 2 and marker.read_text() == "xx"
+    assert "status 3" in crashed.error
+
+    failed = queue.get(boom.id)
+    assert failed.state == "failed" and failed.error == "ValueError: bad input"
+    assert (stats.done, stats.failed, stats.abandoned) == (1, 3, 0)
+
+
+def test_analyze_job(tmp_path: Path) -> None:
+    src = tmp_path / "src" / "pkg"
+    src.mkdir(parents=True)
+    (src / "__init__.py").write_text("", encoding="utf-8")
+    (src / "core.py").write_text("def f():\n    return g()\n\ndef g():\n    return 1\n", encoding="utf-8")
+    (src / "broken.py").write_text("def (:\n", encoding="utf-8")
+
+    out = tmp_path / "run"
+    result = analyze_job({"source": str(tmp_path / "src"), "out": str(out), "archives": True})
+    assert result["files_analyzed"] == 3 and result["parse_errors"] == 1
+    assert (out / "analysis" / "analysis.sqlite").exists()
+    assert (out / "report" / "index.html").exists()
+    assert (out / "report.zip").exists() and (out / "analysis.zip").exists()